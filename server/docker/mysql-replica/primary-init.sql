@@ -0,0 +1,4 @@
+-- Replication account used by the replica (docker-compose.replica.yml)
+CREATE USER IF NOT EXISTS 'repl'@'%' IDENTIFIED BY 'repl';
+GRANT REPLICATION SLAVE ON *.* TO 'repl'@'%';
+FLUSH PRIVILEGES;
@@ -0,0 +1,18 @@
+#!/bin/bash
+# Point the replica at the primary and start replicating (docker-compose.replica.yml).
+# Runs once, when the replica's data directory is first initialised.
+set -e
+
+mysql -uroot -p"$MYSQL_ROOT_PASSWORD" <<SQL
+CHANGE REPLICATION SOURCE TO
+  SOURCE_HOST = 'mysql-primary',
+  SOURCE_PORT = 3306,
+  SOURCE_USER = 'repl',
+  SOURCE_PASSWORD = 'repl',
+  SOURCE_AUTO_POSITION = 1,
+  SOURCE_DELAY = ${REPLICA_DELAY_SECONDS:-0},
+  GET_SOURCE_PUBLIC_KEY = 1;
+START REPLICA;
+-- Persisted rather than a server flag, so the entrypoint's own setup can still write
+SET PERSIST super_read_only = ON;
+SQL
@@ -2,11 +2,46 @@
 process.env.TZ = 'Asia/Kolkata';
 require('./src/config/env');
 
+const {
+  isClusterPrimary,
+  startClusterPrimary,
+  onLeadershipChange,
+  markWorkerReady,
+} = require('./src/cluster');
+
+// In cluster mode the primary only supervises workers; it never serves
+if (isClusterPrimary()) {
+  // Workers must share OTPs, or a code sent by one fails to verify on another
+  const otpStoreProblem = require('./src/services/otp').getUnsharedOtpStoreReason();
+  if (otpStoreProblem) {
+    console.error(
+      `❌ Refusing to start ${process.env.CLUSTER_WORKERS} workers: ${otpStoreProblem}. ` +
+        'Set OTP_STORE_PROVIDER=redis and REDIS_URL, or unset CLUSTER_WORKERS.'
+    );
+    process.exit(1);
+  }
+  startClusterPrimary();
+  return;
+}
+
 const express = require('express');
-const { PrismaClient } = require('@prisma/client');
 const path = require('path');
 const { createFrontDeskHoldCleanup } = require('./src/utils/frontdeskHoldCleanup');
 const { registerRoutes } = require('./src/routes/routeRegistry');
+const requestLogger = require('./src/middleware/requestLogger');
+const { metricsMiddleware, metricsHandler } = require('./src/middleware/metrics.middleware');
+const { queryTracker } = require('./src/middleware/queryTracker.middleware');
+const { trackWrites } = require('./src/middleware/readReplica.middleware');
+const { compression } = require('./src/middleware/compression.middleware');
+const { serveUploads } = require('./src/middleware/uploads.middleware');
+const { createUploadGc } = require('./src/services/media/blobGc.service');
+const emailGateway = require('./src/services/communication/emailGateway');
+const { warmPropertyDetailsCache } = require('./src/services/property/propertyDetailsCache.service');
+const { createWebhookInboxProcessor } = require('./src/services/payment/webhookInbox.service');
+const { createPaymentReconciler } = require('./src/services/payment/paymentReconciliation.service');
+const { createOrderExpirySweeper } = require('./src/services/payment/orderExpiry.service');
+const { processWebhookEvent, notifyBookingConfirmed } = require('./src/controllers/payment/webhook.controller');
+const prisma = require('./src/config/prisma');
 
 
 // Initialize app
@@ -14,24 +49,37 @@ const app = express();
 
 const port = process.env.PORT || 5000;
 
-// Prisma
-const prisma = new PrismaClient();
-
 // Cleanup
 const HOLD_CLEANUP_INTERVAL_MS = parseInt(
   process.env.FRONTDESK_HOLD_CLEANUP_INTERVAL_MS || '60000',
   10
 );
 const frontDeskHoldCleanup = createFrontDeskHoldCleanup(prisma);
+const uploadGc = createUploadGc();
+const webhookInbox = createWebhookInboxProcessor({ handleEvent: processWebhookEvent });
+const paymentReconciler = createPaymentReconciler({ onFinalized: notifyBookingConfirmed });
+const orderExpirySweeper = createOrderExpirySweeper();
 
-// Logging middleware
-const loggingMiddleware = (req, res, next) => {
-  console.log(`[${req.method}] ${req.url}`);
-  next();
-};
+// Request logging (request ID + duration for every request)
+app.use(requestLogger);
+
+// Metrics (per-route latency, in-flight, Prisma queries, event loop lag)
+app.use(metricsMiddleware);
+app.get('/metrics', metricsHandler);
+
+// gzip/brotli for JSON and text responses above the size threshold.
+// Mounted before queryTracker: its res.end wrapper must run before the
+// compressor writes the headers, or the budget 500 and X-Query-Summary are lost
+app.use(compression);
+
+// Per-request query tracking / budgets (development and test only)
+app.use(queryTracker);
+
+// Read-your-writes: callers who just wrote read from the primary (replica setups only)
+app.use(trackWrites);
 
 // ================= ROUTES =================
-const routeManager = registerRoutes(app, loggingMiddleware);
+const routeManager = registerRoutes(app);
 
 // Webhooks first (raw body)
 routeManager.registerWebhooks();
@@ -40,8 +88,8 @@ routeManager.registerWebhooks();
 app.use(express.json());
 app.use(express.urlencoded({ extended: true }));
 
-// Static uploads
-app.use('/uploads', express.static(path.join(__dirname, 'uploads')));
+// Static uploads (content-hashed files are served as immutable)
+app.use('/uploads', serveUploads(path.join(__dirname, 'uploads')));
 
 // Other routes
 routeManager.registerAll();
@@ -91,10 +139,31 @@ async function startServer() {
     await prisma.$connect();
     console.log('✅ Database connected');
 
-    await frontDeskHoldCleanup.start(HOLD_CLEANUP_INTERVAL_MS);
+    // Periodic jobs run on the leader only (always true without cluster mode)
+    onLeadershipChange(async (isLeader) => {
+      if (isLeader) {
+        await frontDeskHoldCleanup.start(HOLD_CLEANUP_INTERVAL_MS);
+        uploadGc.start();
+        await webhookInbox.start();
+        paymentReconciler.start();
+        orderExpirySweeper.start();
+      } else {
+        frontDeskHoldCleanup.stop();
+        uploadGc.stop();
+        webhookInbox.stop();
+        paymentReconciler.stop();
+        orderExpirySweeper.stop();
+      }
+    });
+
+    // Every worker has its own details cache - warm it without delaying startup
+    warmPropertyDetailsCache().catch((err) => {
+      console.error('⚠️ Property details cache warm-up failed:', err.message);
+    });
 
     app.listen(port, () => {
-      console.log(`🚀 Server running on http://localhost:${port}`);
+      console.log(`🚀 Server running on http://localhost:${port} (pid ${process.pid})`);
+      markWorkerReady();
     });
   } catch (err) {
     console.error('❌ Startup failed:', err);
@@ -108,6 +177,11 @@ startServer();
 const shutdown = async () => {
   console.log('🛑 Shutting down...');
   frontDeskHoldCleanup.stop();
+  uploadGc.stop();
+  webhookInbox.stop();
+  paymentReconciler.stop();
+  orderExpirySweeper.stop();
+  emailGateway.close();
   await prisma.$disconnect();
   process.exit(0);
 };
@@ -0,0 +1,102 @@
+/**
+ * Prisma query middleware
+ *
+ * Prisma 6 dropped $use() middleware, so hooks are installed as a client
+ * extension around every model operation. The shared client in
+ * src/config/prisma.js is created through applyPrismaMiddleware().
+ *
+ * Hooks registered with registerQueryHook() receive
+ * { model, action, durationMs, error } after each query completes.
+ *
+ * When a read replica client is passed, reads the current request routed
+ * to the replica (utils/readRouting) are sent there instead; metrics and
+ * hooks still see them once, here.
+ */
+
+const { histogram, counter } = require('../../src/utils/metrics.utils');
+const { shouldUseReplica, noteOperation } = require('../../src/utils/readRouting.utils');
+
+const queryDuration = histogram({
+  name: 'prisma_query_duration_seconds',
+  help: 'Prisma query duration by model and action',
+  labelNames: ['model', 'action'],
+  buckets: [0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5],
+});
+
+const queryErrors = counter({
+  name: 'prisma_query_errors_total',
+  help: 'Prisma queries that threw, by model and action',
+  labelNames: ['model', 'action'],
+});
+
+const replicaReads = counter({
+  name: 'prisma_replica_reads_total',
+  help: 'Prisma reads served by the read replica, by model',
+  labelNames: ['model'],
+});
+
+const hooks = [];
+
+/**
+ * Register a callback invoked after every Prisma model query
+ * @param {Function} hook - ({ model, action, args, durationMs, error }) => void
+ */
+const registerQueryHook = (hook) => {
+  hooks.push(hook);
+};
+
+const runHooks = (event) => {
+  for (const hook of hooks) {
+    try {
+      hook(event);
+    } catch (error) {
+      console.error('❌ Prisma query hook failed:', error);
+    }
+  }
+};
+
+// Client property for a model name (Property -> property)
+const delegateName = (model) => model.charAt(0).toLowerCase() + model.slice(1);
+
+/**
+ * Wrap a PrismaClient with query metrics and hooks
+ * @param {import('@prisma/client').PrismaClient} client
+ * @param {Object} [options]
+ * @param {import('@prisma/client').PrismaClient|null} [options.replica] - Read replica client
+ * @returns {import('@prisma/client').PrismaClient} - Extended client
+ */
+const applyPrismaMiddleware = (client, { replica = null } = {}) =>
+  client.$extends({
+    name: 'query-middleware',
+    query: {
+      $allModels: {
+        async $allOperations({ model, operation, args, query }) {
+          const start = process.hrtime.bigint();
+          let error = null;
+          try {
+            if (replica && shouldUseReplica(operation)) {
+              replicaReads.inc({ model });
+              return await replica[delegateName(model)][operation](args);
+            }
+            noteOperation(operation);
+            return await query(args);
+          } catch (err) {
+            error = err;
+            queryErrors.inc({ model, action: operation });
+            throw err;
+          } finally {
+            const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+            queryDuration.observe({ model, action: operation }, seconds);
+            if (hooks.length > 0) {
+              runHooks({ model, action: operation, args, durationMs: seconds * 1000, error });
+            }
+          }
+        },
+      },
+    },
+  });
+
+module.exports = {
+  applyPrismaMiddleware,
+  registerQueryHook,
+};
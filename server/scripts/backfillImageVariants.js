@@ -0,0 +1,37 @@
+/**
+ * Image variant backfill
+ *
+ * Generates thumb/card/hero variants for property and room type images
+ * uploaded before the image pipeline existed (or whose background
+ * processing was interrupted by a restart). Safe to re-run: rows that
+ * already have variants are skipped and existing variant files are reused.
+ *
+ * Usage:
+ *   node scripts/backfillImageVariants.js [--property <propertyId>]
+ */
+
+require('../src/config/env');
+
+const prisma = require('../src/config/prisma');
+const { processMediaVariants } = require('../src/services/media/imagePipeline.service');
+
+const args = process.argv.slice(2);
+const propertyIndex = args.indexOf('--property');
+const propertyId = propertyIndex >= 0 ? args[propertyIndex + 1] : null;
+
+(async () => {
+  const propertyMedia = await processMediaVariants('propertyMedia', propertyId ? { propertyId } : {});
+  console.log('🖼️  Property media:', propertyMedia);
+
+  const roomTypeMedia = await processMediaVariants(
+    'propertyRoomTypeMedia',
+    propertyId ? { propertyRoomType: { propertyId } } : {}
+  );
+  console.log('🖼️  Room type media:', roomTypeMedia);
+
+  await prisma.$disconnect();
+})().catch(async (error) => {
+  console.error('❌ Image variant backfill failed:', error);
+  await prisma.$disconnect();
+  process.exit(1);
+});
@@ -0,0 +1,123 @@
+/**
+ * Cluster throughput benchmark
+ *
+ * Starts the server with an increasing number of workers and measures
+ * read throughput of the search and property detail endpoints, so the
+ * scaling of cluster mode across cores can be compared.
+ *
+ * Usage (needs a reachable DATABASE_URL with at least one property):
+ *   node scripts/benchmarkCluster.js --property <propertyId> [--workers 1,2,4] [--duration 10] [--connections 64]
+ */
+
+const http = require('http');
+const path = require('path');
+const { spawn } = require('child_process');
+const os = require('os');
+
+const args = process.argv.slice(2);
+const argValue = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index >= 0 && args[index + 1] ? args[index + 1] : fallback;
+};
+
+const PORT = parseInt(argValue('port', '5055'), 10);
+const DURATION_S = parseInt(argValue('duration', '10'), 10);
+const CONNECTIONS = parseInt(argValue('connections', '64'), 10);
+const PROPERTY_ID = argValue('property', null);
+const WORKER_STEPS = argValue(
+  'workers',
+  [1, 2, 4, os.cpus().length].filter((n, i, all) => n <= os.cpus().length && all.indexOf(n) === i).join(',')
+)
+  .split(',')
+  .map((n) => parseInt(n, 10));
+
+const targets = [
+  '/api/search/cities',
+  '/api/search/property-types',
+  ...(PROPERTY_ID ? [`/propertiesDetials/${PROPERTY_ID}`] : []),
+];
+
+const agent = new http.Agent({ keepAlive: true, maxSockets: CONNECTIONS });
+
+const request = (urlPath) =>
+  new Promise((resolve) => {
+    const req = http.get({ host: '127.0.0.1', port: PORT, path: urlPath, agent }, (res) => {
+      res.resume();
+      res.on('end', () => resolve(res.statusCode));
+    });
+    req.on('error', () => resolve(0));
+  });
+
+const waitForServer = async (timeoutMs = 30000) => {
+  const started = Date.now();
+  while (Date.now() - started < timeoutMs) {
+    const status = await request(targets[0]);
+    if (status === 200) return;
+    await new Promise((resolve) => setTimeout(resolve, 250));
+  }
+  throw new Error('Server did not become ready');
+};
+
+const runLoad = async (urlPath) => {
+  const deadline = Date.now() + DURATION_S * 1000;
+  let completed = 0;
+  let errors = 0;
+
+  const loop = async () => {
+    while (Date.now() < deadline) {
+      const status = await request(urlPath);
+      if (status >= 200 && status < 400) completed += 1;
+      else errors += 1;
+    }
+  };
+
+  await Promise.all(Array.from({ length: CONNECTIONS }, loop));
+  return { rps: completed / DURATION_S, errors };
+};
+
+const startServer = (workers) =>
+  spawn(process.execPath, [path.join(__dirname, '..', 'index.js')], {
+    env: { ...process.env, PORT: String(PORT), CLUSTER_WORKERS: String(workers) },
+    stdio: 'ignore',
+  });
+
+const stopServer = (child) =>
+  new Promise((resolve) => {
+    child.once('exit', resolve);
+    child.kill('SIGTERM');
+  });
+
+(async () => {
+  const results = {};
+
+  for (const workers of WORKER_STEPS) {
+    const child = startServer(workers);
+    try {
+      await waitForServer();
+      for (const target of targets) {
+        // Short warm-up so connection setup isn't measured
+        await request(target);
+        const { rps, errors } = await runLoad(target);
+        results[target] = results[target] || {};
+        results[target][workers] = rps;
+        console.log(`workers=${workers} ${target} -> ${rps.toFixed(1)} req/s (${errors} errors)`);
+      }
+    } finally {
+      await stopServer(child);
+    }
+  }
+
+  console.log('\nScaling relative to the first step:');
+  Object.entries(results).forEach(([target, byWorkers]) => {
+    const baseline = byWorkers[WORKER_STEPS[0]] || 1;
+    const line = WORKER_STEPS.map(
+      (workers) => `${workers}w=${((byWorkers[workers] || 0) / baseline).toFixed(2)}x`
+    ).join('  ');
+    console.log(`  ${target}: ${line}`);
+  });
+
+  agent.destroy();
+})().catch((error) => {
+  console.error('❌ Benchmark failed:', error);
+  process.exit(1);
+});
@@ -0,0 +1,120 @@
+/**
+ * Email render + send benchmark
+ *
+ * Measures template render throughput on its own, then render + send
+ * throughput through a provider. The mock provider is the baseline (fixed
+ * simulated latency, no network); running with --provider nodemailer shows
+ * what the SMTP transport adds on top (set EMAIL_SMTP_POOL=false to compare
+ * against one connection per message).
+ *
+ * Usage:
+ *   node scripts/benchmarkEmail.js [--renders 20000] [--messages 200] [--concurrency 10]
+ *   node scripts/benchmarkEmail.js --provider nodemailer --to inbox@example.com [--messages 20]
+ */
+
+require('../src/config/env');
+
+const { performance } = require('perf_hooks');
+const emailTemplates = require('../src/services/communication/templates/emailTemplate.service');
+const mockProvider = require('../src/services/communication/providers/email/mock.provider');
+
+const args = process.argv.slice(2);
+const argValue = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index >= 0 && args[index + 1] ? args[index + 1] : fallback;
+};
+
+const RENDERS = parseInt(argValue('renders', '20000'), 10);
+const MESSAGES = parseInt(argValue('messages', '200'), 10);
+const CONCURRENCY = parseInt(argValue('concurrency', '10'), 10);
+const PROVIDER = argValue('provider', 'mock');
+const TO = argValue('to', 'bench@example.com');
+
+const sampleBooking = (i) => ({
+  bookingNumber: `BK${100000 + i}`,
+  guestName: `Guest ${i}`,
+  propertyName: 'Hillside Retreat',
+  propertyAddress: 'Munnar, Kerala',
+  checkIn: new Date(Date.now() + 7 * 86400000),
+  checkOut: new Date(Date.now() + 10 * 86400000),
+  nights: 3,
+  guests: 2,
+  children: 1,
+  totalAmount: 18500 + i,
+  roomDetails: [
+    { roomTypeName: 'Deluxe', rooms: 1, mealPlan: 'Breakfast', price: 9000 },
+    { roomTypeName: 'Suite', rooms: 1, price: 9500 + i },
+  ],
+});
+
+// Providers log every message - results are printed with the original logger
+const log = console.log;
+
+const report = (label, count, elapsedMs) => {
+  log(
+    `${label.padEnd(28)} ${String(count).padStart(7)} in ${elapsedMs.toFixed(0).padStart(6)}ms  ` +
+      `${((count / elapsedMs) * 1000).toFixed(0).padStart(8)}/s`
+  );
+};
+
+const benchRender = () => {
+  // Warm up the JIT before timing
+  for (let i = 0; i < 500; i += 1) emailTemplates.bookingConfirmation(sampleBooking(i));
+
+  const started = performance.now();
+  let bytes = 0;
+  for (let i = 0; i < RENDERS; i += 1) {
+    bytes += emailTemplates.bookingConfirmation(sampleBooking(i)).length;
+  }
+  report('render only', RENDERS, performance.now() - started);
+  log(`${''.padEnd(28)} avg ${(bytes / RENDERS / 1024).toFixed(1)}KB per email`);
+};
+
+const benchSend = async (label, provider) => {
+  let next = 0;
+  let failed = 0;
+
+  const worker = async () => {
+    while (next < MESSAGES) {
+      const i = next;
+      next += 1;
+      const html = emailTemplates.bookingConfirmation(sampleBooking(i));
+      const result = await provider.send(TO, `Booking Confirmation - BK${100000 + i}`, html);
+      if (!result.success) failed += 1;
+    }
+  };
+
+  const started = performance.now();
+  await Promise.all(Array.from({ length: Math.min(CONCURRENCY, MESSAGES) }, worker));
+  report(label, MESSAGES, performance.now() - started);
+  if (failed) log(`${''.padEnd(28)} ${failed} failed`);
+};
+
+(async () => {
+  benchRender();
+
+  // Silence per-message provider logs while timing
+  console.log = () => {};
+  try {
+    await benchSend(`render + send (mock, c=${CONCURRENCY})`, mockProvider);
+  } finally {
+    console.log = log;
+  }
+
+  if (PROVIDER === 'nodemailer') {
+    const nodemailerProvider = require('../src/services/communication/providers/email/nodemailer.provider');
+    console.log = () => {};
+    try {
+      await benchSend(
+        `render + send (smtp${process.env.EMAIL_SMTP_POOL === 'false' ? '' : ' pooled'}, c=${CONCURRENCY})`,
+        nodemailerProvider
+      );
+    } finally {
+      console.log = log;
+      nodemailerProvider.close();
+    }
+  }
+})().catch((error) => {
+  console.error('❌ Email benchmark failed:', error);
+  process.exit(1);
+});
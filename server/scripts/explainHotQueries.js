@@ -0,0 +1,63 @@
+/**
+ * Query plan check for hot queries
+ *
+ * EXPLAINs the critical query shapes (src/utils/queryPlan.utils.js) against
+ * the configured database and exits with code 1 when any of them scans a
+ * whole table or index, or cannot use the composite index meant for it.
+ * Run it after schema or query changes; `npm test` runs the same checks
+ * against a seeded fixture (tests/queryPlans.test.js).
+ *
+ * Needs a reachable DATABASE_URL with the schema applied and realistic
+ * data: on near-empty tables MySQL prefers a full scan even when a good
+ * index exists. Table statistics are refreshed (ANALYZE TABLE) first.
+ *
+ * Usage:
+ *   node scripts/explainHotQueries.js [--property <propertyId>] [--verbose]
+ */
+
+require('../src/config/env');
+
+const { PrismaClient } = require('@prisma/client');
+const { SAMPLE_ID, createQueryPlanChecker } = require('../src/utils/queryPlan.utils');
+
+const args = process.argv.slice(2);
+const argValue = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index >= 0 && args[index + 1] ? args[index + 1] : fallback;
+};
+const verbose = args.includes('--verbose');
+
+const prisma = new PrismaClient({ log: [{ emit: 'event', level: 'query' }] });
+const { buildChecks, analyzeTables, explainCheck } = createQueryPlanChecker(prisma);
+
+(async () => {
+  const now = new Date();
+  const sampleProperty = argValue('property', null)
+    ? { id: argValue('property', null) }
+    : await prisma.property.findFirst({ select: { id: true } });
+  const checks = buildChecks({ propertyId: sampleProperty?.id || SAMPLE_ID, now });
+
+  await analyzeTables([...new Set(checks.map((check) => check.table))]);
+
+  let failures = 0;
+  for (const check of checks) {
+    const { plans, problems } = await explainCheck(check);
+    const summary = plans.map((plan) => `${plan.type} via ${plan.key || '-'} (~${plan.rows} rows)`).join('; ');
+
+    if (problems.length) {
+      failures += 1;
+      console.log(`❌ ${check.name}: ${problems.join(', ')}${summary ? ` [${summary}]` : ''}`);
+    } else {
+      console.log(`✅ ${check.name}: ${summary}`);
+    }
+    if (verbose || problems.length) plans.forEach((plan) => console.log(`   ${plan.sql}`));
+  }
+
+  console.log(failures ? `\n${failures} of ${checks.length} query plan(s) regressed` : `\nAll ${checks.length} query plans use an index`);
+  await prisma.$disconnect();
+  process.exit(failures ? 1 : 0);
+})().catch(async (error) => {
+  console.error('❌ Query plan check failed:', error);
+  await prisma.$disconnect();
+  process.exit(1);
+});
@@ -0,0 +1,30 @@
+/**
+ * Upload blob garbage collection
+ *
+ * Removes content-hashed uploads (and their image variants) that no
+ * database row references any more. The server runs the same job
+ * periodically on the cluster leader; this script is for one-off runs.
+ *
+ * Usage:
+ *   node scripts/gcUploads.js [--dry-run] [--grace-hours 24]
+ */
+
+require('../src/config/env');
+
+const prisma = require('../src/config/prisma');
+const { collectUnreferencedBlobs } = require('../src/services/media/blobGc.service');
+
+const args = process.argv.slice(2);
+const dryRun = args.includes('--dry-run');
+const graceIndex = args.indexOf('--grace-hours');
+const graceMs = graceIndex >= 0 ? parseFloat(args[graceIndex + 1]) * 60 * 60 * 1000 : undefined;
+
+(async () => {
+  const summary = await collectUnreferencedBlobs({ dryRun, ...(graceMs !== undefined ? { graceMs } : {}) });
+  console.log(`🧹 Upload GC${dryRun ? ' (dry run)' : ''}:`, summary);
+  await prisma.$disconnect();
+})().catch(async (error) => {
+  console.error('❌ Upload GC failed:', error);
+  await prisma.$disconnect();
+  process.exit(1);
+});
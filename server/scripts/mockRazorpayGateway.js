@@ -0,0 +1,188 @@
+/**
+ * Mock Razorpay gateway
+ *
+ * Serves the read endpoints payment reconciliation uses
+ * (GET /v1/orders/:id/payments and GET /v1/payment_links/:id) and order
+ * creation (POST /v1/orders) with a fixed simulated latency, so
+ * reconciliation and checkout can be exercised and load tested without
+ * touching Razorpay. Each order gets a deterministic outcome from a
+ * hash of its ID: a captured payment for the order's amount (read from the
+ * database), a failed payment, or no payment at all. Unknown orders get
+ * Razorpay's 400 BAD_REQUEST_ERROR.
+ *
+ * Point the server at it with RAZORPAY_API_BASE_URL=http://localhost:4010/v1,
+ * or use createMockGateway() in-process (scripts/reconcilePayments.js --mock).
+ *
+ * Usage:
+ *   node scripts/mockRazorpayGateway.js [--port 4010] [--latency 80] [--captured 0.5] [--failed 0.2]
+ */
+
+require('../src/config/env');
+
+const crypto = require('crypto');
+const http = require('http');
+const prisma = require('../src/config/prisma');
+
+const args = process.argv.slice(2);
+const argValue = (name, fallback) => {
+  const index = args.indexOf(`--${name}`);
+  return index >= 0 && args[index + 1] ? args[index + 1] : fallback;
+};
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+// 0 <= fraction < 1, stable per order
+const outcomeFraction = (razorpayOrderId) =>
+  crypto.createHash('md5').update(razorpayOrderId).digest().readUInt32BE(0) / 0x100000000;
+
+/**
+ * In-process mock with the razorpayGateway.service interface
+ * @param {Object} [options]
+ * @param {number} [options.latencyMs=80]
+ * @param {number} [options.capturedRatio=0.5] - Share of orders with a captured payment
+ * @param {number} [options.failedRatio=0.2] - Share of orders with a failed payment
+ */
+const createMockGateway = ({ latencyMs = 80, capturedRatio = 0.5, failedRatio = 0.2 } = {}) => {
+  const fetchOrderPayments = async (razorpayOrderId) => {
+    await sleep(latencyMs);
+
+    const order = await prisma.order.findUnique({
+      where: { razorpayOrderId },
+      select: { amount: true, currency: true, createdAt: true },
+    });
+    if (!order) {
+      throw Object.assign(new Error(`Razorpay order.payments failed (400): The id provided does not exist`), {
+        status: 400,
+        code: 'BAD_REQUEST_ERROR',
+      });
+    }
+
+    const fraction = outcomeFraction(razorpayOrderId);
+    if (fraction >= capturedRatio + failedRatio) return [];
+
+    return [
+      {
+        id: `pay_${crypto.createHash('sha1').update(razorpayOrderId).digest('hex').slice(0, 14)}`,
+        status: fraction < capturedRatio ? 'captured' : 'failed',
+        amount: order.amount,
+        currency: order.currency,
+        method: 'upi',
+        createdAt: new Date(order.createdAt.getTime() + 60 * 1000),
+      },
+    ];
+  };
+
+  return { fetchOrderPayments };
+};
+
+const toApiPayment = (payment, razorpayOrderId) => ({
+  id: payment.id,
+  entity: 'payment',
+  amount: payment.amount,
+  currency: payment.currency,
+  status: payment.status,
+  order_id: razorpayOrderId,
+  method: payment.method,
+  created_at: Math.floor(payment.createdAt.getTime() / 1000),
+});
+
+const startServer = () => {
+  const port = parseInt(argValue('port', '4010'), 10);
+  const latencyMs = parseInt(argValue('latency', '80'), 10);
+  const gateway = createMockGateway({
+    latencyMs,
+    capturedRatio: parseFloat(argValue('captured', '0.5')),
+    failedRatio: parseFloat(argValue('failed', '0.2')),
+  });
+
+  const send = (res, status, body) => {
+    res.writeHead(status, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify(body));
+  };
+
+  const createOrder = async (req, res) => {
+    let raw = '';
+    for await (const chunk of req) raw += chunk;
+
+    let options;
+    try {
+      options = JSON.parse(raw || '{}');
+    } catch (error) {
+      send(res, 400, { error: { code: 'BAD_REQUEST_ERROR', description: 'Invalid JSON body' } });
+      return;
+    }
+    if (!Number.isInteger(options.amount) || options.amount < 100) {
+      send(res, 400, { error: { code: 'BAD_REQUEST_ERROR', description: 'The amount must be atleast INR 1.00' } });
+      return;
+    }
+
+    await sleep(latencyMs);
+    send(res, 200, {
+      id: `order_${crypto.randomBytes(7).toString('hex')}`,
+      entity: 'order',
+      amount: options.amount,
+      amount_paid: 0,
+      amount_due: options.amount,
+      currency: options.currency || 'INR',
+      receipt: options.receipt || null,
+      status: 'created',
+      attempts: 0,
+      notes: options.notes || {},
+      created_at: Math.floor(Date.now() / 1000),
+    });
+  };
+
+  const server = http.createServer(async (req, res) => {
+    if (req.method === 'POST' && req.url.split('?')[0] === '/v1/orders') {
+      await createOrder(req, res);
+      return;
+    }
+
+    const orderMatch = req.url.match(/^\/v1\/orders\/([^/?]+)\/payments/);
+    const linkMatch = req.url.match(/^\/v1\/payment_links\/([^/?]+)/);
+    if (req.method !== 'GET' || (!orderMatch && !linkMatch)) {
+      send(res, 404, { error: { code: 'BAD_REQUEST_ERROR', description: 'The requested URL was not found on the server.' } });
+      return;
+    }
+
+    const razorpayOrderId = decodeURIComponent((orderMatch || linkMatch)[1]);
+    try {
+      const payments = await gateway.fetchOrderPayments(razorpayOrderId);
+      if (orderMatch) {
+        send(res, 200, {
+          entity: 'collection',
+          count: payments.length,
+          items: payments.map((payment) => toApiPayment(payment, razorpayOrderId)),
+        });
+      } else {
+        send(res, 200, {
+          id: razorpayOrderId,
+          currency: payments[0]?.currency || 'INR',
+          payments: payments.map((payment) => ({
+            payment_id: payment.id,
+            amount: payment.amount,
+            status: payment.status,
+            method: payment.method,
+            created_at: Math.floor(payment.createdAt.getTime() / 1000),
+          })),
+        });
+      }
+    } catch (error) {
+      send(res, error.status || 500, { error: { code: error.code || 'SERVER_ERROR', description: error.message } });
+    }
+  });
+
+  server.listen(port, () => console.log(`🧪 Mock Razorpay gateway listening on http://localhost:${port}/v1`));
+
+  const shutdown = () => server.close(() => prisma.$disconnect().finally(() => process.exit(0)));
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+};
+
+if (require.main === module) {
+  startServer();
+}
+
+module.exports = {
+  createMockGateway,
+};
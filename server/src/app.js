@@ -1,17 +1,40 @@
 const express = require('express');
 const path = require('path');
 const requestLogger = require('./middleware/requestLogger');
+const { metricsMiddleware, metricsHandler } = require('./middleware/metrics.middleware');
+const { queryTracker } = require('./middleware/queryTracker.middleware');
+const { trackWrites } = require('./middleware/readReplica.middleware');
+const { compression } = require('./middleware/compression.middleware');
+const { serveUploads } = require('./middleware/uploads.middleware');
 const errorHandler = require('./middleware/errorHandler');
 const registerRoutes = require('./routes');
 
 const app = express();
 
+// Request logging (request ID + duration for every request)
+app.use(requestLogger);
+
+// Metrics (per-route latency, in-flight, Prisma queries, event loop lag)
+app.use(metricsMiddleware);
+app.get('/metrics', metricsHandler);
+
+// gzip/brotli for JSON and text responses above the size threshold.
+// Mounted before queryTracker: its res.end wrapper must run before the
+// compressor writes the headers, or the budget 500 and X-Query-Summary are lost
+app.use(compression);
+
+// Per-request query tracking / budgets (development and test only)
+app.use(queryTracker);
+
+// Read-your-writes: callers who just wrote read from the primary (replica setups only)
+app.use(trackWrites);
+
 // Body parsers
 app.use(express.json());
 app.use(express.urlencoded({ extended: true }));
 
-// Static files
-app.use('/uploads', express.static(path.join(__dirname, '..', 'uploads')));
+// Static files (content-hashed uploads are served as immutable)
+app.use('/uploads', serveUploads(path.join(__dirname, '..', 'uploads')));
 
 // Register routes
 registerRoutes(app);
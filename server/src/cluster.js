@@ -0,0 +1,271 @@
+/**
+ * Cluster Mode
+ *
+ * Runs one Express worker per CPU core behind the shared listening port.
+ * The primary process only supervises: it forks workers, restarts them
+ * when they crash and elects exactly one worker as leader. Periodic jobs
+ * (e.g. front desk hold cleanup) must only run on the leader, so they are
+ * started through onLeadershipChange() instead of unconditionally.
+ *
+ * Workers can also broadcast small messages to every other worker (e.g.
+ * cache invalidations) through broadcastToWorkers(); the primary relays
+ * them over the IPC channel.
+ *
+ * Configuration:
+ * - CLUSTER_WORKERS: number of workers, or 'auto' for one per core.
+ *   Unset / 0 / 1 keeps the classic single-process mode (which is
+ *   always the leader).
+ *   More than one worker requires OTP_STORE_PROVIDER=redis with REDIS_URL
+ *   (checked by index.js before the workers are forked).
+ */
+
+const cluster = require('cluster');
+const os = require('os');
+
+const RESTART_BASE_DELAY_MS = 1000;
+const RESTART_MAX_DELAY_MS = 30000;
+const CRASH_LOOP_WINDOW_MS = 10000;
+
+const MESSAGE_READY = 'cluster:ready';
+const MESSAGE_ROLE = 'cluster:role';
+const MESSAGE_BROADCAST = 'cluster:broadcast';
+
+/**
+ * Resolve the configured worker count
+ * @returns {number} - 1 means single-process mode
+ */
+const getWorkerCount = () => {
+  const raw = (process.env.CLUSTER_WORKERS || '').trim().toLowerCase();
+  if (!raw) return 1;
+
+  if (raw === 'auto') {
+    return typeof os.availableParallelism === 'function'
+      ? os.availableParallelism()
+      : os.cpus().length;
+  }
+
+  const count = parseInt(raw, 10);
+  return Number.isFinite(count) && count > 1 ? count : 1;
+};
+
+const isClusterEnabled = () => getWorkerCount() > 1;
+
+/**
+ * True when this process should supervise workers instead of serving
+ * @returns {boolean}
+ */
+const isClusterPrimary = () => isClusterEnabled() && cluster.isPrimary;
+
+/* ============================ PRIMARY ============================ */
+
+const startClusterPrimary = () => {
+  const workerCount = getWorkerCount();
+  const readyWorkers = new Set();
+  let leaderId = null;
+  let shuttingDown = false;
+  let recentCrashes = [];
+
+  const sendRole = (worker, isLeader) => {
+    if (worker && worker.isConnected()) {
+      worker.send({ type: MESSAGE_ROLE, leader: isLeader });
+    }
+  };
+
+  const electLeader = () => {
+    if (leaderId !== null && cluster.workers[leaderId]) return;
+
+    leaderId = null;
+    // Lowest worker id among ready workers wins - deterministic and cheap
+    const candidates = Array.from(readyWorkers)
+      .filter((id) => cluster.workers[id])
+      .sort((a, b) => a - b);
+
+    if (candidates.length === 0) return;
+
+    leaderId = candidates[0];
+    sendRole(cluster.workers[leaderId], true);
+    console.log(`👑 Worker ${leaderId} (pid ${cluster.workers[leaderId].process.pid}) elected leader`);
+  };
+
+  const forkWorker = () => {
+    const worker = cluster.fork();
+
+    worker.on('message', (message) => {
+      if (message && message.type === MESSAGE_BROADCAST) {
+        // Relay to every other worker; the sender has already handled it
+        Object.values(cluster.workers).forEach((other) => {
+          if (other && other.id !== worker.id && other.isConnected()) {
+            other.send(message);
+          }
+        });
+        return;
+      }
+
+      if (message && message.type === MESSAGE_READY) {
+        readyWorkers.add(worker.id);
+        if (leaderId === null) {
+          electLeader();
+        } else {
+          sendRole(worker, false);
+        }
+      }
+    });
+
+    return worker;
+  };
+
+  const restartDelay = () => {
+    const now = Date.now();
+    recentCrashes = recentCrashes.filter((t) => now - t < CRASH_LOOP_WINDOW_MS);
+    recentCrashes.push(now);
+    // Back off exponentially while workers keep crashing in a short window
+    return Math.min(
+      RESTART_BASE_DELAY_MS * 2 ** (recentCrashes.length - 1),
+      RESTART_MAX_DELAY_MS
+    );
+  };
+
+  cluster.on('exit', (worker, code, signal) => {
+    readyWorkers.delete(worker.id);
+    if (worker.id === leaderId) {
+      leaderId = null;
+      if (!shuttingDown) electLeader();
+    }
+
+    if (shuttingDown || worker.exitedAfterDisconnect) return;
+
+    const delay = restartDelay();
+    console.error(
+      `❌ Worker ${worker.id} (pid ${worker.process.pid}) exited (${signal || code}). Restarting in ${delay}ms`
+    );
+    setTimeout(() => {
+      if (!shuttingDown) forkWorker();
+    }, delay);
+  });
+
+  const shutdown = (signal) => {
+    if (shuttingDown) return;
+    shuttingDown = true;
+    console.log(`🛑 Cluster primary received ${signal}, stopping workers...`);
+
+    Object.values(cluster.workers).forEach((worker) => {
+      if (worker) worker.process.kill(signal);
+    });
+
+    const forceExit = setTimeout(() => process.exit(0), 10000);
+    forceExit.unref();
+
+    cluster.on('exit', () => {
+      if (Object.keys(cluster.workers).length === 0) {
+        process.exit(0);
+      }
+    });
+  };
+
+  process.on('SIGINT', () => shutdown('SIGINT'));
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+
+  console.log(`🧩 Cluster primary ${process.pid} starting ${workerCount} workers`);
+  for (let i = 0; i < workerCount; i += 1) {
+    forkWorker();
+  }
+};
+
+/* ============================ WORKER ============================ */
+
+let isLeader = !isClusterEnabled();
+const leadershipListeners = [];
+const broadcastListeners = new Map();
+
+const handleRoleMessage = (message) => {
+  const next = Boolean(message.leader);
+  if (next === isLeader) return;
+
+  isLeader = next;
+  leadershipListeners.forEach((listener) => {
+    Promise.resolve(listener(isLeader)).catch((error) => {
+      console.error('❌ Leadership change handler failed:', error);
+    });
+  });
+};
+
+const handleBroadcastMessage = (message) => {
+  (broadcastListeners.get(message.channel) || []).forEach((listener) => {
+    try {
+      listener(message.payload);
+    } catch (error) {
+      console.error(`❌ Broadcast handler for "${message.channel}" failed:`, error);
+    }
+  });
+};
+
+if (isClusterEnabled() && cluster.isWorker) {
+  process.on('message', (message) => {
+    if (!message) return;
+    if (message.type === MESSAGE_ROLE) handleRoleMessage(message);
+    else if (message.type === MESSAGE_BROADCAST) handleBroadcastMessage(message);
+  });
+}
+
+/**
+ * Register a handler for leadership changes
+ * In single-process mode the handler is invoked once with `true`.
+ * @param {Function} listener - async (isLeader: boolean) => void
+ */
+const onLeadershipChange = (listener) => {
+  leadershipListeners.push(listener);
+  if (isLeader) {
+    Promise.resolve(listener(true)).catch((error) => {
+      console.error('❌ Leadership change handler failed:', error);
+    });
+  }
+};
+
+/**
+ * Tell the primary this worker is serving and can take the leader role
+ * No-op outside cluster mode.
+ */
+const markWorkerReady = () => {
+  if (isClusterEnabled() && cluster.isWorker && process.send) {
+    process.send({ type: MESSAGE_READY });
+  }
+};
+
+const isLeaderProcess = () => isLeader;
+
+/**
+ * Send a message to every other worker (relayed by the primary)
+ * No-op outside cluster mode, where there are no other workers.
+ * @param {string} channel - Channel name
+ * @param {*} payload - Structured-cloneable payload
+ * @returns {boolean} - Whether the message was handed to the primary
+ */
+const broadcastToWorkers = (channel, payload) => {
+  if (!isClusterEnabled() || !cluster.isWorker || !process.send || !process.connected) {
+    return false;
+  }
+  process.send({ type: MESSAGE_BROADCAST, channel, payload });
+  return true;
+};
+
+/**
+ * Handle messages other workers broadcast on a channel
+ * @param {string} channel - Channel name
+ * @param {Function} listener - (payload) => void
+ */
+const onWorkerBroadcast = (channel, listener) => {
+  if (!broadcastListeners.has(channel)) broadcastListeners.set(channel, []);
+  broadcastListeners.get(channel).push(listener);
+};
+
+module.exports = {
+  getWorkerCount,
+  isClusterEnabled,
+  isClusterPrimary,
+  startClusterPrimary,
+  onLeadershipChange,
+  markWorkerReady,
+  isLeaderProcess,
+  broadcastToWorkers,
+  onWorkerBroadcast,
+};
@@ -1,30 +1,19 @@
 const path = require('path');
 const fs = require('fs');
 const multer = require('multer');
+const { createContentHashStorage } = require('../utils/contentHashStorage.utils');
 
 // Base upload directory
 const UPLOAD_BASE = path.join(__dirname, '..', '..', 'uploads');
 fs.mkdirSync(UPLOAD_BASE, { recursive: true });
 
 // Configure storage
-const storage = multer.diskStorage({
-  destination: (req, file, cb) => {
+// Files are stored under their content hash (deduplicated, cacheable forever)
+const storage = createContentHashStorage({
+  uploadBase: UPLOAD_BASE,
+  subdirectory: (file) => {
     const t = file.mimetype;
-    const sub = t.startsWith('image/') ? 'images' : t.startsWith('video/') ? 'videos' : 'other';
-    const dir = path.join(UPLOAD_BASE, sub);
-    fs.mkdirSync(dir, { recursive: true });
-    file.subdirectory = sub;
-    cb(null, dir);
-  },
-  filename: (req, file, cb) => {
-    const ext = path.extname(file.originalname);
-    const base = path.basename(file.originalname, ext).replace(/\s+/g, '_');
-    const filename = `${Date.now()}_${base}${ext}`;
-    
-    // Store both filesystem path and URL-friendly path
-    file.url = `/uploads/${file.subdirectory}/${filename}`;
-    
-    cb(null, filename);
+    return t.startsWith('image/') ? 'images' : t.startsWith('video/') ? 'videos' : 'other';
   }
 });
 
@@ -1,5 +1,31 @@
 const { PrismaClient } = require('@prisma/client');
+const { applyPrismaMiddleware } = require('../../prisma/middleware/middleware');
+const { runOnPrimary } = require('../utils/readRouting.utils');
 
-const prisma = new PrismaClient();
+// Optional read replica. Only reads of routes marked replicaSafe go there
+// (see utils/readRouting); everything else uses the primary.
+const REPLICA_URL = process.env.DATABASE_REPLICA_URL;
+const replica = REPLICA_URL ? new PrismaClient({ datasourceUrl: REPLICA_URL }) : null;
+
+// Single shared client for the whole process (one connection pool),
+// wrapped with the query middleware (metrics, query hooks, replica routing)
+const client = applyPrismaMiddleware(new PrismaClient(), { replica });
+
+// With a replica, transactions always run on the primary - including
+// reads inside them on a replicaSafe route
+const prisma = replica
+  ? new Proxy(client, {
+    get(target, property) {
+      if (property === '$transaction') {
+        return (...args) => runOnPrimary(() => target.$transaction(...args));
+      }
+      if (property === '$disconnect') {
+        return () => Promise.all([target.$disconnect(), replica.$disconnect()]);
+      }
+      const value = Reflect.get(target, property);
+      return typeof value === 'function' ? value.bind(target) : value;
+    },
+  })
+  : client;
 
 module.exports = prisma;
@@ -0,0 +1,46 @@
+/**
+ * Per-route query budgets
+ *
+ * Maximum number of Prisma queries a single request to a route may issue
+ * while the query tracker is enabled (development/test). Keys are
+ * "METHOD /route/pattern" as matched by Express. Routes without an entry
+ * use QUERY_BUDGET_DEFAULT.
+ *
+ * Lower a budget when a route is optimised so regressions are caught.
+ */
+
+const DEFAULT_QUERY_BUDGET = parseInt(process.env.QUERY_BUDGET_DEFAULT || '40', 10);
+
+const queryBudgets = {
+  // Public catalog / search reads
+  'GET /properties': 10,
+  'GET /properties/search': 10,
+  'GET /propertiesDetials/:id': 5,
+  'GET /propertiesDetials/:id/pricing': 10,
+  'GET /propertiesDetials/:id/booking-data': 12,
+
+  // Booking / payment writes
+  'POST /api/create-order': 25,
+
+  // Host/admin bulk editors known to loop over queries
+  'PATCH /host-property/:propertyId/features': 30,
+  'POST /host/daily-rates/apply-rate-plan-range': 40,
+  'POST /seed': 40,
+  'POST /special-rate-applications': 30,
+};
+
+/**
+ * Budget for a route key
+ * @param {string} routeKey - "METHOD /pattern"
+ * @returns {number}
+ */
+const getQueryBudget = (routeKey) =>
+  Object.prototype.hasOwnProperty.call(queryBudgets, routeKey)
+    ? queryBudgets[routeKey]
+    : DEFAULT_QUERY_BUDGET;
+
+module.exports = {
+  queryBudgets,
+  getQueryBudget,
+  DEFAULT_QUERY_BUDGET,
+};
@@ -0,0 +1,111 @@
+/**
+ * Redis client (optional shared backend)
+ *
+ * State that must be visible to every Node process (OTPs, shared caches)
+ * goes through this client. A real Redis connection is used when REDIS_URL
+ * is set and the optional `redis` package is installed. Otherwise a local
+ * in-process stand-in exposing the same command subset is returned, which
+ * is what tests and single-process development run against. The stand-in
+ * is marked `isLocal`; callers that are only correct when state is really
+ * shared (the redis OTP provider) refuse it.
+ */
+
+const { createExpiringMap } = require('../utils/expiringMap.utils');
+
+const REDIS_URL = process.env.REDIS_URL;
+
+/**
+ * Local stand-in for a node-redis v4 client
+ * Supports only the commands used by this codebase.
+ * @returns {Object} - Client with get/set/del/getDel/incrBy/quit
+ */
+const createLocalRedisClient = () => {
+  const store = createExpiringMap();
+
+  return {
+    isLocal: true,
+    get: async (key) => {
+      const value = store.get(key);
+      return value === undefined ? null : value;
+    },
+    set: async (key, value, options = {}) => {
+      if (options.NX && store.has(key)) {
+        return null;
+      }
+      // No PX/EX: the key never expires (no timer is scheduled for it)
+      const ttlMs = options.PX || (options.EX ? options.EX * 1000 : Infinity);
+      store.set(key, String(value), ttlMs);
+      return 'OK';
+    },
+    del: async (keys) => {
+      const list = Array.isArray(keys) ? keys : [keys];
+      return list.reduce((count, key) => count + (store.delete(key) ? 1 : 0), 0);
+    },
+    getDel: async (key) => {
+      const value = store.get(key);
+      store.delete(key);
+      return value === undefined ? null : value;
+    },
+    incrBy: async (key, increment) => {
+      const current = parseInt(store.get(key) || '0', 10);
+      const next = current + increment;
+      const remaining = store.ttl(key);
+      // ttl() is Infinity for a key without expiry, -1 for a missing one
+      store.set(key, String(next), remaining > 0 ? remaining : Infinity);
+      return next;
+    },
+    quit: async () => {
+      store.clear();
+    },
+  };
+};
+
+let clientPromise = null;
+
+const connectRedis = async () => {
+  if (!REDIS_URL) {
+    return createLocalRedisClient();
+  }
+
+  let redis;
+  try {
+    redis = require('redis');
+  } catch (error) {
+    console.warn('⚠️ REDIS_URL is set but the "redis" package is not installed. Using local stand-in.');
+    return createLocalRedisClient();
+  }
+
+  const client = redis.createClient({ url: REDIS_URL });
+  client.on('error', (error) => {
+    console.error('❌ Redis client error:', error.message);
+  });
+  await client.connect();
+  console.log('✅ Redis connected');
+  return client;
+};
+
+/**
+ * Get the shared Redis client (connected once, then reused)
+ * @returns {Promise<Object>} - node-redis client or local stand-in
+ */
+const getRedisClient = () => {
+  if (!clientPromise) {
+    clientPromise = connectRedis().catch((error) => {
+      console.error('❌ Redis connection failed, using local stand-in:', error.message);
+      return createLocalRedisClient();
+    });
+  }
+  return clientPromise;
+};
+
+/**
+ * Whether a real shared Redis backend is configured
+ * @returns {boolean}
+ */
+const isSharedRedisConfigured = () => Boolean(REDIS_URL);
+
+module.exports = {
+  getRedisClient,
+  createLocalRedisClient,
+  isSharedRedisConfigured,
+};
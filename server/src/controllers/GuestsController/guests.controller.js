@@ -1,7 +1,6 @@
-const { PrismaClient } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { verifyPropertyAccess } = require('../adminController/propertyAccess.utils');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 // UUID regex pattern for validation
 const UUID_REGEX = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
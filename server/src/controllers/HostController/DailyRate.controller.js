@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePricingCalendar } = require('../../services/property/pricingCalendarCache.service');
 
 /**
  * ===================== Daily Rate Plan Management =====================
@@ -163,6 +163,8 @@ const applyRatePlanToDate = async (req, res) => {
         }
       });
 
+      invalidatePricingCalendar(propertyId, [normalizedDate]);
+
       return res.status(200).json({
         success: true,
         message: 'Rate plan updated successfully',
@@ -189,6 +191,8 @@ const applyRatePlanToDate = async (req, res) => {
         }
       });
 
+      invalidatePricingCalendar(propertyId, [normalizedDate]);
+
       return res.status(201).json({
         success: true,
         message: 'Rate plan applied successfully',
@@ -317,6 +321,8 @@ const applyRatePlanToDateRange = async (req, res) => {
       };
     });
 
+    invalidatePricingCalendar(propertyId, dates);
+
     return res.status(200).json({
       success: true,
       message: `Rate plan applied to ${result.totalDates} dates successfully`,
@@ -380,6 +386,8 @@ const removeRatePlanFromDate = async (req, res) => {
       }
     });
 
+    invalidatePricingCalendar(propertyId, [normalizedDate]);
+
     return res.status(200).json({
       success: true,
       message: 'Rate plan removed from date successfully'
@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePricingCalendar } = require('../../services/property/pricingCalendarCache.service');
 
 // Save PropertyRoomTypeMealPlan data
 const savePropertyRoomTypeMealPlans = async (req, res) => {
@@ -139,6 +139,9 @@ const savePropertyRoomTypeMealPlans = async (req, res) => {
       return savedPlans;
     });
 
+    // Meal-plan prices feed every calendar month of the property
+    invalidatePricingCalendar(propertyId);
+
     return res.status(200).json({
       success: true,
       message: 'Rate plans saved successfully',
@@ -220,6 +223,8 @@ const deletePropertyRoomTypeMealPlan = async (req, res) => {
       data: { isActive: false }
     });
 
+    invalidatePricingCalendar(deletedPlan.propertyId);
+
     return res.status(200).json({
       success: true,
       message: 'Rate plan deleted successfully',
@@ -392,6 +397,8 @@ const savePlanBulk = async (req, res) => {
       };
     });
 
+    invalidatePricingCalendar(propertyId);
+
     return res.status(200).json({
       success: true,
       message: `Rate plan "${ratePlanName}" saved successfully`,
@@ -652,6 +659,8 @@ const updateRatePlan = async (req, res) => {
       };
     });
 
+    invalidatePricingCalendar(result.ratePlan.propertyId);
+
     return res.status(200).json({
       success: true,
       message: `Rate plan "${name}" updated successfully`,
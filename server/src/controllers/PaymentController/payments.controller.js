@@ -1,7 +1,7 @@
-const { PrismaClient, PaymentStatus } = require('@prisma/client');
+const { PaymentStatus } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { verifyPropertyAccess } = require('../adminController/propertyAccess.utils');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /**
  * Get all payments (Admin only - from all properties)
@@ -5,10 +5,11 @@
  * Reviews can only be created for completed bookings
  */
 
-const { PrismaClient, BookingStatus } = require('@prisma/client');
+const { BookingStatus } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
 
 // Constants
 const REVIEW_EDIT_WINDOW_DAYS = 7; // Can edit review within 7 days of creation
@@ -645,6 +646,9 @@ const updatePropertyRatingStats = async (propertyId) => {
         reviewCount,
       },
     });
+
+    // Details page shows the rating and latest reviews
+    await invalidatePropertyDetails(propertyId);
   } catch (error) {
     console.error('Error updating property rating stats:', error);
     // Don't throw - this is a background update, shouldn't fail the main operation
@@ -1,10 +1,10 @@
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 const path = require('path');
 const { signToken } = require('../../utils/jwt.utils');
 const { smsService, emailService, smsTemplates, emailTemplates } = require('../../services/communication');
+const { createOtpStore } = require('../../services/otp');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /* =======================
    Helper functions
@@ -23,23 +23,13 @@ const toDateOrNull = (val) => {
   return isNaN(d.getTime()) ? null : d;
 };
 
-const otpStore = new Map();
+// OTP storage (memory or shared backend, see services/otp)
+const otpStore = createOtpStore('admin');
 
 const generateOTP = () => {
   return Math.floor(1000 + Math.random() * 9000).toString();
 };
 
-/**
- * Clean expired OTPs from store
- */
-const cleanExpiredOTPs = () => {
-  const now = Date.now();
-  for (const [phone, data] of otpStore.entries()) {
-    if (data.expiresAt < now) {
-      otpStore.delete(phone);
-    }
-  }
-};
 
 /* =======================
    Controller
@@ -170,11 +160,8 @@ const AuthController = {
       const otp = generateOTP();
       const expiresAt = Date.now() + 5 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
-      // Store OTP (in-memory for development)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      // Store OTP
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
@@ -280,7 +267,7 @@ const AuthController = {
       const cleanPhone = phone.replace(/\s|-/g, '');
 
       // Get stored OTP
-      const storedOTPData = otpStore.get(cleanPhone);
+      const storedOTPData = await otpStore.get(cleanPhone);
 
 
       if (!storedOTPData) {
@@ -292,7 +279,7 @@ const AuthController = {
 
       // Check if OTP expired
       if (Date.now() > storedOTPData.expiresAt) {
-        otpStore.delete(cleanPhone);
+        await otpStore.delete(cleanPhone);
         return res.status(400).json({
           success: false,
           message: 'OTP has expired. Please request a new OTP.'
@@ -309,7 +296,7 @@ const AuthController = {
       }
 
       // OTP verified successfully - remove from store
-      otpStore.delete(cleanPhone);
+      await otpStore.delete(cleanPhone);
 
       // Check if user exists
       let admin = await prisma.admin.findFirst({
@@ -411,10 +398,7 @@ const AuthController = {
       const expiresAt = Date.now() + 1 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
       // Store new OTP (replaces existing if any)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
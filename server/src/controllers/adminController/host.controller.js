@@ -1,12 +1,17 @@
 // src/controllers/adminController/host.controller.js
-const { PrismaClient, Prisma } = require('@prisma/client');
-const prisma = new PrismaClient();
+const { Prisma } = require('@prisma/client');
+const prisma = require('../../config/prisma');
 const bcrypt = require('bcrypt');
 const { logout } = require('./auth.controller');
 const jwt = require('jsonwebtoken');
 const { signToken } = require('../../utils/jwt.utils');
 const ALLOWED_FIELDS_HOST = ['email', 'password']; // don't accept role from client
 const { smsService, emailService, smsTemplates, emailTemplates } = require('../../services/communication');
+const { createOtpStore } = require('../../services/otp');
+const { scheduleMediaVariants } = require('../../services/media/imagePipeline.service');
+const { ingestMediaFiles, indexMediaMetadata } = require('../../services/media/mediaIngest.service');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
+const { syncPivot, syncPivotGroups } = require('../../utils/pivotSync.utils');
 
 const isValidRequest = (req, allowed) =>
   Object.keys(req.body || {}).every((k) => allowed.includes(k));
@@ -21,23 +26,13 @@ const safeJSON = (value, fallback) => {
   }
 };
 
-const otpStore = new Map();
+// OTP storage (memory or shared backend, see services/otp)
+const otpStore = createOtpStore('host');
 
 const generateOTP = () => {
   return Math.floor(1000 + Math.random() * 9000).toString();
 };
 
-/**
- * Clean expired OTPs from store
- */
-const cleanExpiredOTPs = () => {
-  const now = Date.now();
-  for (const [phone, data] of otpStore.entries()) {
-    if (data.expiresAt < now) {
-      otpStore.delete(phone);
-    }
-  }
-};
 
 const normalizeToArray = (input) => {
   if (input == null) return [];
@@ -144,6 +139,8 @@ const ALLOWED_IMAGE_MIME_TYPES = [
 
 const ALLOWED_VIDEO_MIME_TYPES = ['video/mp4', 'video/webm', 'video/mov'];
 
+const ALLOWED_MEDIA_MIME_TYPES = [...ALLOWED_IMAGE_MIME_TYPES, ...ALLOWED_VIDEO_MIME_TYPES];
+
 const MAX_MEDIA_FILE_SIZE = 50 * 1024 * 1024; // 50MB
 
 const ensureHostProperty = async (propertyId, ownerHostId) => {
@@ -364,11 +361,8 @@ const HostController = {
       const otp = generateOTP();
       const expiresAt = Date.now() + 5 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
-      // Store OTP (in-memory for development)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      // Store OTP
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
@@ -470,7 +464,7 @@ const HostController = {
       }
 
       const cleanPhone = phone.replace(/\s|-/g, "");
-      const storedOTPData = otpStore.get(cleanPhone);
+      const storedOTPData = await otpStore.get(cleanPhone);
 
       if (!storedOTPData) {
         return res.status(400).json({
@@ -480,7 +474,7 @@ const HostController = {
       }
 
       if (Date.now() > storedOTPData.expiresAt) {
-        otpStore.delete(cleanPhone);
+        await otpStore.delete(cleanPhone);
         return res.status(400).json({
           success: false,
           message: "OTP expired"
@@ -495,10 +489,10 @@ const HostController = {
       }
 
       // OTP verified → delete it
-      otpStore.delete(cleanPhone);
+      await otpStore.delete(cleanPhone);
 
       // 🔐 Mark phone as verified for signup (short-lived)
-      otpStore.set(`verified:${cleanPhone}`, {
+      await otpStore.set(`verified:${cleanPhone}`, {
         verified: true,
         expiresAt: Date.now() + 5 * 60 * 1000 // 5 minutes
       });
@@ -533,7 +527,7 @@ const HostController = {
       const cleanPhone = phone.replace(/\s|-/g, '');
 
       // Get stored OTP
-      const storedOTPData = otpStore.get(cleanPhone);
+      const storedOTPData = await otpStore.get(cleanPhone);
 
 
       if (!storedOTPData) {
@@ -545,7 +539,7 @@ const HostController = {
 
       // Check if OTP expired
       if (Date.now() > storedOTPData.expiresAt) {
-        otpStore.delete(cleanPhone);
+        await otpStore.delete(cleanPhone);
         return res.status(400).json({
           success: false,
           message: 'OTP has expired. Please request a new OTP.'
@@ -562,7 +556,7 @@ const HostController = {
       }
 
       // OTP verified successfully - remove from store
-      otpStore.delete(cleanPhone);
+      await otpStore.delete(cleanPhone);
 
       // Check if user exists
       let host = await prisma.host.findFirst({
@@ -667,10 +661,7 @@ const HostController = {
       const expiresAt = Date.now() + 1 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
       // Store new OTP (replaces existing if any)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
@@ -1039,6 +1030,8 @@ const HostController = {
 
     const refreshedProperty = await fetchHostPropertyDetails(propertyId);
 
+    await invalidatePropertyDetails(propertyId);
+
     return res.json({
       success: true,
       message: 'Host property basics updated successfully',
@@ -1080,6 +1073,8 @@ const HostController = {
 
     const refreshedProperty = await fetchHostPropertyDetails(propertyId);
 
+    await invalidatePropertyDetails(propertyId);
+
     return res.json({
       success: true,
       message: 'Host property location updated successfully',
@@ -1126,6 +1121,8 @@ const HostController = {
 
     const refreshedProperty = await fetchHostPropertyDetails(propertyId);
 
+    await invalidatePropertyDetails(propertyId);
+
     return res.json({
       success: true,
       message: 'Host property cancellation policy updated successfully',
@@ -1157,51 +1154,15 @@ const HostController = {
     const safetyList = normalizeIdList(safetyIds);
 
     const updatedProperty = await prisma.$transaction(async (tx) => {
-      const syncPropertyPivot = async (delegate, selectedIds, foreignKey) => {
-        const records = await delegate.findMany({ where: { propertyId } });
-        const selectedSet = new Set(selectedIds);
-
-        for (const record of records) {
-          if (selectedSet.has(record[foreignKey])) {
-            if (record.isDeleted) {
-              await delegate.update({
-                where: { id: record.id },
-                data: { isDeleted: false },
-              });
-            }
-          } else if (!record.isDeleted) {
-            await delegate.update({
-              where: { id: record.id },
-              data: { isDeleted: true },
-            });
-          }
-        }
-
-        for (const id of selectedIds) {
-          const existingRecord = records.find((record) => record[foreignKey] === id);
-          if (!existingRecord) {
-            await delegate.create({
-              data: {
-                propertyId,
-                [foreignKey]: id,
-              },
-            });
-          } else if (existingRecord.isDeleted) {
-            await delegate.update({
-              where: { id: existingRecord.id },
-              data: { isDeleted: false },
-            });
-          }
-        }
-      };
-
-      await syncPropertyPivot(tx.propertyAmenity, amenityList, 'amenityId');
-      await syncPropertyPivot(tx.propertyFacility, facilityList, 'facilityId');
-      await syncPropertyPivot(tx.propertySafety, safetyList, 'safetyId');
+      await syncPivot(tx.propertyAmenity, { where: { propertyId }, foreignKey: 'amenityId', selectedIds: amenityList });
+      await syncPivot(tx.propertyFacility, { where: { propertyId }, foreignKey: 'facilityId', selectedIds: facilityList });
+      await syncPivot(tx.propertySafety, { where: { propertyId }, foreignKey: 'safetyId', selectedIds: safetyList });
 
       return fetchHostPropertyDetails(propertyId);
     });
 
+    await invalidatePropertyDetails(propertyId);
+
     return res.json({
       success: true,
       message: 'Host property features updated successfully',
@@ -1235,28 +1196,24 @@ const HostController = {
 
     const newMediaFiles = filesByField.media || [];
 
-    for (const file of newMediaFiles) {
-      const validType =
-        ALLOWED_IMAGE_MIME_TYPES.includes(file.mimetype) ||
-        ALLOWED_VIDEO_MIME_TYPES.includes(file.mimetype);
-      if (!validType) {
-        return res.status(400).json({
-          success: false,
-          message: `Invalid file type: ${file.mimetype}`,
-        });
-      }
-      if (file.size > MAX_MEDIA_FILE_SIZE) {
-        return res.status(400).json({
-          success: false,
-          message: `File too large: ${file.originalname}`,
-        });
-      }
+    // Validate and probe every upload concurrently before touching the DB
+    const ingest = await ingestMediaFiles(newMediaFiles, {
+      allowedMimeTypes: ALLOWED_MEDIA_MIME_TYPES,
+      maxFileSize: MAX_MEDIA_FILE_SIZE,
+    });
+    if (ingest.errors.length) {
+      return res.status(400).json({
+        success: false,
+        message: ingest.errors[0].message,
+      });
     }
 
     const existingMediaPayload = buildMediaPayload(existingMedia);
-    const newMediaPayload = newMediaFiles.map((file, index) => ({
+    const newMediaPayload = ingest.items.map(({ file, type, width, height }, index) => ({
       url: fileToUrl(req, file),
-      type: file.mimetype?.startsWith('image/') ? 'image' : 'video',
+      type,
+      width,
+      height,
       isFeatured: false,
       order: existingMediaPayload.items.length + index,
     }));
@@ -1285,26 +1242,44 @@ const HostController = {
 
     const coverImageUrl = combinedMedia.find((item) => item.isFeatured)?.url || combinedMedia[0].url;
 
-    const updatedProperty = await prisma.$transaction(async (tx) => {
-      await tx.propertyMedia.deleteMany({ where: { propertyId } });
-
-      await tx.propertyMedia.createMany({
-        data: combinedMedia.map((media) => ({
-          propertyId,
-          url: media.url,
-          type: media.type,
-          isFeatured: media.isFeatured,
-          order: media.order,
-        })),
-      });
+    // Rows are recreated below - carry over probed dimensions and variants
+    // of media that are kept so they are not regenerated
+    const knownMetadata = indexMediaMetadata(
+      await prisma.propertyMedia.findMany({
+        where: { propertyId, url: { in: existingMediaPayload.items.map((item) => item.url) } },
+        select: { url: true, width: true, height: true, variants: true },
+      })
+    );
+
+    const mediaRows = combinedMedia.map((media) => {
+      const known = knownMetadata.get(media.url);
+      return {
+        propertyId,
+        url: media.url,
+        type: media.type,
+        isFeatured: media.isFeatured,
+        order: media.order,
+        width: media.width ?? known?.width ?? null,
+        height: media.height ?? known?.height ?? null,
+        variants: known?.variants ?? undefined,
+      };
+    });
 
-      await tx.property.update({
+    // The transaction only covers the metadata write
+    await prisma.$transaction([
+      prisma.propertyMedia.deleteMany({ where: { propertyId } }),
+      prisma.propertyMedia.createMany({ data: mediaRows }),
+      prisma.property.update({
         where: { id: propertyId },
         data: { coverImage: coverImageUrl },
-      });
+      }),
+    ]);
 
-      return fetchHostPropertyDetails(propertyId);
-    });
+    const updatedProperty = await fetchHostPropertyDetails(propertyId);
+
+    scheduleMediaVariants('propertyMedia', { propertyId });
+
+    await invalidatePropertyDetails(propertyId);
 
     return res.json({
       success: true,
@@ -1350,67 +1325,33 @@ const HostController = {
       (filesGroupedByIndex[index] ||= []).push(file);
     }
 
-    for (const [index, files] of Object.entries(filesGroupedByIndex)) {
-      for (const file of files) {
-        const validType =
-          ALLOWED_IMAGE_MIME_TYPES.includes(file.mimetype) ||
-          ALLOWED_VIDEO_MIME_TYPES.includes(file.mimetype);
-        if (!validType) {
-          return res.status(400).json({
-            success: false,
-            message: `Invalid file type for room type index ${index}: ${file.mimetype}`,
-          });
-        }
-        if (file.size > MAX_MEDIA_FILE_SIZE) {
-          return res.status(400).json({
-            success: false,
-            message: `File too large for room type index ${index}: ${file.originalname}`,
-          });
-        }
+    // Validate and probe all room type uploads concurrently up front
+    const ingestedByIndex = {};
+    const ingestResults = await Promise.all(
+      Object.entries(filesGroupedByIndex).map(async ([index, files]) => [
+        index,
+        await ingestMediaFiles(files, {
+          allowedMimeTypes: ALLOWED_MEDIA_MIME_TYPES,
+          maxFileSize: MAX_MEDIA_FILE_SIZE,
+        }),
+      ])
+    );
+    for (const [index, { items, errors }] of ingestResults) {
+      const [error] = errors;
+      if (error) {
+        return res.status(400).json({
+          success: false,
+          message: `${error.message} (room type index ${index})`,
+        });
       }
+      ingestedByIndex[index] = items;
     }
 
-    const updatedProperty = await prisma.$transaction(async (tx) => {
-      const syncRoomTypeAmenities = async (roomTypeId, amenityIds = []) => {
-        const normalised = normalizeIdList(amenityIds);
-        const existing = await tx.propertyRoomTypeAmenity.findMany({
-          where: { propertyRoomTypeId: roomTypeId },
-        });
-        const selectedSet = new Set(normalised);
-
-        for (const record of existing) {
-          if (selectedSet.has(record.amenityId)) {
-            if (record.isDeleted) {
-              await tx.propertyRoomTypeAmenity.update({
-                where: { id: record.id },
-                data: { isDeleted: false },
-              });
-            }
-          } else if (!record.isDeleted) {
-            await tx.propertyRoomTypeAmenity.update({
-              where: { id: record.id },
-              data: { isDeleted: true },
-            });
-          }
-        }
+    await prisma.$transaction(async (tx) => {
+      // Room type amenities are synced for every room type at once after the loop
+      const roomTypeAmenities = new Map();
 
-        for (const amenityId of normalised) {
-          const existingRecord = existing.find((record) => record.amenityId === amenityId);
-          if (!existingRecord) {
-            await tx.propertyRoomTypeAmenity.create({
-              data: {
-                propertyRoomTypeId: roomTypeId,
-                amenityId,
-              },
-            });
-          } else if (existingRecord.isDeleted) {
-            await tx.propertyRoomTypeAmenity.update({
-              where: { id: existingRecord.id },
-              data: { isDeleted: false },
-            });
-          }
-        }
-      };
+      const pendingMedia = [];
 
       for (let index = 0; index < roomTypesPayload.length; index += 1) {
         const roomTypePayload = roomTypesPayload[index];
@@ -1490,9 +1431,9 @@ const HostController = {
           continue;
         }
 
-        await syncRoomTypeAmenities(
+        roomTypeAmenities.set(
           propertyRoomTypeId,
-          roomTypePayload.amenities || roomTypePayload.amenityIds || []
+          normalizeIdList(roomTypePayload.amenities || roomTypePayload.amenityIds || [])
         );
 
         if (Array.isArray(roomTypePayload.existingMedia)) {
@@ -1509,31 +1450,54 @@ const HostController = {
           }
         }
 
-        const newRoomTypeFiles = filesGroupedByIndex[index] || [];
+        const newRoomTypeMedia = ingestedByIndex[index] || [];
+        if (newRoomTypeMedia.length) {
+          pendingMedia.push({ propertyRoomTypeId, items: newRoomTypeMedia });
+        }
+      }
 
-        if (newRoomTypeFiles.length) {
-          const existingCount = await tx.propertyRoomTypeMedia.count({
-            where: {
-              propertyRoomTypeId,
-              isDeleted: false,
-            },
-          });
+      await syncPivotGroups(tx.propertyRoomTypeAmenity, {
+        ownerKey: 'propertyRoomTypeId',
+        foreignKey: 'amenityId',
+        selections: roomTypeAmenities,
+      });
 
-          const mediaPayload = newRoomTypeFiles.map((file, fileIndex) => ({
-            propertyRoomTypeId,
-            url: fileToUrl(req, file),
-            type: file.mimetype?.startsWith('image/') ? 'image' : 'video',
-            isFeatured: false,
-            order: existingCount + fileIndex,
-          }));
+      // One count and one insert for every room type's new media
+      if (pendingMedia.length) {
+        const counts = await tx.propertyRoomTypeMedia.groupBy({
+          by: ['propertyRoomTypeId'],
+          where: {
+            propertyRoomTypeId: { in: pendingMedia.map((entry) => entry.propertyRoomTypeId) },
+            isDeleted: false,
+          },
+          _count: { _all: true },
+        });
+        const existingCounts = new Map(
+          counts.map((row) => [row.propertyRoomTypeId, row._count._all])
+        );
 
-          await tx.propertyRoomTypeMedia.createMany({ data: mediaPayload });
-        }
+        await tx.propertyRoomTypeMedia.createMany({
+          data: pendingMedia.flatMap(({ propertyRoomTypeId, items }) =>
+            items.map(({ file, type, width, height }, fileIndex) => ({
+              propertyRoomTypeId,
+              url: fileToUrl(req, file),
+              type,
+              width,
+              height,
+              isFeatured: false,
+              order: (existingCounts.get(propertyRoomTypeId) || 0) + fileIndex,
+            }))
+          ),
+        });
       }
-
-      return fetchHostPropertyDetails(propertyId);
     });
 
+    const updatedProperty = await fetchHostPropertyDetails(propertyId);
+
+    scheduleMediaVariants('propertyRoomTypeMedia', { propertyRoomType: { propertyId } });
+
+    await invalidatePropertyDetails(propertyId);
+
     return res.json({
       success: true,
       message: 'Host property room types updated successfully',
@@ -1,5 +1,4 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const { applySpecialRates } = require('../../utils/specialRateMap.utils');
 
 // "2025-09-29T00:00:00.000Z" -> "2025-09-29"
@@ -1,8 +1,9 @@
 // controllers/PropertyController.js
-const { PrismaClient, Prisma } = require('@prisma/client');
+const { Prisma } = require('@prisma/client');
 const { log, Console } = require('console');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const path = require('path');
+const { randomUUID } = require('crypto');
 const {
   dayUTC,
   diffNights,
@@ -11,6 +12,12 @@ const {
   calculateRoomAssignments
 } = require('../../utils/property.utils');
 const { requireAdminOrHost, requireAdmin } = require('../../utils/auth.utils');
+const { getAgentPricingContext } = require('../../services/property/agentPricing.service');
+const logger = require('../../utils/logger.utils').child('search');
+const { weakEtag, isNotModified } = require('../../utils/etag.utils');
+const { scheduleMediaVariants } = require('../../services/media/imagePipeline.service');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
+const { syncPivot } = require('../../utils/pivotSync.utils');
 
 /* ---------------------------- helpers ---------------------------- */
 const parseJSON = (v, fallback) => {
@@ -38,6 +45,66 @@ const ensureNotDeleted = async (model, id, name = 'record') => {
   if (entity.isDeleted) return { error: `${name} has been deleted` };
   return { entity };
 };
+
+// Validate addRooms/updateRooms configurations; room types are checked in one query
+// Returns { status, message } for the first invalid configuration, otherwise null
+const validateRoomConfigs = async (propertyId, roomConfigs) => {
+  for (const config of roomConfigs) {
+    const { propertyRoomTypeId, namePrefix, roomCount } = config || {};
+
+    if (!propertyRoomTypeId) {
+      return { status: 400, message: 'propertyRoomTypeId is required for all configurations' };
+    }
+    if (!namePrefix?.trim()) {
+      return { status: 400, message: 'namePrefix is required for all configurations' };
+    }
+    if (!roomCount || roomCount < 1 || roomCount > 50) {
+      return { status: 400, message: 'roomCount must be between 1 and 50' };
+    }
+  }
+
+  const roomTypeIds = [...new Set(roomConfigs.map(config => config.propertyRoomTypeId))];
+  const roomTypes = await prisma.propertyRoomType.findMany({
+    where: { id: { in: roomTypeIds }, propertyId, isDeleted: false },
+    select: { id: true },
+  });
+  const found = new Set(roomTypes.map(roomType => roomType.id));
+  const missing = roomTypeIds.find(id => !found.has(id));
+  if (missing) {
+    return { status: 404, message: `Property room type not found: ${missing}` };
+  }
+
+  return null;
+};
+
+const groupBy = (items, keyOf) => {
+  const groups = new Map();
+  items.forEach(item => {
+    const key = keyOf(item);
+    if (!groups.has(key)) groups.set(key, []);
+    groups.get(key).push(item);
+  });
+  return groups;
+};
+
+const ROOM_RENAME_CHUNK_SIZE = 500;
+
+// One UPDATE ... SET name = CASE id ... END per chunk of renames, for a batched $transaction
+// (raw SQL skips @updatedAt, so updatedAt is set here)
+const buildRoomRenameQueries = (renames) => {
+  const queries = [];
+  for (let i = 0; i < renames.length; i += ROOM_RENAME_CHUNK_SIZE) {
+    const chunk = renames.slice(i, i + ROOM_RENAME_CHUNK_SIZE);
+    queries.push(prisma.$executeRaw`
+      UPDATE \`Room\`
+      SET name = CASE id ${Prisma.join(chunk.map(({ id, name }) => Prisma.sql`WHEN ${id} THEN ${name}`), ' ')} END,
+          updatedAt = CURRENT_TIMESTAMP(3)
+      WHERE id IN (${Prisma.join(chunk.map(({ id }) => id))})
+    `);
+  }
+  return queries;
+};
+
 function normalizeToArray(input) {
   if (input == null) return [];
   if (Array.isArray(input)) return input;
@@ -782,8 +849,7 @@ const PropertyController = {
   getProperties: async (req, res) => {
     try {
       // Log role from extractRole middleware
-      console.log('getProperties - Role:', req.user?.role || 'no role');
-      console.log('getProperties - User ID:', req.user?.id || 'no id');
+      logger.debug('getProperties - Request', { role: req.user?.role || null, userId: req.user?.id || null });
 
       const {
         page = 1,
@@ -810,7 +876,7 @@ const PropertyController = {
       if (req.user?.role === 'host' && req.user?.id) {
         // Force host to only see their own properties
         finalOwnerHostId = req.user.id;
-        console.log('getProperties - Host filtering: Only showing properties for host', finalOwnerHostId);
+        logger.debug('getProperties - Host filtering', { ownerHostId: finalOwnerHostId });
       }
 
       // Build base where clause (without city filter)
@@ -864,10 +930,8 @@ const PropertyController = {
       let where = baseWhere;
 
       if (city) {
-        console.log('getProperties - City filter requested:', city);
-        console.log('getProperties - Property type filter:', propertyType);
-        console.log('getProperties - Status filter:', status);
-        console.log('getProperties - Base where (before city filter):', JSON.stringify(baseWhere, null, 2));
+        logger.debug('getProperties - Filters', { city, propertyType, status });
+        logger.trace('getProperties - Base where (before city filter)', () => ({ where: baseWhere }));
 
         // Step 1: Get all properties matching other filters (propertyType, status, etc.)
         // This ensures propertyType and status filters are applied FIRST
@@ -881,7 +945,7 @@ const PropertyController = {
           // This is necessary to ensure all filters work together correctly
         });
 
-        console.log('getProperties - Properties found before city filter:', allMatchingProperties.length);
+        logger.debug('getProperties - Properties found before city filter', { count: allMatchingProperties.length });
 
         // Step 2: Filter by city (case-insensitive) in Node.js
         const cityLower = city.toLowerCase().trim();
@@ -897,21 +961,21 @@ const PropertyController = {
             const locationCityLower = locationCity.toLowerCase().trim();
             const matches = locationCityLower === cityLower;
             if (matches) {
-              console.log('getProperties - City match:', locationCity, '===', city);
+              logger.trace('getProperties - City match', { locationCity, city });
             }
             return matches;
           })
           .map(p => p.id);
 
-        console.log('getProperties - Properties matching city filter:', matchingPropertyIds.length);
-        console.log('getProperties - Matching property IDs:', matchingPropertyIds);
+        logger.debug('getProperties - Properties matching city filter', { count: matchingPropertyIds.length });
+        logger.trace('getProperties - Matching property IDs', () => ({ matchingPropertyIds }));
 
         // Step 3: Apply city filter to where clause
         // This preserves all other filters (propertyType, status, etc.)
         if (matchingPropertyIds.length === 0) {
           // No properties match the city filter
           where = { ...baseWhere, id: { in: [] } };
-          console.log('getProperties - No properties match city filter - returning empty result');
+          logger.debug('getProperties - No properties match city filter - returning empty result');
         } else {
           // Filter by property IDs that match the city
           // This preserves propertyType, status, and all other filters
@@ -919,15 +983,10 @@ const PropertyController = {
             ...baseWhere,
             id: { in: matchingPropertyIds }
           };
-          console.log('getProperties - Applied city filter with', matchingPropertyIds.length, 'properties');
         }
       }
 
-      console.log('getProperties - Final where clause:', JSON.stringify(where, null, 2));
-      console.log('getProperties - Final where keys:', Object.keys(where));
-      console.log('getProperties - Has propertyType filter:', !!where.propertyTypeId);
-      console.log('getProperties - Has status filter:', !!where.status);
-      console.log('getProperties - Has city filter (id in array):', Array.isArray(where.id?.in));
+      logger.trace('getProperties - Final where clause', () => ({ where }));
 
       // Validate sort fields
       const allowedSortFields = ['createdAt', 'updatedAt', 'title', 'avgRating', 'reviewCount'];
@@ -955,6 +1014,7 @@ const PropertyController = {
           reviewCount: true,
           coverImage: true,
           createdAt: true,
+          updatedAt: true,
 
           // Property type
           propertyType: {
@@ -972,7 +1032,9 @@ const PropertyController = {
             select: {
               id: true,
               url: true,
-              type: true
+              type: true,
+              variants: true,
+              updatedAt: true
             },
           },
 
@@ -984,6 +1046,7 @@ const PropertyController = {
             },
             select: {
               id: true,
+              updatedAt: true,
               roomType: {
                 select: {
                   id: true,
@@ -1000,6 +1063,8 @@ const PropertyController = {
               mealPlanLinks: {
                 where: { isDeleted: false, isActive: true },
                 select: {
+                  id: true,
+                  updatedAt: true,
                   doubleOccupancyPrice: true,
                   singleOccupancyPrice: true,
                   groupOccupancyPrice: true
@@ -1012,6 +1077,7 @@ const PropertyController = {
           amenities: {
             where: { isDeleted: false },
             select: {
+              updatedAt: true,
               amenity: {
                 select: {
                   id: true,
@@ -1027,73 +1093,31 @@ const PropertyController = {
             where: { isDeleted: false },
             select: {
               id: true,
-              rating: true
+              rating: true,
+              updatedAt: true
             }
           }
         },
       });
 
 
-      console.log('properties:', JSON.stringify(properties, null, 2));
-
-      // Check if role is agent and fetch agent discounts
-      let agentDiscountsMap = new Map();
-      let isApprovedAgent = false;
-
-      if (req.user?.role === 'agent' && req.user?.id) {
-        try {
-          // Check if agent is approved
-          const agent = await prisma.travelAgent.findFirst({
-            where: {
-              id: req.user.id,
-              isDeleted: false,
-              status: 'approved'
-            },
-            select: {
-              id: true,
-              status: true
-            }
-          });
-
-          if (agent) {
-            isApprovedAgent = true;
-            console.log('getProperties - Agent is approved:', agent.id);
-
-            // Fetch agent's discounts for all properties in the result
-            const propertyIds = properties.map(p => p.id);
-            if (propertyIds.length > 0) {
-              const discounts = await prisma.travelAgentPropertyDiscount.findMany({
-                where: {
-                  agentId: agent.id,
-                  propertyId: { in: propertyIds },
-                  isDeleted: false,
-                  isActive: true
-                },
-                select: {
-                  propertyId: true,
-                  discountType: true,
-                  discountValue: true
-                }
-              });
+      logger.trace('getProperties - Properties', () => ({ properties }));
 
-              // Create a map for quick lookup: propertyId -> discount
-              discounts.forEach(discount => {
-                agentDiscountsMap.set(discount.propertyId, {
-                  type: discount.discountType,
-                  value: Number(discount.discountValue)
-                });
-              });
+      // Approved agents see their discounted prices - discounts come from a per-agent cached map
+      const agentPricing = await getAgentPricingContext(req.user);
+      const isApprovedAgent = Boolean(agentPricing);
+      const agentDiscountsMap = agentPricing ? agentPricing.discountsFor(properties.map(p => p.id)) : new Map();
 
-              console.log('getProperties - Agent discounts found:', discounts.length);
-            }
-          } else {
-            console.log('getProperties - Agent not found or not approved');
-          }
-        } catch (agentError) {
-          console.error('getProperties - Error checking agent:', agentError);
-          // Continue without agent discounts if there's an error
-        }
-      }
+      // Validator from the loaded rows - repeat listings get a 304 before the card transform
+      const etag = weakEtag(
+        'properties',
+        req.originalUrl,
+        req.user?.role || '',
+        total,
+        JSON.stringify(Array.from(agentDiscountsMap)),
+        properties
+      );
+      if (isNotModified(req, res, etag)) return;
 
       // Transform data for property cards
       const data = properties.map((p) => {
@@ -1174,7 +1198,8 @@ const PropertyController = {
             images: p.media.map(m => ({
               id: m.id,
               url: m.url,
-              type: m.type
+              type: m.type,
+              variants: m.variants || null
             })),
 
             // Price range
@@ -1364,54 +1389,18 @@ const PropertyController = {
         dateISO
       );
 
-      // Check if role is agent and fetch agent discounts (same as getProperties)
-      let agentDiscountsMap = new Map();
-      let isApprovedAgent = false;
+      // Agent discounts (same as getProperties)
+      const agentPricing = await getAgentPricingContext(req.user);
+      const isApprovedAgent = Boolean(agentPricing);
+      const agentDiscountsMap = agentPricing ? agentPricing.discountsFor(results.map(r => r.property.id)) : new Map();
 
-      if (req.user?.role === 'agent' && req.user?.id) {
-        try {
-          const agent = await prisma.travelAgent.findFirst({
-            where: {
-              id: req.user.id,
-              isDeleted: false,
-              status: 'approved'
-            },
-            select: {
-              id: true,
-              status: true
-            }
-          });
-
-          if (agent) {
-            isApprovedAgent = true;
-            const propertyIds = results.map(r => r.property.id);
-            if (propertyIds.length > 0) {
-              const discounts = await prisma.travelAgentPropertyDiscount.findMany({
-                where: {
-                  agentId: agent.id,
-                  propertyId: { in: propertyIds },
-                  isDeleted: false,
-                  isActive: true
-                },
-                select: {
-                  propertyId: true,
-                  discountType: true,
-                  discountValue: true
-                }
-              });
-
-              discounts.forEach(discount => {
-                agentDiscountsMap.set(discount.propertyId, {
-                  type: discount.discountType,
-                  value: Number(discount.discountValue)
-                });
-              });
-            }
-          }
-        } catch (agentError) {
-          console.error('searchProperties - Error checking agent:', agentError);
-        }
-      }
+      const etag = weakEtag(
+        'search',
+        req.originalUrl,
+        JSON.stringify(Array.from(agentDiscountsMap)),
+        results
+      );
+      if (isNotModified(req, res, etag)) return;
 
       // Transform data to match getProperties format exactly
       const data = results.map((result) => {
@@ -1499,7 +1488,8 @@ const PropertyController = {
             images: property.media?.map(m => ({
               id: m.id,
               url: m.url,
-              type: m.type
+              type: m.type,
+              variants: m.variants || null
             })) || [],
 
             // Price range
@@ -1541,8 +1531,7 @@ const PropertyController = {
         }
       });
 
-      console.log(`\n=== Search Results ===`);
-      console.log(`Found ${data.length} available properties`);
+      logger.debug('searchProperties - Results', { count: data.length });
 
       // Return same structure as getProperties (but without pagination since it's search results)
       return res.json({
@@ -1904,32 +1893,13 @@ const PropertyController = {
           }
         });
 
-        // Clear existing relations
-        await tx.propertyAmenity.deleteMany({ where: { propertyId: id } });
-        await tx.propertyFacility.deleteMany({ where: { propertyId: id } });
-        await tx.propertySafety.deleteMany({ where: { propertyId: id } });
-        await tx.propertyMedia.deleteMany({ where: { propertyId: id } });
+        // Sync amenities, facilities and safeties (only changed links are written)
+        await syncPivot(tx.propertyAmenity, { where: { propertyId: id }, foreignKey: 'amenityId', selectedIds: amenityList });
+        await syncPivot(tx.propertyFacility, { where: { propertyId: id }, foreignKey: 'facilityId', selectedIds: facilityList });
+        await syncPivot(tx.propertySafety, { where: { propertyId: id }, foreignKey: 'safetyId', selectedIds: safetyList });
 
-        // Recreate amenities
-        if (amenityList.length) {
-          await tx.propertyAmenity.createMany({
-            data: amenityList.map(amenityId => ({ propertyId: id, amenityId }))
-          });
-        }
-
-        // Recreate facilities
-        if (facilityList.length) {
-          await tx.propertyFacility.createMany({
-            data: facilityList.map(facilityId => ({ propertyId: id, facilityId }))
-          });
-        }
-
-        // Recreate safeties
-        if (safetyList.length) {
-          await tx.propertySafety.createMany({
-            data: safetyList.map(safetyId => ({ propertyId: id, safetyId }))
-          });
-        }
+        // Clear existing media
+        await tx.propertyMedia.deleteMany({ where: { propertyId: id } });
 
         // Recreate media
         if (allPropertyMedia.length) {
@@ -2039,6 +2009,9 @@ const PropertyController = {
         });
       });
 
+      scheduleMediaVariants('propertyMedia', { propertyId: id });
+      await invalidatePropertyDetails(id);
+
       res.json({ success: true, message: 'Property updated successfully', data: result });
     } catch (err) {
       console.error('updateProperty:', err);
@@ -2057,6 +2030,7 @@ const PropertyController = {
       const guard = await ensureNotDeleted(prisma.property, id, 'Property');
       if (guard.error) return res.status(404).json({ success: false, message: guard.error });
       await prisma.property.update({ where: { id }, data: { isDeleted: true } });
+      await invalidatePropertyDetails(id);
       res.json({ success: true, message: 'Property deleted' });
     } catch (err) {
       console.error('deleteProperty:', err);
@@ -2077,8 +2051,6 @@ const PropertyController = {
     // Expect array of room configurations
     const roomConfigs = req.body;
 
-    console.log('roomConfigs:', roomConfigs);
-
     if (!Array.isArray(roomConfigs) || roomConfigs.length === 0) {
       return res.status(400).json({ success: false, message: 'Room configurations array is required' });
     }
@@ -2092,57 +2064,26 @@ const PropertyController = {
         return res.status(404).json({ success: false, message: 'Property not found' });
       }
 
-      // ✅ Validate all room configurations
-      for (const config of roomConfigs) {
-        const { propertyRoomTypeId, namePrefix, roomCount, fromDate, toDate } = config;
-
-        if (!propertyRoomTypeId) {
-          return res.status(400).json({ success: false, message: 'propertyRoomTypeId is required for all configurations' });
-        }
-        if (!namePrefix?.trim()) {
-          return res.status(400).json({ success: false, message: 'namePrefix is required for all configurations' });
-        }
-        if (!roomCount || roomCount < 1 || roomCount > 50) {
-          return res.status(400).json({ success: false, message: 'roomCount must be between 1 and 50' });
-        }
-        // ✅ Date validation not needed for room creation
-        // Rooms are available by default, no need for date ranges
-
-        // ✅ Check room type exists for this property
-        const propertyRoomType = await prisma.propertyRoomType.findFirst({
-          where: { id: propertyRoomTypeId, propertyId, isDeleted: false },
-        });
-        if (!propertyRoomType) {
-          return res.status(404).json({ success: false, message: `Property room type not found: ${propertyRoomTypeId}` });
-        }
+      // ✅ Validate all room configurations (one room type lookup for all of them)
+      const invalid = await validateRoomConfigs(propertyId, roomConfigs);
+      if (invalid) {
+        return res.status(invalid.status).json({ success: false, message: invalid.message });
       }
 
-      // ✅ Create rooms for each configuration
-      const createdRooms = [];
-
-      for (const config of roomConfigs) {
-        const { propertyRoomTypeId, namePrefix, roomCount } = config;
-
-        // Create multiple rooms for this room type
-        for (let i = 1; i <= roomCount; i++) {
-          const roomName = `${namePrefix.trim()} ${i}`;
-
-          // ✅ Create room
-          const newRoom = await prisma.room.create({
-            data: {
-              propertyRoomTypeId,
-              name: roomName,
-              status: 'active',
-            }
-          });
-
-          createdRooms.push(newRoom);
+      // ✅ Create every room in one insert - ids are generated here since
+      // MySQL createMany cannot return the created rows.
+      // No availability records: rooms are available by default and rows
+      // are only created when they become unavailable (booked/blocked)
+      const createdRooms = roomConfigs.flatMap(({ propertyRoomTypeId, namePrefix, roomCount }) =>
+        Array.from({ length: Number(roomCount) }, (_, i) => ({
+          id: randomUUID(),
+          propertyRoomTypeId,
+          name: `${namePrefix.trim()} ${i + 1}`,
+          status: 'active',
+        }))
+      );
 
-          // ✅ No need to create availability records
-          // Rooms are available by default
-          // Only create records when they become unavailable (booked/blocked)
-        }
-      }
+      await prisma.room.createMany({ data: createdRooms });
 
       const totalRooms = createdRooms.length;
 
@@ -2198,113 +2139,83 @@ const PropertyController = {
         return res.status(404).json({ success: false, message: 'Property not found' });
       }
 
-      // ✅ Validate all room configurations
-      for (const config of roomConfigs) {
-        const { propertyRoomTypeId, namePrefix, roomCount } = config;
-
-        if (!propertyRoomTypeId) {
-          return res.status(400).json({ success: false, message: 'propertyRoomTypeId is required for all configurations' });
-        }
-        if (!namePrefix?.trim()) {
-          return res.status(400).json({ success: false, message: 'namePrefix is required for all configurations' });
-        }
-        if (!roomCount || roomCount < 1 || roomCount > 50) {
-          return res.status(400).json({ success: false, message: 'roomCount must be between 1 and 50' });
-        }
-        // ✅ Date validation removed - rooms are available by default
-
-        // ✅ Check room type exists for this property
-        const propertyRoomType = await prisma.propertyRoomType.findFirst({
-          where: { id: propertyRoomTypeId, propertyId, isDeleted: false },
-        });
-        if (!propertyRoomType) {
-          return res.status(404).json({ success: false, message: `Property room type not found: ${propertyRoomTypeId}` });
-        }
+      // ✅ Validate all room configurations (one room type lookup for all of them)
+      const invalid = await validateRoomConfigs(propertyId, roomConfigs);
+      if (invalid) {
+        return res.status(invalid.status).json({ success: false, message: invalid.message });
       }
 
-      // ✅ Process each room type configuration
-      const updateResults = [];
+      // A room type listed twice is configured by its last entry
+      const configByRoomType = new Map(roomConfigs.map(config => [config.propertyRoomTypeId, config]));
+      const roomTypeIds = [...configByRoomType.keys()];
 
-      for (const config of roomConfigs) {
-        const { propertyRoomTypeId, namePrefix, roomCount } = config;
-
-        // ✅ Get existing rooms for this room type
-        const existingRooms = await prisma.room.findMany({
-          where: {
-            propertyRoomTypeId,
-            isDeleted: false
-          },
-          orderBy: { name: 'asc' }
+      // ✅ Existing rooms of every room type in one query
+      const existingRooms = await prisma.room.findMany({
+        where: { propertyRoomTypeId: { in: roomTypeIds }, isDeleted: false },
+        select: { id: true, name: true, propertyRoomTypeId: true },
+        orderBy: { name: 'asc' }
+      });
+      const existingByRoomType = groupBy(existingRooms, room => room.propertyRoomTypeId);
+
+      // ✅ Diff each room type against its target count and names
+      const roomsToCreate = [];
+      const roomIdsToDelete = [];
+      const renames = [];
+
+      configByRoomType.forEach(({ namePrefix, roomCount: count }, propertyRoomTypeId) => {
+        const existing = existingByRoomType.get(propertyRoomTypeId) || [];
+        const prefix = namePrefix.trim();
+        const roomCount = Number(count);
+
+        // Keep the first rooms (renamed to match the prefix), add or soft delete the rest
+        existing.slice(0, roomCount).forEach((room, i) => {
+          const name = `${prefix} ${i + 1}`;
+          if (room.name !== name) renames.push({ id: room.id, name });
         });
-
-        const existingCount = existingRooms.length;
-        const newCount = roomCount;
-        // ✅ No date range needed - rooms are available by default
-
-        // ✅ Handle room count changes
-        if (newCount > existingCount) {
-          // Create additional rooms
-          for (let i = existingCount + 1; i <= newCount; i++) {
-            const roomName = `${namePrefix.trim()} ${i}`;
-
-            const newRoom = await prisma.room.create({
-              data: {
-                propertyRoomTypeId,
-                name: roomName,
-                status: 'active',
-              }
-            });
-
-            // ✅ No need to create availability records - room is available by default
-          }
-        } else if (newCount < existingCount) {
-          // Delete excess rooms
-          const roomsToDelete = existingRooms.slice(newCount);
-          const roomIdsToDelete = roomsToDelete.map(room => room.id);
-
-          // Soft delete rooms
-          await prisma.room.updateMany({
-            where: { id: { in: roomIdsToDelete } },
-            data: { isDeleted: true }
-          });
-
-          // ✅ No need to delete availability records - they don't exist by default
-        }
-
-        // ✅ Handle room name changes (rename existing rooms)
-        const roomsToUpdate = existingRooms.slice(0, Math.min(existingCount, newCount));
-        for (let i = 0; i < roomsToUpdate.length; i++) {
-          const room = roomsToUpdate[i];
-          const newRoomName = `${namePrefix.trim()} ${i + 1}`;
-
-          if (room.name !== newRoomName) {
-            await prisma.room.update({
-              where: { id: room.id },
-              data: { name: newRoomName }
-            });
-          }
+        existing.slice(roomCount).forEach(room => roomIdsToDelete.push(room.id));
+        for (let i = existing.length + 1; i <= roomCount; i++) {
+          roomsToCreate.push({ propertyRoomTypeId, name: `${prefix} ${i}`, status: 'active' });
         }
+      });
 
-        // ✅ No need to handle availability date changes - rooms are available by default
+      // ✅ Apply everything in one batched transaction
+      // (availability rows only exist for unavailable dates, so nothing to add or remove)
+      const operations = [];
+      if (roomsToCreate.length) {
+        operations.push(prisma.room.createMany({ data: roomsToCreate }));
+      }
+      if (roomIdsToDelete.length) {
+        operations.push(prisma.room.updateMany({
+          where: { id: { in: roomIdsToDelete } },
+          data: { isDeleted: true }
+        }));
+      }
+      if (renames.length) {
+        operations.push(...buildRoomRenameQueries(renames));
+      }
+      if (operations.length) {
+        await prisma.$transaction(operations);
+      }
 
-        // ✅ Collect results
-        const finalRooms = await prisma.room.findMany({
-          where: {
-            propertyRoomTypeId,
-            isDeleted: false
-          }
-        });
+      // ✅ Collect results
+      const finalRooms = await prisma.room.findMany({
+        where: { propertyRoomTypeId: { in: roomTypeIds }, isDeleted: false },
+        select: { id: true, name: true, propertyRoomTypeId: true }
+      });
+      const finalByRoomType = groupBy(finalRooms, room => room.propertyRoomTypeId);
 
-        updateResults.push({
+      const updateResults = roomTypeIds.map(propertyRoomTypeId => {
+        const rooms = finalByRoomType.get(propertyRoomTypeId) || [];
+        return {
           roomTypeId: propertyRoomTypeId,
-          namePrefix,
-          roomCount: finalRooms.length,
-          rooms: finalRooms.map(room => ({
+          namePrefix: configByRoomType.get(propertyRoomTypeId).namePrefix,
+          roomCount: rooms.length,
+          rooms: rooms.map(room => ({
             id: room.id,
             name: room.name
           }))
-        });
-      }
+        };
+      });
 
       return res.status(200).json({
         success: true,
@@ -2514,75 +2425,4 @@ const generateDateRange = (fromDate, toDate) => {
   return dates;
 };
 
-// Create availability records for a room
-const createAvailabilityForRoom = async (roomId, dateRange) => {
-  const availabilities = dateRange.map(date => ({
-    roomId,
-    date: new Date(date),
-    minNights: 1,
-    status: 'available',
-    isDeleted: false,
-  }));
-
-  await prisma.availability.createMany({
-    data: availabilities,
-    skipDuplicates: true,
-  });
-};
-
-// Update availability for a room (add/remove dates as needed)
-const updateRoomAvailability = async (roomId, newDateRange) => {
-  // Get existing availability dates
-  const existingAvailability = await prisma.availability.findMany({
-    where: {
-      roomId,
-      isDeleted: false
-    },
-    orderBy: { date: 'asc' }
-  });
-
-  const existingDates = existingAvailability.map(av =>
-    av.date.toISOString().split('T')[0]
-  );
-
-  const newDates = newDateRange.map(date =>
-    date.toISOString().split('T')[0]
-  );
-
-  // Find dates to delete (exist in DB but not in new range)
-  const datesToDelete = existingDates.filter(date => !newDates.includes(date));
-
-  // Find dates to add (exist in new range but not in DB)
-  const datesToAdd = newDates.filter(date => !existingDates.includes(date));
-
-  // Soft delete removed dates
-  if (datesToDelete.length > 0) {
-    const deleteDateObjects = datesToDelete.map(date => new Date(date));
-    await prisma.availability.updateMany({
-      where: {
-        roomId,
-        date: { in: deleteDateObjects },
-        isDeleted: false
-      },
-      data: { isDeleted: true }
-    });
-  }
-
-  // Add new dates
-  if (datesToAdd.length > 0) {
-    const newAvailabilityRecords = datesToAdd.map(date => ({
-      roomId,
-      date: new Date(date),
-      minNights: 1,
-      status: 'available',
-      isDeleted: false,
-    }));
-
-    await prisma.availability.createMany({
-      data: newAvailabilityRecords,
-      skipDuplicates: true,
-    });
-  }
-};
-
 module.exports = PropertyController;
@@ -1,6 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
 const { get } = require('../../routes/adminRoutes/property.routes');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const propertyRoomtypeController = {
 
@@ -1,9 +1,12 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const { verifyPropertyAccess } = require('./propertyAccess.utils');
 const { validatePropertyImages, validateRoomTypeImages } = require('../../utils/imageValidation.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { isValidUuid } = require('../../utils/frontdesk.utils');
+const { scheduleMediaVariants } = require('../../services/media/imagePipeline.service');
+const { indexMediaMetadata } = require('../../services/media/mediaIngest.service');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
+const { syncPivot, syncPivotGroups } = require('../../utils/pivotSync.utils');
 
 // Transaction timeout configuration (matches property creation)
 const MAX_TRANSACTION_TIMEOUT = 120000; // 120 seconds
@@ -26,6 +29,14 @@ const safeJSON = (value, fallback) => {
   }
 };
 
+/**
+ * Remember probed image dimensions per uploaded file so media rows are
+ * written with them
+ */
+const recordImageDimensions = (target, images = []) => {
+  images.forEach(({ file, width, height }) => target.set(file, { width, height }));
+};
+
 const normalizeToArray = (input) => {
   if (input == null) return [];
   if (Array.isArray(input)) return input;
@@ -569,6 +580,8 @@ const updatePropertyBasics = async (req, res) => {
       data: updateData,
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Property basics updated successfully');
   } catch (error) {
     console.error('updatePropertyBasics error:', error);
@@ -665,6 +678,8 @@ const updatePropertyLocation = async (req, res) => {
       },
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, updatedProperty, 'Location information updated successfully');
   } catch (error) {
     console.error('updatePropertyLocation error:', error);
@@ -785,6 +800,8 @@ const updatePropertyPolicy = async (req, res) => {
       },
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(
       res,
       {
@@ -827,41 +844,13 @@ const updatePropertyFeatures = async (req, res) => {
     const safetyList = normalizeToArray(safetyIds).filter(Boolean);
 
     await prisma.$transaction(async (tx) => {
-      await tx.propertyAmenity.deleteMany({ where: { propertyId: id } });
-      await tx.propertyFacility.deleteMany({ where: { propertyId: id } });
-      await tx.propertySafety.deleteMany({ where: { propertyId: id } });
-
-      if (amenityList.length) {
-        await tx.propertyAmenity.createMany({
-          data: amenityList.map((amenityId) => ({
-            propertyId: id,
-            amenityId,
-          })),
-          skipDuplicates: true,
-        });
-      }
-
-      if (facilityList.length) {
-        await tx.propertyFacility.createMany({
-          data: facilityList.map((facilityId) => ({
-            propertyId: id,
-            facilityId,
-          })),
-          skipDuplicates: true,
-        });
-      }
-
-      if (safetyList.length) {
-        await tx.propertySafety.createMany({
-          data: safetyList.map((safetyId) => ({
-            propertyId: id,
-            safetyId,
-          })),
-          skipDuplicates: true,
-        });
-      }
+      await syncPivot(tx.propertyAmenity, { where: { propertyId: id }, foreignKey: 'amenityId', selectedIds: amenityList });
+      await syncPivot(tx.propertyFacility, { where: { propertyId: id }, foreignKey: 'facilityId', selectedIds: facilityList });
+      await syncPivot(tx.propertySafety, { where: { propertyId: id }, foreignKey: 'safetyId', selectedIds: safetyList });
     }, { timeout: MAX_TRANSACTION_TIMEOUT });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Property features updated successfully');
   } catch (error) {
     console.error('updatePropertyFeatures error:', error);
@@ -1137,6 +1126,7 @@ const updateProperty = async (req, res) => {
     }, {});
 
     const newMediaFiles = filesByField.media || [];
+    const probedDimensions = new Map();
 
     // Parse existing media to get count
     const existingMediaPayload = buildMediaPayload(existingMedia);
@@ -1157,6 +1147,7 @@ const updateProperty = async (req, res) => {
       if (!propertyImageValidation.valid) {
         return sendError(res, 'Property image validation failed', 400, propertyImageValidation.errors);
       }
+      recordImageDimensions(probedDimensions, propertyImageValidation.images);
 
       // Calculate total media count (existing + new images only)
       const totalMediaCount = existingMediaCount + imageFiles.length;
@@ -1181,6 +1172,7 @@ const updateProperty = async (req, res) => {
     const newMediaPayload = newMediaFiles.map((file, index) => ({
       url: fileToUrl(req, file),
       type: 'image', // Only images are allowed (videos removed for consistency)
+      ...probedDimensions.get(file),
       isFeatured: false,
       order: existingMediaPayload.items.length + index,
     }));
@@ -1206,6 +1198,16 @@ const updateProperty = async (req, res) => {
     // Validate room type images before transaction
     // Check each room type's new images and total count (existing + new)
     // Note: This validates both existing room types (with propertyRoomTypeId) and new room types (without propertyRoomTypeId)
+    // Files are validated concurrently; results are checked in order below
+    // so the first failing room type is reported
+    const roomTypeImageValidations = new Map(
+      await Promise.all(roomTypePayloads.map(async (payload, index) => [
+        index,
+        await validateRoomTypeImages(
+          (filesByField[`roomTypeImages_${index}`] || []).filter((file) => file.mimetype?.startsWith('image/'))
+        ),
+      ]))
+    );
     for (const [index, payload] of roomTypePayloads.entries()) {
       const roomTypeImageFiles = filesByField[`roomTypeImages_${index}`] || [];
       
@@ -1218,10 +1220,11 @@ const updateProperty = async (req, res) => {
         }
 
         // Validate images using validation utilities (validates count, size, type, aspect ratio)
-        const roomTypeImageValidation = await validateRoomTypeImages(imageFiles);
+        const roomTypeImageValidation = roomTypeImageValidations.get(index);
         if (!roomTypeImageValidation.valid) {
           return sendError(res, `Room type at index ${index + 1} image validation failed`, 400, roomTypeImageValidation.errors);
         }
+        recordImageDimensions(probedDimensions, roomTypeImageValidation.images);
 
         // Get existing media count for this room type
         // For new room types, existingMedia will be empty
@@ -1260,35 +1263,11 @@ const updateProperty = async (req, res) => {
 
       await tx.property.update(propertyUpdatePayload);
 
-      await tx.propertyAmenity.deleteMany({ where: { propertyId: id } });
-      await tx.propertyFacility.deleteMany({ where: { propertyId: id } });
-      await tx.propertySafety.deleteMany({ where: { propertyId: id } });
+      await syncPivot(tx.propertyAmenity, { where: { propertyId: id }, foreignKey: 'amenityId', selectedIds: amenityList });
+      await syncPivot(tx.propertyFacility, { where: { propertyId: id }, foreignKey: 'facilityId', selectedIds: facilityList });
+      await syncPivot(tx.propertySafety, { where: { propertyId: id }, foreignKey: 'safetyId', selectedIds: safetyList });
       await tx.propertyMedia.deleteMany({ where: { propertyId: id } });
 
-      if (amenityList.length) {
-        const createAmenityPayload = amenityList.map((amenityId) => ({
-          propertyId: id,
-          amenityId,
-        }));
-        await tx.propertyAmenity.createMany({ data: createAmenityPayload });
-      }
-
-      if (facilityList.length) {
-        const createFacilityPayload = facilityList.map((facilityId) => ({
-          propertyId: id,
-          facilityId,
-        }));
-        await tx.propertyFacility.createMany({ data: createFacilityPayload });
-      }
-
-      if (safetyList.length) {
-        const createSafetyPayload = safetyList.map((safetyId) => ({
-          propertyId: id,
-          safetyId,
-        }));
-        await tx.propertySafety.createMany({ data: createSafetyPayload });
-      }
-
       await tx.propertyMedia.createMany({
         data: combinedMedia.map((media) => ({
           propertyId: id,
@@ -1296,6 +1275,8 @@ const updateProperty = async (req, res) => {
           type: media.type,
           isFeatured: media.isFeatured,
           order: media.order,
+          width: media.width ?? null,
+          height: media.height ?? null,
         })),
       });
 
@@ -1338,6 +1319,7 @@ const updateProperty = async (req, res) => {
         }
       }
 
+      const newRoomTypeMedia = [];
       for (let roomTypeIndex = 0; roomTypeIndex < roomTypePayloads.length; roomTypeIndex += 1) {
         const payload = roomTypePayloads[roomTypeIndex];
         const { propertyRoomTypeId } = payload;
@@ -1368,6 +1350,7 @@ const updateProperty = async (req, res) => {
           propertyRoomTypeId,
           url: fileToUrl(req, file),
           type: 'image', // Only images are allowed (videos removed for consistency)
+          ...probedDimensions.get(file),
           isFeatured: activeExistingMedia.length === 0 && fileIdx === 0,
           order: startOrder + fileIdx,
         }));
@@ -1380,29 +1363,27 @@ const updateProperty = async (req, res) => {
             });
           }
 
-          await tx.propertyRoomTypeMedia.createMany({
-            data: mediaCreatePayload,
-          });
+          newRoomTypeMedia.push(...mediaCreatePayload);
         }
       }
 
-      for (const [propertyRoomTypeId, amenityIds] of roomTypeAmenityMap.entries()) {
-        await tx.propertyRoomTypeAmenity.deleteMany({
-          where: { propertyRoomTypeId },
-        });
-
-        if (amenityIds.length) {
-          await tx.propertyRoomTypeAmenity.createMany({
-            data: amenityIds.map((amenityId) => ({
-              propertyRoomTypeId,
-              amenityId,
-            })),
-            skipDuplicates: true,
-          });
-        }
+      // All room types' uploads in one insert
+      if (newRoomTypeMedia.length) {
+        await tx.propertyRoomTypeMedia.createMany({ data: newRoomTypeMedia });
       }
+
+      await syncPivotGroups(tx.propertyRoomTypeAmenity, {
+        ownerKey: 'propertyRoomTypeId',
+        foreignKey: 'amenityId',
+        selections: roomTypeAmenityMap,
+      });
     }, { timeout: MAX_TRANSACTION_TIMEOUT });
 
+    scheduleMediaVariants('propertyMedia', { propertyId: id });
+    scheduleMediaVariants('propertyRoomTypeMedia', { propertyRoomType: { propertyId: id } });
+
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Property updated successfully');
   } catch (error) {
     console.error('updateProperty error:', error);
@@ -1625,6 +1606,17 @@ const updatePropertyRoomTypes = async (req, res) => {
     // Validate room type images before transaction
     // Check each room type's new images and total count (existing + new)
     // Note: This validates both existing room types (with propertyRoomTypeId) and new room types (without propertyRoomTypeId)
+    // Files are validated concurrently; results are checked in order below
+    // so the first failing room type is reported
+    const probedDimensions = new Map();
+    const roomTypeImageValidations = new Map(
+      await Promise.all(roomTypePayloads.map(async (payload) => [
+        payload.index,
+        await validateRoomTypeImages(
+          (filesByField[`roomTypeImages_${payload.index}`] || []).filter((file) => file.mimetype?.startsWith('image/'))
+        ),
+      ]))
+    );
     for (const payload of roomTypePayloads) {
       const roomTypeImageFiles = filesByField[`roomTypeImages_${payload.index}`] || [];
       
@@ -1637,10 +1629,11 @@ const updatePropertyRoomTypes = async (req, res) => {
         }
 
         // Validate images using validation utilities (validates count, size, type, aspect ratio)
-        const roomTypeImageValidation = await validateRoomTypeImages(imageFiles);
+        const roomTypeImageValidation = roomTypeImageValidations.get(payload.index);
         if (!roomTypeImageValidation.valid) {
           return sendError(res, `Room type at index ${payload.index + 1} image validation failed`, 400, roomTypeImageValidation.errors);
         }
+        recordImageDimensions(probedDimensions, roomTypeImageValidation.images);
 
         // Get existing media count for this room type
         // For new room types, existingMedia will be empty
@@ -1718,6 +1711,7 @@ const updatePropertyRoomTypes = async (req, res) => {
       }
 
       // Handle new media uploads
+      const newRoomTypeMedia = [];
       for (const payload of roomTypePayloads) {
         const propertyRoomTypeId = payload.propertyRoomTypeId;
         if (!propertyRoomTypeId) continue;
@@ -1745,6 +1739,7 @@ const updatePropertyRoomTypes = async (req, res) => {
           propertyRoomTypeId,
           url: fileToUrl(req, file),
           type: 'image', // Only images are allowed (videos removed for consistency)
+          ...probedDimensions.get(file),
           isFeatured: activeExistingMedia.length === 0 && fileIdx === 0,
           order: startOrder + fileIdx,
         }));
@@ -1756,30 +1751,27 @@ const updatePropertyRoomTypes = async (req, res) => {
             });
           }
 
-          await tx.propertyRoomTypeMedia.createMany({
-            data: mediaCreatePayload,
-          });
+          newRoomTypeMedia.push(...mediaCreatePayload);
         }
       }
 
-      // Update amenities for each room type
-      for (const [propertyRoomTypeId, amenityIds] of roomTypeAmenityMap.entries()) {
-        await tx.propertyRoomTypeAmenity.deleteMany({
-          where: { propertyRoomTypeId },
-        });
-
-        if (amenityIds.length) {
-          await tx.propertyRoomTypeAmenity.createMany({
-            data: amenityIds.map((amenityId) => ({
-              propertyRoomTypeId,
-              amenityId,
-            })),
-            skipDuplicates: true,
-          });
-        }
+      // All room types' uploads in one insert
+      if (newRoomTypeMedia.length) {
+        await tx.propertyRoomTypeMedia.createMany({ data: newRoomTypeMedia });
       }
+
+      // Update amenities for each room type
+      await syncPivotGroups(tx.propertyRoomTypeAmenity, {
+        ownerKey: 'propertyRoomTypeId',
+        foreignKey: 'amenityId',
+        selections: roomTypeAmenityMap,
+      });
     }, { timeout: MAX_TRANSACTION_TIMEOUT });
 
+    scheduleMediaVariants('propertyRoomTypeMedia', { propertyRoomType: { propertyId: id } });
+
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Room types updated successfully');
   } catch (error) {
     console.error('updatePropertyRoomTypes error:', error);
@@ -1815,6 +1807,7 @@ const updatePropertyMedia = async (req, res) => {
     }, {});
 
     const newMediaFiles = filesByField.media || [];
+    const probedDimensions = new Map();
 
     // Parse existing media to get count
     const existingMediaPayload = buildMediaPayload(existingMedia);
@@ -1835,6 +1828,7 @@ const updatePropertyMedia = async (req, res) => {
       if (!propertyImageValidation.valid) {
         return sendError(res, 'Property image validation failed', 400, propertyImageValidation.errors);
       }
+      recordImageDimensions(probedDimensions, propertyImageValidation.images);
 
       // Calculate total media count (existing + new images only)
       const totalMediaCount = existingMediaCount + imageFiles.length;
@@ -1859,6 +1853,7 @@ const updatePropertyMedia = async (req, res) => {
     const newMediaPayload = newMediaFiles.map((file, index) => ({
       url: fileToUrl(req, file),
       type: 'image', // Only images are allowed (videos removed for consistency)
+      ...probedDimensions.get(file),
       isFeatured: false,
       order: existingMediaPayload.items.length + index,
     }));
@@ -1884,24 +1879,42 @@ const updatePropertyMedia = async (req, res) => {
 
     const coverImageUrl = combinedMedia.find((item) => item.isFeatured)?.url || combinedMedia[0].url;
 
-    await prisma.$transaction(async (tx) => {
-      await tx.propertyMedia.deleteMany({ where: { propertyId: id } });
-
-      await tx.propertyMedia.createMany({
-        data: combinedMedia.map((media) => ({
-          propertyId: id,
-          url: media.url,
-          type: media.type,
-          isFeatured: media.isFeatured,
-          order: media.order,
-        })),
-      });
+    // Rows are recreated below - carry over probed dimensions and variants
+    // of media that are kept so they are not regenerated
+    const knownMetadata = indexMediaMetadata(
+      await prisma.propertyMedia.findMany({
+        where: { propertyId: id, url: { in: existingMediaPayload.items.map((item) => item.url) } },
+        select: { url: true, width: true, height: true, variants: true },
+      })
+    );
 
-      await tx.property.update({
+    // The transaction only covers the metadata write
+    await prisma.$transaction([
+      prisma.propertyMedia.deleteMany({ where: { propertyId: id } }),
+      prisma.propertyMedia.createMany({
+        data: combinedMedia.map((media) => {
+          const known = knownMetadata.get(media.url);
+          return {
+            propertyId: id,
+            url: media.url,
+            type: media.type,
+            isFeatured: media.isFeatured,
+            order: media.order,
+            width: media.width ?? known?.width ?? null,
+            height: media.height ?? known?.height ?? null,
+            variants: known?.variants ?? undefined,
+          };
+        }),
+      }),
+      prisma.property.update({
         where: { id },
         data: { coverImage: coverImageUrl },
-      });
-    }, { timeout: MAX_TRANSACTION_TIMEOUT });
+      }),
+    ]);
+
+    scheduleMediaVariants('propertyMedia', { propertyId: id });
+
+    await invalidatePropertyDetails(id);
 
     return sendSuccess(res, null, 'Property media updated successfully');
   } catch (error) {
@@ -1951,6 +1964,8 @@ const updatePropertyStatus = async (req, res) => {
       data: { status },
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Property status updated successfully');
   } catch (error) {
     console.error('updatePropertyStatus error:', error);
@@ -1994,6 +2009,8 @@ const softDeleteProperty = async (req, res) => {
       },
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Property deleted successfully');
   } catch (error) {
     console.error('softDeleteProperty error:', error);
@@ -2088,6 +2105,8 @@ const deletePropertyRoomType = async (req, res) => {
       });
     }, { timeout: MAX_TRANSACTION_TIMEOUT });
 
+    await invalidatePropertyDetails(propertyId);
+
     return sendSuccess(res, null, 'Room type removed from property successfully');
   } catch (error) {
     console.error('deletePropertyRoomType error:', error);
@@ -2215,6 +2234,8 @@ const updatePropertyTax = async (req, res) => {
       });
     });
 
+    await invalidatePropertyDetails(id);
+
     return sendSuccess(res, null, 'Tax configuration updated successfully');
   } catch (error) {
     console.error('updatePropertyTax error:', error);
@@ -1,2 +1,2 @@
 import {prisma} from '../prismaClient.js';
-const prisma = new PrismaClient();
\ No newline at end of file
+const prisma = require('../../config/prisma');
\ No newline at end of file
@@ -1,5 +1,4 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const { requireAdmin, requireAdminOrHost } = require('../../utils/auth.utils');
 
 // Your existing date utils
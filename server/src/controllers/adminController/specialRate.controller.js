@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
 
 
 const SpecialRateController = {
@@ -168,6 +168,8 @@ const SpecialRateController = {
       }
     });
 
+    await invalidatePropertyDetails(propertyId);
+
     res.status(201).json({
       success: true,
       message: 'Special rate created successfully',
@@ -343,6 +345,8 @@ const SpecialRateController = {
           creator: { select: { firstName: true, lastName: true } }
         }
       });
+
+      await invalidatePropertyDetails(existingRate.propertyId);
       
       res.json({
         success: true,
@@ -381,7 +385,8 @@ const SpecialRateController = {
           isActive: true,
           dateFrom: true,
           dateTo: true,
-          usageCount: true
+          usageCount: true,
+          propertyId: true
         }
       });
       
@@ -421,6 +426,8 @@ const SpecialRateController = {
           isActive: true
         }
       });
+
+      await invalidatePropertyDetails(existingRate.propertyId);
       
       res.json({
         success: true,
@@ -458,7 +465,7 @@ const SpecialRateController = {
       
       const existingRate = await prisma.specialRate.findFirst({
         where: { id, isDeleted: false },
-        select: { id: true, name: true, isActive: true }
+        select: { id: true, name: true, isActive: true, propertyId: true }
       });
       
       if (!existingRate) {
@@ -476,6 +483,8 @@ const SpecialRateController = {
         },
         select: { id: true, name: true, isActive: true }
       });
+
+      await invalidatePropertyDetails(existingRate.propertyId);
       
       res.json({
         success: true,
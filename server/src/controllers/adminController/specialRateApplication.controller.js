@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePropertyDetails } = require('../../services/property/propertyDetailsCache.service');
 
 
 const SpecialRateApplicationController = {
@@ -297,6 +297,8 @@ const SpecialRateApplicationController = {
         });
       }
 
+      await invalidatePropertyDetails(propertyId);
+
       res.status(201).json({
         success: true,
         message: 'Special rate application created successfully',
@@ -366,6 +368,7 @@ const SpecialRateApplicationController = {
       const deletedApplication = await prisma.specialRateApplication.delete({
         where: { id: id }
       });
+      await invalidatePropertyDetails(deletedApplication.propertyId);
       res.status(200).json({
         success: true,
         message: 'Special rate application deleted successfully',
@@ -3,10 +3,9 @@
  * Requires authenticated travel agent
  */
 
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 
-const prisma = new PrismaClient();
+const prisma = require('../../../config/prisma');
 
 module.exports = async function changeTravelAgentPassword(req, res) {
   try {
@@ -1,8 +1,7 @@
 
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 
-const prisma = new PrismaClient();
+const prisma = require('../../../config/prisma');
 
 module.exports = async function travelAgentRegister(req,res){
 
@@ -3,11 +3,10 @@
  * Handles authentication for approved travel agents
  */
 
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 const { signToken } = require('../../../utils/jwt.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../../config/prisma');
 
 module.exports = async function travelAgentLogin(req, res) {
   try {
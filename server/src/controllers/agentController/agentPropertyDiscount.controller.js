@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidateAgentDiscounts } = require('../../services/property/agentPricing.service');
 
 const AgentPropertyDiscountController = {
   // Set discount for agent-property combination
@@ -83,6 +83,8 @@ const AgentPropertyDiscountController = {
         }
       });
 
+      invalidateAgentDiscounts(agentId);
+
       res.json({
         success: true,
         message: 'Agent property discount set successfully',
@@ -124,6 +126,8 @@ const AgentPropertyDiscountController = {
         });
       }
 
+      invalidateAgentDiscounts(agentId);
+
       res.json({
         success: true,
         message: 'Agent property discount deleted successfully'
@@ -383,6 +387,8 @@ const AgentPropertyDiscountController = {
         });
       }
 
+      invalidateAgentDiscounts(agentId);
+
       res.json({
         success: true,
         message: `Agent ${isBlocked ? 'blocked from' : 'unblocked from'} property successfully`
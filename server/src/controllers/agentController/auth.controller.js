@@ -1,8 +1,8 @@
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 const jwt = require('jsonwebtoken');
 const { signToken } = require('../../utils/jwt.utils');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePrincipal } = require('../../utils/principalCache.utils');
 
 const TravelAgentAuthController = {
   // Travel Agent Registration
@@ -341,6 +341,7 @@ const TravelAgentAuthController = {
           updatedAt: true
         }
       });
+      invalidatePrincipal('agent', agentId);
 
       res.json({
         success: true,
@@ -458,6 +459,7 @@ const TravelAgentAuthController = {
           password: hashedNewPassword
         }
       });
+      invalidatePrincipal('agent', agentId);
 
       res.json({
         success: true,
@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { invalidatePrincipal } = require('../../utils/principalCache.utils');
 
 const TravelAgentController = {
   // Get all approved active travel agents
@@ -147,6 +147,7 @@ const TravelAgentController = {
         where: { id: agentId },
         data
       });
+      invalidatePrincipal('agent', agentId);
 
       res.json({ success: true, message: 'Agent status updated', data: { id: updated.id, status: updated.status } });
     } catch (err) {
@@ -178,6 +179,7 @@ const TravelAgentController = {
           updatedAt: new Date()
         }
       });
+      invalidatePrincipal('agent', agentId);
 
       return res.json({ success: true, message: 'Agent deleted successfully', data: { id: updated.id } });
     } catch (err) {
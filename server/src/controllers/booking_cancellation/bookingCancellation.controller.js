@@ -1,87 +1,16 @@
-const { PrismaClient, PaymentStatus, BookingStatus } = require('@prisma/client');
+const { PaymentStatus, BookingStatus } = require('@prisma/client');
 
-const prisma = new PrismaClient();
-
-const IST_OFFSET_MINUTES = 330;
-const DAY_IN_MS = 24 * 60 * 60 * 1000;
-
-const toIstMidnight = (date) => {
-  if (!(date instanceof Date) || Number.isNaN(date.getTime())) {
-    return null;
-  }
-  const utcMillis = date.getTime();
-  const istMillis = utcMillis + IST_OFFSET_MINUTES * 60 * 1000;
-  const dayStartMillis = Math.floor(istMillis / DAY_IN_MS) * DAY_IN_MS;
-  return new Date(dayStartMillis - IST_OFFSET_MINUTES * 60 * 1000);
-};
-
-const diffInCalendarDaysIst = (futureDate, baseDate) => {
-  const future = toIstMidnight(futureDate);
-  const base = toIstMidnight(baseDate);
-  if (!future || !base) return null;
-  const diff = future.getTime() - base.getTime();
-  return Math.floor(diff / DAY_IN_MS);
-};
-
-const buildRefundEvaluation = ({ booking, rules }) => {
-  if (!booking || !Array.isArray(rules) || rules.length === 0) {
-    return {
-      eligibleAmount: 0,
-      percentage: 0,
-      matchedRule: null,
-    };
-  }
-
-  const now = new Date();
-  const daysNotice = diffInCalendarDaysIst(booking.startDate, now);
-  const orderedRules = [...rules]
-    .filter((rule) => Number.isFinite(rule.daysBefore))
-    .sort((a, b) => b.daysBefore - a.daysBefore);
-
-  const matchedRule = orderedRules.find((rule) => daysNotice >= rule.daysBefore) || null;
-  const percentage = matchedRule ? matchedRule.refundPercentage : 0;
-  const totalAmountNumber = Number(booking.totalAmount ?? 0);
-  const eligibleAmount = Number.isFinite(totalAmountNumber)
-    ? (totalAmountNumber * percentage) / 100
-    : 0;
-
-  return {
-    eligibleAmount,
-    percentage,
-    matchedRule,
-    daysNotice,
-  };
-};
-
-const extractRoomIdsFromBooking = (booking) => {
-  const ids = new Set();
-
-  // PRODUCTION: Use BookingRoomSelection model (relational approach)
-  // Note: booking.roomId removed - all room details are in BookingRoomSelection
-  if (booking.bookingRoomSelections && Array.isArray(booking.bookingRoomSelections)) {
-    booking.bookingRoomSelections.forEach((selection) => {
-      // Extract room IDs from JSON array
-      const roomIds = Array.isArray(selection.roomIds) 
-        ? selection.roomIds 
-        : (typeof selection.roomIds === 'string' ? JSON.parse(selection.roomIds || '[]') : []);
-      
-      roomIds.forEach((roomId) => {
-        if (roomId) ids.add(roomId);
-      });
-    });
-  }
-
-  return Array.from(ids);
-};
+const prisma = require('../../config/prisma');
+const {
+  normalizeRules,
+  getSnapshotRules,
+  buildRefundEvaluation,
+} = require('../../utils/cancellationRefund.utils');
 
 const getCancellationRules = async (booking) => {
-  const snapshotRules = booking?.cancellationPolicySnapshot?.rules;
-  if (Array.isArray(snapshotRules) && snapshotRules.length > 0) {
-    return snapshotRules.map((rule) => ({
-      id: rule.id,
-      daysBefore: Number(rule.daysBefore) || 0,
-      refundPercentage: Number(rule.refundPercentage) || 0,
-    }));
+  const snapshotRules = getSnapshotRules(booking);
+  if (snapshotRules.length > 0) {
+    return snapshotRules;
   }
 
   if (!booking?.cancellationPolicyId) {
@@ -99,11 +28,7 @@ const getCancellationRules = async (booking) => {
     return [];
   }
 
-  return policy.rules.map((rule) => ({
-    id: rule.id,
-    daysBefore: Number(rule.daysBefore) || 0,
-    refundPercentage: Number(rule.refundPercentage) || 0,
-  }));
+  return normalizeRules(policy.rules);
 };
 
 const getBookingDetails = async (req, res) => {
@@ -1,6 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const isTruthy = (value) => {
   if (value === true || value === 'true' || value === 1 || value === '1') return true;
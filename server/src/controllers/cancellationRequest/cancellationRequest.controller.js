@@ -5,11 +5,18 @@
  * Admin can approve/reject cancellation requests
  */
 
-const { PrismaClient, BookingStatus } = require('@prisma/client');
+const { BookingStatus } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { smsService, emailService, smsTemplates, emailTemplates } = require('../../services/communication');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { approveCancellationRequests } = require('../../services/booking/cancellationApproval.service');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const {
+  getCancellationCounts,
+  recordCancellationTransition,
+} = require('../../services/booking/cancellationRequestCounts.service');
+const { KEYSET_ORDER_BY, decodeCursor, keysetWhere, keysetPage } = require('../../utils/keysetCursor.utils');
 
 // Default cancellation reasons
 const DEFAULT_REASONS = [
@@ -22,6 +29,14 @@ const DEFAULT_REASONS = [
   'Other'
 ];
 
+const REQUEST_STATUSES = ['pending', 'approved', 'rejected'];
+
+// Most requests one batch-approve call may carry
+const MAX_BATCH_APPROVE = 100;
+
+// Approval notifications: contact lookups + SMS/email, after the approval has committed
+const notificationPool = createWorkPool({ name: 'cancellation-notifications', concurrency: 4 });
+
 /**
  * Ensure user is authenticated and extract role/ID
  */
@@ -270,15 +285,18 @@ const sendRequestCreatedNotifications = async (cancellationRequest, requesterCon
           requestId: cancellationRequest.id
         });
 
-        await Promise.all(
-          adminEmails.map(adminEmail =>
-            emailService.send({
-              to: adminEmail,
-              subject: 'New Cancellation Request - ZomesStay',
-              content: adminEmailHTML
-            })
-          )
+        // One merged send for every admin
+        const results = await emailService.sendBatch(
+          adminEmails.map((adminEmail) => ({
+            to: adminEmail,
+            subject: 'New Cancellation Request - ZomesStay',
+            content: adminEmailHTML
+          }))
         );
+        const failed = results.filter((result) => !result.success);
+        if (failed.length > 0) {
+          console.error('Failed admin notifications:', failed.map(({ to, error }) => ({ to, error })));
+        }
       } catch (error) {
         console.error('Failed to send admin notifications:', error.message);
       }
@@ -297,7 +315,7 @@ const sendRequestCreatedNotifications = async (cancellationRequest, requesterCon
  */
 const sendRequestApprovedNotifications = async (cancellationRequest, booking, requesterContact, hostContact) => {
   try {
-    const refundAmount = booking.totalAmount; // Full refund for now
+    const refundAmount = Number(booking.refundEligibleAmount ?? 0);
     const refundTimeline = '5-7 business days';
 
     const approvalData = {
@@ -425,6 +443,48 @@ const sendRequestRejectedNotifications = async (cancellationRequest, booking, re
   }
 };
 
+/**
+ * Send approval notifications for requests that were just approved
+ * Contact lookups and sends run outside the approval transaction, a few at a
+ * time; failures are logged and never affect the approval.
+ * @param {Array<{request: object, booking: object}>} approved - From approveCancellationRequests
+ */
+const notifyApprovedRequests = (approved) => {
+  notificationPool
+    .mapSettled(approved, async ({ request, booking }) => {
+      const [requesterContact, hostContact] = await Promise.all([
+        fetchRequesterContactInfo(request.role, request.requestedBy, booking),
+        fetchHostContactInfo(booking.property.id),
+      ]);
+      await sendRequestApprovedNotifications(request, booking, requesterContact, hostContact);
+    })
+    .then((results) => {
+      results
+        .filter((result) => result.status === 'rejected')
+        .forEach((result) => {
+          console.error('Failed to send cancellation approval notifications (non-critical):', result.reason?.message);
+        });
+    });
+};
+
+/**
+ * Shape an approved request for API responses
+ */
+const formatApprovedRequest = ({ request, booking, refund }) => ({
+  id: request.id,
+  bookingId: request.bookingId,
+  bookingNumber: booking.bookingNumber,
+  status: request.status,
+  adminNotes: request.adminNotes,
+  reviewedAt: request.reviewedAt,
+  refund: {
+    paymentStatus: booking.paymentStatus,
+    refundEligibleAmount: booking.refundEligibleAmount,
+    refundPercentage: booking.refundPercentage,
+    daysNotice: refund?.daysNotice ?? null,
+  },
+});
+
 /**
  * Create a cancellation request
  * POST /api/cancellation-requests
@@ -560,6 +620,8 @@ const createCancellationRequest = async (req, res) => {
       },
     });
 
+    recordCancellationTransition(null, 'pending');
+
     // Send notifications (non-blocking)
     try {
       const requesterContact = await fetchRequesterContactInfo(role, requestedBy, cancellationRequest.booking);
@@ -601,10 +663,106 @@ const createCancellationRequest = async (req, res) => {
   }
 };
 
+/**
+ * Parse list query params: status?, limit?, and either cursor? or page?
+ * Without `page` the list is keyset-paginated (newest first, `cursor` from
+ * the previous response); `page` keeps numbered pages for older clients.
+ * @returns {{status?: string, limitNum: number, cursor?: object|null, pageNum?: number}|{error: string}}
+ */
+const parseListQuery = (query) => {
+  const { status, page, limit = 20, cursor } = query;
+
+  const limitNum = parseInt(limit, 10);
+  if (isNaN(limitNum) || limitNum < 1 || limitNum > 100) {
+    return { error: 'Limit must be between 1 and 100' };
+  }
+
+  if (page !== undefined && cursor === undefined) {
+    const pageNum = parseInt(page, 10);
+    if (isNaN(pageNum) || pageNum < 1) {
+      return { error: 'Invalid page number' };
+    }
+    return { status, limitNum, pageNum };
+  }
+
+  try {
+    return { status, limitNum, cursor: decodeCursor(cursor) };
+  } catch (error) {
+    return { error: 'Invalid cursor' };
+  }
+};
+
+// Slim list projection - full details come from GET /api/cancellation-requests/:requestId
+const listSelect = {
+  id: true,
+  bookingId: true,
+  requestedBy: true,
+  role: true,
+  reason: true,
+  status: true,
+  reviewedAt: true,
+  createdAt: true,
+  booking: {
+    select: {
+      bookingNumber: true,
+      status: true,
+      startDate: true,
+      endDate: true,
+      totalAmount: true,
+      guestName: true,
+      property: {
+        select: {
+          id: true,
+          title: true,
+        },
+      },
+    },
+  },
+};
+
+const formatListItem = (request) => ({
+  id: request.id,
+  bookingId: request.bookingId,
+  bookingNumber: request.booking.bookingNumber,
+  requestedBy: request.requestedBy,
+  role: request.role,
+  reason: request.reason,
+  status: request.status,
+  reviewedAt: request.reviewedAt,
+  booking: {
+    id: request.bookingId,
+    ...request.booking,
+  },
+  createdAt: request.createdAt,
+});
+
+/**
+ * Fetch one keyset page of cancellation requests
+ * @returns {Promise<{cancellationRequests: Array<object>, pagination: object}>}
+ */
+const fetchKeysetPage = async (where, { cursor, limitNum }) => {
+  const rows = await prisma.cancellationRequest.findMany({
+    where: { ...where, ...keysetWhere(cursor) },
+    select: listSelect,
+    orderBy: KEYSET_ORDER_BY,
+    take: limitNum + 1,
+  });
+  const { items, nextCursor, hasNext } = keysetPage(rows, limitNum);
+
+  return {
+    cancellationRequests: items.map(formatListItem),
+    pagination: {
+      limit: limitNum,
+      nextCursor,
+      hasNext,
+    },
+  };
+};
+
 /**
  * Get cancellation requests (for admin)
  * GET /api/cancellation-requests
- * Query params: status?, page?, limit?
+ * Query params: status?, limit?, cursor? (or page? for numbered pages)
  * Access: Admin only
  */
 const getCancellationRequests = async (req, res) => {
@@ -615,19 +773,11 @@ const getCancellationRequests = async (req, res) => {
       return sendError(res, adminCheck.message, adminCheck.status);
     }
 
-    const { status, page = 1, limit = 20 } = req.query;
-
-    // Validate pagination
-    const pageNum = parseInt(page, 10);
-    const limitNum = parseInt(limit, 10);
-
-    if (isNaN(pageNum) || pageNum < 1) {
-      return sendError(res, 'Invalid page number', 400);
-    }
-
-    if (isNaN(limitNum) || limitNum < 1 || limitNum > 100) {
-      return sendError(res, 'Limit must be between 1 and 100', 400);
+    const listQuery = parseListQuery(req.query);
+    if (listQuery.error) {
+      return sendError(res, listQuery.error, 400);
     }
+    const { status, limitNum, pageNum } = listQuery;
 
     // Build where clause
     const where = {
@@ -635,8 +785,19 @@ const getCancellationRequests = async (req, res) => {
       ...(status && { status }),
     };
 
-    // Get total count
-    const total = await prisma.cancellationRequest.count({ where });
+    const counts = await getCancellationCounts();
+
+    if (pageNum === undefined) {
+      const page = await fetchKeysetPage(where, listQuery);
+      return sendSuccess(res, { ...page, counts }, 'Cancellation requests retrieved successfully');
+    }
+
+    // Numbered pages: total from the status counters instead of a count query
+    const total = !status
+      ? counts.total
+      : REQUEST_STATUSES.includes(status)
+        ? counts[status]
+        : await prisma.cancellationRequest.count({ where });
 
     // Get cancellation requests
     const cancellationRequests = await prisma.cancellationRequest.findMany({
@@ -670,9 +831,7 @@ const getCancellationRequests = async (req, res) => {
           },
         },
       },
-      orderBy: {
-        createdAt: 'desc',
-      },
+      orderBy: KEYSET_ORDER_BY,
       skip: (pageNum - 1) * limitNum,
       take: limitNum,
     });
@@ -725,6 +884,7 @@ const getCancellationRequests = async (req, res) => {
           hasNext: pageNum < pages,
           hasPrev: pageNum > 1,
         },
+        counts,
       },
       'Cancellation requests retrieved successfully'
     );
@@ -742,7 +902,7 @@ const getCancellationRequests = async (req, res) => {
 /**
  * Get own cancellation requests
  * GET /api/cancellation-requests/my-requests
- * Query params: status?, page?, limit?
+ * Query params: status?, limit?, cursor? (or page? for numbered pages)
  * Access: User, Agent, Host
  */
 const getMyCancellationRequests = async (req, res) => {
@@ -754,19 +914,11 @@ const getMyCancellationRequests = async (req, res) => {
     }
     const { role, id: requestedBy } = authCheck;
 
-    const { status, page = 1, limit = 20 } = req.query;
-
-    // Validate pagination
-    const pageNum = parseInt(page, 10);
-    const limitNum = parseInt(limit, 10);
-
-    if (isNaN(pageNum) || pageNum < 1) {
-      return sendError(res, 'Invalid page number', 400);
-    }
-
-    if (isNaN(limitNum) || limitNum < 1 || limitNum > 100) {
-      return sendError(res, 'Limit must be between 1 and 100', 400);
+    const listQuery = parseListQuery(req.query);
+    if (listQuery.error) {
+      return sendError(res, listQuery.error, 400);
     }
+    const { status, limitNum, pageNum } = listQuery;
 
     // Build where clause
     const where = {
@@ -776,6 +928,11 @@ const getMyCancellationRequests = async (req, res) => {
       ...(status && { status }),
     };
 
+    if (pageNum === undefined) {
+      const page = await fetchKeysetPage(where, listQuery);
+      return sendSuccess(res, page, 'Cancellation requests retrieved successfully');
+    }
+
     // Get total count
     const total = await prisma.cancellationRequest.count({ where });
 
@@ -800,9 +957,7 @@ const getMyCancellationRequests = async (req, res) => {
           },
         },
       },
-      orderBy: {
-        createdAt: 'desc',
-      },
+      orderBy: KEYSET_ORDER_BY,
       skip: (pageNum - 1) * limitNum,
       take: limitNum,
     });
@@ -856,6 +1011,34 @@ const getMyCancellationRequests = async (req, res) => {
   }
 };
 
+/**
+ * Get cancellation request counts per status (for admin)
+ * GET /api/cancellation-requests/counts
+ * Served from in-memory counters - cheap enough for badge polling
+ * Access: Admin only
+ */
+const getCancellationRequestCounts = async (req, res) => {
+  try {
+    // Check admin access
+    const adminCheck = ensureAdminAccess(req);
+    if (!adminCheck.ok) {
+      return sendError(res, adminCheck.message, adminCheck.status);
+    }
+
+    const counts = await getCancellationCounts();
+
+    return sendSuccess(res, { counts }, 'Cancellation request counts retrieved successfully');
+  } catch (error) {
+    console.error('Error fetching cancellation request counts:', error);
+    return sendError(
+      res,
+      'Failed to fetch cancellation request counts',
+      500,
+      process.env.NODE_ENV === 'development' ? error : null
+    );
+  }
+};
+
 /**
  * Get default cancellation reasons
  * GET /api/cancellation-requests/reasons
@@ -903,119 +1086,104 @@ const approveCancellationRequest = async (req, res) => {
       return sendError(res, 'Request ID is required', 400);
     }
 
-    // Find cancellation request
-    const cancellationRequest = await prisma.cancellationRequest.findFirst({
-      where: {
-        id: requestId,
-        isDeleted: false,
-      },
-      include: {
-        booking: {
-          include: {
-            cancellationPolicy: {
-              include: {
-                rules: true,
-              },
-            },
-          },
-        },
-      },
+    // Cancel the booking, evaluate the refund and release its room-nights in one transaction
+    const { approved, skipped } = await approveCancellationRequests({
+      requestIds: [requestId],
+      adminId,
+      adminNotes: adminNotes ? adminNotes.trim() : null,
     });
 
-    if (!cancellationRequest) {
-      return sendError(res, 'Cancellation request not found', 404);
+    if (!approved.length) {
+      const [failure] = skipped;
+      return sendError(res, failure.message, failure.status);
     }
 
-    if (cancellationRequest.status !== 'pending') {
-      return sendError(
-        res,
-        `Cancellation request is already ${cancellationRequest.status}`,
-        400
-      );
+    // Send notifications (non-blocking)
+    notifyApprovedRequests(approved);
+
+    return sendSuccess(
+      res,
+      {
+        cancellationRequest: formatApprovedRequest(approved[0]),
+      },
+      'Cancellation request approved and booking cancelled successfully'
+    );
+  } catch (error) {
+    console.error('Error approving cancellation request:', error);
+    return sendError(
+      res,
+      'Failed to approve cancellation request',
+      500,
+      process.env.NODE_ENV === 'development' ? error : null
+    );
+  }
+};
+
+/**
+ * Approve many cancellation requests at once (admin only)
+ * POST /api/cancellation-requests/batch-approve
+ * Body: { requestIds: string[], adminNotes? }
+ * Access: Admin only
+ *
+ * Requests that cannot be approved (not found, already reviewed, booking
+ * already cancelled...) are listed under `skipped`; the rest are approved
+ * together.
+ */
+const batchApproveCancellationRequests = async (req, res) => {
+  try {
+    // Check admin access
+    const adminCheck = ensureAdminAccess(req);
+    if (!adminCheck.ok) {
+      return sendError(res, adminCheck.message, adminCheck.status);
     }
+    const { adminId } = adminCheck;
 
-    // Check if booking is still cancellable
-    if (cancellationRequest.booking.status === BookingStatus.cancelled) {
-      return sendError(res, 'Booking is already cancelled', 400);
+    const { requestIds, adminNotes } = req.body || {};
+
+    if (!Array.isArray(requestIds) || requestIds.length === 0) {
+      return sendError(res, 'requestIds must be a non-empty array', 400);
     }
 
-    // Use transaction to update request and cancel booking
-    const result = await prisma.$transaction(async (tx) => {
-      // Update cancellation request status
-      const updatedRequest = await tx.cancellationRequest.update({
-        where: { id: requestId },
-        data: {
-          status: 'approved',
-          adminNotes: adminNotes ? adminNotes.trim() : null,
-          reviewedAt: new Date(),
-          reviewedBy: adminId,
-        },
-        include: {
-          booking: {
-            include: {
-              property: {
-                select: {
-                  id: true,
-                  title: true,
-                  ownerHostId: true,
-                },
-              },
-            },
-          },
-        },
-      });
+    if (requestIds.length > MAX_BATCH_APPROVE) {
+      return sendError(res, `Cannot approve more than ${MAX_BATCH_APPROVE} requests at once`, 400);
+    }
 
-      // Cancel the booking (this will trigger refund calculation if needed)
-      // Note: We'll use the existing cancellation logic from bookingCancellation.controller.js
-      // For now, we'll just update the status
-      await tx.booking.update({
-        where: { id: cancellationRequest.bookingId },
-        data: {
-          status: BookingStatus.cancelled,
-          cancellationDate: new Date(),
-          cancellationReason: cancellationRequest.reason,
-        },
-      });
+    if (requestIds.some((id) => typeof id !== 'string' || id.trim().length === 0)) {
+      return sendError(res, 'requestIds must contain request ID strings', 400);
+    }
+
+    if (adminNotes && (typeof adminNotes !== 'string' || adminNotes.length > 1000)) {
+      return sendError(res, 'Admin notes must be a string of at most 1000 characters', 400);
+    }
 
-      return updatedRequest;
+    const { approved, skipped, releasedNights } = await approveCancellationRequests({
+      requestIds: requestIds.map((id) => id.trim()),
+      adminId,
+      adminNotes: adminNotes ? adminNotes.trim() : null,
     });
 
     // Send notifications (non-blocking)
-    try {
-      const requesterContact = await fetchRequesterContactInfo(
-        cancellationRequest.role,
-        cancellationRequest.requestedBy,
-        result.booking
-      );
-      const hostContact = await fetchHostContactInfo(result.booking.property.id);
-      
-      sendRequestApprovedNotifications(result, result.booking, requesterContact, hostContact)
-        .catch(error => {
-          console.error('Failed to send cancellation approval notifications (non-critical):', error.message);
-        });
-    } catch (error) {
-      console.error('Error preparing cancellation approval notifications (non-critical):', error.message);
-    }
+    notifyApprovedRequests(approved);
 
     return sendSuccess(
       res,
       {
-        cancellationRequest: {
-          id: result.id,
-          bookingId: result.bookingId,
-          bookingNumber: result.booking.bookingNumber,
-          status: result.status,
-          adminNotes: result.adminNotes,
-          reviewedAt: result.reviewedAt,
+        approved: approved.map(formatApprovedRequest),
+        skipped,
+        summary: {
+          requested: requestIds.length,
+          approved: approved.length,
+          skipped: skipped.length,
+          releasedNights,
         },
       },
-      'Cancellation request approved and booking cancelled successfully'
+      `${approved.length} cancellation request(s) approved`
     );
   } catch (error) {
-    console.error('Error approving cancellation request:', error);
+    console.error('Error batch approving cancellation requests:', error);
     return sendError(
       res,
-      'Failed to approve cancellation request',
+      'Failed to approve cancellation requests',
       500,
       process.env.NODE_ENV === 'development' ? error : null
     );
@@ -1104,6 +1272,8 @@ const rejectCancellationRequest = async (req, res) => {
       },
     });
 
+    recordCancellationTransition('pending', 'rejected');
+
     // Send notifications (non-blocking)
     try {
       const requesterContact = await fetchRequesterContactInfo(
@@ -1252,8 +1422,10 @@ module.exports = {
   createCancellationRequest,
   getCancellationRequests,
   getMyCancellationRequests,
+  getCancellationRequestCounts,
   getCancellationReasons,
   approveCancellationRequest,
+  batchApproveCancellationRequests,
   rejectCancellationRequest,
   getCancellationRequestById,
 };
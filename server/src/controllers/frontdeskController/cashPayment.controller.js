@@ -3,14 +3,14 @@
  * Handles creation of bookings with cash payments for front-desk
  */
 
-const { PrismaClient, OrderStatus, PaymentStatus, PaymentMethod } = require('@prisma/client');
+const { OrderStatus, PaymentStatus, PaymentMethod } = require('@prisma/client');
 const { ensurePropertyAccess } = require('./access.utils');
 const { toDateOnly, buildDateRange, formatISODate } = require('../../utils/date.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { normalizePhone, isValidUuid } = require('../../utils/frontdesk.utils');
 const { createCashBooking: createCashBookingService } = require('../../services/frontdesk/cashBooking.service');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /**
  * Create booking with cash payment
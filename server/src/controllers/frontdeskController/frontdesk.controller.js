@@ -1,4 +1,3 @@
-const { PrismaClient } = require('@prisma/client');
 const { ensurePropertyAccess } = require('./access.utils');
 const {
   toDateOnly,
@@ -11,7 +10,7 @@ const {
 } = require('../../utils/date.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const { normalizeAvailabilityStatus } = require('../../utils/frontdesk.utils');
 
@@ -1,4 +1,3 @@
-const { PrismaClient } = require('@prisma/client');
 const { ensurePropertyAccess } = require('./access.utils');
 const {
   toDateOnly,
@@ -9,7 +8,7 @@ const {
 } = require('../../utils/date.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const MS_PER_DAY = 24 * 60 * 60 * 1000;
 const DEFAULT_HOLD_DURATION_MINUTES = 15;
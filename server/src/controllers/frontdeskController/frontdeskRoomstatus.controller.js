@@ -1,4 +1,3 @@
-const { PrismaClient } = require('@prisma/client');
 const { ensurePropertyAccess } = require('./access.utils');
 const { toDateOnly, formatISODate } = require('../../utils/date.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
@@ -9,7 +8,7 @@ const {
   DEFAULT_REASON_BY_STATUS,
 } = require('../../utils/frontdesk.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const HOURS_TO_MILLISECONDS = 60 * 60 * 1000;
 
@@ -4,13 +4,13 @@
  */
 
 const Razorpay = require('razorpay');
-const { PrismaClient, OrderCreatorType } = require('@prisma/client');
+const { OrderCreatorType } = require('@prisma/client');
 const { ensurePropertyAccess } = require('./access.utils');
 const { toDateOnly, buildDateRange, formatISODate, addDays } = require('../../utils/date.utils');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { normalizePhone, isValidUuid } = require('../../utils/frontdesk.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const razorpay = new Razorpay({
   key_id: process.env.RAZORPAY_KEY_ID || 'rzp_test_RWnUwmZYbfokH5',
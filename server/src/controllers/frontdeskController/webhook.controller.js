@@ -4,11 +4,11 @@
  */
 
 const crypto = require('crypto');
-const { PrismaClient, PaymentStatus, BookingStatus } = require('@prisma/client');
+const { PaymentStatus, BookingStatus } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { buildDateRange, formatISODate, toDateOnly } = require('../../utils/date.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const RAZORPAY_WEBHOOK_SECRET = process.env.RAZORPAY_WEBHOOK_SECRET || '';
 
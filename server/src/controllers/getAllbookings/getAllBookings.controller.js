@@ -1,6 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 const DEFAULT_LIMIT = 20;
 const MAX_LIMIT = 100;
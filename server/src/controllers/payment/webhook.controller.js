@@ -8,7 +8,8 @@
  * - Comprehensive error handling
  * - Idempotency checks (via bookingCreation service)
  * - Transaction safety
- * - Always returns 200 to Razorpay (prevents retries)
+ * - Events are stored in a durable inbox and acknowledged immediately;
+ *   the inbox worker processes them in order per Razorpay order
  * 
  * Supported Events:
  * - payment.captured (user/agent bookings from createOrder)
@@ -18,14 +19,14 @@
  * - payment_link.cancelled (payment link cancelled)
  */
 
-const { PrismaClient } = require('@prisma/client');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const { verifyWebhookSignature } = require('../../services/payment/webHookVerification.service');
 const { createBookingFromOrder } = require('../../services/payment/bookingCreation.service');
 const { releaseOrderHolds } = require('../../services/payment/roomAvailability.service');
+const { enqueueWebhookEvent } = require('../../services/payment/webhookInbox.service');
 const { smsService, emailService, smsTemplates, emailTemplates } = require('../../services/communication');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /**
  * Fetch notification recipients for booking confirmation
@@ -172,17 +173,19 @@ const sendBookingConfirmationNotifications = async (order, booking, recipients,
         const smsProvider = process.env.SMS_PROVIDER || 'mock';
         const smsFrom = (smsProvider === 'twilio' && process.env.TWILIO_PHONE_NUMBER) ? process.env.TWILIO_PHONE_NUMBER : 'ZOMESSTAY';
 
-        await smsService.send({
-          to: recipients.guest.phone,
-          message: guestSMS,
-          from: smsFrom
-        });
-
-        await emailService.send({
-          to: recipients.guest.email,
-          subject: 'Booking Confirmation - ZomesStay',
-          content: guestEmailHTML
-        });
+        // SMS and email go through independent providers
+        await Promise.all([
+          smsService.send({
+            to: recipients.guest.phone,
+            message: guestSMS,
+            from: smsFrom
+          }),
+          emailService.send({
+            to: recipients.guest.email,
+            subject: 'Booking Confirmation - ZomesStay',
+            content: guestEmailHTML
+          })
+        ]);
 
         console.log(`[${requestId}] ✅ Booking confirmation sent to guest`, {
           email: recipients.guest.email,
@@ -193,73 +196,70 @@ const sendBookingConfirmationNotifications = async (order, booking, recipients,
       }
     }
 
-    // 2. Send Email to Host
+    // 2. Email the host and all admins in one batch (identical admin
+    // emails are merged into a single multi-recipient send)
+    const staffEmails = [];
+
     if (recipients.host.email) {
-      try {
-        const hostData = {
-          hostName: recipients.host.name,
-          bookingNumber: bookingData.bookingNumber,
-          propertyName: bookingData.propertyName,
-          guestName: bookingData.guestName,
-          guestEmail: recipients.guest.email,
-          guestPhone: recipients.guest.phone,
-          checkIn: bookingData.checkIn,
-          checkOut: bookingData.checkOut,
-          nights: bookingData.nights,
-          guests: bookingData.guests,
-          children: bookingData.children,
-          totalAmount: bookingData.totalAmount,
-          roomDetails: bookingData.roomDetails
-        };
-
-        const hostEmailHTML = emailTemplates.bookingNotificationToHost(hostData);
-
-        await emailService.send({
-          to: recipients.host.email,
-          subject: 'New Booking Received - ZomesStay',
-          content: hostEmailHTML
-        });
+      const hostData = {
+        hostName: recipients.host.name,
+        bookingNumber: bookingData.bookingNumber,
+        propertyName: bookingData.propertyName,
+        guestName: bookingData.guestName,
+        guestEmail: recipients.guest.email,
+        guestPhone: recipients.guest.phone,
+        checkIn: bookingData.checkIn,
+        checkOut: bookingData.checkOut,
+        nights: bookingData.nights,
+        guests: bookingData.guests,
+        children: bookingData.children,
+        totalAmount: bookingData.totalAmount,
+        roomDetails: bookingData.roomDetails
+      };
+
+      staffEmails.push({
+        to: recipients.host.email,
+        subject: 'New Booking Received - ZomesStay',
+        content: emailTemplates.bookingNotificationToHost(hostData)
+      });
+    }
+
+    if (recipients.admins.length > 0) {
+      const adminEmailHTML = emailTemplates.adminBookingNotification({
+        bookingNumber: booking.bookingNumber,
+        propertyName: bookingData.propertyName,
+        guestName: bookingData.guestName,
+        guestEmail: recipients.guest.email,
+        guestPhone: recipients.guest.phone,
+        checkIn: bookingData.checkIn,
+        checkOut: bookingData.checkOut,
+        nights: bookingData.nights,
+        guests: bookingData.guests,
+        children: bookingData.children,
+        totalAmount: bookingData.totalAmount,
+        roomDetails: bookingData.roomDetails
+      });
 
-        console.log(`[${requestId}] ✅ Booking notification sent to host`, {
-          email: recipients.host.email
+      recipients.admins.forEach((adminEmail) => {
+        staffEmails.push({
+          to: adminEmail,
+          subject: 'New Booking Confirmed - ZomesStay',
+          content: adminEmailHTML
         });
-      } catch (error) {
-        console.error(`[${requestId}] Failed to send host notification:`, error.message);
-      }
+      });
     }
 
-    // 3. Send Email to all Admins
-    if (recipients.admins.length > 0) {
+    if (staffEmails.length > 0) {
       try {
-        const adminEmailHTML = emailTemplates.adminBookingNotification({
-          bookingNumber: booking.bookingNumber,
-          propertyName: bookingData.propertyName,
-          guestName: bookingData.guestName,
-          guestEmail: recipients.guest.email,
-          guestPhone: recipients.guest.phone,
-          checkIn: bookingData.checkIn,
-          checkOut: bookingData.checkOut,
-          nights: bookingData.nights,
-          guests: bookingData.guests,
-          children: bookingData.children,
-          totalAmount: bookingData.totalAmount,
-          roomDetails: bookingData.roomDetails
-        });
+        const results = await emailService.sendBatch(staffEmails);
+        const failed = results.filter((result) => !result.success);
 
-        // Send to all admins in parallel
-        await Promise.all(
-          recipients.admins.map(adminEmail =>
-            emailService.send({
-              to: adminEmail,
-              subject: 'New Booking Confirmed - ZomesStay',
-              content: adminEmailHTML
-            })
-          )
-        );
-
-        console.log(`[${requestId}] ✅ Booking notification sent to ${recipients.admins.length} admin(s)`);
+        console.log(`[${requestId}] ✅ Booking notification sent to ${results.length - failed.length}/${results.length} host/admin recipient(s)`);
+        if (failed.length > 0) {
+          console.error(`[${requestId}] Failed host/admin notifications:`, failed.map(({ to, error }) => ({ to, error })));
+        }
       } catch (error) {
-        console.error(`[${requestId}] Failed to send admin notifications:`, error.message);
+        console.error(`[${requestId}] Failed to send host/admin notifications:`, error.message);
       }
     }
 
@@ -269,6 +269,61 @@ const sendBookingConfirmationNotifications = async (order, booking, recipients,
   }
 };
 
+/**
+ * Send booking confirmation notifications for an order turned into a booking
+ * Never throws - notification failures must not fail payment processing.
+ * Used by the payment webhooks and by payment reconciliation.
+ *
+ * @param {string} orderId - Order ID
+ * @param {object} booking - Created booking
+ * @param {string} requestId - Request ID for logging
+ * @returns {Promise<void>}
+ */
+const notifyBookingConfirmed = async (orderId, booking, requestId) => {
+  try {
+    // Fetch full order with all relations needed for notifications
+    const fullOrder = await prisma.order.findUnique({
+      where: { id: orderId },
+      include: {
+        property: {
+          select: {
+            id: true,
+            title: true,
+            ownerHostId: true,
+            location: true
+          }
+        },
+        roomSelections: {
+          select: {
+            roomTypeName: true,
+            rooms: true,
+            guests: true,
+            children: true,
+            mealPlanId: true,
+            price: true,
+            tax: true,
+            totalPrice: true
+          }
+        }
+      }
+    });
+
+    if (fullOrder) {
+      // Fetch notification recipients
+      const recipients = await fetchNotificationRecipients(fullOrder, booking);
+
+      // Send notifications (non-blocking, don't await)
+      sendBookingConfirmationNotifications(fullOrder, booking, recipients, requestId)
+        .catch(error => {
+          console.error(`[${requestId}] Notification sending failed (non-critical):`, error.message);
+        });
+    }
+  } catch (error) {
+    console.error(`[${requestId}] Failed to send notifications (non-critical):`, error.message);
+    // Don't fail payment processing if notifications fail
+  }
+};
+
 /**
  * Generate unique request ID for logging
  * @returns {string} Request ID
@@ -373,48 +428,7 @@ const handlePaymentCaptured = async (eventData, requestId) => {
 
     // Send booking confirmation notifications (non-blocking)
     if (!result.alreadyProcessed) {
-      try {
-        // Fetch full order with all relations needed for notifications
-        const fullOrder = await prisma.order.findUnique({
-          where: { id: order.id },
-          include: {
-            property: {
-              select: {
-                id: true,
-                title: true,
-                ownerHostId: true,
-                location: true
-              }
-            },
-            roomSelections: {
-              select: {
-                roomTypeName: true,
-                rooms: true,
-                guests: true,
-                children: true,
-                mealPlanId: true,
-                price: true,
-                tax: true,
-                totalPrice: true
-              }
-            }
-          }
-        });
-
-        if (fullOrder) {
-          // Fetch notification recipients
-          const recipients = await fetchNotificationRecipients(fullOrder, result.booking);
-          
-          // Send notifications (non-blocking, don't await)
-          sendBookingConfirmationNotifications(fullOrder, result.booking, recipients, requestId)
-            .catch(error => {
-              console.error(`[${requestId}] Notification sending failed (non-critical):`, error.message);
-            });
-        }
-      } catch (error) {
-        console.error(`[${requestId}] Failed to send notifications (non-critical):`, error.message);
-        // Don't fail webhook if notifications fail
-      }
+      await notifyBookingConfirmed(order.id, result.booking, requestId);
     }
 
     return {
@@ -562,48 +576,7 @@ const handlePaymentLinkPaid = async (eventData, requestId) => {
 
     // Send booking confirmation notifications (non-blocking)
     if (!result.alreadyProcessed) {
-      try {
-        // Fetch full order with all relations needed for notifications
-        const fullOrder = await prisma.order.findUnique({
-          where: { id: order.id },
-          include: {
-            property: {
-              select: {
-                id: true,
-                title: true,
-                ownerHostId: true,
-                location: true
-              }
-            },
-            roomSelections: {
-              select: {
-                roomTypeName: true,
-                rooms: true,
-                guests: true,
-                children: true,
-                mealPlanId: true,
-                price: true,
-                tax: true,
-                totalPrice: true
-              }
-            }
-          }
-        });
-
-        if (fullOrder) {
-          // Fetch notification recipients
-          const recipients = await fetchNotificationRecipients(fullOrder, result.booking);
-          
-          // Send notifications (non-blocking, don't await)
-          sendBookingConfirmationNotifications(fullOrder, result.booking, recipients, requestId)
-            .catch(error => {
-              console.error(`[${requestId}] Notification sending failed (non-critical):`, error.message);
-            });
-        }
-      } catch (error) {
-        console.error(`[${requestId}] Failed to send notifications (non-critical):`, error.message);
-        // Don't fail webhook if notifications fail
-      }
+      await notifyBookingConfirmed(order.id, result.booking, requestId);
     }
 
     return {
@@ -859,6 +832,44 @@ const handlePaymentLinkCancelled = async (eventData, requestId) => {
   }
 };
 
+/**
+ * Event handlers by Razorpay event type
+ */
+const EVENT_HANDLERS = {
+  'payment.captured': handlePaymentCaptured,
+  'payment_link.paid': handlePaymentLinkPaid,
+  'payment.failed': handlePaymentFailed,
+  'payment_link.expired': handlePaymentLinkExpired,
+  'payment_link.cancelled': handlePaymentLinkCancelled,
+};
+
+/**
+ * Process one stored webhook event (called by the webhook inbox worker)
+ * Throws on failure so the inbox can retry the event with backoff.
+ *
+ * @param {object} eventData - Parsed webhook body
+ * @param {string} requestId - Request ID for logging
+ * @returns {Promise<object>} Handler result
+ */
+const processWebhookEvent = async (eventData, requestId) => {
+  const event = eventData?.event || eventData?.entity?.event;
+  const handler = EVENT_HANDLERS[event];
+
+  if (!handler) {
+    console.log(`[${requestId}] ℹ️ Unhandled webhook event: ${event}`);
+    return { event, processed: false };
+  }
+
+  const result = await handler(eventData, requestId);
+
+  console.log(`[${requestId}] ✅ Webhook event processed successfully`, {
+    event,
+    result,
+  });
+
+  return result;
+};
+
 /**
  * Unified Razorpay Webhook Handler
  * 
@@ -869,19 +880,21 @@ const handlePaymentLinkCancelled = async (eventData, requestId) => {
  * 1. Razorpay sends POST request to /webhooks/razorpay
  * 2. We verify signature (security check)
  * 3. We parse event type from payload
- * 4. We route to appropriate handler:
+ * 4. We store the event in the webhook inbox and acknowledge it
+ *    (services/payment/webhookInbox.service). The inbox worker then runs
+ *    processWebhookEvent, which routes to the handler:
  *    - payment.captured → Create booking (user/agent bookings)
  *    - payment_link.paid → Create booking (frontdesk bookings)
  *    - payment.failed → Release holds
  *    - payment_link.expired → Release holds
  *    - payment_link.cancelled → Release holds
- * 5. We always return 200 OK (prevents Razorpay retries)
  * 
  * PRODUCTION NOTES:
- * - Always returns 200 OK to Razorpay (even on errors)
- * - This prevents Razorpay from retrying failed webhooks
- * - Errors are logged for manual investigation
- * - In production, you may want to implement a dead letter queue for failed events
+ * - Returns 200 OK once the event is stored, and for requests that can
+ *   never succeed (bad signature, invalid payload, unhandled event)
+ * - Returns 500 only when a verified event could not be stored, so that
+ *   Razorpay redelivers it instead of it being lost
+ * - Processing failures are retried by the inbox worker with backoff
  * 
  * @param {object} req - Express request object
  * @param {object} res - Express response object
@@ -980,84 +993,56 @@ const unifiedWebhookHandler = async (req, res) => {
     payloadKeys: Object.keys(eventData?.payload || {}),
   });
 
-  // PRODUCTION: Route to appropriate handler based on event type
-  try {
-    let result = null;
-
-    switch (event) {
-      case 'payment.captured':
-        result = await handlePaymentCaptured(eventData, requestId);
-        break;
-
-      case 'payment_link.paid':
-        result = await handlePaymentLinkPaid(eventData, requestId);
-        break;
-
-      case 'payment.failed':
-        result = await handlePaymentFailed(eventData, requestId);
-        break;
-
-      case 'payment_link.expired':
-        result = await handlePaymentLinkExpired(eventData, requestId);
-        break;
-
-      case 'payment_link.cancelled':
-        result = await handlePaymentLinkCancelled(eventData, requestId);
-        break;
+  if (!EVENT_HANDLERS[event]) {
+    console.log(`[${requestId}] ℹ️ Unhandled webhook event: ${event}`, {
+      event,
+      payload: eventData?.payload,
+    });
+    // Return 200 for unhandled events (we acknowledge receipt)
+    return sendSuccess(
+      res,
+      { event, message: 'Event received but not processed' },
+      `Event ${event} received but not handled (logged for review)`,
+      200
+    );
+  }
 
-      default:
-        console.log(`[${requestId}] ℹ️ Unhandled webhook event: ${event}`, {
-          event,
-          payload: eventData?.payload,
-        });
-        // Return 200 for unhandled events (we acknowledge receipt)
-        return sendSuccess(
-          res,
-          { event, message: 'Event received but not processed' },
-          `Event ${event} received but not handled (logged for review)`,
-          200
-        );
-    }
+  // PRODUCTION: Store the event and acknowledge - processing happens in the inbox worker
+  try {
+    const stored = await enqueueWebhookEvent({
+      eventId: req.headers['x-razorpay-event-id'] || null,
+      event,
+      payload: eventData,
+    });
 
-    // PRODUCTION: Success response - always return 200 OK to Razorpay
-    console.log(`[${requestId}] ✅ Webhook event processed successfully`, {
+    console.log(`[${requestId}] 📥 Webhook event ${stored.duplicate ? 'already stored (redelivery)' : 'queued'}`, {
       event,
-      result,
+      inboxId: stored.id,
     });
 
-    return sendSuccess(res, result, `Webhook event ${event} processed successfully`, 200);
+    return sendSuccess(
+      res,
+      { event, inboxId: stored.id, duplicate: stored.duplicate },
+      `Webhook event ${event} accepted`,
+      200
+    );
   } catch (error) {
-    // PRODUCTION: Error handling - always return 200 to prevent Razorpay retries
-    // Errors are logged for manual investigation
-    console.error(`[${requestId}] ❌ Error processing webhook event ${event}`, {
+    console.error(`[${requestId}] ❌ Failed to store webhook event ${event}`, {
       event,
       error: error.message,
       code: error.code,
       stack: process.env.NODE_ENV === 'development' ? error.stack : undefined,
     });
 
-    // PRODUCTION: In production, you may want to:
-    // 1. Send error to dead letter queue
-    // 2. Send alert to monitoring system
-    // 3. Notify admins via email/SMS
-
-    // Always return 200 OK to Razorpay (prevents retries)
-    // This is important because we handle errors manually
-    return sendSuccess(
-      res,
-      {
-        event,
-        error: process.env.NODE_ENV === 'development' ? error.message : 'Internal server error',
-        requestId, // Include request ID for tracking
-      },
-      `Error processing webhook event ${event} (logged for investigation)`,
-      200
-    );
+    // Not stored: let Razorpay redeliver it
+    return sendError(res, 'Webhook event could not be stored, please retry', 500);
   }
 };
 
 const WebhookController = {
   unifiedWebhookHandler,
+  processWebhookEvent,
+  notifyBookingConfirmed,
   // Export handlers for testing
   handlePaymentCaptured,
   handlePaymentLinkPaid,
@@ -3,18 +3,20 @@
  * Manages site-wide settings like logo, banner images, contact info, etc.
  */
 
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const { sendSuccess, sendError } = require('../../utils/response.utils');
 const fs = require('fs');
 const path = require('path');
 const { UPLOAD_BASE } = require('../../config/multer');
+const { isContentHashedUpload } = require('../../utils/contentHashStorage.utils');
 
 /**
  * Helper function to delete old files
+ * Content-hashed uploads may be shared with other records, so they are
+ * left for the upload GC to collect once nothing references them.
  */
 const deleteOldFile = (filePath) => {
-  if (!filePath) return;
+  if (!filePath || isContentHashedUpload(filePath)) return;
   try {
     // Extract the relative path from the URL (e.g., /uploads/images/logo.png)
     // Remove leading slash and 'uploads/' prefix if present
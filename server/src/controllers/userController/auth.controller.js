@@ -1,11 +1,11 @@
-const { PrismaClient } = require('@prisma/client');
 const bcrypt = require('bcrypt');
 const jwt = require('jsonwebtoken');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 const { smsService, emailService, smsTemplates, emailTemplates } = require('../../services/communication');
+const { createOtpStore } = require('../../services/otp');
 
-// In-memory OTP storage for development (replace with Redis/cache in production)
-const otpStore = new Map(); // phone -> { otp, expiresAt }
+// OTP storage (memory or shared backend, see services/otp)
+const otpStore = createOtpStore('user');
 
 /**
  * Generate a 4-digit OTP
@@ -14,17 +14,6 @@ const generateOTP = () => {
   return Math.floor(1000 + Math.random() * 9000).toString();
 };
 
-/**
- * Clean expired OTPs from store
- */
-const cleanExpiredOTPs = () => {
-  const now = Date.now();
-  for (const [phone, data] of otpStore.entries()) {
-    if (data.expiresAt < now) {
-      otpStore.delete(phone);
-    }
-  }
-};
 
 const UserAuthController = {
   /**
@@ -54,11 +43,8 @@ const UserAuthController = {
       const otp = generateOTP();
       const expiresAt = Date.now() + 5 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
-      // Store OTP (in-memory for development)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      // Store OTP
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
@@ -167,7 +153,7 @@ const UserAuthController = {
       const cleanPhone = phone.replace(/\s|-/g, '');
 
       // Get stored OTP
-      const storedOTPData = otpStore.get(cleanPhone);
+      const storedOTPData = await otpStore.get(cleanPhone);
 
       if (!storedOTPData) {
         return res.status(400).json({
@@ -178,7 +164,7 @@ const UserAuthController = {
 
       // Check if OTP expired
       if (Date.now() > storedOTPData.expiresAt) {
-        otpStore.delete(cleanPhone);
+        await otpStore.delete(cleanPhone);
         return res.status(400).json({
           success: false,
           message: 'OTP has expired. Please request a new OTP.'
@@ -194,7 +180,7 @@ const UserAuthController = {
       }
 
       // OTP verified successfully - remove from store
-      otpStore.delete(cleanPhone);
+      await otpStore.delete(cleanPhone);
 
       // Check if user exists
       let user = await prisma.user.findFirst({
@@ -288,10 +274,7 @@ const UserAuthController = {
       const expiresAt = Date.now() + 1 * 60 * 1000; // 5 minutes expiry (increased from 60 seconds)
 
       // Store new OTP (replaces existing if any)
-      otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
-
-      // Clean expired OTPs periodically
-      cleanExpiredOTPs();
+      await otpStore.set(cleanPhone, { otp, expiresAt, countryCode });
 
       // Check if user exists and has email (optional: send email OTP if available)
       let userEmail = null;
@@ -1,9 +1,9 @@
 const Razorpay = require('razorpay');
-const { PrismaClient } = require('@prisma/client');
 const crypto = require('crypto');
 const { toDateOnly } = require('../../utils/date.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const razorpayGateway = require('../../services/payment/razorpayGateway.service');
 
 // Load Razorpay credentials from environment variables (PRODUCTION SECURITY)
 const RAZORPAY_KEY_ID = process.env.RAZORPAY_KEY_ID || 'rzp_test_RWnUwmZYbfokH5';
@@ -18,6 +18,11 @@ const razorpay = new Razorpay({
   key_secret: RAZORPAY_KEY_SECRET
 });
 
+// The SDK always calls api.razorpay.com; with RAZORPAY_API_BASE_URL set (e.g. the
+// mock gateway for load tests) orders are created through the HTTP client instead
+const createRazorpayOrder = (options) =>
+  process.env.RAZORPAY_API_BASE_URL ? razorpayGateway.createOrder(options) : razorpay.orders.create(options);
+
 // Validation helper functions
 const validateEmail = (email) => {
   if (!email) return false;
@@ -426,7 +431,7 @@ const createOrder = async (req, res) => {
       
       let razorpayOrder;
       try {
-        razorpayOrder = await razorpay.orders.create(options);
+        razorpayOrder = await createRazorpayOrder(options);
         
         // PRODUCTION: Validate Razorpay response
         if (!razorpayOrder || !razorpayOrder.id) {
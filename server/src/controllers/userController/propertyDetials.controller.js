@@ -1,5 +1,13 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
+const { getAgentPricingContext } = require('../../services/property/agentPricing.service');
+const logger = require('../../utils/logger.utils').child('pricing');
+const { weakEtag, isNotModified } = require('../../utils/etag.utils');
+const { getPropertyDetailsDocument } = require('../../services/property/propertyDetailsCache.service');
+const {
+    getPricingCalendar,
+    applyAgentDiscount,
+    INVALID_RANGE_CODE,
+} = require('../../services/property/pricingCalendarCache.service');
 
 const PropertyDetailsController = {
     // Basic property details (fast load)
@@ -7,219 +15,22 @@ const PropertyDetailsController = {
         try {
             const { id } = req.params;
 
-            const property = await prisma.property.findUnique({
-                where: { 
-                    id,
-                    isDeleted: false,
-                    status: 'active'
-                },
-                select: {
-                    id: true,
-                    title: true,
-                    description: true,
-                    rulesAndPolicies: true,
-                    status: true,
-                    location: true,
-                    avgRating: true,
-                    reviewCount: true,
-                    coverImage: true,
-                    checkInTime: true,
-                    checkOutTime: true,
-                    createdAt: true,
-                    updatedAt: true,
-
-                    // Owner information
-                    ownerHost: {
-                        select: {
-                            id: true,
-                            firstName: true,
-                            lastName: true,
-                            email: true,
-                            phone: true,
-                            isVerified: true,
-                            isActive: true
-                        }
-                    },
-
-                    // Property type
-                    propertyType: { 
-                        select: { id: true, name: true } 
-                    },
-
-                    // Media
-                    media: {
-                        where: { isDeleted: false },
-                        orderBy: { order: 'asc' },
-                        select: { 
-                            id: true, 
-                            url: true, 
-                            type: true, 
-                            isFeatured: true, 
-                            order: true 
-                        },
-                    },
-
-                    // Amenities
-                    amenities: {
-                        where: { isDeleted: false },
-                        select: {
-                            amenity: { 
-                                select: { 
-                                    id: true, 
-                                    name: true, 
-                                    icon: true, 
-                                    category: true,
-                                    isActive: true 
-                                } 
-                            },
-                        },
-                    },
-
-                    // Facilities
-                    facilities: {
-                        where: { isDeleted: false },
-                        select: {
-                            facility: { 
-                                select: { 
-                                    id: true, 
-                                    name: true, 
-                                    icon: true, 
-                                    category: true,
-                                    isActive: true 
-                                } 
-                            },
-                        },
-                    },
-
-                    // Safety features
-                    safeties: {
-                        where: { isDeleted: false },
-                        select: {
-                            safety: { 
-                                select: { 
-                                    id: true, 
-                                    name: true, 
-                                    icon: true, 
-                                    category: true,
-                                    isActive: true 
-                                } 
-                            },
-                        },
-                    },
-
-                    // Reviews
-                    reviews: {
-                        where: { isDeleted: false },
-                        orderBy: { createdAt: 'desc' },
-                        take: 10,
-                        select: {
-                            id: true,
-                            rating: true,
-                            description: true,
-                            createdAt: true,
-                            user: {
-                                select: {
-                                    id: true,
-                                    username: true,
-                                    firstname: true,
-                                    lastname: true,
-                                    profileImage: true,
-                                },
-                            },
-                        },
-                    },
+            const document = await getPropertyDetailsDocument(id);
 
-                    // Special rates
-                    specialRates: {
-                        where: { 
-                            isDeleted: false, 
-                            isActive: true 
-                        },
-                        select: {
-                            id: true,
-                            kind: true,
-                            name: true,
-                            pricingMode: true,
-                            color: true,
-                            flatPrice: true,
-                            percentAdj: true,
-                            createdAt: true,
-                            roomTypeLinks: {
-                                where: { isActive: true },
-                                select: {
-                                    id: true,
-                                    pricingMode: true,
-                                    flatPrice: true,
-                                    percentAdj: true,
-                                    propertyRoomType: {
-                                        select: {
-                                            id: true,
-                                            roomType: { select: { name: true } }
-                                        }
-                                    }
-                                }
-                            },
-                            SpecialRateApplication: {
-                                where: { isActive: true },
-                                select: {
-                                    id: true,
-                                    dateFrom: true,
-                                    dateTo: true,
-                                    propertyRoomType: {
-                                        select: {
-                                            id: true,
-                                            roomType: { select: { name: true } }
-                                        }
-                                    }
-                                },
-                                orderBy: { dateFrom: 'asc' }
-                            }
-                        },
-                    },
-
-                  
-                }
-            });
-
-            if (!property) {
+            if (!document) {
                 return res.status(404).json({
                     success: false,
                     message: 'Property not found'
                 });
             }
 
-            // Transform and format the response
-            const formattedProperty = {
-                ...property,
-                // Flatten nested relationships
-                amenities: property.amenities.map(a => a.amenity),
-                facilities: property.facilities.map(f => f.facility),
-                safeties: property.safeties.map(s => s.safety),
-                
-                // Add computed fields
-              
-                totalAmenities: property.amenities.length,
-                totalFacilities: property.facilities.length,
-                totalSafetyFeatures: property.safeties.length,
-                
-               
-                
-                // Add media summary
-                mediaSummary: {
-                    total: property.media.length,
-                    featured: property.media.filter(m => m.isFeatured).length,
-                    images: property.media.filter(m => m.type === 'image').length,
-                    videos: property.media.filter(m => m.type === 'video').length
-                }
-            };
+            if (isNotModified(req, res, document.etag)) return;
 
-            return res.json({
-                success: true,
-                data: formattedProperty
-            });
+            // Body is serialized once per cache fill
+            return res.type('json').send(document.body);
 
         } catch (error) {
-            console.error('Error fetching property details:', error);
+            logger.error('Error fetching property details', error);
             return res.status(500).json({
                 success: false,
                 message: 'Error fetching property details',
@@ -233,58 +44,12 @@ const PropertyDetailsController = {
             const { id } = req.params;
             const { startDate, endDate, month, year } = req.query;
 
-            console.log(startDate, endDate, month, year)
-
-            // Check if role is agent and fetch agent discount
-            let agentDiscount = null;
-            let isApprovedAgent = false;
-
-            if (req.user?.role === 'agent' && req.user?.id) {
-                try {
-                    // Check if agent is approved
-                    const agent = await prisma.travelAgent.findFirst({
-                        where: {
-                            id: req.user.id,
-                            isDeleted: false,
-                            status: 'approved'
-                        },
-                        select: {
-                            id: true,
-                            status: true
-                        }
-                    });
+            logger.debug('getPropertyPricing - Query', { propertyId: id, startDate, endDate, month, year });
 
-                    if (agent) {
-                        isApprovedAgent = true;
-                        console.log('getPropertyPricing - Agent is approved:', agent.id);
-
-                        // Fetch agent's discount for this property
-                        const discount = await prisma.travelAgentPropertyDiscount.findFirst({
-                            where: {
-                                agentId: agent.id,
-                                propertyId: id,
-                                isDeleted: false,
-                                isActive: true
-                            },
-                            select: {
-                                discountType: true,
-                                discountValue: true
-                            }
-                        });
-
-                        if (discount) {
-                            agentDiscount = {
-                                type: discount.discountType,
-                                value: Number(discount.discountValue)
-                            };
-                            console.log('getPropertyPricing - Agent discount found:', agentDiscount);
-                        }
-                    }
-                } catch (agentError) {
-                    console.error('getPropertyPricing - Error checking agent:', agentError);
-                    // Continue without agent discounts if there's an error
-                }
-            }
+            // Approved agents get their discount for this property from the cached per-agent map
+            const agentPricing = await getAgentPricingContext(req.user);
+            const isApprovedAgent = Boolean(agentPricing);
+            const agentDiscount = agentPricing ? agentPricing.discountFor(id) : null;
 
             // Support multiple loading strategies
             // Use UTC dates to avoid timezone conversion issues
@@ -315,278 +80,22 @@ const PropertyDetailsController = {
                 queryEndDate = nextMonthEnd;
             }
 
-            // Step 1: Get all RatePlanDates for the date range
-            const ratePlanDates = await prisma.ratePlanDate.findMany({
-                where: {
-                    propertyId: id,
-                    isDeleted: false,
-                    isActive: true,
-                    date: {
-                        gte: queryStartDate,
-                        lte: queryEndDate
-                    }
-                },
-                select: {
-                    id: true,
-                    date: true,
-                    ratePlanId: true,
-                    isActive: true
-                },
-                orderBy: { date: 'asc' }
-            });
-
-            // Step 2: Get unique rate plan IDs
-            const ratePlanIds = [...new Set(ratePlanDates.map(rpd => rpd.ratePlanId))];
-
-            console.log(ratePlanIds)
-
-            // Step 3: Get RatePlan details with pricing
-            const ratePlans = await prisma.ratePlan.findMany({
-                where: {
-                    id: { in: ratePlanIds },
-                    isDeleted: false,
-                    isActive: true
-                },
-                select: {
-                    id: true,
-                    name: true,
-                    color: true,
-                    description: true,
-                    isActive: true,
-                    createdAt: true,
-                    roomTypeMealPlanPricing: {
-                        where: { isDeleted: false, isActive: true },
-                        select: {
-                            id: true,
-                            doubleOccupancyPrice: true,
-                            singleOccupancyPrice: true,
-                            groupOccupancyPrice: true,
-                            extraBedPriceAdult: true,
-                            extraBedPriceChild: true,
-                            extraBedPriceInfant: true,
-                            propertyRoomType: {
-                                select: {
-                                    id: true,
-                                    roomType: { select: { name: true } }
-                                }
-                            },
-                            mealPlan: {
-                                select: {
-                                    id: true,
-                                    name: true,
-                                    code: true,
-                                    kind: true
-                                }
-                            }
-                        }
-                    }
-                }
-            });
-
-            console.log(ratePlans)
-
-            // Step 4: Get property room types and total rooms
-            const roomTypes = await prisma.propertyRoomType.findMany({
-                where: {
-                    propertyId: id,
-                    isDeleted: false,
-                    isActive: true
-                },
-                select: {
-                    id: true,
-                    roomType: {
-                        select: {
-                            id: true,
-                            name: true
-                        }
-                    },
-                    rooms: {
-                        where: { isDeleted: false },
-                        select: {
-                            id: true,
-                            name: true,
-                            code: true
-                        }
-                    }
-                }
-            });
-
-            // Step 5: Calculate total rooms per room type
-            const totalRoomsPerType = roomTypes.map(rt => ({
-                ...rt,
-                totalRooms: rt.rooms.length
-            }));
-
-            console.log(totalRoomsPerType)
+            // Base calendar comes from cached (property, month) buckets
+            const calendar = await getPricingCalendar(id, queryStartDate, queryEndDate);
 
-            // Step 6: Get availability data for the date range
-            const availabilityData = await prisma.availability.findMany({
-                where: {
-                    room: {
-                        propertyRoomType: {
-                            propertyId: id
-                        }
-                    },
-                    date: {
-                        gte: queryStartDate,
-                        lte: queryEndDate
-                    },
-                    isDeleted: false
-                },
-                select: {
-                    id: true,
-                    roomId: true,
-                    date: true,
-                    status: true,
-                    minNights: true,
-                    reason: true,
-                    blockedBy: true,
-                    room: {
-                        select: {
-                            id: true,
-                            propertyRoomTypeId: true,
-                            name: true,
-                            code: true
-                        }
-                    }
-                },
-                orderBy: { date: 'asc' }
-            });
+            // Answer repeat views with a 304 before the discount overlay and serialization
+            const etag = weakEtag(
+                'property-pricing',
+                id,
+                queryStartDate,
+                queryEndDate,
+                isApprovedAgent ? req.user.id : '',
+                agentDiscount ? `${agentDiscount.type}:${agentDiscount.value}` : '',
+                calendar.versions.join(',')
+            );
+            if (isNotModified(req, res, etag)) return;
 
-            console.log(availabilityData)
-
-            // Step 7: Calculate simplified availability and pricing per date
-            const availabilityByDate = {};
-            const dateRange = [];
-            
-            // Normalize start and end dates to UTC midnight for consistent date iteration
-            const startDateUTC = new Date(Date.UTC(
-                queryStartDate.getUTCFullYear(),
-                queryStartDate.getUTCMonth(),
-                queryStartDate.getUTCDate(),
-                0, 0, 0, 0
-            ));
-            const endDateUTC = new Date(Date.UTC(
-                queryEndDate.getUTCFullYear(),
-                queryEndDate.getUTCMonth(),
-                queryEndDate.getUTCDate(),
-                0, 0, 0, 0
-            ));
-            
-            let currentDate = new Date(startDateUTC);
-            
-            while (currentDate <= endDateUTC) {
-                // Format date as YYYY-MM-DD using UTC methods to avoid timezone shifts
-                const year = currentDate.getUTCFullYear();
-                const month = String(currentDate.getUTCMonth() + 1).padStart(2, '0');
-                const day = String(currentDate.getUTCDate()).padStart(2, '0');
-                const dateStr = `${year}-${month}-${day}`;
-                dateRange.push(dateStr);
-                
-                let totalAvailableRoomsForDate = 0;
-                let minimumPriceForDate = null;
-                
-                // Calculate availability and pricing for each room type
-                totalRoomsPerType.forEach(roomType => {
-                    const totalRooms = roomType.totalRooms;
-                    
-                    // Count blocked/unavailable rooms for this date and room type
-                    // Format database date as YYYY-MM-DD using UTC to match dateStr format
-                    const blockedRooms = availabilityData.filter(av => {
-                        const avDateObj = new Date(av.date);
-                        const avYear = avDateObj.getUTCFullYear();
-                        const avMonth = String(avDateObj.getUTCMonth() + 1).padStart(2, '0');
-                        const avDay = String(avDateObj.getUTCDate()).padStart(2, '0');
-                        const avDate = `${avYear}-${avMonth}-${avDay}`;
-                        return avDate === dateStr && 
-                               av.room.propertyRoomTypeId === roomType.id &&
-                               (av.status === 'booked' || av.status === 'maintenance' || av.status === 'blocked');
-                    }).length;
-                    
-                    // Available rooms = Total rooms - Blocked rooms
-                    const availableRooms = Math.max(0, totalRooms - blockedRooms);
-                    totalAvailableRoomsForDate += availableRooms;
-                    
-                    // Find rate plan for this date
-                    // Format database date as YYYY-MM-DD using UTC to match dateStr format
-                    const ratePlanForDate = ratePlanDates.find(rpd => {
-                        const rpdDateObj = new Date(rpd.date);
-                        const rpdYear = rpdDateObj.getUTCFullYear();
-                        const rpdMonth = String(rpdDateObj.getUTCMonth() + 1).padStart(2, '0');
-                        const rpdDay = String(rpdDateObj.getUTCDate()).padStart(2, '0');
-                        const rpdDate = `${rpdYear}-${rpdMonth}-${rpdDay}`;
-                        return rpdDate === dateStr;
-                    });
-                    
-                    // Get pricing for this room type and rate plan
-                    let roomTypePricing = null;
-                    if (ratePlanForDate) {
-                        const ratePlan = ratePlans.find(rp => rp.id === ratePlanForDate.ratePlanId);
-                        if (ratePlan) {
-                            roomTypePricing = ratePlan.roomTypeMealPlanPricing.find(pricing => 
-                                pricing.propertyRoomType.id === roomType.id
-                            );
-                        }
-                    }
-                    
-                    // Calculate minimum price for this room type
-                    let roomTypeMinPrice = null;
-                    if (roomTypePricing) {
-                        const prices = [
-                            roomTypePricing.doubleOccupancyPrice,
-                            roomTypePricing.singleOccupancyPrice,
-                            roomTypePricing.groupOccupancyPrice
-                        ].filter(price => price && price > 0);
-                        
-                        if (prices.length > 0) {
-                            roomTypeMinPrice = Math.min(...prices);
-                        }
-                    }
-                    
-                    // Update overall minimum price for this date
-                    if (roomTypeMinPrice && (minimumPriceForDate === null || roomTypeMinPrice < minimumPriceForDate)) {
-                        minimumPriceForDate = roomTypeMinPrice;
-                    }
-                });
-                
-                // Apply agent discount if applicable
-                let discountedPrice = null;
-                let originalPrice = minimumPriceForDate;
-                
-                if (isApprovedAgent && agentDiscount && minimumPriceForDate) {
-                    if (agentDiscount.type === 'percentage') {
-                        // Percentage discount: discountedPrice = originalPrice * (1 - discountValue/100)
-                        discountedPrice = minimumPriceForDate * (1 - agentDiscount.value / 100);
-                    } else {
-                        // Flat discount: discountedPrice = originalPrice - discountValue
-                        discountedPrice = Math.max(0, minimumPriceForDate - agentDiscount.value);
-                    }
-                    discountedPrice = Math.round(discountedPrice * 100) / 100; // Round to 2 decimal places
-                }
-                
-                // Simplified date information - only essential data
-                availabilityByDate[dateStr] = {
-                    totalAvailableRooms: totalAvailableRoomsForDate,
-                    minimumPrice: discountedPrice || minimumPriceForDate, // Use discounted price if available, otherwise original
-                    originalPrice: discountedPrice ? originalPrice : null, // Only include originalPrice if discount is applied
-                    agentDiscount: discountedPrice ? {
-                        type: agentDiscount.type,
-                        value: agentDiscount.value
-                    } : null
-                };
-                
-                // Increment date using UTC methods to avoid timezone shifts
-                currentDate = new Date(Date.UTC(
-                    currentDate.getUTCFullYear(),
-                    currentDate.getUTCMonth(),
-                    currentDate.getUTCDate() + 1,
-                    0, 0, 0, 0
-                ));
-            }
-
-          
-
-           ;
+            const availabilityByDate = applyAgentDiscount(calendar.days, isApprovedAgent ? agentDiscount : null);
 
             // Return only the availability data
             return res.json({
@@ -595,7 +104,13 @@ const PropertyDetailsController = {
             });
 
         } catch (error) {
-            console.error('Error fetching property pricing:', error);
+            if (error.code === INVALID_RANGE_CODE) {
+                return res.status(400).json({
+                    success: false,
+                    message: error.message
+                });
+            }
+            logger.error('Error fetching property pricing', error);
             return res.status(500).json({
                 success: false,
                 message: 'Error fetching property pricing',
@@ -613,7 +128,7 @@ const PropertyDetailsController = {
             // ===================== STEP 2: INPUT VALIDATION =====================
             // Validate all required inputs before processing
 
-            console.log(checkIn, checkOut, guests, rooms, children, adults)
+            logger.debug('getBookingData - Query', { checkIn, checkOut, guests, rooms, children, adults });
             
             // Step 2.1: Validate required parameters exist
             if (!id || !checkIn || !checkOut) {
@@ -710,7 +225,8 @@ const PropertyDetailsController = {
                     status: true,
                     checkInTime: true,  // Property-specific check-in time (e.g., "14:00")
                     checkOutTime: true,  // Property-specific check-out time (e.g., "11:00")
-                    taxSlabs: true  // Tax slabs configuration: [{min: number, max: number|null, rate: number}]
+                    taxSlabs: true,  // Tax slabs configuration: [{min: number, max: number|null, rate: number}]
+                    updatedAt: true
                 }
             });
 
@@ -762,56 +278,14 @@ const PropertyDetailsController = {
             // ===================== STEP 4: CHECK AGENT DISCOUNT =====================
             // If the logged-in user is an approved agent, check if they have a discount for this property
             
-            let agentRates = null;
-
-            // Step 4.1: Check if the request is from an authenticated agent
-            if (req.user?.role === 'agent' && req.user?.id) {
-                try {
-                    // Step 4.2: Verify the agent exists and is approved
-                    const agent = await prisma.travelAgent.findFirst({
-                        where: {
-                            id: req.user.id,
-                            isDeleted: false,
-                            status: 'approved'  // Only approved agents get discounts
-                        },
-                        select: {
-                            id: true,
-                            status: true
-                        }
-                    });
-
-                    if (agent) {
-                        console.log('getBookingData - Agent is approved:', agent.id);
-
-                        // Step 4.3: Fetch agent's discount for this specific property
-                        const discount = await prisma.travelAgentPropertyDiscount.findFirst({
-                            where: {
-                                agentId: agent.id,
-                                propertyId: propertyId,
-                                isDeleted: false,
-                                isActive: true  // Only active discounts apply
-                            },
-                            select: {
-                                discountType: true,   // 'percentage' or 'flat'
-                                discountValue: true  // Discount amount
-                            }
-                        });
-
-                        // Step 4.4: If discount exists, store it for later use in response
-                        if (discount) {
-                            agentRates = {
-                                agentId: agent.id,
-                                discount: Number(discount.discountValue),
-                                type: discount.discountType
-                            };
-                            console.log('getBookingData - Agent discount found:', agentRates);
-                        }
-                    }
-                } catch (agentError) {
-                    console.error('getBookingData - Error checking agent:', agentError);
-                    // Continue without agent discount if there's an error (non-blocking)
-                }
-            }
+            // Step 4.1: Resolve the approved agent and their discount for this property (cached per agent)
+            const agentPricing = await getAgentPricingContext(req.user);
+            const agentDiscount = agentPricing ? agentPricing.discountFor(propertyId) : null;
+            const agentRates = agentDiscount ? {
+                agentId: agentPricing.agentId,
+                discount: agentDiscount.value,
+                type: agentDiscount.type
+            } : null;
 
             // ===================== STEP 5: CALCULATE DATE RANGE =====================
             // Generate an array of all dates from check-in to check-out (exclusive of check-out date)
@@ -829,7 +303,7 @@ const PropertyDetailsController = {
             // Fetch all active room types for this property along with their rooms
             
 
-             console.log(dateRange)
+             logger.trace('getBookingData - Date range', () => ({ dateRange }));
             // Step 6.1: Fetch all room types and their associated rooms
             const roomTypes = await prisma.propertyRoomType.findMany({
                 where: {
@@ -864,7 +338,8 @@ const PropertyDetailsController = {
                             order: 'asc'
                         },
                         select: {
-                            url: true
+                            url: true,
+                            updatedAt: true
                         }
                     }
                 }
@@ -909,7 +384,7 @@ const PropertyDetailsController = {
                 }
             });
 
-            console.log(availabilityData)
+            logger.trace('getBookingData - Availability', () => ({ availabilityData }));
 
             // ===================== STEP 8: FETCH RATE PLANS =====================
             // Fetch pricing information (rate plans) for each date in the stay
@@ -928,17 +403,21 @@ const PropertyDetailsController = {
                 },
                 select: {
                     date: true,
+                    updatedAt: true,
                     ratePlan: {
                         select: {
                             id: true,
                             name: true,
                             color: true,
+                            updatedAt: true,
                             roomTypeMealPlanPricing: {
                                 where: {
                                     isDeleted: false,
                                     isActive: true
                                 },
                                 select: {
+                                    id: true,
+                                    updatedAt: true,
                                     propertyRoomTypeId: true,
                                     mealPlanId: true,
                                     singleOccupancyPrice: true,
@@ -962,6 +441,18 @@ const PropertyDetailsController = {
                 }
             });
 
+            // Step 8.2: Answer repeat views with a 304 before building the response
+            const etag = weakEtag(
+                'booking-data',
+                req.originalUrl,
+                agentRates ? `${agentRates.agentId}:${agentRates.type}:${agentRates.discount}` : '',
+                property,
+                roomTypes,
+                availabilityData,
+                ratePlanDates
+            );
+            if (isNotModified(req, res, etag)) return;
+
             // ===================== STEP 9: PROCESS ROOM TYPES =====================
             // For each room type, determine which rooms are available for the entire stay
             // and build pricing information for each date
@@ -1097,7 +588,7 @@ const PropertyDetailsController = {
             });
 
         } catch (error) {
-            console.error('Error fetching booking data:', error);
+            logger.error('Error fetching booking data', error);
             return res.status(500).json({
                 success: false,
                 message: 'Error fetching booking data',
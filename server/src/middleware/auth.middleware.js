@@ -1,6 +1,5 @@
 const jwt = require('jsonwebtoken');
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const { getApprovedAgent } = require('../utils/principalCache.utils');
 
 /**nnknk
  * Middleware to authenticate travel agents
@@ -33,19 +32,8 @@ const authenticateTravelAgent = async (req, res, next) => {
       });
     }
 
-    // Verify agent still exists and is approved
-    const agent = await prisma.travelAgent.findFirst({
-      where: {
-        id: decoded.agentId,
-        isDeleted: false,
-        status: 'approved'
-      },
-      select: {
-        id: true,
-        email: true,
-        status: true
-      }
-    });
+    // Verify agent still exists and is approved (short-lived principal cache)
+    const agent = await getApprovedAgent(decoded.agentId);
 
     if (!agent) {
       return res.status(401).json({
@@ -0,0 +1,168 @@
+/**
+ * Response Compression Middleware
+ * Compresses text/JSON responses with brotli or gzip, negotiated from
+ * Accept-Encoding. Bodies are streamed through zlib so large responses
+ * are never buffered twice, and small ones (below the threshold) are
+ * sent as-is since compressing them costs more than it saves.
+ *
+ * Configuration (environment):
+ * - COMPRESSION: set to 'off' to disable
+ * - COMPRESSION_THRESHOLD: minimum body size in bytes (default: 1024)
+ * - COMPRESSION_BROTLI: set to 'false' to only offer gzip
+ * - COMPRESSION_GZIP_LEVEL: 1-9 (default: 6)
+ * - COMPRESSION_BROTLI_QUALITY: 0-11 (default: 4, tuned for dynamic responses)
+ */
+
+const zlib = require('zlib');
+const { counter } = require('../utils/metrics.utils');
+
+const isEnabled = (process.env.COMPRESSION || '').toLowerCase() !== 'off';
+const threshold = Math.max(0, parseInt(process.env.COMPRESSION_THRESHOLD || '1024', 10) || 0);
+const brotliEnabled = (process.env.COMPRESSION_BROTLI || 'true').toLowerCase() !== 'false';
+const gzipLevel = parseInt(process.env.COMPRESSION_GZIP_LEVEL || '6', 10);
+const brotliQuality = parseInt(process.env.COMPRESSION_BROTLI_QUALITY || '4', 10);
+
+const COMPRESSIBLE_TYPE = /^text\/|json|javascript|xml|svg/i;
+const NEVER_COMPRESS_TYPE = /^text\/event-stream/i;
+
+const compressedBytes = counter({
+  name: 'http_compression_bytes_total',
+  help: 'Response bytes before (stage=in) and after (stage=out) compression',
+  labelNames: ['encoding', 'stage'],
+});
+
+/**
+ * Pick the best supported encoding from an Accept-Encoding header
+ * @param {string} header - e.g. "gzip, deflate, br;q=0.9"
+ * @returns {'br'|'gzip'|null}
+ */
+const negotiateEncoding = (header) => {
+  if (!header) return null;
+
+  const accepted = {};
+  header.split(',').forEach((part) => {
+    const [name, ...params] = part.trim().toLowerCase().split(';');
+    const qParam = params.find((p) => p.trim().startsWith('q='));
+    const q = qParam ? parseFloat(qParam.trim().slice(2)) : 1;
+    if (name) accepted[name] = Number.isNaN(q) ? 0 : q;
+  });
+
+  const quality = (name) =>
+    accepted[name] !== undefined ? accepted[name] : accepted['*'] !== undefined ? accepted['*'] : 0;
+
+  const candidates = (brotliEnabled ? ['br', 'gzip'] : ['gzip'])
+    .map((name) => ({ name, q: quality(name) }))
+    .filter((c) => c.q > 0);
+
+  if (candidates.length === 0) return null;
+  // Stable sort keeps brotli first on ties
+  candidates.sort((a, b) => b.q - a.q);
+  return candidates[0].name;
+};
+
+const createEncoder = (encoding) =>
+  encoding === 'br'
+    ? zlib.createBrotliCompress({
+        params: { [zlib.constants.BROTLI_PARAM_QUALITY]: brotliQuality },
+      })
+    : zlib.createGzip({ level: gzipLevel });
+
+const chunkLength = (chunk, encoding) => {
+  if (!chunk) return 0;
+  return Buffer.isBuffer(chunk) ? chunk.length : Buffer.byteLength(chunk, encoding);
+};
+
+const shouldCompress = (req, res, firstChunkSize, isWholeBody) => {
+  if (req.method === 'HEAD' || res.headersSent) return false;
+  if (res.statusCode < 200 || res.statusCode === 204 || res.statusCode === 304) return false;
+  if (res.getHeader('Content-Encoding')) return false;
+
+  const cacheControl = String(res.getHeader('Cache-Control') || '');
+  if (/no-transform/i.test(cacheControl)) return false;
+
+  const type = String(res.getHeader('Content-Type') || '');
+  if (!type || NEVER_COMPRESS_TYPE.test(type) || !COMPRESSIBLE_TYPE.test(type)) return false;
+
+  const declaredLength = res.getHeader('Content-Length');
+  const size = declaredLength !== undefined ? Number(declaredLength) : isWholeBody ? firstChunkSize : Infinity;
+  return size >= threshold;
+};
+
+/**
+ * Express middleware - mount before the routes whose output should be compressed
+ */
+const compression = (req, res, next) => {
+  if (!isEnabled) return next();
+
+  res.vary('Accept-Encoding');
+
+  const encoding = negotiateEncoding(req.headers['accept-encoding']);
+  if (!encoding) return next();
+
+  const originalWrite = res.write;
+  const originalEnd = res.end;
+  let decided = false;
+  let encoder = null;
+  let bytesIn = 0;
+  let bytesOut = 0;
+
+  const start = (firstChunkSize, isWholeBody) => {
+    decided = true;
+    if (!shouldCompress(req, res, firstChunkSize, isWholeBody)) return;
+
+    res.removeHeader('Content-Length');
+    res.setHeader('Content-Encoding', encoding);
+
+    encoder = createEncoder(encoding);
+    encoder.on('data', (chunk) => {
+      bytesOut += chunk.length;
+      // Respect socket backpressure instead of buffering the whole body
+      if (originalWrite.call(res, chunk) === false) {
+        encoder.pause();
+        res.once('drain', () => encoder.resume());
+      }
+    });
+    encoder.on('end', () => {
+      compressedBytes.inc({ encoding, stage: 'in' }, bytesIn);
+      compressedBytes.inc({ encoding, stage: 'out' }, bytesOut);
+      originalEnd.call(res);
+    });
+    encoder.on('error', (error) => {
+      req.log?.error?.('Response compression failed', error);
+      res.destroy(error);
+    });
+  };
+
+  res.write = function write(chunk, chunkEncoding, callback) {
+    if (!decided) start(chunkLength(chunk, chunkEncoding), false);
+    if (!encoder) return originalWrite.call(res, chunk, chunkEncoding, callback);
+
+    bytesIn += chunkLength(chunk, chunkEncoding);
+    return encoder.write(chunk, typeof chunkEncoding === 'string' ? chunkEncoding : undefined, callback);
+  };
+
+  res.end = function end(chunk, chunkEncoding, callback) {
+    if (typeof chunk === 'function') {
+      callback = chunk;
+      chunk = undefined;
+    } else if (typeof chunkEncoding === 'function') {
+      callback = chunkEncoding;
+      chunkEncoding = undefined;
+    }
+
+    if (!decided) start(chunkLength(chunk, chunkEncoding), true);
+    if (!encoder) return originalEnd.call(res, chunk, chunkEncoding, callback);
+
+    if (callback) res.once('finish', callback);
+    if (chunk) bytesIn += chunkLength(chunk, chunkEncoding);
+    encoder.end(chunk, typeof chunkEncoding === 'string' ? chunkEncoding : undefined);
+    return res;
+  };
+
+  next();
+};
+
+module.exports = {
+  compression,
+  negotiateEncoding,
+};
@@ -0,0 +1,71 @@
+const { histogram, gauge, renderMetrics } = require('../utils/metrics.utils');
+
+const requestDuration = histogram({
+  name: 'http_request_duration_seconds',
+  help: 'HTTP request latency by route',
+  labelNames: ['method', 'route', 'status'],
+});
+
+const requestsInFlight = gauge({
+  name: 'http_requests_in_flight',
+  help: 'HTTP requests currently being processed',
+  labelNames: ['method'],
+});
+
+/**
+ * Route label for a finished request
+ * Uses the matched route pattern (e.g. /propertiesDetials/:id/pricing) so
+ * ids don't explode label cardinality; unmatched requests share one label.
+ */
+const routeLabel = (req) => {
+  if (req.route && req.route.path) {
+    return `${req.baseUrl || ''}${req.route.path}`;
+  }
+  return req.baseUrl || 'unmatched';
+};
+
+/**
+ * Records latency and in-flight gauges for every request
+ */
+const metricsMiddleware = (req, res, next) => {
+  if (req.path === '/metrics') return next();
+
+  const method = req.method;
+  const stopTimer = requestDuration.startTimer();
+  requestsInFlight.inc({ method });
+
+  let recorded = false;
+  const record = () => {
+    if (recorded) return;
+    recorded = true;
+    requestsInFlight.dec({ method });
+    stopTimer({
+      method,
+      route: routeLabel(req),
+      status: `${Math.floor(res.statusCode / 100)}xx`,
+    });
+  };
+
+  res.on('finish', record);
+  res.on('close', record);
+  next();
+};
+
+/**
+ * GET /metrics - Prometheus text format
+ * If METRICS_TOKEN is set, requires "Authorization: Bearer <token>".
+ */
+const metricsHandler = (req, res) => {
+  const token = process.env.METRICS_TOKEN;
+  if (token && req.headers.authorization !== `Bearer ${token}`) {
+    return res.status(401).json({ success: false, message: 'Unauthorized' });
+  }
+
+  res.set('Content-Type', 'text/plain; version=0.0.4; charset=utf-8');
+  res.send(renderMetrics());
+};
+
+module.exports = {
+  metricsMiddleware,
+  metricsHandler,
+};
@@ -0,0 +1,155 @@
+const { registerQueryHook } = require('../../prisma/middleware/middleware');
+const { runWithRequestContext, getRequestContext } = require('../utils/requestContext.utils');
+const { getQueryBudget } = require('../config/queryBudgets');
+const { histogram } = require('../utils/metrics.utils');
+const logger = require('../utils/logger.utils').child('queries');
+
+/**
+ * Query Tracker
+ * Records every Prisma query issued while handling a request, flags
+ * repeated same-shape queries (likely N+1 loops) and enforces per-route
+ * query budgets from config/queryBudgets.
+ *
+ * - Enabled in development and test, or anywhere with QUERY_TRACKER=on
+ * - Strict mode (NODE_ENV=test or QUERY_BUDGET_STRICT=true): a request
+ *   over budget is answered with 500 so Jest/supertest runs fail
+ * - Development: adds an X-Query-Summary response header
+ */
+
+const NODE_ENV = process.env.NODE_ENV;
+const TRACKER_ENABLED =
+  process.env.QUERY_TRACKER === 'on' ||
+  (process.env.QUERY_TRACKER !== 'off' && (NODE_ENV === 'development' || NODE_ENV === 'test'));
+const STRICT = process.env.QUERY_BUDGET_STRICT === 'true' || NODE_ENV === 'test';
+const REPEAT_THRESHOLD = parseInt(process.env.QUERY_REPEAT_THRESHOLD || '5', 10);
+
+const queriesPerRequest = histogram({
+  name: 'http_request_queries',
+  help: 'Prisma queries issued per HTTP request by route',
+  labelNames: ['route'],
+  buckets: [1, 2, 5, 10, 20, 50, 100, 200],
+});
+
+// Budget violations seen by this process (inspectable from test teardown)
+const violations = [];
+
+/**
+ * Structural fingerprint of query args: keys only, values dropped,
+ * so findUnique({ where: { id: 1 } }) and ({ where: { id: 2 } }) match
+ */
+const shapeOf = (value, depth = 0) => {
+  if (depth > 4 || value === null || typeof value !== 'object') return '';
+  if (Array.isArray(value)) return value.length > 0 ? `[${shapeOf(value[0], depth + 1)}]` : '[]';
+  return `{${Object.keys(value)
+    .sort()
+    .map((key) => `${key}${shapeOf(value[key], depth + 1)}`)
+    .join(',')}}`;
+};
+
+if (TRACKER_ENABLED) {
+  registerQueryHook(({ model, action, args, durationMs }) => {
+    const context = getRequestContext();
+    if (!context || !context.queries) return;
+    context.queries.push({
+      shape: `${model}.${action}${shapeOf(args)}`,
+      durationMs,
+    });
+  });
+}
+
+const routeKeyOf = (req) =>
+  req.route && req.route.path
+    ? `${req.method} ${req.baseUrl || ''}${req.route.path}`
+    : `${req.method} unmatched`;
+
+/**
+ * Summarise recorded queries for a request
+ * @param {Array} queries - [{ shape, durationMs }]
+ * @returns {Object} - { count, totalMs, repeated: [{ shape, count }] }
+ */
+const summarize = (queries) => {
+  const byShape = new Map();
+  let totalMs = 0;
+  queries.forEach(({ shape, durationMs }) => {
+    byShape.set(shape, (byShape.get(shape) || 0) + 1);
+    totalMs += durationMs;
+  });
+
+  const repeated = Array.from(byShape.entries())
+    .filter(([, count]) => count >= REPEAT_THRESHOLD)
+    .map(([shape, count]) => ({ shape, count }))
+    .sort((a, b) => b.count - a.count);
+
+  return { count: queries.length, totalMs: Math.round(totalMs * 100) / 100, repeated };
+};
+
+const queryTracker = (req, res, next) => {
+  if (!TRACKER_ENABLED) return next();
+
+  const context = { queries: [] };
+  let checked = false;
+  let summary = null;
+  let violation = null;
+
+  // Evaluate once, right before the response is written
+  const check = () => {
+    if (checked) return;
+    checked = true;
+
+    const routeKey = routeKeyOf(req);
+    const budget = getQueryBudget(routeKey);
+    summary = summarize(context.queries);
+    queriesPerRequest.observe({ route: routeKey }, summary.count);
+
+    if (summary.repeated.length > 0) {
+      (req.log || logger).warn('Repeated same-shape queries (possible N+1)', {
+        route: routeKey,
+        repeated: summary.repeated,
+      });
+    }
+
+    if (summary.count > budget) {
+      violation = { route: routeKey, budget, count: summary.count, repeated: summary.repeated };
+      violations.push(violation);
+      (req.log || logger).warn('Query budget exceeded', violation);
+    }
+  };
+
+  const originalEnd = res.end;
+  res.end = function end(...args) {
+    check();
+
+    if (!res.headersSent) {
+      if (NODE_ENV === 'development') {
+        res.setHeader(
+          'X-Query-Summary',
+          `count=${summary.count}; time=${summary.totalMs}ms; repeated=${summary.repeated.length}`
+        );
+      }
+
+      if (STRICT && violation) {
+        const body = JSON.stringify({
+          success: false,
+          message: `Query budget exceeded for ${violation.route}: ${violation.count} > ${violation.budget}`,
+          queryBudgetViolation: violation,
+        });
+        res.statusCode = 500;
+        res.setHeader('Content-Type', 'application/json; charset=utf-8');
+        res.setHeader('Content-Length', Buffer.byteLength(body));
+        return originalEnd.call(this, body);
+      }
+    }
+
+    return originalEnd.apply(this, args);
+  };
+
+  runWithRequestContext(context, next);
+};
+
+module.exports = {
+  queryTracker,
+  getQueryBudgetViolations: () => violations.slice(),
+  resetQueryBudgetViolations: () => {
+    violations.length = 0;
+  },
+};
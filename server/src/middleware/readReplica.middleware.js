@@ -0,0 +1,100 @@
+const crypto = require('crypto');
+const { getRedisClient } = require('../config/redis');
+const { getRequestContext, runWithRequestContext } = require('../utils/requestContext.utils');
+const { preferReplica } = require('../utils/readRouting.utils');
+const { counter } = require('../utils/metrics.utils');
+const logger = require('../utils/logger.utils').child('db');
+
+/**
+ * Read Replica Routing
+ * - replicaSafe: route-level opt-in for catalog and search reads. The
+ *   request's reads go to the replica (DATABASE_REPLICA_URL) unless the
+ *   caller wrote recently.
+ * - trackWrites: global. A write request (POST/PUT/PATCH/DELETE) makes its
+ *   caller "sticky" for REPLICA_STICKY_MS, so their next reads come from
+ *   the primary and they see their own changes despite replication lag.
+ *
+ * Callers are identified by their Authorization header (hashed), or by IP
+ * when anonymous. Stickiness is kept in the shared Redis store, so it holds
+ * across workers and instances; without REDIS_URL it is per process.
+ *
+ * Both are no-ops when no replica is configured.
+ *
+ * Configuration (environment):
+ * - DATABASE_REPLICA_URL: read replica connection string (unset = primary only)
+ * - REPLICA_STICKY_MS: read-your-writes window after a write (default: 5000)
+ */
+
+const REPLICA_ENABLED = Boolean(process.env.DATABASE_REPLICA_URL);
+const STICKY_MS = parseInt(process.env.REPLICA_STICKY_MS || '5000', 10);
+const WRITE_METHODS = new Set(['POST', 'PUT', 'PATCH', 'DELETE']);
+
+const stickyRequests = counter({
+  name: 'db_replica_sticky_requests_total',
+  help: 'Replica-safe requests served from the primary because the caller wrote recently',
+});
+
+const stickyKey = (req) =>
+  `db:sticky:${crypto
+    .createHash('sha1')
+    .update(req.headers.authorization || `ip:${req.ip}`)
+    .digest('hex')
+    .slice(0, 24)}`;
+
+const markSticky = async (req) => {
+  const client = await getRedisClient();
+  await client.set(stickyKey(req), '1', { PX: STICKY_MS });
+};
+
+const replicaSafe = async (req, res, next) => {
+  if (!REPLICA_ENABLED) return next();
+
+  let sticky;
+  try {
+    const client = await getRedisClient();
+    sticky = Boolean(await client.get(stickyKey(req)));
+  } catch (error) {
+    // Unknown - stay on the primary
+    logger.warn('Read-your-writes lookup failed, reading from primary', { err: error });
+    sticky = true;
+  }
+
+  if (sticky) {
+    stickyRequests.inc();
+    return next();
+  }
+
+  const context = getRequestContext();
+  if (context) {
+    preferReplica(context);
+    return next();
+  }
+
+  const replicaContext = {};
+  preferReplica(replicaContext);
+  return runWithRequestContext(replicaContext, next);
+};
+
+const trackWrites = async (req, res, next) => {
+  if (!REPLICA_ENABLED || !WRITE_METHODS.has(req.method)) return next();
+
+  // Marked before the write (so a read racing the response is covered) and
+  // again when it completes (so a slow write still gets the full window)
+  res.on('finish', () => {
+    if (res.statusCode < 400) {
+      markSticky(req).catch((error) => logger.warn('Failed to mark caller sticky', { err: error }));
+    }
+  });
+
+  try {
+    await markSticky(req);
+  } catch (error) {
+    logger.warn('Failed to mark caller sticky', { err: error });
+  }
+  return next();
+};
+
+module.exports = {
+  replicaSafe,
+  trackWrites,
+};
@@ -1,4 +1,31 @@
+const crypto = require('crypto');
+const logger = require('../utils/logger.utils').child('http');
+
+/**
+ * Request logger
+ * Tags every request with a request ID (reusing an incoming X-Request-Id),
+ * exposes a request-scoped logger as req.log and emits one line per
+ * request when the response finishes, including status and duration.
+ */
 module.exports = (req, res, next) => {
-  console.log(`Incoming request: ${req.method} ${req.url}`);
+  const startedAt = process.hrtime.bigint();
+  const requestId = req.headers['x-request-id'] || crypto.randomUUID();
+
+  req.id = requestId;
+  req.log = logger.with({ requestId });
+  res.setHeader('X-Request-Id', requestId);
+
+  res.on('finish', () => {
+    const durationMs = Number(process.hrtime.bigint() - startedAt) / 1e6;
+    const level = res.statusCode >= 500 ? 'warn' : 'info';
+    req.log[level]('request completed', {
+      method: req.method,
+      url: req.originalUrl,
+      status: res.statusCode,
+      durationMs: Math.round(durationMs * 100) / 100,
+      contentLength: res.getHeader('content-length'),
+    });
+  });
+
   next();
 };
@@ -0,0 +1,34 @@
+/**
+ * Static Uploads Middleware
+ * Serves /uploads. Content-hashed files (and their variants) can never
+ * change under the same name, so they are cached for a year without
+ * revalidation; legacy timestamp-named files keep revalidating.
+ */
+
+const path = require('path');
+const express = require('express');
+const { isContentHashedUpload } = require('../utils/contentHashStorage.utils');
+
+const IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable';
+const REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate';
+
+/**
+ * @param {string} uploadDir - Directory to serve
+ * @returns {import('express').RequestHandler}
+ */
+const serveUploads = (uploadDir) =>
+  express.static(uploadDir, {
+    // Temp files from in-progress uploads must never be served
+    dotfiles: 'ignore',
+    cacheControl: false,
+    setHeaders: (res, filePath) => {
+      res.setHeader(
+        'Cache-Control',
+        isContentHashedUpload(path.basename(filePath)) ? IMMUTABLE_CACHE_CONTROL : REVALIDATE_CACHE_CONTROL
+      );
+    },
+  });
+
+module.exports = {
+  serveUploads,
+};
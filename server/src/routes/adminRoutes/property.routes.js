@@ -6,6 +6,7 @@ const { uploadImage, uploadVideo, uploadMedia, uploadPropertyMedia } = require('
 const PropertyController = require('../../controllers/adminController/property.controller');
 const PropertyUpdateController = require('../../controllers/adminController/propertyUpdation.controller');
 const { extractRole } = require('../../middleware/extractRole.middleware');
+const { replicaSafe } = require('../../middleware/readReplica.middleware');
 
 /* --------------------------- AMENITIES --------------------------- */
 // GET: Admin and Host can view
@@ -59,9 +60,9 @@ PropertyRoute.delete('/room-types/:id', extractRole, PropertyController.deleteRo
 //   PropertyController.createProperty
 // );
 // common for all roles - but we given here 
-PropertyRoute.get('/properties', extractRole, PropertyController.getProperties);
+PropertyRoute.get('/properties', extractRole, replicaSafe, PropertyController.getProperties);
 PropertyRoute.get('/properties/list', extractRole, PropertyController.getPropertiesList);
-PropertyRoute.get('/properties/search', extractRole, PropertyController.searchProperties);
+PropertyRoute.get('/properties/search', extractRole, replicaSafe, PropertyController.searchProperties);
 PropertyRoute.get('/properties/:id', extractRole, PropertyController.getProperty);
 
 /* ----------------------- PROPERTY UPDATION ROUTES ----------------------- */
@@ -23,11 +23,26 @@ router.get('/cancellation-requests/reasons', CancellationRequestController.getCa
  */
 router.post('/cancellation-requests', extractRole, CancellationRequestController.createCancellationRequest);
 
+/**
+ * POST /api/cancellation-requests/batch-approve
+ * Approve many cancellation requests and cancel their bookings
+ * Requires: Admin authentication
+ * Body: { requestIds: string[], adminNotes? }
+ */
+router.post('/cancellation-requests/batch-approve', extractRole, CancellationRequestController.batchApproveCancellationRequests);
+
+/**
+ * GET /api/cancellation-requests/counts
+ * Get cancellation request counts per status (pending, approved, rejected)
+ * Requires: Admin authentication
+ */
+router.get('/cancellation-requests/counts', extractRole, CancellationRequestController.getCancellationRequestCounts);
+
 /**
  * GET /api/cancellation-requests/my-requests
  * Get own cancellation requests
  * Requires: User, Agent, or Host authentication
- * Query params: status?, page?, limit?
+ * Query params: status?, limit?, cursor? (or page? for numbered pages)
  */
 router.get('/cancellation-requests/my-requests', extractRole, CancellationRequestController.getMyCancellationRequests);
 
@@ -35,7 +50,7 @@ router.get('/cancellation-requests/my-requests', extractRole, CancellationReques
  * GET /api/cancellation-requests
  * Get all cancellation requests (for admin review)
  * Requires: Admin authentication
- * Query params: status?, page?, limit?
+ * Query params: status?, limit?, cursor? (or page? for numbered pages)
  */
 router.get('/cancellation-requests', extractRole, CancellationRequestController.getCancellationRequests);
 
@@ -2,10 +2,11 @@ const express = require('express');
 const router = express.Router();
 const PropertyDetailsController = require('../../controllers/userController/propertyDetials.controller');
 const { extractRole } = require('../../middleware/extractRole.middleware');
+const { replicaSafe } = require('../../middleware/readReplica.middleware');
 
 // More specific routes must come FIRST (Express matches in order)
 router.get('/propertiesDetials/:id/booking-data', extractRole, PropertyDetailsController.getBookingData);
-router.get('/propertiesDetials/:id/pricing', extractRole, PropertyDetailsController.getPropertyPricing);
-router.get('/propertiesDetials/:id', extractRole, PropertyDetailsController.getPropertyDetails);
+router.get('/propertiesDetials/:id/pricing', extractRole, replicaSafe, PropertyDetailsController.getPropertyPricing);
+router.get('/propertiesDetials/:id', extractRole, replicaSafe, PropertyDetailsController.getPropertyDetails);
 
 module.exports = router;
\ No newline at end of file
@@ -1,12 +1,13 @@
 const express = require('express');
 const router = express.Router();
 const PropertySearchController = require('../../controllers/userController/propertySearch.controller');
+const { replicaSafe } = require('../../middleware/readReplica.middleware');
 
 // Get unique cities with icons - public endpoint (no auth required)
-router.get('/cities', PropertySearchController.getUniqueCities);
+router.get('/cities', replicaSafe, PropertySearchController.getUniqueCities);
 
 // Get all property types - public endpoint (no auth required)
-router.get('/property-types', PropertySearchController.getPropertyTypes);
+router.get('/property-types', replicaSafe, PropertySearchController.getPropertyTypes);
 
 module.exports = router;
 
@@ -5,7 +5,8 @@
  * - Uses express.raw() middleware for signature verification
  * - Handles ALL Razorpay webhook events from single endpoint
  * - Security: Signature verification required
- * - Error handling: Always returns 200 to Razorpay (prevents retries)
+ * - Durable inbox: verified events are stored and acknowledged at once,
+ *   then processed by the inbox worker (services/payment/webhookInbox.service)
  * 
  * IMPORTANT:
  * This route MUST be registered BEFORE express.json() middleware
@@ -64,10 +65,12 @@ router.use(
  * - Requests without signature header are rejected
  * 
  * Response:
- * - Always returns 200 OK (even on errors)
- * - This prevents Razorpay from retrying failed webhooks
- * - Errors are logged for manual investigation
- * - In production, consider implementing dead letter queue for failed events
+ * - 200 OK once the event is stored in the webhook inbox (processing
+ *   happens afterwards, with retries and per-order ordering)
+ * - 200 OK for requests that can never succeed (bad signature, invalid
+ *   payload, unhandled event) - logged for investigation
+ * - 500 if the event could not be stored, so Razorpay redelivers it
+ * - Events that keep failing are parked as `dead` in webhook_events
  * 
  * Example Request:
  * POST /webhooks/razorpay
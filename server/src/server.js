@@ -1,6 +1,19 @@
 const app = require('./app');
 const prisma = require('./config/prisma');
 const { createFrontDeskHoldCleanup } = require('./utils/frontdeskHoldCleanup');
+const { createUploadGc } = require('./services/media/blobGc.service');
+const emailGateway = require('./services/communication/emailGateway');
+const { warmPropertyDetailsCache } = require('./services/property/propertyDetailsCache.service');
+const { createWebhookInboxProcessor } = require('./services/payment/webhookInbox.service');
+const { createPaymentReconciler } = require('./services/payment/paymentReconciliation.service');
+const { createOrderExpirySweeper } = require('./services/payment/orderExpiry.service');
+const { processWebhookEvent, notifyBookingConfirmed } = require('./controllers/payment/webhook.controller');
+const {
+  isClusterPrimary,
+  startClusterPrimary,
+  onLeadershipChange,
+  markWorkerReady,
+} = require('./cluster');
 
 const port = process.env.PORT || 5000;
 
@@ -10,16 +23,47 @@ const HOLD_INTERVAL = parseInt(
 );
 
 const frontDeskHoldCleanup = createFrontDeskHoldCleanup(prisma);
+const uploadGc = createUploadGc();
+const webhookInbox = createWebhookInboxProcessor({ handleEvent: processWebhookEvent });
+const paymentReconciler = createPaymentReconciler({ onFinalized: notifyBookingConfirmed });
+const orderExpirySweeper = createOrderExpirySweeper();
 
 async function startServer() {
+  // In cluster mode the primary only forks and supervises workers
+  if (isClusterPrimary()) {
+    startClusterPrimary();
+    return;
+  }
+
   try {
     await prisma.$connect();
     console.log('✅ Database connected');
 
-    await frontDeskHoldCleanup.start(HOLD_INTERVAL);
+    // Periodic jobs run on the leader only (always true without cluster mode)
+    onLeadershipChange(async (isLeader) => {
+      if (isLeader) {
+        await frontDeskHoldCleanup.start(HOLD_INTERVAL);
+        uploadGc.start();
+        await webhookInbox.start();
+        paymentReconciler.start();
+        orderExpirySweeper.start();
+      } else {
+        frontDeskHoldCleanup.stop();
+        uploadGc.stop();
+        webhookInbox.stop();
+        paymentReconciler.stop();
+        orderExpirySweeper.stop();
+      }
+    });
+
+    // Every worker has its own details cache - warm it without delaying startup
+    warmPropertyDetailsCache().catch((err) => {
+      console.error('⚠️ Property details cache warm-up failed:', err.message);
+    });
 
     app.listen(port, () => {
-      console.log(`🚀 Server running on http://localhost:${port}`);
+      console.log(`🚀 Server running on http://localhost:${port} (pid ${process.pid})`);
+      markWorkerReady();
     });
   } catch (err) {
     console.error('❌ Failed to start server:', err);
@@ -30,11 +74,18 @@ async function startServer() {
 const shutdown = async () => {
   console.log('🛑 Graceful shutdown...');
   frontDeskHoldCleanup.stop();
+  uploadGc.stop();
+  webhookInbox.stop();
+  paymentReconciler.stop();
+  orderExpirySweeper.stop();
+  emailGateway.close();
   await prisma.$disconnect();
   process.exit(0);
 };
 
-process.on('SIGINT', shutdown);
-process.on('SIGTERM', shutdown);
+if (!isClusterPrimary()) {
+  process.on('SIGINT', shutdown);
+  process.on('SIGTERM', shutdown);
+}
 
 module.exports = startServer;
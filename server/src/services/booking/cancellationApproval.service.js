@@ -0,0 +1,305 @@
+/**
+ * Cancellation Approval Service
+ * Approves one or many pending cancellation requests and cancels their
+ * bookings: refund evaluation, payment status, and release of the booked
+ * room-nights so the rooms can be sold again.
+ *
+ * Everything that can be decided up front is done before the transaction:
+ * requests and bookings are read in one query, refunds are evaluated in
+ * memory from each booking's cancellationPolicySnapshot (policy rules are
+ * only read - in one query - for old bookings without a snapshot). The
+ * transaction itself is a fixed handful of bulk statements plus one update
+ * per booking, however many requests are approved:
+ * - cancellationRequest.updateMany: pending -> approved (guards against a
+ *   concurrent review)
+ * - booking.updateMany per booking: cancel with its refund figures
+ * - payment.updateMany per payment status
+ * - availability.deleteMany: every booked night held by the bookings
+ *
+ * Booked availability rows identify their booking in blockedBy, so the
+ * release does not depend on stay dates. Online bookings store the booking
+ * ID (set when the hold is confirmed); front desk cash bookings store
+ * `Booking <bookingNumber>` (see bookedByMarkers). The pricing calendar
+ * picks up the release through its availability write hook.
+ *
+ * Notifications are left to the caller, outside the transaction.
+ */
+
+const { PaymentStatus, BookingStatus } = require('@prisma/client');
+const prisma = require('../../config/prisma');
+const {
+  normalizeRules,
+  getSnapshotRules,
+  buildRefundEvaluation,
+  extractRoomIdsFromBooking,
+} = require('../../utils/cancellationRefund.utils');
+const { recordCancellationTransition } = require('./cancellationRequestCounts.service');
+const logger = require('../../utils/logger.utils').child('cancellation');
+
+const CONFLICT_CODE = 'CANCELLATION_CONFLICT';
+const CONFLICT_MESSAGE = 'Cancellation request was reviewed or its booking changed while approving. Please retry.';
+
+const bookingSelect = {
+  id: true,
+  bookingNumber: true,
+  propertyId: true,
+  status: true,
+  totalAmount: true,
+  startDate: true,
+  endDate: true,
+  nights: true,
+  adults: true,
+  children: true,
+  guestName: true,
+  guestEmail: true,
+  guestPhone: true,
+  cancellationPolicyId: true,
+  cancellationPolicySnapshot: true,
+  property: {
+    select: {
+      id: true,
+      title: true,
+      ownerHostId: true,
+    },
+  },
+  bookingRoomSelections: {
+    select: { roomIds: true },
+  },
+};
+
+const conflictError = () => Object.assign(new Error(CONFLICT_MESSAGE), { code: CONFLICT_CODE });
+
+/**
+ * blockedBy values that mark a booking's booked nights
+ * @param {Object} booking - { id, bookingNumber }
+ * @returns {string[]}
+ */
+const bookedByMarkers = (booking) =>
+  booking.bookingNumber ? [booking.id, `Booking ${booking.bookingNumber}`] : [booking.id];
+
+/**
+ * Rules for bookings made before policy snapshots existed, in one query
+ * @returns {Promise<Map<string, Array<Object>>>} cancellationPolicyId -> normalized rules
+ */
+const loadFallbackRules = async (bookings) => {
+  const policyIds = [
+    ...new Set(
+      bookings
+        .filter((booking) => booking.cancellationPolicyId && getSnapshotRules(booking).length === 0)
+        .map((booking) => booking.cancellationPolicyId)
+    ),
+  ];
+  if (!policyIds.length) return new Map();
+
+  const rules = await prisma.cancellationPolicyRule.findMany({
+    where: { cancellationPolicyId: { in: policyIds } },
+    select: { id: true, cancellationPolicyId: true, daysBefore: true, refundPercentage: true },
+  });
+
+  const byPolicy = new Map();
+  rules.forEach((rule) => {
+    if (!byPolicy.has(rule.cancellationPolicyId)) byPolicy.set(rule.cancellationPolicyId, []);
+    byPolicy.get(rule.cancellationPolicyId).push(rule);
+  });
+  byPolicy.forEach((policyRules, policyId) => byPolicy.set(policyId, normalizeRules(policyRules)));
+  return byPolicy;
+};
+
+/**
+ * Booking fields to write when cancelling, same rules as a direct
+ * cancellation (bookingCancellation.controller)
+ * @returns {{data: Object, refund: Object|null}|{error: string}}
+ */
+const planBookingCancellation = (booking, rules, reason, now) => {
+  const data = {
+    status: BookingStatus.cancelled,
+    cancellationDate: now,
+    cancellationReason: reason,
+    refundStatusUpdatedAt: now,
+    refundedAmount: null,
+    refundEligibleAmount: null,
+    refundPercentage: null,
+    refundProcessedAt: null,
+  };
+
+  if (!booking.cancellationPolicyId && rules.length === 0) {
+    return { data: { ...data, paymentStatus: PaymentStatus.REFUND_NOT_APPLICABLE }, refund: null };
+  }
+
+  if (rules.length === 0) {
+    return { error: 'Cancellation policy rules are not configured for this booking' };
+  }
+
+  const refund = buildRefundEvaluation({ booking, rules, now });
+  if (refund.eligibleAmount > 0 && refund.percentage > 0) {
+    return {
+      data: {
+        ...data,
+        paymentStatus: PaymentStatus.REFUND_INITIATED,
+        // Actual refund processing happens later; updated when it completes
+        refundedAmount: refund.eligibleAmount,
+        refundEligibleAmount: refund.eligibleAmount,
+        refundPercentage: refund.percentage,
+        refundProcessedAt: now,
+      },
+      refund,
+    };
+  }
+
+  return { data: { ...data, paymentStatus: PaymentStatus.REFUND_NOT_APPLICABLE }, refund };
+};
+
+/**
+ * Approve pending cancellation requests and cancel their bookings
+ * Requests that cannot be approved are reported in `skipped` and do not
+ * stop the others. If another review or cancellation lands while the batch
+ * is being written, the whole batch is rolled back and reported as skipped
+ * with status 409, so it can simply be retried.
+ * @param {Object} options
+ * @param {string[]} options.requestIds
+ * @param {string} options.adminId - Reviewing admin
+ * @param {string|null} [options.adminNotes]
+ * @returns {Promise<{approved: Array<{request: Object, booking: Object, refund: Object|null}>,
+ *   skipped: Array<{requestId: string, status: number, message: string}>, releasedNights: number}>}
+ */
+const approveCancellationRequests = async ({ requestIds, adminId, adminNotes = null }) => {
+  const ids = [...new Set((requestIds || []).filter(Boolean))];
+  const skipped = [];
+  if (!ids.length) return { approved: [], skipped, releasedNights: 0 };
+
+  const requests = await prisma.cancellationRequest.findMany({
+    where: { id: { in: ids }, isDeleted: false },
+    select: {
+      id: true,
+      bookingId: true,
+      requestedBy: true,
+      role: true,
+      reason: true,
+      status: true,
+      booking: { select: bookingSelect },
+    },
+  });
+  const requestsById = new Map(requests.map((request) => [request.id, request]));
+  const fallbackRules = await loadFallbackRules(requests.map((request) => request.booking));
+
+  const now = new Date();
+  const plans = [];
+  const plannedBookings = new Set();
+
+  ids.forEach((requestId) => {
+    const request = requestsById.get(requestId);
+    const skip = (status, message) => skipped.push({ requestId, status, message });
+
+    if (!request) return skip(404, 'Cancellation request not found');
+    if (request.status !== 'pending') return skip(400, `Cancellation request is already ${request.status}`);
+
+    const { booking } = request;
+    if (booking.status === BookingStatus.cancelled) return skip(400, 'Booking is already cancelled');
+    if (booking.status === BookingStatus.completed) return skip(400, 'Completed bookings cannot be cancelled');
+    if (plannedBookings.has(booking.id)) return skip(409, 'Another request for this booking is in the same batch');
+
+    const snapshotRules = getSnapshotRules(booking);
+    const rules = snapshotRules.length ? snapshotRules : fallbackRules.get(booking.cancellationPolicyId) || [];
+    const plan = planBookingCancellation(booking, rules, request.reason, now);
+    if (plan.error) return skip(400, plan.error);
+
+    plannedBookings.add(booking.id);
+    plans.push({ request, ...plan });
+  });
+
+  if (!plans.length) return { approved: [], skipped, releasedNights: 0 };
+
+  const blockedByMarkers = plans.flatMap((plan) => bookedByMarkers(plan.request.booking));
+  const roomIdsByBooking = plans.map((plan) => extractRoomIdsFromBooking(plan.request.booking));
+  // Only narrow by room when every booking lists its rooms, so no held night is missed
+  const roomIds = roomIdsByBooking.every((bookingRoomIds) => bookingRoomIds.length)
+    ? [...new Set(roomIdsByBooking.flat())]
+    : [];
+  const reviewData = {
+    status: 'approved',
+    adminNotes,
+    reviewedAt: now,
+    reviewedBy: adminId,
+  };
+
+  const bookingIdsByPaymentStatus = new Map();
+  plans.forEach((plan) => {
+    const { paymentStatus } = plan.data;
+    if (!bookingIdsByPaymentStatus.has(paymentStatus)) bookingIdsByPaymentStatus.set(paymentStatus, []);
+    bookingIdsByPaymentStatus.get(paymentStatus).push(plan.request.bookingId);
+  });
+
+  let released;
+  try {
+    released = await prisma.$transaction(async (tx) => {
+      const reviewed = await tx.cancellationRequest.updateMany({
+        where: { id: { in: plans.map((plan) => plan.request.id) }, status: 'pending', isDeleted: false },
+        data: reviewData,
+      });
+      if (reviewed.count !== plans.length) throw conflictError();
+
+      const cancelled = await Promise.all(
+        plans.map((plan) =>
+          tx.booking.updateMany({
+            where: {
+              id: plan.request.bookingId,
+              status: { notIn: [BookingStatus.cancelled, BookingStatus.completed] },
+            },
+            data: plan.data,
+          })
+        )
+      );
+      if (cancelled.some((result) => result.count !== 1)) throw conflictError();
+
+      await Promise.all(
+        [...bookingIdsByPaymentStatus.entries()].map(([status, statusBookingIds]) =>
+          tx.payment.updateMany({
+            where: { bookingId: { in: statusBookingIds }, isDeleted: false },
+            data: { status, updatedAt: now },
+          })
+        )
+      );
+
+      // blockedBy alone identifies the nights; roomId lets the pricing
+      // calendar hook invalidate just the affected properties
+      return tx.availability.deleteMany({
+        where: {
+          blockedBy: { in: blockedByMarkers },
+          ...(roomIds.length && { roomId: { in: roomIds } }),
+          status: 'booked',
+          isDeleted: false,
+        },
+      });
+    });
+  } catch (error) {
+    if (error.code !== CONFLICT_CODE) throw error;
+    logger.warn('Cancellation approval conflicted with a concurrent change', { requests: plans.length });
+    plans.forEach((plan) => skipped.push({ requestId: plan.request.id, status: 409, message: error.message }));
+    return { approved: [], skipped, releasedNights: 0 };
+  }
+
+  recordCancellationTransition('pending', 'approved', plans.length);
+
+  logger.info('Cancellation requests approved', {
+    approved: plans.length,
+    skipped: skipped.length,
+    releasedNights: released.count,
+  });
+
+  return {
+    approved: plans.map((plan) => {
+      const { booking, ...request } = plan.request;
+      return {
+        request: { ...request, ...reviewData },
+        booking: { ...booking, ...plan.data },
+        refund: plan.refund,
+      };
+    }),
+    skipped,
+    releasedNights: released.count,
+  };
+};
+
+module.exports = {
+  approveCancellationRequests,
+};
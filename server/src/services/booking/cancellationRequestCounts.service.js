@@ -0,0 +1,77 @@
+/**
+ * Cancellation Request Counters
+ * Per-status totals (pending, approved, rejected) for the admin queue and
+ * its pending badge, without counting the table on every poll.
+ *
+ * The totals are loaded with one groupBy and cached. Every status
+ * transition (createCancellationRequest, approval, rejection) drops them in
+ * this process and - through the invalidation bus (utils/invalidationBus.utils)
+ * - in every other worker and host, so the next read on any worker counts
+ * afresh and the badge and page totals agree across workers. Transitions
+ * are rare next to badge polls, so this still saves almost every count.
+ * The TTL only bounds drift from writes made outside these code paths.
+ *
+ * Configuration (environment):
+ * - CANCELLATION_COUNTS_TTL_MS: how long loaded totals are trusted (default: 60s)
+ */
+
+const prisma = require('../../config/prisma');
+const { createTtlCache } = require('../../utils/ttlCache.utils');
+const { createInvalidationChannel } = require('../../utils/invalidationBus.utils');
+
+const STATUSES = ['pending', 'approved', 'rejected'];
+const COUNTS_KEY = 'all';
+
+const countsCache = createTtlCache({
+  name: 'cancellation-request-counts',
+  ttlMs: parseInt(process.env.CANCELLATION_COUNTS_TTL_MS || '60000', 10),
+  maxEntries: 1,
+});
+
+const loadCounts = async () => {
+  const groups = await prisma.cancellationRequest.groupBy({
+    by: ['status'],
+    where: { isDeleted: false },
+    _count: { _all: true },
+  });
+
+  const counts = Object.fromEntries(STATUSES.map((status) => [status, 0]));
+  groups.forEach((group) => {
+    if (group.status in counts) counts[group.status] = group._count._all;
+  });
+  return counts;
+};
+
+/**
+ * Current totals per status
+ * @returns {Promise<{pending: number, approved: number, rejected: number, total: number}>}
+ */
+const getCancellationCounts = async () => {
+  const counts = await countsCache.getOrLoad(COUNTS_KEY, loadCounts);
+  return { ...counts, total: STATUSES.reduce((sum, status) => sum + counts[status], 0) };
+};
+
+const transitionChannel = createInvalidationChannel('cancellation-request-counts', {
+  handler: () => countsCache.delete(COUNTS_KEY),
+  resync: () => countsCache.clear(),
+});
+
+/**
+ * Record status transitions once they have been committed
+ * Drops the totals in every process; the next read reloads them. Dropping
+ * (rather than adjusting in place) cannot double count a transition on a
+ * process that reloaded after the commit but before the message arrived.
+ * @param {string|null} from - Previous status, null for a new request
+ * @param {string} to - New status
+ * @param {number} [count=1] - Number of requests that moved
+ * @returns {Promise<void>}
+ */
+const recordCancellationTransition = (from, to, count = 1) => {
+  if (!count) return Promise.resolve();
+  return transitionChannel.publish({ from: from || null, to, count });
+};
+
+module.exports = {
+  getCancellationCounts,
+  recordCancellationTransition,
+};
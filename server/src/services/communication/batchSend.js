@@ -0,0 +1,118 @@
+/**
+ * Batch Send Helpers
+ * Shared by the gateways and providers to implement sendBatch:
+ * - identical messages (same sender and content) are grouped so providers
+ *   that support it can deliver them as one multi-recipient send, and a
+ *   recipient listed twice is only sent to once
+ * - per-provider concurrency caps and rate limits for providers that can
+ *   only send one message per API call
+ *
+ * Every batch returns one result per input message, in input order:
+ * { to, success, messageId?, error?, provider? }
+ */
+
+/**
+ * Create a rate limiter that spaces acquisitions evenly
+ * Shared by every batch sent through the same provider in this process.
+ * @param {number} perSecond - Maximum acquisitions per second (0 = unlimited)
+ * @returns {{acquire: () => Promise<void>}}
+ */
+const createRateLimiter = (perSecond) => {
+  if (!perSecond || perSecond <= 0) {
+    return { acquire: () => Promise.resolve() };
+  }
+
+  const interval = 1000 / perSecond;
+  let nextAt = 0;
+
+  return {
+    acquire: () => {
+      const now = Date.now();
+      const at = Math.max(now, nextAt);
+      nextAt = at + interval;
+      return at > now ? new Promise((resolve) => setTimeout(resolve, at - now)) : Promise.resolve();
+    },
+  };
+};
+
+/**
+ * Group messages whose content is identical
+ * @param {Array<Object>} messages - Messages with a `to` field
+ * @param {Function} contentKey - (message) => string identifying the content
+ * @returns {Array<{message: Object, recipients: Array<{to: string, indexes: number[]}>}>}
+ */
+const groupIdenticalMessages = (messages, contentKey) => {
+  const groups = new Map();
+
+  messages.forEach((message, index) => {
+    const key = contentKey(message);
+    let group = groups.get(key);
+    if (!group) {
+      group = { message, recipients: new Map() };
+      groups.set(key, group);
+    }
+
+    const to = String(message.to).trim();
+    const recipientKey = to.toLowerCase();
+    if (!group.recipients.has(recipientKey)) {
+      group.recipients.set(recipientKey, { to, indexes: [] });
+    }
+    group.recipients.get(recipientKey).indexes.push(index);
+  });
+
+  return [...groups.values()].map((group) => ({
+    message: group.message,
+    recipients: [...group.recipients.values()],
+  }));
+};
+
+/**
+ * Split an array into chunks of at most `size` items
+ */
+const chunk = (items, size) => {
+  const chunks = [];
+  for (let i = 0; i < items.length; i += size) {
+    chunks.push(items.slice(i, i + size));
+  }
+  return chunks;
+};
+
+/**
+ * Send each unique (content, recipient) pair individually, bounded by a
+ * work pool and a rate limiter, and fan results back out per message
+ * @param {Object} options
+ * @param {Array<Object>} options.messages
+ * @param {Function} options.contentKey - See groupIdenticalMessages
+ * @param {Object} options.pool - Work pool (utils/workPool.utils)
+ * @param {Object} options.limiter - Rate limiter (createRateLimiter)
+ * @param {Function} options.sendOne - (message, to) => Promise<Object>
+ * @returns {Promise<Array<Object>>} - Per-message results, in input order
+ */
+const sendIndividually = async ({ messages, contentKey, pool, limiter, sendOne }) => {
+  const results = new Array(messages.length);
+  const deliveries = groupIdenticalMessages(messages, contentKey).flatMap((group) =>
+    group.recipients.map((recipient) => ({ message: group.message, recipient }))
+  );
+
+  await pool.map(deliveries, async ({ message, recipient }) => {
+    let result;
+    try {
+      await limiter.acquire();
+      result = await sendOne(message, recipient.to);
+    } catch (error) {
+      result = { success: false, error: error.message };
+    }
+    recipient.indexes.forEach((index) => {
+      results[index] = { ...result, to: messages[index].to };
+    });
+  });
+
+  return results;
+};
+
+module.exports = {
+  createRateLimiter,
+  groupIdenticalMessages,
+  chunk,
+  sendIndividually,
+};
@@ -6,6 +6,8 @@
 
 const emailGateway = require('./emailGateway');
 
+const EMAIL_REGEX = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
+
 /**
  * Email Service
  */
@@ -38,8 +40,7 @@ const emailService = {
       }
 
       // Basic email validation
-      const emailRegex = /^[^\s@]+@[^\s@]+\.[^\s@]+$/;
-      if (!emailRegex.test(to)) {
+      if (!EMAIL_REGEX.test(to)) {
         return {
           success: false,
           error: 'Invalid email address format'
@@ -56,6 +57,45 @@ const emailService = {
         error: error.message
       };
     }
+  },
+
+  /**
+   * Send many Emails
+   * Identical messages to several recipients (e.g. one notification to
+   * every admin) are delivered as one multi-recipient send where the
+   * provider supports it. Invalid messages fail individually without
+   * affecting the rest.
+   * @param {Array<{to: string, subject: string, content: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order:
+   *   { to, success, messageId?, error? }
+   *
+   * @example
+   * const results = await emailService.sendBatch(
+   *   adminEmails.map((to) => ({ to, subject: 'New Booking', content: html }))
+   * );
+   */
+  sendBatch: async (messages = []) => {
+    const results = new Array(messages.length);
+    const valid = [];
+    const validIndexes = [];
+
+    messages.forEach((message, index) => {
+      const { to, subject, content } = message || {};
+      if (!to || !subject || !content) {
+        results[index] = { to, success: false, error: 'Email address, subject, and content are required' };
+      } else if (!EMAIL_REGEX.test(to)) {
+        results[index] = { to, success: false, error: 'Invalid email address format' };
+      } else {
+        valid.push({ to, subject, content, from: message.from || null });
+        validIndexes.push(index);
+      }
+    });
+
+    const sent = await emailGateway.sendBatch(valid);
+    sent.forEach((result, i) => {
+      results[validIndexes[i]] = result;
+    });
+    return results;
   }
 };
 
@@ -5,6 +5,7 @@
  */
 
 const providerConfig = require('./config/provider.config');
+const { createWorkPool } = require('../../utils/workPool.utils');
 
 // Import providers
 const mockProvider = require('./providers/email/mock.provider');
@@ -20,6 +21,8 @@ const providers = {
   // aws-ses: require('./providers/email/aws-ses.provider'),
 };
 
+const fallbackPool = createWorkPool({ name: 'email-batch', concurrency: 5 });
+
 /**
  * Email Gateway
  */
@@ -58,6 +61,45 @@ const emailGateway = {
         error: error.message
       };
     }
+  },
+
+  /**
+   * Send many Email messages via active provider
+   * Providers merge identical messages and apply their own concurrency
+   * and rate limits; a provider without sendBatch falls back to
+   * individual sends through a bounded pool.
+   * @param {Array<{to: string, subject: string, content: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order:
+   *   { to, success, messageId?, error? }
+   */
+  sendBatch: async (messages) => {
+    if (!messages.length) return [];
+    try {
+      const provider = emailGateway.getProvider();
+      if (typeof provider.sendBatch === 'function') {
+        return await provider.sendBatch(messages);
+      }
+      return await Promise.all(
+        messages.map(async (message) => ({
+          ...(await fallbackPool.run(() => provider.send(message.to, message.subject, message.content, message.from))),
+          to: message.to
+        }))
+      );
+    } catch (error) {
+      console.error('Email Gateway Batch Error:', error);
+      return messages.map((message) => ({
+        to: message.to,
+        success: false,
+        error: error.message
+      }));
+    }
+  },
+
+  /**
+   * Release provider resources (pooled connections) on shutdown
+   */
+  close: () => {
+    Object.values(providers).forEach((provider) => provider.close?.());
   }
 };
 
@@ -4,6 +4,8 @@
  * Logs emails instead of sending
  */
 
+const { groupIdenticalMessages } = require('../../batchSend');
+
 const mockEmailProvider = {
   /**
    * Send Email (mock - just logs)
@@ -30,6 +32,39 @@ const mockEmailProvider = {
       messageId: `mock_${Date.now()}`,
       provider: 'mock'
     };
+  },
+
+  /**
+   * Send many Emails (mock - logs one entry per merged message)
+   * @param {Array<{to: string, subject: string, content: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order
+   */
+  sendBatch: async (messages) => {
+    const results = new Array(messages.length);
+    const groups = groupIdenticalMessages(
+      messages,
+      (message) => `${message.from || ''}\u0000${message.subject}\u0000${message.content}`
+    );
+
+    await Promise.all(groups.map(async ({ message, recipients }) => {
+      console.log('📧 [MOCK EMAIL BATCH]', {
+        to: recipients.map((recipient) => recipient.to),
+        from: message.from || null,
+        subject: message.subject,
+        content: message.content.substring(0, 100) + '...',
+        timestamp: new Date().toISOString()
+      });
+
+      // Simulate API delay
+      await new Promise(resolve => setTimeout(resolve, 50));
+
+      const messageId = `mock_${Date.now()}`;
+      recipients.forEach((recipient) => recipient.indexes.forEach((index) => {
+        results[index] = { to: messages[index].to, success: true, messageId, provider: 'mock' };
+      }));
+    }));
+
+    return results;
   }
 };
 
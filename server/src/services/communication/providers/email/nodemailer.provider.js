@@ -6,6 +6,14 @@
  * - GMAIL_USER: Your Gmail address (e.g., your-email@gmail.com)
  * - GMAIL_APP_PASSWORD: Your Gmail App Password (16-character password)
  * - GMAIL_FROM_EMAIL: Default sender email (optional, uses GMAIL_USER if not set)
+ *
+ * Connection pooling (optional):
+ * - EMAIL_SMTP_POOL: Reuse SMTP connections across messages (default: true)
+ * - EMAIL_SMTP_MAX_CONNECTIONS: Concurrent SMTP connections (default: 5)
+ * - EMAIL_SMTP_MAX_MESSAGES: Messages sent over one connection before it is recycled (default: 100)
+ * - EMAIL_SMTP_RATE_LIMIT: Maximum messages per second across the pool (default: unlimited)
+ * - EMAIL_BATCH_MAX_RECIPIENTS: Recipients per merged batch message (default: 50)
+ *   sendBatch keeps at most EMAIL_SMTP_MAX_CONNECTIONS deliveries in flight
  * 
  * Note: 
  * - You must enable 2-Step Verification in your Google Account
@@ -14,12 +22,25 @@
  */
 
 const nodemailer = require('nodemailer');
+const { groupIdenticalMessages, chunk } = require('../../batchSend');
+const { createWorkPool } = require('../../../../utils/workPool.utils');
 
 // Load Gmail credentials from environment variables
 const GMAIL_USER = process.env.GMAIL_USER;
 const GMAIL_APP_PASSWORD = process.env.GMAIL_APP_PASSWORD;
 const GMAIL_FROM_EMAIL = process.env.GMAIL_FROM_EMAIL || GMAIL_USER;
 
+// Without pooling every sendMail opens (and TLS-negotiates) a new SMTP connection
+const SMTP_POOL = process.env.EMAIL_SMTP_POOL !== 'false';
+const SMTP_MAX_CONNECTIONS = parseInt(process.env.EMAIL_SMTP_MAX_CONNECTIONS || '5', 10);
+const SMTP_MAX_MESSAGES = parseInt(process.env.EMAIL_SMTP_MAX_MESSAGES || '100', 10);
+const SMTP_RATE_LIMIT = parseInt(process.env.EMAIL_SMTP_RATE_LIMIT || '0', 10);
+const BATCH_MAX_RECIPIENTS = parseInt(process.env.EMAIL_BATCH_MAX_RECIPIENTS || '50', 10);
+
+// Batch deliveries wait here rather than piling up in the transport's queue
+// (or, unpooled, each opening its own SMTP connection)
+const batchPool = createWorkPool({ name: 'email-nodemailer', concurrency: SMTP_MAX_CONNECTIONS });
+
 // Validate Gmail credentials
 if (!GMAIL_USER || !GMAIL_APP_PASSWORD) {
   console.error('⚠️ WARNING: Gmail credentials not found in environment variables');
@@ -34,6 +55,11 @@ if (GMAIL_USER && GMAIL_APP_PASSWORD) {
       host: 'smtp.gmail.com',
       port: 587, // TLS port
       secure: false, // true for 465, false for other ports
+      pool: SMTP_POOL,
+      maxConnections: SMTP_MAX_CONNECTIONS,
+      maxMessages: SMTP_MAX_MESSAGES,
+      // Pooled transports throttle to rateLimit messages per rateDelta ms
+      ...(SMTP_POOL && SMTP_RATE_LIMIT > 0 ? { rateLimit: SMTP_RATE_LIMIT, rateDelta: 1000 } : {}),
       auth: {
         user: GMAIL_USER,
         pass: GMAIL_APP_PASSWORD
@@ -50,7 +76,10 @@ if (GMAIL_USER && GMAIL_APP_PASSWORD) {
         console.error('⚠️ ERROR: Gmail SMTP connection failed:', error.message);
         console.error('Please check your GMAIL_USER and GMAIL_APP_PASSWORD');
       } else {
-        console.log('✅ Gmail SMTP connection verified successfully');
+        console.log(
+          '✅ Gmail SMTP connection verified successfully',
+          SMTP_POOL ? `(pool: ${SMTP_MAX_CONNECTIONS} connections, ${SMTP_MAX_MESSAGES} messages each)` : ''
+        );
       }
     });
   } catch (error) {
@@ -87,6 +116,60 @@ const isHTML = (content) => {
   return htmlRegex.test(content);
 };
 
+/**
+ * Map a Nodemailer/SMTP error to a readable message
+ * @param {Error} error
+ * @returns {string}
+ */
+const describeSendError = (error) => {
+  let errorMessage = 'Failed to send email';
+  
+  // Common error codes and messages
+  if (error.code) {
+    switch (error.code) {
+      case 'EAUTH':
+        errorMessage = 'Authentication failed. Please check your Gmail credentials (GMAIL_USER and GMAIL_APP_PASSWORD)';
+        break;
+      case 'ECONNECTION':
+        errorMessage = 'Connection failed. Please check your internet connection and Gmail SMTP settings';
+        break;
+      case 'ETIMEDOUT':
+        errorMessage = 'Connection timeout. Gmail SMTP server is not responding';
+        break;
+      case 'EENVELOPE':
+        errorMessage = 'Invalid email address format';
+        break;
+      case 'EMESSAGE':
+        errorMessage = 'Invalid message format';
+        break;
+      default:
+        errorMessage = error.message || `Email error: ${error.code}`;
+    }
+  } else if (error.response) {
+    // SMTP error response
+    errorMessage = `SMTP error: ${error.response}`;
+  } else if (error.responseCode) {
+    // Response code error
+    switch (error.responseCode) {
+      case 535:
+        errorMessage = 'Authentication failed. Invalid Gmail App Password. Please generate a new App Password from Google Account settings';
+        break;
+      case 550:
+        errorMessage = 'Email address not found or invalid';
+        break;
+      case 552:
+        errorMessage = 'Mailbox full or quota exceeded';
+        break;
+      default:
+        errorMessage = `SMTP error (${error.responseCode}): ${error.message || 'Unknown error'}`;
+    }
+  } else {
+    errorMessage = error.message || 'Unknown error occurred';
+  }
+
+  return errorMessage;
+};
+
 /**
  * Nodemailer Email Provider
  */
@@ -206,51 +289,7 @@ const nodemailerEmailProvider = {
       };
 
     } catch (error) {
-      // Handle Nodemailer-specific errors
-      let errorMessage = 'Failed to send email';
-      
-      // Common error codes and messages
-      if (error.code) {
-        switch (error.code) {
-          case 'EAUTH':
-            errorMessage = 'Authentication failed. Please check your Gmail credentials (GMAIL_USER and GMAIL_APP_PASSWORD)';
-            break;
-          case 'ECONNECTION':
-            errorMessage = 'Connection failed. Please check your internet connection and Gmail SMTP settings';
-            break;
-          case 'ETIMEDOUT':
-            errorMessage = 'Connection timeout. Gmail SMTP server is not responding';
-            break;
-          case 'EENVELOPE':
-            errorMessage = 'Invalid email address format';
-            break;
-          case 'EMESSAGE':
-            errorMessage = 'Invalid message format';
-            break;
-          default:
-            errorMessage = error.message || `Email error: ${error.code}`;
-        }
-      } else if (error.response) {
-        // SMTP error response
-        errorMessage = `SMTP error: ${error.response}`;
-      } else if (error.responseCode) {
-        // Response code error
-        switch (error.responseCode) {
-          case 535:
-            errorMessage = 'Authentication failed. Invalid Gmail App Password. Please generate a new App Password from Google Account settings';
-            break;
-          case 550:
-            errorMessage = 'Email address not found or invalid';
-            break;
-          case 552:
-            errorMessage = 'Mailbox full or quota exceeded';
-            break;
-          default:
-            errorMessage = `SMTP error (${error.responseCode}): ${error.message || 'Unknown error'}`;
-        }
-      } else {
-        errorMessage = error.message || 'Unknown error occurred';
-      }
+      const errorMessage = describeSendError(error);
 
       console.error('❌ [NODEMAILER EMAIL] Email sending failed', {
         to,
@@ -268,6 +307,123 @@ const nodemailerEmailProvider = {
         responseCode: error.responseCode || null
       };
     }
+  },
+
+  /**
+   * Send many emails
+   * Identical messages (same sender, subject and content) are merged into
+   * one SMTP message per chunk of recipients, addressed by Bcc so
+   * recipients do not see each other. Other messages go out individually.
+   * At most EMAIL_SMTP_MAX_CONNECTIONS deliveries are in flight at once.
+   * @param {Array<{to: string, subject: string, content: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order:
+   *   { to, success, messageId?, error?, provider }
+   */
+  sendBatch: async (messages) => {
+    const results = new Array(messages.length);
+    const fail = (index, error, extra = {}) => {
+      results[index] = { to: messages[index].to, success: false, error, provider: 'nodemailer', ...extra };
+    };
+
+    if (!transporter) {
+      messages.forEach((message, index) =>
+        fail(index, 'Email transporter not initialized. Please check GMAIL_USER and GMAIL_APP_PASSWORD')
+      );
+      return results;
+    }
+
+    const groups = groupIdenticalMessages(
+      messages,
+      (message) => `${message.from || ''}\u0000${message.subject}\u0000${message.content}`
+    );
+
+    const deliveries = [];
+    groups.forEach(({ message, recipients }) => {
+      const valid = recipients.filter((recipient) => {
+        if (validateEmail(recipient.to)) return true;
+        recipient.indexes.forEach((index) => fail(index, `Invalid email address format: ${recipient.to}`));
+        return false;
+      });
+      chunk(valid, BATCH_MAX_RECIPIENTS).forEach((recipientChunk) => deliveries.push({ message, recipients: recipientChunk }));
+    });
+
+    await batchPool.map(deliveries, async ({ message, recipients }) => {
+      const settle = (recipient, result) =>
+        recipient.indexes.forEach((index) => {
+          results[index] = { ...result, to: messages[index].to };
+        });
+
+      if (recipients.length === 1) {
+        const result = await nodemailerEmailProvider.send(recipients[0].to, message.subject, message.content, message.from);
+        settle(recipients[0], result);
+        return;
+      }
+
+      const fromEmail = message.from || GMAIL_FROM_EMAIL;
+      if (!fromEmail || !validateEmail(fromEmail)) {
+        recipients.forEach((recipient) =>
+          settle(recipient, { success: false, error: `Invalid sender email format: ${fromEmail}`, provider: 'nodemailer' })
+        );
+        return;
+      }
+
+      const isHTMLContent = isHTML(message.content);
+      try {
+        const info = await transporter.sendMail({
+          from: `"ZomesStay" <${fromEmail}>`,
+          to: fromEmail,
+          bcc: recipients.map((recipient) => recipient.to),
+          subject: message.subject,
+          text: isHTMLContent ? null : message.content,
+          html: isHTMLContent ? message.content : null
+        });
+
+        const rejected = new Set((info.rejected || []).map((address) => String(address).toLowerCase()));
+        recipients.forEach((recipient) =>
+          settle(
+            recipient,
+            rejected.has(recipient.to.toLowerCase())
+              ? { success: false, error: 'Recipient rejected by SMTP server', provider: 'nodemailer' }
+              : { success: true, messageId: info.messageId, response: info.response, provider: 'nodemailer' }
+          )
+        );
+
+        console.log('✅ [NODEMAILER EMAIL] Batch email sent', {
+          messageId: info.messageId,
+          recipients: recipients.length,
+          rejected: rejected.size,
+          subject: message.subject
+        });
+      } catch (error) {
+        const errorMessage = describeSendError(error);
+        console.error('❌ [NODEMAILER EMAIL] Batch email failed', {
+          recipients: recipients.length,
+          error: errorMessage,
+          code: error.code,
+          timestamp: new Date().toISOString()
+        });
+        recipients.forEach((recipient) =>
+          settle(recipient, {
+            success: false,
+            error: errorMessage,
+            provider: 'nodemailer',
+            code: error.code || null,
+            responseCode: error.responseCode || null
+          })
+        );
+      }
+    });
+
+    return results;
+  },
+
+  /**
+   * Close pooled SMTP connections (graceful shutdown)
+   */
+  close: () => {
+    if (transporter) {
+      transporter.close();
+    }
   }
 };
 
@@ -4,6 +4,12 @@
  * Logs messages instead of sending
  */
 
+const { createWorkPool } = require('../../../../utils/workPool.utils');
+const { createRateLimiter, sendIndividually } = require('../../batchSend');
+
+const pool = createWorkPool({ name: 'sms-mock', concurrency: 10 });
+const limiter = createRateLimiter(0);
+
 const mockSMSProvider = {
   /**
    * Send SMS (mock - just logs)
@@ -28,7 +34,21 @@ const mockSMSProvider = {
       messageId: `mock_${Date.now()}`,
       provider: 'mock'
     };
-  }
+  },
+
+  /**
+   * Send many SMS (mock - one send per unique recipient and message)
+   * @param {Array<{to: string, message: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order
+   */
+  sendBatch: (messages) =>
+    sendIndividually({
+      messages,
+      contentKey: (message) => `${message.from || ''}\u0000${message.message}`,
+      pool,
+      limiter,
+      sendOne: (message, to) => mockSMSProvider.send(to, message.message, message.from)
+    })
 };
 
 module.exports = mockSMSProvider;
@@ -7,16 +7,30 @@
  * - TWILIO_AUTH_TOKEN: Your Twilio Auth Token
  * - TWILIO_PHONE_NUMBER: Your Twilio phone number (e.g., +1234567890)
  * 
+ * Batch sending (optional):
+ * - TWILIO_MAX_CONCURRENCY: Concurrent Twilio API calls (default: 5)
+ * - TWILIO_MESSAGES_PER_SECOND: Send rate across all batches (default: 1, Twilio's long code limit)
+ *
  * Note: Trial accounts can only send to verified phone numbers
  */
 
 const twilio = require('twilio');
+const { createWorkPool } = require('../../../../utils/workPool.utils');
+const { createRateLimiter, sendIndividually } = require('../../batchSend');
 
 // Load Twilio credentials from environment variables
 const TWILIO_ACCOUNT_SID = process.env.TWILIO_ACCOUNT_SID;
 const TWILIO_AUTH_TOKEN = process.env.TWILIO_AUTH_TOKEN;
 const TWILIO_PHONE_NUMBER = process.env.TWILIO_PHONE_NUMBER;
 
+// Twilio has no multi-recipient message API: batches are sent one message
+// per recipient, capped in concurrency and spaced to the account's rate
+const batchPool = createWorkPool({
+  name: 'sms-twilio',
+  concurrency: parseInt(process.env.TWILIO_MAX_CONCURRENCY || '5', 10),
+});
+const batchLimiter = createRateLimiter(parseFloat(process.env.TWILIO_MESSAGES_PER_SECOND || '1'));
+
 // Validate Twilio credentials
 if (!TWILIO_ACCOUNT_SID || !TWILIO_AUTH_TOKEN) {
   console.error('⚠️ WARNING: Twilio credentials not found in environment variables');
@@ -230,7 +244,23 @@ const twilioSMSProvider = {
         code: error.code || null
       };
     }
-  }
+  },
+
+  /**
+   * Send many SMS via Twilio
+   * Each unique (message, recipient) pair is sent once, within the
+   * provider's concurrency cap and rate limit.
+   * @param {Array<{to: string, message: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order
+   */
+  sendBatch: (messages) =>
+    sendIndividually({
+      messages,
+      contentKey: (message) => `${message.from || ''}\u0000${message.message}`,
+      pool: batchPool,
+      limiter: batchLimiter,
+      sendOne: (message, to) => twilioSMSProvider.send(to, message.message, message.from)
+    })
 };
 
 module.exports = twilioSMSProvider;
@@ -45,6 +45,36 @@ const smsService = {
         error: error.message
       };
     }
+  },
+
+  /**
+   * Send many SMS
+   * Sent within the provider's concurrency and rate limits; a recipient
+   * listed twice for the same message is only sent to once.
+   * @param {Array<{to: string, message: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order:
+   *   { to, success, messageId?, error? }
+   */
+  sendBatch: async (messages = []) => {
+    const results = new Array(messages.length);
+    const valid = [];
+    const validIndexes = [];
+
+    messages.forEach((entry, index) => {
+      const { to, message } = entry || {};
+      if (!to || !message) {
+        results[index] = { to, success: false, error: 'Phone number and message are required' };
+      } else {
+        valid.push({ to, message, from: entry.from || null });
+        validIndexes.push(index);
+      }
+    });
+
+    const sent = await smsGateway.sendBatch(valid);
+    sent.forEach((result, i) => {
+      results[validIndexes[i]] = result;
+    });
+    return results;
   }
 };
 
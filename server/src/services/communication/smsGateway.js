@@ -5,6 +5,7 @@
  */
 
 const providerConfig = require('./config/provider.config');
+const { createWorkPool } = require('../../utils/workPool.utils');
 
 // Import providers
 const mockProvider = require('./providers/sms/mock.provider');
@@ -20,6 +21,8 @@ const providers = {
   // msg91: require('./providers/sms/msg91.provider'),
 };
 
+const fallbackPool = createWorkPool({ name: 'sms-batch', concurrency: 5 });
+
 /**
  * SMS Gateway
  */
@@ -57,6 +60,38 @@ const smsGateway = {
         error: error.message
       };
     }
+  },
+
+  /**
+   * Send many SMS messages via active provider
+   * Providers merge identical messages and apply their own concurrency
+   * and rate limits; a provider without sendBatch falls back to
+   * individual sends through a bounded pool.
+   * @param {Array<{to: string, message: string, from?: string}>} messages
+   * @returns {Promise<Array<Object>>} - Per-message results, in input order:
+   *   { to, success, messageId?, error? }
+   */
+  sendBatch: async (messages) => {
+    if (!messages.length) return [];
+    try {
+      const provider = smsGateway.getProvider();
+      if (typeof provider.sendBatch === 'function') {
+        return await provider.sendBatch(messages);
+      }
+      return await Promise.all(
+        messages.map(async (message) => ({
+          ...(await fallbackPool.run(() => provider.send(message.to, message.message, message.from))),
+          to: message.to
+        }))
+      );
+    } catch (error) {
+      console.error('SMS Gateway Batch Error:', error);
+      return messages.map((message) => ({
+        to: message.to,
+        success: false,
+        error: error.message
+      }));
+    }
   }
 };
 
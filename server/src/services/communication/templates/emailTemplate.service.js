@@ -2,22 +2,50 @@
  * Email Template Service
  * Provides HTML email templates with consistent styling
  * All templates return HTML content ready to send
+ *
+ * The shared layout is compiled once at load into static fragments and
+ * date/currency formatters are built once, so rendering an email only
+ * concatenates the per-message parts.
  */
 
 /**
- * Base HTML wrapper with ZomesStay branding
- * @param {string} content - Main content HTML
- * @param {string} title - Email title (for <title> tag)
- * @returns {string} - Complete HTML email
+ * Compile a template with {{slot}} placeholders into a render function
+ * The source is split into static fragments once, so rendering is a
+ * single pass of concatenation instead of rebuilding the whole document.
+ * @param {string} source - Template source
+ * @returns {(values: Object) => string}
  */
-const getBaseEmailTemplate = (content, title = 'ZomesStay') => {
-  return `
+const compileTemplate = (source) => {
+  const fragments = [];
+  const slots = [];
+  const placeholder = /\{\{(\w+)\}\}/g;
+  let last = 0;
+  let match;
+  while ((match = placeholder.exec(source)) !== null) {
+    fragments.push(source.slice(last, match.index));
+    slots.push(match[1]);
+    last = placeholder.lastIndex;
+  }
+  fragments.push(source.slice(last));
+
+  return (values) => {
+    let html = fragments[0];
+    for (let i = 0; i < slots.length; i += 1) {
+      html += values[slots[i]] ?? '';
+      html += fragments[i + 1];
+    }
+    return html;
+  };
+};
+
+// ZomesStay branded layout (styles, header, footer), compiled once at load
+const renderBaseLayout = compileTemplate(`
 <!DOCTYPE html>
 <html lang="en">
 <head>
   <meta charset="UTF-8">
   <meta name="viewport" content="width=device-width, initial-scale=1.0">
-  <title>${title}</title>
+  <title>{{title}}</title>
   <style>
     body {
       font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
@@ -135,19 +163,60 @@ const getBaseEmailTemplate = (content, title = 'ZomesStay') => {
       <h1>ZomesStay</h1>
     </div>
     <div class="email-body">
-      ${content}
+      {{content}}
     </div>
     <div class="email-footer">
-      <p>© ${new Date().getFullYear()} ZomesStay. All rights reserved.</p>
+      <p>© {{year}} ZomesStay. All rights reserved.</p>
       <p>This is an automated email. Please do not reply to this message.</p>
       <p>For support, contact us at support@zomesstay.com</p>
     </div>
   </div>
 </body>
 </html>
-  `.trim();
+  `.trim());
+
+/**
+ * Base HTML wrapper with ZomesStay branding
+ * @param {string} content - Main content HTML
+ * @param {string} title - Email title (for <title> tag)
+ * @returns {string} - Complete HTML email
+ */
+const getBaseEmailTemplate = (content, title = 'ZomesStay') =>
+  renderBaseLayout({ title, content, year: new Date().getFullYear() });
+
+// Intl formatters are expensive to construct - build them once instead of
+// per toLocale*String call
+const DATE_FORMAT = new Intl.DateTimeFormat('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
+const NUMBER_FORMAT = new Intl.NumberFormat('en-IN');
+
+const formatDate = (date) => {
+  if (!date) return 'N/A';
+  const d = new Date(date);
+  return Number.isNaN(d.getTime()) ? 'Invalid Date' : DATE_FORMAT.format(d);
+};
+
+const formatCurrency = (amount) => {
+  if (!amount) return '₹0';
+  return `₹${NUMBER_FORMAT.format(Number(amount))}`;
 };
 
+/**
+ * Room details section shared by the booking templates
+ * @param {Array<Object>} roomDetails
+ * @returns {string}
+ */
+const renderRoomDetails = (roomDetails) => (roomDetails.length > 0 ? `
+        <h3>Room Details</h3>
+        ${roomDetails.map(room => `
+          <div class="info-box">
+            <strong>${room.roomTypeName || 'Room'}</strong><br>
+            Rooms: ${room.rooms || 1}<br>
+            ${room.mealPlan ? `Meal Plan: ${room.mealPlan}<br>` : ''}
+            Price: ${formatCurrency(room.price)}
+          </div>
+        `).join('')}
+      ` : '');
+
 /**
  * Email Template Service
  */
@@ -190,17 +259,6 @@ const emailTemplateService = {
     roomDetails = [],
     paymentMethod = 'Online Payment'
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>Booking Confirmed! 🎉</h2>
       <p>Dear ${guestName},</p>
@@ -247,17 +305,7 @@ const emailTemplateService = {
         </tr>
       </table>
 
-      ${roomDetails.length > 0 ? `
-        <h3>Room Details</h3>
-        ${roomDetails.map(room => `
-          <div class="info-box">
-            <strong>${room.roomTypeName || 'Room'}</strong><br>
-            Rooms: ${room.rooms || 1}<br>
-            ${room.mealPlan ? `Meal Plan: ${room.mealPlan}<br>` : ''}
-            Price: ${formatCurrency(room.price)}
-          </div>
-        `).join('')}
-      ` : ''}
+      ${renderRoomDetails(roomDetails)}
 
       <div class="info-box">
         <strong>Important Information:</strong><br>
@@ -285,11 +333,6 @@ const emailTemplateService = {
     reason = 'Payment could not be processed',
     retryLink = null
   }) => {
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>Payment Failed</h2>
       <p>Dear ${guestName},</p>
@@ -335,12 +378,6 @@ const emailTemplateService = {
     requestId,
     reason
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
     const content = `
       <h2>Cancellation Request Received</h2>
       <p>Dear ${guestName},</p>
@@ -381,11 +418,6 @@ const emailTemplateService = {
     refundAmount,
     refundTimeline = '5-7 business days'
   }) => {
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>Cancellation Approved ✅</h2>
       <p>Dear ${guestName},</p>
@@ -469,17 +501,6 @@ const emailTemplateService = {
     totalAmount,
     roomDetails = []
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>New Booking Received! 🎉</h2>
       <p>Dear ${hostName},</p>
@@ -531,17 +552,7 @@ const emailTemplateService = {
         </tr>
       </table>
 
-      ${roomDetails.length > 0 ? `
-        <h3>Room Details</h3>
-        ${roomDetails.map(room => `
-          <div class="info-box">
-            <strong>${room.roomTypeName || 'Room'}</strong><br>
-            Rooms: ${room.rooms || 1}<br>
-            ${room.mealPlan ? `Meal Plan: ${room.mealPlan}<br>` : ''}
-            Price: ${formatCurrency(room.price)}
-          </div>
-        `).join('')}
-      ` : ''}
+      ${renderRoomDetails(roomDetails)}
 
       <div class="info-box">
         <strong>Action Required:</strong><br>
@@ -575,12 +586,6 @@ const emailTemplateService = {
     customReason,
     requestId
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
     const content = `
       <h2>New Cancellation Request ⚠️</h2>
       <p>Dear Admin,</p>
@@ -656,17 +661,6 @@ const emailTemplateService = {
     totalAmount,
     roomDetails = []
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>New Booking Confirmed 📋</h2>
       <p>Dear Admin,</p>
@@ -718,17 +712,7 @@ const emailTemplateService = {
         </tr>
       </table>
 
-      ${roomDetails.length > 0 ? `
-        <h3>Room Details</h3>
-        ${roomDetails.map(room => `
-          <div class="info-box">
-            <strong>${room.roomTypeName || 'Room'}</strong><br>
-            Rooms: ${room.rooms || 1}<br>
-            ${room.mealPlan ? `Meal Plan: ${room.mealPlan}<br>` : ''}
-            Price: ${formatCurrency(room.price)}
-          </div>
-        `).join('')}
-      ` : ''}
+      ${renderRoomDetails(roomDetails)}
 
       <div class="info-box">
         <strong>Note:</strong><br>
@@ -763,17 +747,6 @@ const emailTemplateService = {
     totalAmount,
     refundAmount
   }) => {
-    const formatDate = (date) => {
-      if (!date) return 'N/A';
-      const d = new Date(date);
-      return d.toLocaleDateString('en-IN', { weekday: 'long', year: 'numeric', month: 'long', day: 'numeric' });
-    };
-
-    const formatCurrency = (amount) => {
-      if (!amount) return '₹0';
-      return `₹${Number(amount).toLocaleString('en-IN')}`;
-    };
-
     const content = `
       <h2>Booking Cancelled ⚠️</h2>
       <p>Dear ${hostName},</p>
@@ -3,10 +3,10 @@
  * Creates bookings with cash payments for front-desk operations
  */
 
-const { PrismaClient, OrderStatus, PaymentStatus, PaymentMethod } = require('@prisma/client');
+const { OrderStatus, PaymentStatus, PaymentMethod } = require('@prisma/client');
 const { buildDateRange, formatISODate, toDateOnly, addDays } = require('../../utils/date.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /**
  * Generate unique transaction ID for cash payment
@@ -0,0 +1,198 @@
+/**
+ * Upload Blob GC
+ * Reference counting and garbage collection for content-hashed uploads
+ * (see utils/contentHashStorage.utils).
+ *
+ * Because one blob can back several rows (the same banner uploaded as a
+ * property image, a room type image and a site banner), files are never
+ * unlinked when a row goes away. Instead the GC counts references to
+ * every hash across all columns that store upload URLs and removes blobs
+ * (and their derived variants) whose count is zero and which are older
+ * than a grace period - so an upload whose row is still being written is
+ * never collected.
+ *
+ * Configuration (environment):
+ * - UPLOAD_GC_INTERVAL_MS: how often the leader runs the GC (default: 6h, 0 disables)
+ * - UPLOAD_GC_GRACE_MS: minimum blob age before it can be collected (default: 24h)
+ */
+
+const fsp = require('fs/promises');
+const path = require('path');
+const prisma = require('../../config/prisma');
+const { UPLOAD_BASE } = require('../../config/multer');
+const { CONTENT_HASH_FILENAME, TEMP_PREFIX } = require('../../utils/contentHashStorage.utils');
+const logger = require('../../utils/logger.utils').child('media');
+
+const DEFAULT_GRACE_MS = 24 * 60 * 60 * 1000;
+const SCAN_BATCH_SIZE = 1000;
+
+// Any sha256 that appears in a stored value (plain URLs and JSON columns alike)
+const HASH_IN_VALUE = /[0-9a-f]{64}/g;
+
+/**
+ * Every column that can hold an upload URL
+ * `select` fields are stringified as-is, so JSON columns (banner arrays,
+ * room image lists, location.cityIcon, media variants) are covered too.
+ */
+const REFERENCE_SOURCES = [
+  { model: 'propertyMedia', select: { url: true, variants: true } },
+  { model: 'propertyRoomTypeMedia', select: { url: true, variants: true } },
+  { model: 'siteConfig', select: { logo: true, bannerImages: true } },
+  { model: 'property', select: { coverImage: true, location: true } },
+  { model: 'room', select: { images: true } },
+  { model: 'amenity', select: { icon: true } },
+  { model: 'facility', select: { icon: true } },
+  { model: 'safetyHygiene', select: { icon: true } },
+  { model: 'admin', select: { profileImage: true } },
+  { model: 'host', select: { profileImage: true } },
+  { model: 'user', select: { profileImage: true } },
+  { model: 'travelAgent', select: { profileImage: true } },
+];
+
+/**
+ * Count references to every content hash currently stored in the database
+ * Soft-deleted rows still count - they can be restored.
+ * @returns {Promise<Map<string, number>>} - hash -> reference count
+ */
+const getBlobReferenceCounts = async () => {
+  const counts = new Map();
+
+  for (const source of REFERENCE_SOURCES) {
+    let cursor = null;
+    for (;;) {
+      const rows = await prisma[source.model].findMany({
+        select: { id: true, ...source.select },
+        orderBy: { id: 'asc' },
+        take: SCAN_BATCH_SIZE,
+        ...(cursor ? { cursor: { id: cursor }, skip: 1 } : {}),
+      });
+
+      rows.forEach((row) => {
+        const { id, ...values } = row;
+        // One row referencing a blob through its url and its variants counts once
+        const hashes = new Set(JSON.stringify(values).match(HASH_IN_VALUE) || []);
+        hashes.forEach((hash) => counts.set(hash, (counts.get(hash) || 0) + 1));
+      });
+
+      if (rows.length < SCAN_BATCH_SIZE) break;
+      cursor = rows[rows.length - 1].id;
+    }
+  }
+
+  return counts;
+};
+
+const listFiles = async (dir) => {
+  let entries;
+  try {
+    entries = await fsp.readdir(dir, { withFileTypes: true });
+  } catch (error) {
+    return [];
+  }
+
+  const files = [];
+  for (const entry of entries) {
+    const fullPath = path.join(dir, entry.name);
+    if (entry.isDirectory()) {
+      files.push(...(await listFiles(fullPath)));
+    } else if (entry.isFile()) {
+      files.push(fullPath);
+    }
+  }
+  return files;
+};
+
+/**
+ * Remove unreferenced content-hashed blobs and stale temp files
+ * Legacy (non-hashed) uploads are never touched.
+ * @param {Object} [options]
+ * @param {boolean} [options.dryRun=false] - Report without deleting
+ * @param {number} [options.graceMs] - Minimum age before a blob can be removed
+ * @returns {Promise<{scanned: number, referenced: number, deleted: number, bytesFreed: number}>}
+ */
+const collectUnreferencedBlobs = async ({
+  dryRun = false,
+  graceMs = parseInt(process.env.UPLOAD_GC_GRACE_MS || String(DEFAULT_GRACE_MS), 10),
+} = {}) => {
+  // Snapshot the files before counting references: a blob uploaded after
+  // the count is simply not in the list, and older ones are protected by
+  // the grace period
+  const files = await listFiles(UPLOAD_BASE);
+  const counts = await getBlobReferenceCounts();
+  const cutoff = Date.now() - graceMs;
+
+  const summary = { scanned: 0, referenced: 0, deleted: 0, bytesFreed: 0 };
+
+  for (const filePath of files) {
+    const name = path.basename(filePath);
+    const isTemp = name.startsWith(TEMP_PREFIX);
+    const match = CONTENT_HASH_FILENAME.exec(name);
+    if (!match && !isTemp) continue;
+
+    summary.scanned += 1;
+    if (match && counts.get(match[1])) {
+      summary.referenced += 1;
+      continue;
+    }
+
+    let stats;
+    try {
+      stats = await fsp.stat(filePath);
+    } catch (error) {
+      continue;
+    }
+    if (stats.mtimeMs > cutoff) continue;
+
+    if (!dryRun) {
+      try {
+        await fsp.unlink(filePath);
+      } catch (error) {
+        logger.warn('Failed to remove unreferenced upload', { file: filePath, err: error });
+        continue;
+      }
+    }
+    summary.deleted += 1;
+    summary.bytesFreed += stats.size;
+  }
+
+  return summary;
+};
+
+/**
+ * Periodic GC runner (start on the cluster leader only)
+ */
+const createUploadGc = () => {
+  let timer = null;
+
+  const runGc = async () => {
+    try {
+      const summary = await collectUnreferencedBlobs();
+      logger.info('Upload GC completed', summary);
+    } catch (error) {
+      logger.error('Upload GC failed', error);
+    }
+  };
+
+  const start = (intervalMs = parseInt(process.env.UPLOAD_GC_INTERVAL_MS || String(6 * 60 * 60 * 1000), 10)) => {
+    if (timer || !intervalMs) return null;
+    timer = setInterval(runGc, intervalMs);
+    timer.unref();
+    return timer;
+  };
+
+  const stop = () => {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
+    }
+  };
+
+  return { start, stop, runGc };
+};
+
+module.exports = {
+  REFERENCE_SOURCES,
+  getBlobReferenceCounts,
+  collectUnreferencedBlobs,
+  createUploadGc,
+};
@@ -0,0 +1,256 @@
+/**
+ * Image Pipeline
+ * Generates resized WebP/AVIF variants for uploaded property and room type
+ * images and records them on the media rows, so clients can download the
+ * size they display instead of the full original.
+ *
+ * Variants are produced after the upload request has been answered: the
+ * controllers call scheduleMediaVariants() once their transaction commits.
+ * Encoding runs through `sharp` (libvips on the libuv threadpool, never on
+ * the event loop) behind a bounded work pool, so a 60-file upload cannot
+ * starve other requests of threadpool slots.
+ *
+ * Configuration (environment):
+ * - IMAGE_VARIANTS: set to 'off' to disable
+ * - IMAGE_VARIANT_FORMATS: comma list of webp, avif (default: webp,avif)
+ * - IMAGE_VARIANT_CONCURRENCY: images encoded at once (default: 2)
+ *
+ * `sharp` is an optional dependency; without it uploads keep working and
+ * rows simply have no variants.
+ *
+ * Recorded shape (PropertyMedia.variants / PropertyRoomTypeMedia.variants):
+ * { thumb: { width, height, webp: url, avif: url }, card: {...}, hero: {...} }
+ */
+
+const fs = require('fs/promises');
+const path = require('path');
+const prisma = require('../../config/prisma');
+const { UPLOAD_BASE } = require('../../config/multer');
+const { probeImageFile } = require('../../utils/imageProbe.utils');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const { runOutsideRequestContext } = require('../../utils/requestContext.utils');
+const logger = require('../../utils/logger.utils').child('media');
+
+const VARIANT_SIZES = {
+  thumb: { width: 320 },
+  card: { width: 640 },
+  hero: { width: 1600 },
+};
+
+const ENCODER_OPTIONS = {
+  webp: { quality: 75 },
+  avif: { quality: 50, effort: 4 },
+};
+
+// Formats sharp can read that are worth resizing (SVG stays vector)
+const RESIZABLE_FORMATS = new Set(['jpeg', 'png', 'webp', 'gif']);
+
+const MEDIA_MODELS = new Set(['propertyMedia', 'propertyRoomTypeMedia']);
+
+const isEnabled = () => (process.env.IMAGE_VARIANTS || '').toLowerCase() !== 'off';
+
+const variantFormats = () =>
+  (process.env.IMAGE_VARIANT_FORMATS || 'webp,avif')
+    .split(',')
+    .map((f) => f.trim().toLowerCase())
+    .filter((f) => ENCODER_OPTIONS[f]);
+
+const pool = createWorkPool({
+  name: 'image-variants',
+  concurrency: parseInt(process.env.IMAGE_VARIANT_CONCURRENCY || '2', 10),
+});
+
+let sharpModule;
+const loadSharp = () => {
+  if (sharpModule !== undefined) return sharpModule;
+  try {
+    sharpModule = require('sharp');
+  } catch (error) {
+    sharpModule = null;
+    logger.warn('sharp is not installed - image variants are disabled');
+  }
+  return sharpModule;
+};
+
+const UPLOADS_PREFIX = '/uploads/';
+
+/**
+ * Map a stored media URL (absolute or relative) to its file on disk
+ * @returns {string|null} - null for URLs outside the uploads directory
+ */
+const resolveUploadPath = (url) => {
+  if (!url) return null;
+  const index = url.indexOf(UPLOADS_PREFIX);
+  if (index < 0) return null;
+
+  const relative = decodeURIComponent(url.slice(index + UPLOADS_PREFIX.length).split(/[?#]/)[0]);
+  const filePath = path.resolve(UPLOAD_BASE, relative);
+  return filePath.startsWith(path.resolve(UPLOAD_BASE) + path.sep) ? filePath : null;
+};
+
+/**
+ * Build a variant URL with the same origin/prefix as the original
+ */
+const toVariantUrl = (originalUrl, relativePath) => {
+  const index = originalUrl.indexOf(UPLOADS_PREFIX);
+  const base = index >= 0 ? originalUrl.slice(0, index) : '';
+  return `${base}${UPLOADS_PREFIX}${relativePath.split(path.sep).join('/')}`;
+};
+
+const fileExists = async (filePath) => {
+  try {
+    await fs.access(filePath);
+    return true;
+  } catch (error) {
+    return false;
+  }
+};
+
+/**
+ * Generate (or reuse) every variant of one source image
+ * Output dimensions are computed from the header probe, so variants that
+ * already exist on disk are reused without decoding anything.
+ * @param {string} sourcePath - Original image on disk
+ * @returns {Promise<{width: number, height: number, variants: Object}|null>}
+ */
+const generateImageVariants = async (sourcePath) => {
+  const probe = await probeImageFile(sourcePath);
+  if (!probe || !RESIZABLE_FORMATS.has(probe.format) || !probe.width || !probe.height) {
+    return null;
+  }
+
+  const formats = variantFormats();
+  const sharp = formats.length > 0 ? loadSharp() : null;
+  const variantDir = path.join(path.dirname(sourcePath), 'variants');
+  const stem = path.basename(sourcePath, path.extname(sourcePath));
+  await fs.mkdir(variantDir, { recursive: true });
+
+  const variants = {};
+  let produced = 0;
+  for (const [name, size] of Object.entries(VARIANT_SIZES)) {
+    // Never upscale - small originals get variants at their own size
+    const width = Math.min(size.width, probe.width);
+    const height = Math.round((probe.height * width) / probe.width);
+    const entry = { width, height };
+
+    for (const format of formats) {
+      const outputPath = path.join(variantDir, `${stem}-${name}.${format}`);
+      if (!(await fileExists(outputPath))) {
+        if (!sharp) continue;
+        await sharp(sourcePath)
+          .rotate() // apply EXIF orientation before resizing
+          .resize({ width, withoutEnlargement: true })
+          [format](ENCODER_OPTIONS[format])
+          .toFile(outputPath);
+      }
+      entry[format] = path.relative(UPLOAD_BASE, outputPath);
+      produced += 1;
+    }
+
+    variants[name] = entry;
+  }
+
+  // Nothing encoded (e.g. sharp missing) - leave the row for a later run
+  if (produced === 0) return null;
+
+  return { width: probe.width, height: probe.height, variants };
+};
+
+// Source paths currently being processed - repeat saves of a gallery don't re-encode
+const inFlight = new Map();
+
+const processRow = async (model, row) => {
+  const sourcePath = resolveUploadPath(row.url);
+  if (!sourcePath) return false;
+
+  let pending = inFlight.get(sourcePath);
+  if (!pending) {
+    pending = pool.run(() => generateImageVariants(sourcePath)).finally(() => inFlight.delete(sourcePath));
+    inFlight.set(sourcePath, pending);
+  }
+
+  const result = await pending;
+  if (!result) return false;
+
+  const variants = {};
+  Object.entries(result.variants).forEach(([name, entry]) => {
+    variants[name] = { width: entry.width, height: entry.height };
+    variantFormats().forEach((format) => {
+      if (entry[format]) variants[name][format] = toVariantUrl(row.url, entry[format]);
+    });
+  });
+
+  await prisma[model].update({
+    where: { id: row.id },
+    data: { width: result.width, height: result.height, variants },
+  });
+  return true;
+};
+
+/**
+ * Generate variants for image rows that don't have them yet
+ * @param {'propertyMedia'|'propertyRoomTypeMedia'} model
+ * @param {Object} where - Prisma filter, e.g. { propertyId }
+ * @returns {Promise<{processed: number, skipped: number, failed: number}>}
+ */
+const processMediaVariants = async (model, where = {}) => {
+  if (!MEDIA_MODELS.has(model)) {
+    throw new Error(`Unsupported media model: ${model}`);
+  }
+
+  const rows = await prisma[model].findMany({
+    where: { ...where, type: 'image', isDeleted: false },
+    select: { id: true, url: true, variants: true },
+  });
+
+  const pendingRows = rows.filter((row) => !row.variants);
+  const outcomes = await Promise.allSettled(pendingRows.map((row) => processRow(model, row)));
+
+  const summary = { processed: 0, skipped: rows.length - pendingRows.length, failed: 0 };
+  outcomes.forEach((outcome, index) => {
+    if (outcome.status === 'rejected') {
+      summary.failed += 1;
+      logger.warn('Image variant generation failed', {
+        model,
+        mediaId: pendingRows[index].id,
+        err: outcome.reason,
+      });
+    } else if (outcome.value) {
+      summary.processed += 1;
+    } else {
+      summary.skipped += 1;
+    }
+  });
+  return summary;
+};
+
+/**
+ * Fire-and-forget variant generation after an upload has been committed
+ * @param {'propertyMedia'|'propertyRoomTypeMedia'} model
+ * @param {Object} where - Prisma filter for the rows just written
+ */
+const scheduleMediaVariants = (model, where) => {
+  if (!isEnabled()) return;
+
+  // Detached so the background queries don't count against the upload request
+  runOutsideRequestContext(() => {
+    processMediaVariants(model, where)
+      .then((summary) => {
+        if (summary.processed > 0 || summary.failed > 0) {
+          logger.info('Image variants generated', { model, ...summary });
+        }
+      })
+      .catch((error) => {
+        logger.error('Image variant scheduling failed', { model, err: error });
+      });
+  });
+};
+
+module.exports = {
+  VARIANT_SIZES,
+  generateImageVariants,
+  processMediaVariants,
+  scheduleMediaVariants,
+  resolveUploadPath,
+  getImagePipelineStats: () => pool.getStats(),
+};
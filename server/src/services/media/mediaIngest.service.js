@@ -0,0 +1,94 @@
+/**
+ * Media Ingestion
+ * Validates uploaded files concurrently (bounded) before any database work:
+ * type and size checks, an async stat to confirm the file landed on disk,
+ * and a header-only probe for image dimensions. Controllers then write all
+ * media rows with a single createMany in a short transaction.
+ *
+ * Configuration (environment):
+ * - MEDIA_INGEST_CONCURRENCY: files validated at once (default: 8)
+ */
+
+const fsp = require('fs/promises');
+const { probeImageFile } = require('../../utils/imageProbe.utils');
+const { createWorkPool } = require('../../utils/workPool.utils');
+
+const pool = createWorkPool({
+  name: 'media-ingest',
+  concurrency: parseInt(process.env.MEDIA_INGEST_CONCURRENCY || '8', 10),
+});
+
+const mediaTypeOf = (file) => (file.mimetype?.startsWith('image/') ? 'image' : 'video');
+
+/**
+ * Validate and probe one uploaded file
+ * @returns {Promise<{file, type, width, height, error?: {code, message}}>}
+ */
+const inspectFile = async (file, { allowedMimeTypes, maxFileSize }) => {
+  const type = mediaTypeOf(file);
+  const result = { file, type, width: null, height: null };
+
+  if (allowedMimeTypes && !allowedMimeTypes.includes(file.mimetype)) {
+    return { ...result, error: { code: 'INVALID_TYPE', message: `Invalid file type: ${file.mimetype}` } };
+  }
+  if (maxFileSize && file.size > maxFileSize) {
+    return { ...result, error: { code: 'TOO_LARGE', message: `File too large: ${file.originalname}` } };
+  }
+
+  if (file.path) {
+    try {
+      await fsp.stat(file.path);
+    } catch (error) {
+      return { ...result, error: { code: 'MISSING', message: `Uploaded file not found: ${file.originalname}` } };
+    }
+
+    if (type === 'image') {
+      const probe = await probeImageFile(file.path);
+      if (!probe) {
+        return { ...result, error: { code: 'UNREADABLE', message: `Unrecognised or corrupt image: ${file.originalname}` } };
+      }
+      result.width = probe.width;
+      result.height = probe.height;
+    }
+  }
+
+  return result;
+};
+
+/**
+ * Validate a batch of uploaded files concurrently
+ * Results keep the order of `files`.
+ * @param {Array<Object>} files - Multer file objects
+ * @param {Object} [options]
+ * @param {string[]} [options.allowedMimeTypes]
+ * @param {number} [options.maxFileSize] - Bytes
+ * @returns {Promise<{items: Array<{file, type, width, height}>, errors: Array<{file, code, message}>}>}
+ */
+const ingestMediaFiles = async (files = [], options = {}) => {
+  const results = await pool.map(files, (file) => inspectFile(file, options));
+
+  const items = [];
+  const errors = [];
+  results.forEach((entry) => {
+    if (entry.error) {
+      errors.push({ file: entry.file, ...entry.error });
+    } else {
+      items.push(entry);
+    }
+  });
+  return { items, errors };
+};
+
+/**
+ * Index existing media rows by URL so re-saved galleries keep their
+ * probed dimensions and variants when rows are recreated
+ * @param {Array<{url, width, height, variants}>} rows
+ * @returns {Map<string, {width, height, variants}>}
+ */
+const indexMediaMetadata = (rows = []) =>
+  new Map(rows.map((row) => [row.url, { width: row.width, height: row.height, variants: row.variants }]));
+
+module.exports = {
+  ingestMediaFiles,
+  indexMediaMetadata,
+};
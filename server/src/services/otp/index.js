@@ -0,0 +1,94 @@
+/**
+ * OTP Store
+ * Pluggable TTL store for one-time passwords
+ *
+ * Provider is selected with OTP_STORE_PROVIDER:
+ * - 'memory' (default): in-process, fine for a single Node process
+ * - 'redis': shared across processes/hosts (requires REDIS_URL)
+ *
+ * Cluster mode needs the redis provider: an OTP sent by one worker must be
+ * verifiable by any other. index.js refuses to start a cluster otherwise
+ * (see getUnsharedOtpStoreReason).
+ *
+ * Usage:
+ * const { createOtpStore } = require('../../services/otp');
+ * const otpStore = createOtpStore('user');
+ *
+ * await otpStore.set(phone, { otp, expiresAt, countryCode });
+ * const data = await otpStore.get(phone);
+ * await otpStore.delete(phone);
+ */
+
+const memoryProvider = require('./providers/memory.provider');
+const redisProvider = require('./providers/redis.provider');
+
+// Provider registry
+const providers = {
+  memory: memoryProvider,
+  redis: redisProvider,
+};
+
+/**
+ * Get the active OTP provider
+ * @returns {Object} - Provider instance
+ */
+const getProvider = () => {
+  const providerName = process.env.OTP_STORE_PROVIDER || 'memory';
+
+  if (!providers[providerName]) {
+    console.warn(`OTP store provider "${providerName}" not found. Using "memory" provider.`);
+    return providers.memory;
+  }
+
+  return providers[providerName];
+};
+
+/**
+ * Why OTPs would not be shared between processes, if they would not be
+ * Checks configuration only; whether Redis is reachable is seen on first use.
+ * @returns {string|null} - Reason, or null when the store is shared
+ */
+const getUnsharedOtpStoreReason = () => {
+  const providerName = process.env.OTP_STORE_PROVIDER || 'memory';
+  if (providerName !== 'redis') {
+    return `OTP_STORE_PROVIDER is "${providerName}", which keeps OTPs per process`;
+  }
+  if (!process.env.REDIS_URL) {
+    return 'OTP_STORE_PROVIDER is "redis" but REDIS_URL is not set';
+  }
+  try {
+    require.resolve('redis');
+  } catch (error) {
+    return 'OTP_STORE_PROVIDER is "redis" but the "redis" package is not installed';
+  }
+  return null;
+};
+
+/**
+ * Create an OTP store scoped to one namespace (user, host, admin, ...)
+ * so the same phone number can hold independent OTPs per login flow.
+ * Entries expire at their `expiresAt` (epoch ms).
+ * @param {string} namespace - Key prefix
+ * @returns {Object} - { set, get, delete }
+ */
+const createOtpStore = (namespace) => {
+  const keyFor = (key) => `otp:${namespace}:${key}`;
+
+  return {
+    set: async (key, data) => {
+      const ttlMs = (data.expiresAt || 0) - Date.now();
+      if (ttlMs <= 0) return;
+      await getProvider().set(keyFor(key), data, ttlMs);
+    },
+
+    get: async (key) => getProvider().get(keyFor(key)),
+
+    delete: async (key) => getProvider().delete(keyFor(key)),
+  };
+};
+
+module.exports = {
+  createOtpStore,
+  getProvider,
+  getUnsharedOtpStoreReason,
+};
@@ -0,0 +1,45 @@
+/**
+ * Memory OTP Provider
+ * Keeps OTPs in this process only (single-process deployments and dev).
+ * Entries expire through a heap-scheduled timer, no periodic full scans.
+ */
+
+const { createExpiringMap } = require('../../../utils/expiringMap.utils');
+
+const store = createExpiringMap();
+
+const memoryOtpProvider = {
+  name: 'memory',
+
+  /**
+   * Store a value with a TTL
+   * @param {string} key - Namespaced key
+   * @param {Object} value - OTP payload
+   * @param {number} ttlMs - Time to live in milliseconds
+   * @returns {Promise<void>}
+   */
+  set: async (key, value, ttlMs) => {
+    store.set(key, value, ttlMs);
+  },
+
+  /**
+   * Get a stored value
+   * @param {string} key - Namespaced key
+   * @returns {Promise<Object|null>}
+   */
+  get: async (key) => {
+    const value = store.get(key);
+    return value === undefined ? null : value;
+  },
+
+  /**
+   * Delete a stored value
+   * @param {string} key - Namespaced key
+   * @returns {Promise<void>}
+   */
+  delete: async (key) => {
+    store.delete(key);
+  }
+};
+
+module.exports = memoryOtpProvider;
@@ -0,0 +1,75 @@
+/**
+ * Redis OTP Provider
+ * Stores OTPs in Redis so any worker process can verify an OTP that was
+ * sent by another one. Expiry is delegated to Redis (PX on SET).
+ *
+ * A real Redis server is required. Without REDIS_URL (or when it cannot be
+ * reached) config/redis hands out its in-process stand-in, which would make
+ * this store silently per-process, so every operation fails with
+ * OTP_STORE_UNAVAILABLE instead (logged once).
+ */
+
+const { getRedisClient } = require('../../../config/redis');
+
+let unavailableLogged = false;
+
+/**
+ * Get the Redis client, refusing the in-process stand-in
+ * @returns {Promise<Object>}
+ * @throws {Error} With code OTP_STORE_UNAVAILABLE when no real Redis is connected
+ */
+const getSharedClient = async () => {
+  const client = await getRedisClient();
+  if (!client.isLocal) return client;
+
+  const message = 'OTP_STORE_PROVIDER=redis needs a reachable Redis server (REDIS_URL); OTPs cannot be stored';
+  if (!unavailableLogged) {
+    unavailableLogged = true;
+    console.error(`❌ ${message}`);
+  }
+  throw Object.assign(new Error(message), { code: 'OTP_STORE_UNAVAILABLE' });
+};
+
+const redisOtpProvider = {
+  name: 'redis',
+
+  /**
+   * Store a value with a TTL
+   * @param {string} key - Namespaced key
+   * @param {Object} value - OTP payload (JSON serialisable)
+   * @param {number} ttlMs - Time to live in milliseconds
+   * @returns {Promise<void>}
+   */
+  set: async (key, value, ttlMs) => {
+    const client = await getSharedClient();
+    await client.set(key, JSON.stringify(value), { PX: Math.max(1, Math.round(ttlMs)) });
+  },
+
+  /**
+   * Get a stored value
+   * @param {string} key - Namespaced key
+   * @returns {Promise<Object|null>}
+   */
+  get: async (key) => {
+    const client = await getSharedClient();
+    const raw = await client.get(key);
+    if (!raw) return null;
+    try {
+      return JSON.parse(raw);
+    } catch (error) {
+      return null;
+    }
+  },
+
+  /**
+   * Delete a stored value
+   * @param {string} key - Namespaced key
+   * @returns {Promise<void>}
+   */
+  delete: async (key) => {
+    const client = await getSharedClient();
+    await client.del(key);
+  }
+};
+
+module.exports = redisOtpProvider;
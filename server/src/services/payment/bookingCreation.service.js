@@ -13,12 +13,12 @@
  * - Input validation
  */
 
-const { PrismaClient, PaymentStatus, BookingStatus } = require('@prisma/client');
+const { PaymentStatus, BookingStatus } = require('@prisma/client');
 const Razorpay = require('razorpay');
 const { toDateOnly, buildDateRange, formatISODate } = require('../../utils/date.utils');
 const { releaseOrderHolds, convertBlockedToBooked, getBlockedAvailability } = require('./roomAvailability.service');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 // PRODUCTION: Validate Razorpay credentials
 const RAZORPAY_KEY_ID = process.env.RAZORPAY_KEY_ID;
@@ -129,6 +129,7 @@ const verifyPaymentWithRazorpay = async (razorpayPaymentId, requestId = null) =>
  * @param {string} paymentDetails.razorpayPaymentId - Razorpay payment ID (optional, but recommended)
  * @param {string} paymentDetails.paymentMethod - Payment method ('razorpay' or 'payment_link', default: 'razorpay')
  * @param {string} paymentDetails.requestId - Request ID for logging (optional, will generate if not provided)
+ * @param {object} paymentDetails.verifiedPayment - Captured payment the caller already fetched from Razorpay (optional, skips re-verification)
  * @param {object} tx - Prisma transaction client (REQUIRED - must be passed from $transaction)
  * @returns {Promise<{booking: object, bookingNumber: string, alreadyProcessed: boolean}>}
  * @throws {Error} If booking creation fails
@@ -149,7 +150,7 @@ const createBookingFromOrder = async (orderId, paymentDetails, tx) => {
   }
 
   // PRODUCTION: Validate payment method
-  const { razorpayPaymentId, paymentMethod = 'razorpay' } = paymentDetails || {};
+  const { razorpayPaymentId, paymentMethod = 'razorpay', verifiedPayment } = paymentDetails || {};
   const validPaymentMethods = ['razorpay', 'payment_link'];
   if (!validPaymentMethods.includes(paymentMethod)) {
     console.error(`[${requestId}] Validation failed: Invalid payment method`, { paymentMethod });
@@ -309,7 +310,14 @@ const createBookingFromOrder = async (orderId, paymentDetails, tx) => {
   // 6. Verify payment with Razorpay API (CRITICAL for production)
   // PRODUCTION: This fetches payment from Razorpay to verify it exists and is captured
   // Prevents creating bookings for failed/authorized/pending payments
-  if (razorpayPaymentId) {
+  // Skipped when the caller has just fetched the captured payment itself
+  // (payment reconciliation), so the gateway is not asked twice
+  const alreadyVerified = verifiedPayment?.id === razorpayPaymentId && verifiedPayment?.status === 'captured';
+  if (razorpayPaymentId && alreadyVerified) {
+    console.log(`[${requestId}] Payment already verified by caller`, {
+      paymentId: razorpayPaymentId.substring(0, 10) + '...',
+    });
+  } else if (razorpayPaymentId) {
     try {
       await verifyPaymentWithRazorpay(razorpayPaymentId, requestId);
     } catch (error) {
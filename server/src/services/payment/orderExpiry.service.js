@@ -0,0 +1,236 @@
+/**
+ * Order Expiry Sweeper
+ * Moves PENDING orders past their expiry to EXPIRED and releases their
+ * room holds, so abandoned checkouts stop holding inventory and the order
+ * status tells the truth.
+ *
+ * Orders are swept in chunks of ORDER_EXPIRY_BATCH_SIZE, each in one
+ * transaction of two bulk statements however many orders it holds:
+ * - order.updateMany: PENDING -> EXPIRED for the chunk
+ * - availability.deleteMany (releaseOrderHolds): the chunk's blocked holds,
+ *   narrowed to the orders' rooms so the pricing calendar only drops the
+ *   affected properties
+ *
+ * Idempotent and safe to run on several nodes at once: the update only
+ * touches rows still PENDING, and only `blocked` holds are deleted - an
+ * order that was paid in the meantime has had its holds converted to
+ * `booked`. A node that loses the race simply expires fewer orders.
+ *
+ * ORDER_EXPIRY_GRACE_MS keeps an order PENDING for a while after expiry so
+ * a payment captured right at the deadline can still become a booking.
+ * Before a chunk is expired, the gateway is asked for every candidate's
+ * payments (ORDER_EXPIRY_GATEWAY_CONCURRENCY requests in flight). Orders
+ * with a captured or in-progress payment, or whose lookup failed, are left
+ * PENDING: payment reconciliation turns a captured payment into a booking,
+ * which it can no longer do once the order is closed and its rooms are
+ * released. Orders with a webhook still waiting in the inbox (pending,
+ * processing or failed and backing off) are left alone too, until it has
+ * been handled - it may be the payment.captured that books the order.
+ *
+ * Configuration (environment):
+ * - ORDER_EXPIRY_INTERVAL_MS: how often the leader sweeps (default: 60s, 0 disables)
+ * - ORDER_EXPIRY_BATCH_SIZE: orders expired per statement (default: 500)
+ * - ORDER_EXPIRY_GRACE_MS: time past expiresAt before an order is swept (default: 2 min)
+ * - ORDER_EXPIRY_GATEWAY_CONCURRENCY: payment lookups in flight per sweep (default: 4)
+ */
+
+const prisma = require('../../config/prisma');
+const razorpayGateway = require('./razorpayGateway.service');
+const { releaseOrderHolds } = require('./roomAvailability.service');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const { counter } = require('../../utils/metrics.utils');
+const logger = require('../../utils/logger.utils').child('orders');
+
+const BATCH_SIZE = parseInt(process.env.ORDER_EXPIRY_BATCH_SIZE || '500', 10);
+const GRACE_MS = parseInt(process.env.ORDER_EXPIRY_GRACE_MS || String(2 * 60 * 1000), 10);
+const GATEWAY_CONCURRENCY = parseInt(process.env.ORDER_EXPIRY_GATEWAY_CONCURRENCY || '4', 10);
+// Chunks per sweep; anything left over is picked up by the next sweep
+const MAX_BATCHES = 20;
+
+const expiredCounter = counter({
+  name: 'orders_expired_total',
+  help: 'PENDING orders moved to EXPIRED by the expiry sweeper',
+});
+
+const releasedCounter = counter({
+  name: 'order_expiry_holds_released_total',
+  help: 'Room holds released by the order expiry sweeper',
+});
+
+const deferredCounter = counter({
+  name: 'order_expiry_deferred_total',
+  help: 'Expired orders left PENDING for a payment or a webhook still being handled',
+  labelNames: ['reason'],
+});
+
+// Inbox statuses of a webhook that has not been handled yet (see webhookInbox.service)
+const UNHANDLED_WEBHOOK_STATUSES = ['pending', 'processing', 'failed'];
+// Gateway payment statuses that may still become (or already are) a booking
+const UNSETTLED_PAYMENT_STATUSES = ['created', 'authorized', 'captured'];
+
+const gatewayPool = createWorkPool({ name: 'order-expiry-gateway', concurrency: GATEWAY_CONCURRENCY });
+
+const collectRoomIds = (orders) => {
+  const roomIdsByOrder = orders.map((order) =>
+    (order.roomSelections || []).flatMap((selection) => (Array.isArray(selection.roomIds) ? selection.roomIds : []))
+  );
+  // Only narrow by room when every order lists its rooms, so no hold is missed
+  return roomIdsByOrder.every((roomIds) => roomIds.length) ? [...new Set(roomIdsByOrder.flat())] : [];
+};
+
+/**
+ * Razorpay order IDs (among `razorpayOrderIds`) with an unhandled webhook in the inbox
+ * @returns {Promise<Set<string>>}
+ */
+const findOrdersWithUnhandledWebhooks = async (razorpayOrderIds, tx = prisma) => {
+  if (!razorpayOrderIds.length) return new Set();
+  const events = await tx.webhookEvent.findMany({
+    where: { orderingKey: { in: razorpayOrderIds }, status: { in: UNHANDLED_WEBHOOK_STATUSES } },
+    distinct: ['orderingKey'],
+    select: { orderingKey: true },
+  });
+  return new Set(events.map((event) => event.orderingKey));
+};
+
+/**
+ * IDs of orders (among `orders`) the gateway has a live payment for
+ * A failed lookup counts as live: the order is retried on the next sweep.
+ * @returns {Promise<Set<string>>}
+ */
+const findOrdersWithGatewayPayments = async (orders, gateway) => {
+  const results = await gatewayPool.mapSettled(orders, (order) => gateway.fetchOrderPayments(order.razorpayOrderId));
+  const live = new Set();
+  results.forEach((result, index) => {
+    const order = orders[index];
+    if (result.status === 'rejected') {
+      logger.warn('Payment lookup failed, order left PENDING', { orderId: order.id, err: result.reason });
+      live.add(order.id);
+    } else if (result.value.some((payment) => UNSETTLED_PAYMENT_STATUSES.includes(payment.status))) {
+      live.add(order.id);
+    }
+  });
+  return live;
+};
+
+/**
+ * Expire PENDING orders past their expiry (plus grace) and release their holds
+ * @param {Object} [options]
+ * @param {Date} [options.now]
+ * @param {number} [options.batchSize]
+ * @param {Object} [options.gateway] - { fetchOrderPayments } (default: Razorpay API)
+ * @returns {Promise<{batches: number, expired: number, released: number, deferred: number}>}
+ */
+const expireStaleOrders = async ({ now = new Date(), batchSize = BATCH_SIZE, gateway = razorpayGateway } = {}) => {
+  const cutoff = new Date(now.getTime() - GRACE_MS);
+  const summary = { batches: 0, expired: 0, released: 0, deferred: 0 };
+  // Keyset position, so deferred orders are not fetched again in this sweep
+  let cursor = null;
+
+  while (summary.batches < MAX_BATCHES) {
+    const orders = await prisma.order.findMany({
+      where: {
+        status: 'PENDING',
+        isDeleted: false,
+        expiresAt: { lte: cutoff },
+        ...(cursor && {
+          OR: [
+            { expiresAt: { gt: cursor.expiresAt } },
+            { expiresAt: cursor.expiresAt, id: { gt: cursor.id } },
+          ],
+        }),
+      },
+      orderBy: [{ expiresAt: 'asc' }, { id: 'asc' }],
+      take: batchSize,
+      select: {
+        id: true,
+        razorpayOrderId: true,
+        expiresAt: true,
+        roomSelections: { select: { roomIds: true } },
+      },
+    });
+    if (!orders.length) break;
+    cursor = orders[orders.length - 1];
+
+    // Network calls stay outside the transaction
+    const paid = await findOrdersWithGatewayPayments(orders, gateway);
+    const unpaid = orders.filter((order) => !paid.has(order.id));
+
+    const result = await prisma.$transaction(async (tx) => {
+      // Checked in the transaction, right before the update, to keep the
+      // window for a webhook arriving in between as small as possible
+      const awaitingWebhook = await findOrdersWithUnhandledWebhooks(
+        unpaid.map((order) => order.razorpayOrderId).filter(Boolean),
+        tx
+      );
+      const expirable = unpaid.filter((order) => !awaitingWebhook.has(order.razorpayOrderId));
+      const deferred = { payment: paid.size, webhook: unpaid.length - expirable.length };
+      if (!expirable.length) return { expired: 0, released: 0, deferred };
+
+      const orderIds = expirable.map((order) => order.id);
+      const roomIds = collectRoomIds(expirable);
+      const expired = await tx.order.updateMany({
+        where: { id: { in: orderIds }, status: 'PENDING' },
+        data: { status: 'EXPIRED' },
+      });
+      const released = expired.count ? await releaseOrderHolds(orderIds, tx, { roomIds }) : 0;
+      return { expired: expired.count, released, deferred };
+    });
+
+    summary.batches += 1;
+    summary.expired += result.expired;
+    summary.released += result.released;
+    summary.deferred += result.deferred.payment + result.deferred.webhook;
+    expiredCounter.inc({}, result.expired);
+    releasedCounter.inc({}, result.released);
+    deferredCounter.inc({ reason: 'payment' }, result.deferred.payment);
+    deferredCounter.inc({ reason: 'webhook' }, result.deferred.webhook);
+
+    if (orders.length < batchSize) break;
+  }
+
+  return summary;
+};
+
+/**
+ * Periodic expiry sweeper (start on the cluster leader)
+ * @param {Object} [options]
+ * @param {Object} [options.gateway] - Passed to expireStaleOrders
+ */
+const createOrderExpirySweeper = ({ gateway } = {}) => {
+  let timer = null;
+  let running = false;
+
+  const runSweep = async () => {
+    if (running) return;
+    running = true;
+    try {
+      const summary = await expireStaleOrders({ gateway });
+      if (summary.expired || summary.deferred) logger.info('Expired stale orders', summary);
+    } catch (error) {
+      logger.error('Order expiry sweep failed', error);
+    } finally {
+      running = false;
+    }
+  };
+
+  const start = (intervalMs = parseInt(process.env.ORDER_EXPIRY_INTERVAL_MS || '60000', 10)) => {
+    if (timer || !intervalMs) return null;
+    timer = setInterval(runSweep, intervalMs);
+    timer.unref();
+    return timer;
+  };
+
+  const stop = () => {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
+    }
+  };
+
+  return { start, stop, runSweep };
+};
+
+module.exports = {
+  expireStaleOrders,
+  createOrderExpirySweeper,
+};
@@ -0,0 +1,312 @@
+/**
+ * Payment Reconciliation
+ * Recovers orders whose payment webhook never arrived. Left alone such an
+ * order stays PENDING (holding its rooms) until it expires, even though
+ * the guest may have paid.
+ *
+ * Each run scans, in pages:
+ * - PENDING orders older than PAYMENT_RECONCILE_MIN_AGE_MS (younger ones
+ *   are still in checkout) whose expiry is within the lookback window
+ * - orders closed as EXPIRED/FAILED since the previous run, to catch a
+ *   payment captured after the order was closed
+ *
+ * and asks the gateway for each order's payments through a bounded work
+ * pool (PAYMENT_RECONCILE_CONCURRENCY requests in flight). Per order:
+ * - captured payment, order PENDING -> booking created through
+ *   createBookingFromOrder (same path and idempotency checks as the
+ *   webhook), then the onFinalized callback (notifications)
+ * - captured payment, order closed -> logged for a refund or a manual
+ *   booking; the rooms may have been resold
+ * - payment still in progress (created/authorized) -> left alone
+ * - nothing captured and the order has expired -> closed as FAILED (a
+ *   payment failed) or EXPIRED, and its holds are released
+ *
+ * Runs on the cluster leader only; a run is skipped while the previous one
+ * is still going.
+ *
+ * Metrics: payment_reconcile_orders_total{outcome},
+ * payment_reconcile_run_seconds, payment_reconcile_throughput (orders/s of
+ * the last run), payment_reconcile_lag_seconds (payment captured -> booking
+ * created by reconciliation), payment_reconcile_last_run_timestamp_seconds.
+ *
+ * Configuration (environment):
+ * - PAYMENT_RECONCILE_INTERVAL_MS: how often the leader runs it (default: 5 min, 0 disables)
+ * - PAYMENT_RECONCILE_CONCURRENCY: gateway requests in flight (default: 4)
+ * - PAYMENT_RECONCILE_PAGE_SIZE: orders read per page (default: 100)
+ * - PAYMENT_RECONCILE_MIN_AGE_MS: leave orders younger than this to checkout (default: 5 min)
+ * - PAYMENT_RECONCILE_LOOKBACK_MS: how long after expiry a PENDING order is still reconciled (default: 24h)
+ */
+
+const prisma = require('../../config/prisma');
+const razorpayGateway = require('./razorpayGateway.service');
+const { createBookingFromOrder } = require('./bookingCreation.service');
+const { releaseOrderHolds } = require('./roomAvailability.service');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const { counter, gauge, histogram } = require('../../utils/metrics.utils');
+const logger = require('../../utils/logger.utils').child('reconcile');
+
+const CONCURRENCY = parseInt(process.env.PAYMENT_RECONCILE_CONCURRENCY || '4', 10);
+const PAGE_SIZE = parseInt(process.env.PAYMENT_RECONCILE_PAGE_SIZE || '100', 10);
+const MIN_AGE_MS = parseInt(process.env.PAYMENT_RECONCILE_MIN_AGE_MS || String(5 * 60 * 1000), 10);
+const LOOKBACK_MS = parseInt(process.env.PAYMENT_RECONCILE_LOOKBACK_MS || String(24 * 60 * 60 * 1000), 10);
+
+const IN_PROGRESS_STATUSES = ['created', 'authorized'];
+
+const orderSelect = {
+  id: true,
+  razorpayOrderId: true,
+  status: true,
+  amount: true,
+  paymentMethod: true,
+  expiresAt: true,
+};
+
+const lastRun = {
+  ordersPerSecond: 0,
+  finishedAt: 0,
+};
+
+const ordersCounter = counter({
+  name: 'payment_reconcile_orders_total',
+  help: 'Orders checked by payment reconciliation by outcome',
+  labelNames: ['outcome'],
+});
+
+const runHistogram = histogram({
+  name: 'payment_reconcile_run_seconds',
+  help: 'Payment reconciliation run duration',
+  buckets: [1, 5, 15, 30, 60, 120, 300, 600],
+});
+
+const lagHistogram = histogram({
+  name: 'payment_reconcile_lag_seconds',
+  help: 'Time from payment capture to booking creation by reconciliation',
+  buckets: [60, 300, 900, 1800, 3600, 7200, 21600, 86400],
+});
+
+gauge({
+  name: 'payment_reconcile_throughput',
+  help: 'Orders reconciled per second in the last run',
+  collect: (set) => set({}, lastRun.ordersPerSecond),
+});
+
+gauge({
+  name: 'payment_reconcile_last_run_timestamp_seconds',
+  help: 'When the last payment reconciliation run finished',
+  collect: (set) => set({}, lastRun.finishedAt / 1000),
+});
+
+const pool = createWorkPool({ name: 'payment-reconcile', concurrency: CONCURRENCY });
+
+const generateRequestId = () => `RC-${Date.now()}-${Math.random().toString(36).substr(2, 9)}`;
+
+/**
+ * Close an unpaid expired order and release its holds
+ * @returns {Promise<number|null>} Holds released, null when the order was no longer PENDING
+ */
+const closeUnpaidOrder = (order, status) =>
+  prisma.$transaction(async (tx) => {
+    const closed = await tx.order.updateMany({
+      where: { id: order.id, status: 'PENDING' },
+      data: { status },
+    });
+    if (closed.count === 0) return null;
+    return releaseOrderHolds(order.id, tx);
+  });
+
+/**
+ * Reconcile one order against the gateway
+ * @returns {Promise<string>} Outcome
+ */
+const reconcileOrder = async (order, { gateway, onFinalized, now, lags }) => {
+  const requestId = generateRequestId();
+  const payments = await gateway.fetchOrderPayments(order.razorpayOrderId);
+  const captured = payments.find((payment) => payment.status === 'captured');
+
+  if (captured) {
+    if (order.status !== 'PENDING') {
+      logger.warn('Payment captured for a closed order - needs a refund or manual booking', {
+        orderId: order.id,
+        orderStatus: order.status,
+        paymentId: captured.id,
+        amount: captured.amount,
+      });
+      return 'captured_after_close';
+    }
+
+    if (captured.amount !== order.amount) {
+      logger.warn('Captured amount does not match order - left for review', {
+        orderId: order.id,
+        paymentId: captured.id,
+        captured: captured.amount,
+        expected: order.amount,
+      });
+      return 'amount_mismatch';
+    }
+
+    const result = await prisma.$transaction((tx) =>
+      createBookingFromOrder(
+        order.id,
+        {
+          razorpayPaymentId: captured.id,
+          paymentMethod: order.paymentMethod === 'payment_link' ? 'payment_link' : 'razorpay',
+          requestId,
+          verifiedPayment: captured,
+        },
+        tx
+      )
+    );
+    if (result.alreadyProcessed) return 'already_processed';
+
+    if (captured.createdAt) {
+      const lagSeconds = (Date.now() - captured.createdAt.getTime()) / 1000;
+      lagHistogram.observe({}, lagSeconds);
+      lags.push(lagSeconds);
+    }
+    logger.info('Booking created from reconciled payment', {
+      orderId: order.id,
+      bookingNumber: result.bookingNumber,
+      paymentId: captured.id,
+    });
+    if (onFinalized) await onFinalized(order.id, result.booking, requestId);
+    return 'finalized';
+  }
+
+  if (order.status !== 'PENDING') return 'unchanged';
+  if (payments.some((payment) => IN_PROGRESS_STATUSES.includes(payment.status))) return 'in_progress';
+  if (order.expiresAt > now) return 'unchanged';
+
+  const status = payments.some((payment) => payment.status === 'failed') ? 'FAILED' : 'EXPIRED';
+  const released = await closeUnpaidOrder(order, status);
+  if (released === null) return 'unchanged';
+
+  logger.info('Closed unpaid expired order', { orderId: order.id, status, released });
+  return 'released';
+};
+
+/**
+ * Run one reconciliation pass
+ * @param {Object} [options]
+ * @param {Object} [options.gateway] - { fetchOrderPayments } (default: Razorpay API)
+ * @param {Function} [options.onFinalized] - (orderId, booking, requestId) after a booking is created
+ * @param {Date} [options.closedSince] - Also check orders closed since then (default: lookback window)
+ * @param {Date} [options.now]
+ * @returns {Promise<{scanned: number, outcomes: Object, durationMs: number, ordersPerSecond: number,
+ *   lagSeconds: {max: number, avg: number}|null}>} lagSeconds covers the bookings created
+ */
+const reconcilePayments = async ({
+  gateway = razorpayGateway,
+  onFinalized = null,
+  closedSince,
+  now = new Date(),
+} = {}) => {
+  const stopTimer = runHistogram.startTimer();
+  const outcomes = {};
+  const lags = [];
+  let scanned = 0;
+  let lastId = null;
+
+  const where = {
+    isDeleted: false,
+    OR: [
+      {
+        status: 'PENDING',
+        createdAt: { lte: new Date(now.getTime() - MIN_AGE_MS) },
+        expiresAt: { gte: new Date(now.getTime() - LOOKBACK_MS) },
+      },
+      {
+        status: { in: ['EXPIRED', 'FAILED'] },
+        updatedAt: { gte: closedSince || new Date(now.getTime() - LOOKBACK_MS) },
+      },
+    ],
+  };
+
+  for (;;) {
+    const orders = await prisma.order.findMany({
+      where: lastId ? { ...where, id: { gt: lastId } } : where,
+      orderBy: { id: 'asc' },
+      take: PAGE_SIZE,
+      select: orderSelect,
+    });
+    if (!orders.length) break;
+    lastId = orders[orders.length - 1].id;
+    scanned += orders.length;
+
+    const results = await pool.mapSettled(orders, (order) => reconcileOrder(order, { gateway, onFinalized, now, lags }));
+    results.forEach((result, index) => {
+      const outcome = result.status === 'fulfilled' ? result.value : 'error';
+      if (result.status === 'rejected') {
+        logger.warn('Order reconciliation failed', { orderId: orders[index].id, err: result.reason });
+      }
+      outcomes[outcome] = (outcomes[outcome] || 0) + 1;
+      ordersCounter.inc({ outcome });
+    });
+
+    if (orders.length < PAGE_SIZE) break;
+  }
+
+  const durationMs = stopTimer() * 1000;
+  const ordersPerSecond = durationMs > 0 ? (scanned / durationMs) * 1000 : 0;
+  lastRun.ordersPerSecond = ordersPerSecond;
+  lastRun.finishedAt = Date.now();
+
+  return {
+    scanned,
+    outcomes,
+    durationMs,
+    ordersPerSecond,
+    lagSeconds: lags.length
+      ? { max: Math.max(...lags), avg: lags.reduce((sum, lag) => sum + lag, 0) / lags.length }
+      : null,
+  };
+};
+
+/**
+ * Periodic reconciliation runner (start on the cluster leader only)
+ * @param {Object} [options]
+ * @param {Object} [options.gateway] - Passed to reconcilePayments
+ * @param {Function} [options.onFinalized] - Passed to reconcilePayments
+ */
+const createPaymentReconciler = ({ gateway, onFinalized } = {}) => {
+  let timer = null;
+  let running = false;
+  let closedSince = null;
+
+  const runOnce = async () => {
+    if (running) return null;
+    running = true;
+    const startedAt = new Date();
+    try {
+      const summary = await reconcilePayments({ gateway, onFinalized, closedSince: closedSince || undefined });
+      closedSince = startedAt;
+      logger.info('Payment reconciliation completed', summary);
+      return summary;
+    } catch (error) {
+      logger.error('Payment reconciliation failed', error);
+      return null;
+    } finally {
+      running = false;
+    }
+  };
+
+  const start = (intervalMs = parseInt(process.env.PAYMENT_RECONCILE_INTERVAL_MS || String(5 * 60 * 1000), 10)) => {
+    if (timer || !intervalMs) return null;
+    timer = setInterval(runOnce, intervalMs);
+    timer.unref();
+    return timer;
+  };
+
+  const stop = () => {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
+    }
+  };
+
+  return { start, stop, runOnce };
+};
+
+module.exports = {
+  reconcilePayments,
+  createPaymentReconciler,
+};
@@ -0,0 +1,115 @@
+/**
+ * Razorpay Gateway Client
+ * Thin client for the Razorpay REST API: payment reconciliation looks up
+ * the payments made against an order, and order creation goes through it
+ * when RAZORPAY_API_BASE_URL is set (see payment.controller).
+ *
+ * It talks plain HTTP (global fetch) rather than going through the SDK so
+ * the base URL can be pointed at a local mock gateway
+ * (scripts/mockRazorpayGateway.js) for development and load testing.
+ *
+ * Payments are normalized to { id, status, amount, currency, method, createdAt }
+ * with amount in paise and createdAt as a Date.
+ *
+ * Configuration (environment):
+ * - RAZORPAY_KEY_ID / RAZORPAY_KEY_SECRET: API credentials (basic auth)
+ * - RAZORPAY_API_BASE_URL: API root (default: https://api.razorpay.com/v1)
+ * - RAZORPAY_API_TIMEOUT_MS: per-request timeout (default: 10000)
+ */
+
+const { histogram } = require('../../utils/metrics.utils');
+
+const BASE_URL = (process.env.RAZORPAY_API_BASE_URL || 'https://api.razorpay.com/v1').replace(/\/+$/, '');
+const TIMEOUT_MS = parseInt(process.env.RAZORPAY_API_TIMEOUT_MS || '10000', 10);
+
+const requestDuration = histogram({
+  name: 'razorpay_api_request_seconds',
+  help: 'Razorpay API request duration',
+  labelNames: ['operation', 'outcome'],
+  buckets: [0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10],
+});
+
+const authHeader = () =>
+  `Basic ${Buffer.from(`${process.env.RAZORPAY_KEY_ID || ''}:${process.env.RAZORPAY_KEY_SECRET || ''}`).toString('base64')}`;
+
+/**
+ * Call a Razorpay API path (GET, or POST with a JSON body)
+ * @throws {Error} With `status` and Razorpay's error `code` for non-2xx responses
+ */
+const requestJson = async (operation, path, body) => {
+  const stopTimer = requestDuration.startTimer({ operation });
+  let outcome = 'error';
+
+  try {
+    const response = await fetch(`${BASE_URL}${path}`, {
+      method: body ? 'POST' : 'GET',
+      headers: {
+        Authorization: authHeader(),
+        Accept: 'application/json',
+        ...(body ? { 'Content-Type': 'application/json' } : {}),
+      },
+      body: body ? JSON.stringify(body) : undefined,
+      signal: AbortSignal.timeout(TIMEOUT_MS),
+    });
+    const payload = await response.json().catch(() => null);
+
+    if (!response.ok) {
+      outcome = String(response.status);
+      throw Object.assign(
+        new Error(`Razorpay ${operation} failed (${response.status}): ${payload?.error?.description || response.statusText}`),
+        { status: response.status, code: payload?.error?.code }
+      );
+    }
+
+    outcome = 'ok';
+    return payload;
+  } finally {
+    stopTimer({ outcome });
+  }
+};
+
+const toDate = (unixSeconds) => (unixSeconds ? new Date(unixSeconds * 1000) : null);
+
+/**
+ * Payments made against a Razorpay order
+ * Legacy payment-link orders stored the link ID (plink_...) instead of the
+ * order ID; those are looked up through the payment link.
+ * @param {string} razorpayOrderId - order_... (or legacy plink_...)
+ * @returns {Promise<Array<{id: string, status: string, amount: number, currency: string, method: string|null, createdAt: Date|null}>>}
+ */
+const fetchOrderPayments = async (razorpayOrderId) => {
+  if (razorpayOrderId.startsWith('plink_')) {
+    const link = await requestJson('payment_link.fetch', `/payment_links/${encodeURIComponent(razorpayOrderId)}`);
+    return (link?.payments || []).map((payment) => ({
+      id: payment.payment_id,
+      status: payment.status,
+      amount: Number(payment.amount),
+      currency: link.currency,
+      method: payment.method || null,
+      createdAt: toDate(payment.created_at),
+    }));
+  }
+
+  const collection = await requestJson('order.payments', `/orders/${encodeURIComponent(razorpayOrderId)}/payments`);
+  return (collection?.items || []).map((payment) => ({
+    id: payment.id,
+    status: payment.status,
+    amount: Number(payment.amount),
+    currency: payment.currency,
+    method: payment.method || null,
+    createdAt: toDate(payment.created_at),
+  }));
+};
+
+/**
+ * Create a Razorpay order
+ * Same request and response as the SDK's orders.create.
+ * @param {Object} options - { amount (paise), currency, receipt, notes }
+ * @returns {Promise<Object>} Razorpay order ({ id, amount, currency, receipt, status, ... })
+ */
+const createOrder = (options) => requestJson('order.create', '/orders', options);
+
+module.exports = {
+  fetchOrderPayments,
+  createOrder,
+};
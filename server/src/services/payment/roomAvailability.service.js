@@ -3,36 +3,42 @@
  * Handles room blocking, releasing, and status management
  */
 
-const { PrismaClient } = require('@prisma/client');
 
-const prisma = new PrismaClient();
+const prisma = require('../../config/prisma');
 
 /**
  * Release holds for an order (delete or mark as deleted)
- * @param {string} orderId - Order ID
+ * Several orders can be released in one statement by passing an array.
+ * @param {string|string[]} orderId - Order ID (or IDs)
  * @param {object} tx - Prisma transaction client (optional)
+ * @param {object} options - Optional
+ * @param {string[]} options.roomIds - Rooms the holds are on; narrows the delete so the
+ *   pricing calendar only invalidates those rooms' properties
  * @returns {Promise<number>} - Number of holds released
  */
-const releaseOrderHolds = async (orderId, tx = prisma) => {
-  if (!orderId) {
+const releaseOrderHolds = async (orderId, tx = prisma, { roomIds = [] } = {}) => {
+  const orderIds = (Array.isArray(orderId) ? orderId : [orderId]).filter(Boolean);
+  if (orderIds.length === 0) {
     console.warn('⚠️ releaseOrderHolds called without orderId');
     return 0;
   }
+  const label = orderIds.length === 1 ? `order ${orderIds[0]}` : `${orderIds.length} orders`;
 
   try {
-    // Delete blocked availability records for this order
+    // Delete blocked availability records for these orders
     const result = await tx.availability.deleteMany({
       where: {
-        blockedBy: orderId,
+        blockedBy: orderIds.length === 1 ? orderIds[0] : { in: orderIds },
+        ...(roomIds.length > 0 && { roomId: { in: roomIds } }),
         status: 'blocked',
         isDeleted: false,
       },
     });
 
-    console.log(`✅ Released ${result.count} hold(s) for order ${orderId}`);
+    console.log(`✅ Released ${result.count} hold(s) for ${label}`);
     return result.count;
   } catch (error) {
-    console.error(`❌ Error releasing holds for order ${orderId}:`, error);
+    console.error(`❌ Error releasing holds for ${label}:`, error);
     throw error;
   }
 };
@@ -0,0 +1,398 @@
+/**
+ * Webhook Inbox
+ * Durable inbox for Razorpay webhooks: the HTTP handler stores each
+ * verified event and acknowledges it straight away; booking creation,
+ * hold release and notifications happen afterwards in a worker.
+ *
+ * - Receiving is one INSERT, so a burst of payment.captured events no
+ *   longer ties up request workers and DB connections. An event is only
+ *   acknowledged once stored - if the insert fails Razorpay gets a 5xx and
+ *   redelivers. Redeliveries of a stored event (same x-razorpay-event-id)
+ *   are acknowledged without storing a duplicate.
+ * - The processor runs on the cluster leader only. It polls for due
+ *   events that are at the head of their key and runs them through a
+ *   bounded work pool.
+ * - Events sharing an ordering key (the Razorpay order ID, or the payment
+ *   link / payment ID when there is none) are processed strictly in
+ *   arrival order: an event only runs once every earlier event for its key
+ *   has been processed or given up on (dead). An event being processed -
+ *   here or on another node - holds back the rest of its key. Different
+ *   keys run in parallel.
+ * - An event left `processing` by a node that died mid-way is handed back
+ *   once it has not been touched for WEBHOOK_INBOX_PROCESSING_TIMEOUT_MS;
+ *   events still being worked on elsewhere are never reset.
+ * - Failures are retried with exponential backoff (plus jitter) until
+ *   WEBHOOK_INBOX_MAX_ATTEMPTS, then parked as `dead` for investigation.
+ *   Handlers are idempotent (bookingCreation and the hold release check
+ *   order status), so a retry after a partial failure is safe.
+ *
+ * Metrics: webhook_inbox_events{status} (depth), webhook_inbox_oldest_due_seconds,
+ * webhook_inbox_lag_seconds (received -> processed) and
+ * webhook_inbox_processed_total{event,outcome}.
+ *
+ * Configuration (environment):
+ * - WEBHOOK_INBOX_CONCURRENCY: events processed at once (default: 4)
+ * - WEBHOOK_INBOX_POLL_INTERVAL_MS: how often the leader looks for due events (default: 1000)
+ * - WEBHOOK_INBOX_MAX_ATTEMPTS: attempts before an event is parked as dead (default: 8)
+ * - WEBHOOK_INBOX_RETRY_BASE_MS: first retry delay, doubled per attempt (default: 5000)
+ * - WEBHOOK_INBOX_RETRY_MAX_MS: longest retry delay (default: 30 min)
+ * - WEBHOOK_INBOX_RETENTION_MS: processed events kept for auditing (default: 7 days)
+ * - WEBHOOK_INBOX_PROCESSING_TIMEOUT_MS: time after which a `processing` event is
+ *   considered abandoned and retried (default: 10 min)
+ */
+
+const { Prisma } = require('@prisma/client');
+const prisma = require('../../config/prisma');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const { counter, gauge, histogram } = require('../../utils/metrics.utils');
+const logger = require('../../utils/logger.utils').child('webhook');
+
+const CONCURRENCY = parseInt(process.env.WEBHOOK_INBOX_CONCURRENCY || '4', 10);
+const POLL_INTERVAL_MS = parseInt(process.env.WEBHOOK_INBOX_POLL_INTERVAL_MS || '1000', 10);
+const MAX_ATTEMPTS = parseInt(process.env.WEBHOOK_INBOX_MAX_ATTEMPTS || '8', 10);
+const RETRY_BASE_MS = parseInt(process.env.WEBHOOK_INBOX_RETRY_BASE_MS || '5000', 10);
+const RETRY_MAX_MS = parseInt(process.env.WEBHOOK_INBOX_RETRY_MAX_MS || String(30 * 60 * 1000), 10);
+const RETENTION_MS = parseInt(process.env.WEBHOOK_INBOX_RETENTION_MS || String(7 * 24 * 60 * 60 * 1000), 10);
+const PROCESSING_TIMEOUT_MS = parseInt(process.env.WEBHOOK_INBOX_PROCESSING_TIMEOUT_MS || String(10 * 60 * 1000), 10);
+const STATS_INTERVAL_MS = 15000;
+
+const PROVIDER = 'razorpay';
+// Statuses reported as inbox depth (processed events are history)
+const DEPTH_STATUSES = ['pending', 'processing', 'failed', 'dead'];
+// Statuses that still have to run
+const RUNNABLE = ['pending', 'failed'];
+// Statuses that hold back later events for their key (running or still to run)
+const BLOCKING = ['pending', 'processing', 'failed'];
+
+const inboxStats = {
+  counts: {},
+  oldestDueSeconds: 0,
+};
+
+gauge({
+  name: 'webhook_inbox_events',
+  help: 'Unprocessed webhook inbox events by status (refreshed by the processing leader)',
+  labelNames: ['status'],
+  collect: (set) => {
+    DEPTH_STATUSES.forEach((status) => set({ status }, inboxStats.counts[status] || 0));
+  },
+});
+
+gauge({
+  name: 'webhook_inbox_oldest_due_seconds',
+  help: 'Age of the oldest webhook event waiting to be processed',
+  collect: (set) => set({}, inboxStats.oldestDueSeconds),
+});
+
+const lagHistogram = histogram({
+  name: 'webhook_inbox_lag_seconds',
+  help: 'Time from webhook receipt to successful processing',
+  labelNames: ['event'],
+  buckets: [0.1, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 1800],
+});
+
+const processedCounter = counter({
+  name: 'webhook_inbox_processed_total',
+  help: 'Webhook inbox processing attempts by outcome',
+  labelNames: ['event', 'outcome'],
+});
+
+// Processor running in this process (leader only), nudged on new events
+let activeProcessor = null;
+
+/**
+ * Ordering key for a Razorpay event
+ * A payment link's payments carry the link's order ID, so the link and its
+ * payment events share one key.
+ * @param {object} eventData - Parsed webhook body
+ * @returns {string}
+ */
+const getOrderingKey = (eventData) => {
+  const { payment, payment_link: paymentLink } = eventData?.payload || {};
+  return (
+    payment?.entity?.order_id ||
+    paymentLink?.entity?.order_id ||
+    paymentLink?.entity?.id ||
+    payment?.entity?.id ||
+    'unkeyed'
+  );
+};
+
+/**
+ * Store a verified webhook event
+ * @param {object} options
+ * @param {string|null} options.eventId - Provider delivery ID (x-razorpay-event-id)
+ * @param {string} options.event - Event type
+ * @param {object} options.payload - Parsed webhook body
+ * @returns {Promise<{id: string|null, duplicate: boolean}>}
+ * @throws When the event could not be stored (do not acknowledge it)
+ */
+const enqueueWebhookEvent = async ({ eventId, event, payload }) => {
+  try {
+    const row = await prisma.webhookEvent.create({
+      data: {
+        provider: PROVIDER,
+        eventId: eventId || null,
+        event,
+        orderingKey: getOrderingKey(payload),
+        payload,
+      },
+      select: { id: true },
+    });
+
+    if (activeProcessor) activeProcessor.nudge();
+    return { id: row.id, duplicate: false };
+  } catch (error) {
+    // Unique (provider, eventId): Razorpay redelivered an event we already have
+    if (error.code === 'P2002' && eventId) {
+      return { id: null, duplicate: true };
+    }
+    throw error;
+  }
+};
+
+/**
+ * Delay before the next attempt: base * 2^(attempt-1), capped, +-20% jitter
+ */
+const retryDelayMs = (attempt) => {
+  const delay = Math.min(RETRY_MAX_MS, RETRY_BASE_MS * 2 ** (attempt - 1));
+  return Math.round(delay * (0.8 + Math.random() * 0.4));
+};
+
+/**
+ * Create the inbox processor (start on the cluster leader only)
+ * @param {object} options
+ * @param {Function} options.handleEvent - (eventData, requestId) => Promise<object>
+ * @param {number} [options.concurrency]
+ * @param {number} [options.pollIntervalMs]
+ */
+const createWebhookInboxProcessor = ({
+  handleEvent,
+  concurrency = CONCURRENCY,
+  pollIntervalMs = POLL_INTERVAL_MS,
+}) => {
+  const pool = createWorkPool({ name: 'webhook-inbox', concurrency });
+  // Ordering keys with an event in flight - nothing else for them is dispatched
+  const inFlightKeys = new Set();
+  let running = false;
+  let polling = false;
+  let pollAgain = false;
+  let pollTimer = null;
+  let statsTimer = null;
+
+  const processEvent = async (row) => {
+    const claimed = await prisma.webhookEvent.updateMany({
+      where: { id: row.id, status: { in: RUNNABLE } },
+      data: { status: 'processing', attempts: { increment: 1 } },
+    });
+    if (!claimed.count) return;
+
+    const attempt = row.attempts + 1;
+    const requestId = `WH-${row.id}`;
+
+    try {
+      const result = await handleEvent(row.payload, requestId);
+      const processedAt = new Date();
+
+      await prisma.webhookEvent.update({
+        where: { id: row.id },
+        data: { status: 'processed', processedAt, lastError: null, ...(result && { result }) },
+      });
+
+      lagHistogram.observe({ event: row.event }, (processedAt.getTime() - row.receivedAt.getTime()) / 1000);
+      processedCounter.inc({ event: row.event, outcome: 'processed' });
+    } catch (error) {
+      const dead = attempt >= MAX_ATTEMPTS;
+
+      await prisma.webhookEvent.update({
+        where: { id: row.id },
+        data: {
+          status: dead ? 'dead' : 'failed',
+          lastError: String(error.message || error).slice(0, 2000),
+          nextAttemptAt: new Date(Date.now() + retryDelayMs(attempt)),
+        },
+      });
+
+      processedCounter.inc({ event: row.event, outcome: dead ? 'dead' : 'retry' });
+      logger[dead ? 'error' : 'warn'](dead ? 'Webhook event parked as dead' : 'Webhook event failed, will retry', {
+        inboxId: row.id,
+        event: row.event,
+        orderingKey: row.orderingKey,
+        attempt,
+        err: error,
+      });
+    }
+  };
+
+  const dispatch = (row) => {
+    inFlightKeys.add(row.orderingKey);
+    pool
+      .run(() => processEvent(row))
+      .catch((error) => {
+        // Inbox bookkeeping failed (DB unavailable) - the event stays runnable
+        logger.error('Webhook inbox processing error', { inboxId: row.id, err: error });
+      })
+      .finally(() => {
+        inFlightKeys.delete(row.orderingKey);
+        // The next event for this key may be waiting on this one
+        nudge();
+      });
+  };
+
+  const poll = async () => {
+    const free = concurrency - pool.getStats().active - pool.getStats().queued;
+    if (free <= 0) return;
+
+    // Due events that are the earliest unfinished event of their key: one
+    // may only run once nothing earlier for its key is pending, backing off
+    // or being processed by another node. Keys held back that way are
+    // filtered out in the query, so they never fill the window and starve
+    // the keys behind them.
+    const busyKeys = [...inFlightKeys];
+    const heads = await prisma.$queryRaw`
+      SELECT w.id
+      FROM webhook_events w
+      WHERE w.status IN (${Prisma.join(RUNNABLE)})
+        AND w.nextAttemptAt <= ${new Date()}
+        ${busyKeys.length ? Prisma.sql`AND w.orderingKey NOT IN (${Prisma.join(busyKeys)})` : Prisma.empty}
+        AND NOT EXISTS (
+          SELECT 1
+          FROM webhook_events e
+          WHERE e.orderingKey = w.orderingKey
+            AND e.status IN (${Prisma.join(BLOCKING)})
+            AND (e.receivedAt < w.receivedAt OR (e.receivedAt = w.receivedAt AND e.id < w.id))
+        )
+      ORDER BY w.receivedAt ASC, w.id ASC
+      LIMIT ${free}
+    `;
+    if (!heads.length) return;
+
+    const rows = await prisma.webhookEvent.findMany({
+      where: { id: { in: heads.map((head) => head.id) } },
+      orderBy: [{ receivedAt: 'asc' }, { id: 'asc' }],
+      select: { id: true, event: true, orderingKey: true, payload: true, attempts: true, receivedAt: true },
+    });
+
+    rows.filter((row) => !inFlightKeys.has(row.orderingKey)).forEach(dispatch);
+  };
+
+  const loop = async () => {
+    pollTimer = null;
+    if (!running) return;
+
+    polling = true;
+    try {
+      await poll();
+    } catch (error) {
+      logger.error('Webhook inbox poll failed', error);
+    } finally {
+      polling = false;
+    }
+
+    if (!running) return;
+    if (pollAgain) {
+      pollAgain = false;
+      setImmediate(loop);
+    } else {
+      pollTimer = setTimeout(loop, pollIntervalMs);
+      pollTimer.unref();
+    }
+  };
+
+  /**
+   * Poll as soon as possible (new event stored, or a key became free)
+   */
+  function nudge() {
+    if (!running) return;
+    if (polling) {
+      pollAgain = true;
+      return;
+    }
+    if (pollTimer) {
+      clearTimeout(pollTimer);
+      pollTimer = null;
+      setImmediate(loop);
+    }
+  }
+
+  /**
+   * Hand back events left `processing` by a node that stopped mid-way
+   * Only rows untouched for PROCESSING_TIMEOUT_MS: a fresh `processing` row
+   * may belong to another node's leader that is still working on it.
+   */
+  const recoverAbandoned = async () => {
+    const recovered = await prisma.webhookEvent.updateMany({
+      where: { status: 'processing', updatedAt: { lt: new Date(Date.now() - PROCESSING_TIMEOUT_MS) } },
+      data: { status: 'failed', nextAttemptAt: new Date(), lastError: 'Processing abandoned (timed out)' },
+    });
+    if (recovered.count) {
+      logger.warn('Recovered abandoned webhook events', { count: recovered.count });
+      nudge();
+    }
+  };
+
+  const refreshStats = async () => {
+    try {
+      await recoverAbandoned();
+
+      const [groups, oldestDue] = await Promise.all([
+        prisma.webhookEvent.groupBy({
+          by: ['status'],
+          where: { status: { not: 'processed' } },
+          _count: { _all: true },
+        }),
+        prisma.webhookEvent.findFirst({
+          where: { status: { in: RUNNABLE }, nextAttemptAt: { lte: new Date() } },
+          orderBy: { receivedAt: 'asc' },
+          select: { receivedAt: true },
+        }),
+      ]);
+
+      inboxStats.counts = Object.fromEntries(groups.map((group) => [group.status, group._count._all]));
+      inboxStats.oldestDueSeconds = oldestDue ? (Date.now() - oldestDue.receivedAt.getTime()) / 1000 : 0;
+
+      if (RETENTION_MS > 0) {
+        await prisma.webhookEvent.deleteMany({
+          where: { status: 'processed', processedAt: { lt: new Date(Date.now() - RETENTION_MS) } },
+        });
+      }
+    } catch (error) {
+      logger.warn('Webhook inbox stats refresh failed', { err: error });
+    }
+  };
+
+  const start = async () => {
+    if (running) return;
+    running = true;
+    activeProcessor = api;
+
+    // Abandoned events are recovered by refreshStats (now and on every stats tick)
+    statsTimer = setInterval(refreshStats, STATS_INTERVAL_MS);
+    statsTimer.unref();
+    refreshStats();
+    setImmediate(loop);
+    logger.info('Webhook inbox processor started', { concurrency, pollIntervalMs });
+  };
+
+  const stop = () => {
+    running = false;
+    if (activeProcessor === api) activeProcessor = null;
+    if (pollTimer) {
+      clearTimeout(pollTimer);
+      pollTimer = null;
+    }
+    if (statsTimer) {
+      clearInterval(statsTimer);
+      statsTimer = null;
+    }
+  };
+
+  const api = { start, stop, nudge, refreshStats };
+  return api;
+};
+
+module.exports = {
+  getOrderingKey,
+  enqueueWebhookEvent,
+  createWebhookInboxProcessor,
+};
@@ -0,0 +1,116 @@
+/**
+ * Agent Pricing Context
+ * Resolves whether the caller is an approved travel agent and which
+ * property discounts apply to them.
+ *
+ * An agent's active discounts are loaded in one query into a per-agent map
+ * and served from memory, so listing, search, the pricing calendar and the
+ * booking page all apply discounts without querying
+ * travelAgentPropertyDiscount again for every request.
+ *
+ * Any code that changes an agent's discounts must call
+ * invalidateAgentDiscounts(agentId), which drops the map in every worker
+ * and host through the invalidation bus (utils/invalidationBus.utils).
+ * While the bus cannot reach other hosts, maps are kept for
+ * AGENT_DISCOUNT_CACHE_FALLBACK_TTL_MS only. Approval status comes from the
+ * principal cache (utils/principalCache.utils).
+ *
+ * Configuration (environment):
+ * - AGENT_DISCOUNT_CACHE_TTL_MS: per-agent map lifetime (default: 5 min)
+ * - AGENT_DISCOUNT_CACHE_FALLBACK_TTL_MS: lifetime while invalidations may be missed (default: 15s)
+ * - AGENT_DISCOUNT_CACHE_MAX_ENTRIES: agents kept in memory (default: 2000)
+ */
+
+const prisma = require('../../config/prisma');
+const { getApprovedAgent } = require('../../utils/principalCache.utils');
+const { createTtlCache } = require('../../utils/ttlCache.utils');
+const { createInvalidationChannel, isInvalidationDegraded } = require('../../utils/invalidationBus.utils');
+const { runOnPrimary } = require('../../utils/readRouting.utils');
+const logger = require('../../utils/logger.utils').child('pricing');
+
+const discountCache = createTtlCache({
+  name: 'agent-discounts',
+  ttlMs: parseInt(process.env.AGENT_DISCOUNT_CACHE_TTL_MS || String(5 * 60 * 1000), 10),
+  maxEntries: parseInt(process.env.AGENT_DISCOUNT_CACHE_MAX_ENTRIES || '2000', 10),
+});
+const FALLBACK_TTL_MS = parseInt(process.env.AGENT_DISCOUNT_CACHE_FALLBACK_TTL_MS || '15000', 10);
+
+const invalidationChannel = createInvalidationChannel('agent-discounts', {
+  handler: ({ agentId }) => discountCache.delete(agentId),
+  resync: () => discountCache.clear(),
+});
+
+const loadAgentDiscounts = async (agentId) => {
+  const discounts = await prisma.travelAgentPropertyDiscount.findMany({
+    where: { agentId, isDeleted: false, isActive: true },
+    select: { propertyId: true, discountType: true, discountValue: true },
+  });
+
+  return new Map(
+    discounts.map((discount) => [
+      discount.propertyId,
+      { type: discount.discountType, value: Number(discount.discountValue) },
+    ])
+  );
+};
+
+/**
+ * Get the pricing context for the requesting user
+ * Returns null for anyone who is not an approved agent. Lookup failures are
+ * logged and treated as "no agent pricing" so pages still render.
+ * @param {Object} [user] - req.user
+ * @returns {Promise<{agentId: string, discountFor: Function, discountsFor: Function}|null>}
+ */
+const getAgentPricingContext = async (user) => {
+  if (user?.role !== 'agent' || !user?.id) {
+    return null;
+  }
+
+  try {
+    const agent = await getApprovedAgent(user.id);
+    if (!agent) {
+      logger.debug('Agent not found or not approved', { agentId: user.id });
+      return null;
+    }
+
+    const discounts = await discountCache.getOrLoad(
+      agent.id,
+      () => runOnPrimary(() => loadAgentDiscounts(agent.id)),
+      isInvalidationDegraded() ? FALLBACK_TTL_MS : undefined
+    );
+
+    return {
+      agentId: agent.id,
+      /**
+       * @param {string} propertyId
+       * @returns {{type: string, value: number}|null}
+       */
+      discountFor: (propertyId) => discounts.get(propertyId) || null,
+      /**
+       * Discounts for a set of properties, in the order given
+       * @param {string[]} propertyIds
+       * @returns {Map<string, {type: string, value: number}>}
+       */
+      discountsFor: (propertyIds) =>
+        new Map(propertyIds.filter((id) => discounts.has(id)).map((id) => [id, discounts.get(id)])),
+    };
+  } catch (error) {
+    logger.error('Error resolving agent pricing context', { agentId: user.id, err: error });
+    return null;
+  }
+};
+
+/**
+ * Drop an agent's cached discounts in every process after they changed
+ * @param {string} agentId
+ * @returns {Promise<void>}
+ */
+const invalidateAgentDiscounts = (agentId) => {
+  if (!agentId) return Promise.resolve();
+  return invalidationChannel.publish({ agentId });
+};
+
+module.exports = {
+  getAgentPricingContext,
+  invalidateAgentDiscounts,
+};
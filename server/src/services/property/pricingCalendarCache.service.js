@@ -0,0 +1,435 @@
+/**
+ * Pricing Calendar Cache
+ * Month buckets of the booking calendar served by getPropertyPricing:
+ * rooms available and the lowest room price for every day of one
+ * (property, month). The calendar asks for one or two months at a time,
+ * so a request is answered from at most a couple of buckets instead of
+ * re-reading rate plan dates, meal-plan pricing, rooms and availability.
+ *
+ * Buckets hold the base (undiscounted) calendar only; agent discounts are
+ * applied per request by applyAgentDiscount().
+ *
+ * Invalidation:
+ * - rate plan dates and meal-plan prices: the host controllers call
+ *   invalidatePricingCalendar() with the property and, where known, the dates
+ * - availability, rooms and room types: a Prisma query hook drops the buckets
+ *   of the properties (and months) a write touches. Writes that cannot be
+ *   traced to a property (e.g. releasing holds by order id) drop every bucket.
+ * Hook invalidations run before the writing transaction commits, so they are
+ * repeated after PRICING_CALENDAR_REINVALIDATE_MS to drop any bucket reloaded
+ * from the old rows in between.
+ * Every invalidation is published on the invalidation bus
+ * (utils/invalidationBus.utils), so the other workers and hosts drop the same
+ * buckets. While the bus cannot reach other hosts, buckets are kept for
+ * PRICING_CALENDAR_CACHE_FALLBACK_TTL_MS only.
+ *
+ * Configuration (environment):
+ * - PRICING_CALENDAR_CACHE_TTL_MS: bucket lifetime (default: 5 min)
+ * - PRICING_CALENDAR_CACHE_FALLBACK_TTL_MS: bucket lifetime while invalidations may be missed (default: 15s)
+ * - PRICING_CALENDAR_CACHE_MAX_ENTRIES: buckets kept in memory (default: 2000)
+ * - PRICING_CALENDAR_REINVALIDATE_MS: delay of the repeated invalidation (default: 5s)
+ * - PRICING_CALENDAR_MAX_MONTHS: longest range one request may ask for (default: 12).
+ *   Each month is a bucket of 4 queries, so an unbounded range would let one
+ *   request run thousands of queries and flush the cache.
+ */
+
+const prisma = require('../../config/prisma');
+const { registerQueryHook } = require('../../../prisma/middleware/middleware');
+const { createTtlCache } = require('../../utils/ttlCache.utils');
+const { createInvalidationChannel, isInvalidationDegraded } = require('../../utils/invalidationBus.utils');
+const { runOnPrimary } = require('../../utils/readRouting.utils');
+const { weakEtag } = require('../../utils/etag.utils');
+const logger = require('../../utils/logger.utils').child('pricing');
+
+const REINVALIDATE_MS = parseInt(process.env.PRICING_CALENDAR_REINVALIDATE_MS || '5000', 10);
+const FALLBACK_TTL_MS = parseInt(process.env.PRICING_CALENDAR_CACHE_FALLBACK_TTL_MS || '15000', 10);
+const MAX_MONTHS = parseInt(process.env.PRICING_CALENDAR_MAX_MONTHS || '12', 10);
+const INVALID_RANGE_CODE = 'INVALID_CALENDAR_RANGE';
+
+const calendarCache = createTtlCache({
+  name: 'pricing-calendar',
+  ttlMs: parseInt(process.env.PRICING_CALENDAR_CACHE_TTL_MS || String(5 * 60 * 1000), 10),
+  maxEntries: parseInt(process.env.PRICING_CALENDAR_CACHE_MAX_ENTRIES || '2000', 10),
+});
+
+// Rooms and room types never move between properties
+const roomPropertyCache = createTtlCache({ name: 'room-property', ttlMs: 60 * 60 * 1000, maxEntries: 20000 });
+const roomTypePropertyCache = createTtlCache({ name: 'room-type-property', ttlMs: 60 * 60 * 1000, maxEntries: 5000 });
+
+const UNAVAILABLE_STATUSES = ['booked', 'maintenance', 'blocked'];
+const WRITE_ACTIONS = new Set([
+  'create',
+  'createMany',
+  'createManyAndReturn',
+  'update',
+  'updateMany',
+  'updateManyAndReturn',
+  'upsert',
+  'delete',
+  'deleteMany',
+]);
+
+const pad = (value) => String(value).padStart(2, '0');
+
+// YYYY-MM-DD in UTC
+const toDateKey = (date) => `${date.getUTCFullYear()}-${pad(date.getUTCMonth() + 1)}-${pad(date.getUTCDate())}`;
+
+// YYYY-MM in UTC
+const toMonthKey = (date) => `${date.getUTCFullYear()}-${pad(date.getUTCMonth() + 1)}`;
+
+const bucketKey = (propertyId, monthKey) => `${propertyId}|${monthKey}`;
+
+/**
+ * Load and compute one month of the base calendar
+ * @returns {Promise<{version: string, days: Object<string, {totalAvailableRooms: number, minimumPrice: number|null}>}>}
+ */
+const loadMonthBucket = async (propertyId, year, month) => {
+  const monthStart = new Date(Date.UTC(year, month, 1, 0, 0, 0, 0));
+  const monthEnd = new Date(Date.UTC(year, month + 1, 0, 23, 59, 59, 999));
+  const dateRange = { gte: monthStart, lte: monthEnd };
+
+  const [ratePlanDates, roomTypes, unavailable] = await Promise.all([
+    prisma.ratePlanDate.findMany({
+      where: { propertyId, isDeleted: false, isActive: true, date: dateRange },
+      select: { id: true, date: true, ratePlanId: true, updatedAt: true },
+      orderBy: { date: 'asc' },
+    }),
+    prisma.propertyRoomType.findMany({
+      where: { propertyId, isDeleted: false, isActive: true },
+      select: {
+        id: true,
+        updatedAt: true,
+        rooms: { where: { isDeleted: false }, select: { id: true, updatedAt: true } },
+      },
+    }),
+    prisma.availability.findMany({
+      where: {
+        room: { propertyRoomType: { propertyId } },
+        date: dateRange,
+        isDeleted: false,
+        status: { in: UNAVAILABLE_STATUSES },
+      },
+      select: {
+        id: true,
+        date: true,
+        updatedAt: true,
+        room: { select: { propertyRoomTypeId: true } },
+      },
+    }),
+  ]);
+
+  const ratePlanIds = [...new Set(ratePlanDates.map((rpd) => rpd.ratePlanId))];
+  const ratePlans = ratePlanIds.length
+    ? await prisma.ratePlan.findMany({
+        where: { id: { in: ratePlanIds }, isDeleted: false, isActive: true },
+        select: {
+          id: true,
+          updatedAt: true,
+          roomTypeMealPlanPricing: {
+            where: { isDeleted: false, isActive: true },
+            select: {
+              id: true,
+              updatedAt: true,
+              propertyRoomTypeId: true,
+              doubleOccupancyPrice: true,
+              singleOccupancyPrice: true,
+              groupOccupancyPrice: true,
+            },
+          },
+        },
+      })
+    : [];
+
+  // Lowest occupancy price per (rate plan, room type) - the first pricing row
+  // of a room type in a plan is the one the calendar has always shown
+  const minPriceByPlan = new Map();
+  ratePlans.forEach((ratePlan) => {
+    const byRoomType = new Map();
+    ratePlan.roomTypeMealPlanPricing.forEach((pricing) => {
+      if (byRoomType.has(pricing.propertyRoomTypeId)) return;
+      const prices = [pricing.doubleOccupancyPrice, pricing.singleOccupancyPrice, pricing.groupOccupancyPrice]
+        .filter((price) => price && price > 0);
+      byRoomType.set(pricing.propertyRoomTypeId, prices.length > 0 ? Math.min(...prices) : null);
+    });
+    minPriceByPlan.set(ratePlan.id, byRoomType);
+  });
+
+  const planByDate = new Map();
+  ratePlanDates.forEach((rpd) => {
+    const dateKey = toDateKey(new Date(rpd.date));
+    if (!planByDate.has(dateKey)) planByDate.set(dateKey, rpd.ratePlanId);
+  });
+
+  // dateKey -> roomTypeId -> unavailable room count
+  const unavailableByDate = new Map();
+  unavailable.forEach((record) => {
+    const dateKey = toDateKey(new Date(record.date));
+    let byRoomType = unavailableByDate.get(dateKey);
+    if (!byRoomType) {
+      byRoomType = new Map();
+      unavailableByDate.set(dateKey, byRoomType);
+    }
+    const roomTypeId = record.room.propertyRoomTypeId;
+    byRoomType.set(roomTypeId, (byRoomType.get(roomTypeId) || 0) + 1);
+  });
+
+  const days = {};
+  const daysInMonth = new Date(Date.UTC(year, month + 1, 0)).getUTCDate();
+  for (let day = 1; day <= daysInMonth; day += 1) {
+    const dateKey = `${year}-${pad(month + 1)}-${pad(day)}`;
+    const blockedByRoomType = unavailableByDate.get(dateKey);
+    const planPrices = minPriceByPlan.get(planByDate.get(dateKey));
+
+    let totalAvailableRooms = 0;
+    let minimumPrice = null;
+    roomTypes.forEach((roomType) => {
+      const blocked = blockedByRoomType?.get(roomType.id) || 0;
+      totalAvailableRooms += Math.max(0, roomType.rooms.length - blocked);
+
+      const price = planPrices?.get(roomType.id);
+      if (price && (minimumPrice === null || price < minimumPrice)) {
+        minimumPrice = price;
+      }
+    });
+
+    days[dateKey] = { totalAvailableRooms, minimumPrice };
+  }
+
+  return {
+    version: weakEtag('pricing-month', propertyId, year, month, ratePlanDates, ratePlans, roomTypes, unavailable),
+    days,
+  };
+};
+
+/**
+ * Base calendar for a date range, assembled from cached month buckets
+ * @param {string} propertyId
+ * @param {Date} startDate - First day (UTC)
+ * @param {Date} endDate - Last day (UTC, inclusive)
+ * @returns {Promise<{versions: string[], days: Object<string, {totalAvailableRooms, minimumPrice}>}>}
+ * @throws {Error} With code INVALID_CALENDAR_RANGE for an invalid, reversed or too long range
+ */
+const getPricingCalendar = async (propertyId, startDate, endDate) => {
+  const rangeError = (message) => Object.assign(new Error(message), { code: INVALID_RANGE_CODE });
+  if (Number.isNaN(startDate.getTime()) || Number.isNaN(endDate.getTime())) {
+    throw rangeError('Invalid date range');
+  }
+
+  const first = new Date(Date.UTC(startDate.getUTCFullYear(), startDate.getUTCMonth(), startDate.getUTCDate()));
+  const last = new Date(Date.UTC(endDate.getUTCFullYear(), endDate.getUTCMonth(), endDate.getUTCDate()));
+  if (last < first) throw rangeError('End date must not be before start date');
+
+  const monthCount =
+    (last.getUTCFullYear() - first.getUTCFullYear()) * 12 + (last.getUTCMonth() - first.getUTCMonth()) + 1;
+  if (monthCount > MAX_MONTHS) {
+    throw rangeError(`Date range spans ${monthCount} months; at most ${MAX_MONTHS} can be requested at once`);
+  }
+
+  const months = [];
+  for (
+    let cursor = new Date(Date.UTC(first.getUTCFullYear(), first.getUTCMonth(), 1));
+    cursor <= last;
+    cursor = new Date(Date.UTC(cursor.getUTCFullYear(), cursor.getUTCMonth() + 1, 1))
+  ) {
+    months.push({ year: cursor.getUTCFullYear(), month: cursor.getUTCMonth() });
+  }
+
+  const buckets = await Promise.all(
+    months.map(({ year, month }) =>
+      // Shared across requests, so filled from the primary even on replica-routed ones
+      calendarCache.getOrLoad(
+        bucketKey(propertyId, `${year}-${pad(month + 1)}`),
+        () => runOnPrimary(() => loadMonthBucket(propertyId, year, month)),
+        isInvalidationDegraded() ? FALLBACK_TTL_MS : undefined
+      )
+    )
+  );
+
+  const merged = Object.assign({}, ...buckets.map((bucket) => bucket.days));
+  const days = {};
+  for (let cursor = first; cursor <= last; cursor = new Date(cursor.getTime() + 86400000)) {
+    const dateKey = toDateKey(cursor);
+    days[dateKey] = merged[dateKey];
+  }
+
+  return { versions: buckets.map((bucket) => bucket.version), days };
+};
+
+/**
+ * Overlay an agent discount on a base calendar
+ * @param {Object} days - From getPricingCalendar()
+ * @param {{type: string, value: number}|null} agentDiscount
+ * @returns {Object<string, {totalAvailableRooms, minimumPrice, originalPrice, agentDiscount}>}
+ */
+const applyAgentDiscount = (days, agentDiscount) => {
+  const result = {};
+  Object.keys(days).forEach((dateKey) => {
+    const { totalAvailableRooms, minimumPrice } = days[dateKey];
+
+    let discountedPrice = null;
+    if (agentDiscount && minimumPrice) {
+      discountedPrice = agentDiscount.type === 'percentage'
+        ? minimumPrice * (1 - agentDiscount.value / 100)
+        : Math.max(0, minimumPrice - agentDiscount.value);
+      discountedPrice = Math.round(discountedPrice * 100) / 100;
+    }
+
+    result[dateKey] = {
+      totalAvailableRooms,
+      minimumPrice: discountedPrice || minimumPrice,
+      originalPrice: discountedPrice ? minimumPrice : null,
+      agentDiscount: discountedPrice ? { type: agentDiscount.type, value: agentDiscount.value } : null,
+    };
+  });
+  return result;
+};
+
+const dropBuckets = (propertyIds, monthKeys) => {
+  if (propertyIds === null) {
+    calendarCache.clear();
+    return;
+  }
+  if (monthKeys) {
+    propertyIds.forEach((propertyId) => monthKeys.forEach((monthKey) => calendarCache.delete(bucketKey(propertyId, monthKey))));
+    return;
+  }
+  calendarCache.deleteWhere((key) => propertyIds.has(key.slice(0, key.indexOf('|'))));
+};
+
+// Apply a published invalidation to this process
+const applyInvalidation = ({ propertyIds, monthKeys }) => {
+  const ids = propertyIds === null ? null : new Set(propertyIds);
+  const months = monthKeys ? new Set(monthKeys) : null;
+
+  dropBuckets(ids, months);
+  setTimeout(() => dropBuckets(ids, months), REINVALIDATE_MS).unref();
+};
+
+const invalidationChannel = createInvalidationChannel('pricing-calendar', {
+  handler: applyInvalidation,
+  resync: () => calendarCache.clear(),
+});
+
+/**
+ * Drop cached calendar months in every process
+ * @param {string|string[]|null} propertyIds - null drops every property
+ * @param {Array<Date|string>} [dates] - Only the months containing these dates (default: all months)
+ * @returns {Promise<void>}
+ */
+const invalidatePricingCalendar = (propertyIds, dates) => {
+  const ids = propertyIds === null
+    ? null
+    : [...new Set((Array.isArray(propertyIds) ? propertyIds : [propertyIds]).filter(Boolean))];
+  if (ids && ids.length === 0) return Promise.resolve();
+
+  let monthKeys = null;
+  if (dates && dates.length) {
+    const parsed = dates.map((date) => new Date(date));
+    if (parsed.every((date) => !Number.isNaN(date.getTime()))) {
+      monthKeys = [...new Set(parsed.map(toMonthKey))];
+    }
+  }
+
+  return invalidationChannel.publish({ propertyIds: ids, monthKeys });
+};
+
+// ---------------------------------------------------------------------------
+// Write tracking for availability, rooms and room types
+// ---------------------------------------------------------------------------
+
+// Values of `field` in a where/data clause: plain value or { in: [...] }
+const fieldValues = (clause, field) => {
+  const value = clause?.[field];
+  if (value === undefined || value === null) return [];
+  if (typeof value === 'object' && !(value instanceof Date)) {
+    return Array.isArray(value.in) ? value.in : [];
+  }
+  return [value];
+};
+
+const dataClauses = (args) => {
+  const data = args?.create || args?.data;
+  if (!data) return [];
+  return Array.isArray(data) ? data : [data];
+};
+
+// Months a write touches, or null when the write is not limited to known dates
+const touchedDates = (args) => {
+  const dates = [...fieldValues(args?.where, 'date'), ...dataClauses(args).flatMap((data) => fieldValues(data, 'date'))];
+  const range = args?.where?.date;
+  if (range && typeof range === 'object' && !(range instanceof Date) && !Array.isArray(range.in)) {
+    const from = range.gte || range.gt;
+    const to = range.lte || range.lt;
+    if (!from || !to) return null;
+    for (let cursor = new Date(from); cursor <= new Date(to); cursor = new Date(Date.UTC(cursor.getUTCFullYear(), cursor.getUTCMonth() + 1, 1))) {
+      dates.push(new Date(cursor));
+    }
+    dates.push(new Date(to));
+  }
+  return dates.length ? dates : null;
+};
+
+const lookupRoomProperty = (roomId) =>
+  roomPropertyCache.getOrLoad(roomId, async () => {
+    const room = await prisma.room.findUnique({
+      where: { id: roomId },
+      select: { propertyRoomType: { select: { propertyId: true } } },
+    });
+    return room ? room.propertyRoomType.propertyId : null;
+  });
+
+const lookupRoomTypeProperty = (propertyRoomTypeId) =>
+  roomTypePropertyCache.getOrLoad(propertyRoomTypeId, async () => {
+    const roomType = await prisma.propertyRoomType.findUnique({
+      where: { id: propertyRoomTypeId },
+      select: { propertyId: true },
+    });
+    return roomType ? roomType.propertyId : null;
+  });
+
+// Properties a write touches, or null when it cannot be traced from its arguments
+const resolveWriteProperties = async (model, args) => {
+  const clauses = [args?.where, ...dataClauses(args)];
+  const collect = (field) => [...new Set(clauses.flatMap((clause) => fieldValues(clause, field)))];
+
+  let propertyIds = [];
+  if (model === 'Availability') {
+    const roomIds = collect('roomId');
+    if (!roomIds.length) return null;
+    propertyIds = await Promise.all(roomIds.map(lookupRoomProperty));
+  } else if (model === 'Room') {
+    const roomTypeIds = collect('propertyRoomTypeId');
+    const roomIds = roomTypeIds.length ? [] : fieldValues(args?.where, 'id');
+    if (!roomTypeIds.length && !roomIds.length) return null;
+    propertyIds = await Promise.all([...roomTypeIds.map(lookupRoomTypeProperty), ...roomIds.map(lookupRoomProperty)]);
+  } else {
+    propertyIds = collect('propertyId');
+    if (!propertyIds.length) {
+      const roomTypeIds = fieldValues(args?.where, 'id');
+      if (!roomTypeIds.length) return null;
+      propertyIds = await Promise.all(roomTypeIds.map(lookupRoomTypeProperty));
+    }
+  }
+
+  return propertyIds.some((id) => !id) ? null : propertyIds;
+};
+
+registerQueryHook(({ model, action, args, error }) => {
+  if (error || !WRITE_ACTIONS.has(action)) return;
+  if (model !== 'Availability' && model !== 'Room' && model !== 'PropertyRoomType') return;
+
+  const dates = model === 'Availability' ? touchedDates(args) : null;
+  resolveWriteProperties(model, args)
+    .then((propertyIds) => invalidatePricingCalendar(propertyIds, dates))
+    .catch((err) => {
+      logger.warn('Pricing calendar invalidation lookup failed, clearing all', { model, action, err });
+      invalidatePricingCalendar(null);
+    });
+});
+
+module.exports = {
+  getPricingCalendar,
+  INVALID_RANGE_CODE,
+  applyAgentDiscount,
+  invalidatePricingCalendar,
+};
@@ -0,0 +1,441 @@
+/**
+ * Property Details Cache
+ * Cached, fully formatted property detail documents.
+ *
+ * The details page runs one very wide query (owner, type, media, amenities,
+ * facilities, safeties, latest reviews, special rates with their room type
+ * links and applications), but the result only changes when the property
+ * is edited. Documents are kept in an in-process LRU and, optionally, in
+ * the shared Redis backend so other processes and restarts start warm.
+ * Each document stores its ETag and the serialized response body, so a
+ * hit does no query, no transform and no JSON serialization.
+ *
+ * Any code that changes what the details page shows (property, media,
+ * room type, review or special rate writes) must call
+ * invalidatePropertyDetails(propertyId). Other processes' in-process
+ * copies expire after PROPERTY_DETAILS_CACHE_TTL_MS.
+ *
+ * Shared documents carry the property's generation, a Redis counter that
+ * every invalidation increments. A load records the generation before it
+ * queries and tags its document with it, so a document loaded before an
+ * invalidation but written after it carries an old generation and is
+ * ignored by readers instead of being served for the shared TTL.
+ *
+ * Configuration (environment):
+ * - PROPERTY_DETAILS_CACHE_TTL_MS: in-process entry lifetime (default: 60s)
+ * - PROPERTY_DETAILS_CACHE_MAX_ENTRIES: in-process LRU bound (default: 500)
+ * - PROPERTY_DETAILS_CACHE_SHARED: 'true' to also store documents in Redis (REDIS_URL)
+ * - PROPERTY_DETAILS_CACHE_SHARED_TTL_MS: shared entry lifetime (default: 30 min)
+ * - PROPERTY_DETAILS_WARM_COUNT: properties loaded by warmPropertyDetailsCache (default: 20)
+ */
+
+const prisma = require('../../config/prisma');
+const { getRedisClient } = require('../../config/redis');
+const { createTtlCache } = require('../../utils/ttlCache.utils');
+const { createWorkPool } = require('../../utils/workPool.utils');
+const { runOnPrimary } = require('../../utils/readRouting.utils');
+const { weakEtag } = require('../../utils/etag.utils');
+const logger = require('../../utils/logger.utils').child('cache');
+
+const LOCAL_TTL_MS = parseInt(process.env.PROPERTY_DETAILS_CACHE_TTL_MS || '60000', 10);
+const MAX_ENTRIES = parseInt(process.env.PROPERTY_DETAILS_CACHE_MAX_ENTRIES || '500', 10);
+const SHARED_ENABLED = process.env.PROPERTY_DETAILS_CACHE_SHARED === 'true';
+const SHARED_TTL_MS = parseInt(process.env.PROPERTY_DETAILS_CACHE_SHARED_TTL_MS || String(30 * 60 * 1000), 10);
+const WARM_COUNT = parseInt(process.env.PROPERTY_DETAILS_WARM_COUNT || '20', 10);
+
+// Views since start, used to pick what to warm; bounded so it cannot grow
+// with the number of properties ever requested
+const MAX_TRACKED_VIEWS = 5000;
+
+const detailsCache = createTtlCache({
+  name: 'property-details',
+  ttlMs: LOCAL_TTL_MS,
+  maxEntries: MAX_ENTRIES,
+});
+
+// Warm-up loads run a few at a time so they never crowd out live requests
+const warmPool = createWorkPool({ name: 'property-details-warm', concurrency: 4 });
+
+const sharedStats = { hits: 0, misses: 0, errors: 0 };
+const viewCounts = new Map();
+
+const sharedKey = (propertyId) => `property-details:${propertyId}`;
+const generationKey = (propertyId) => `property-details-gen:${propertyId}`;
+
+/**
+ * Run the details query and build the cached document
+ * @param {string} id - Property ID
+ * @returns {Promise<{etag: string, body: string}|null>} - null when the property is missing or inactive
+ */
+const loadPropertyDetailsDocument = async (id) => {
+  const property = await prisma.property.findUnique({
+    where: {
+      id,
+      isDeleted: false,
+      status: 'active'
+    },
+    select: {
+      id: true,
+      title: true,
+      description: true,
+      rulesAndPolicies: true,
+      status: true,
+      location: true,
+      avgRating: true,
+      reviewCount: true,
+      coverImage: true,
+      checkInTime: true,
+      checkOutTime: true,
+      createdAt: true,
+      updatedAt: true,
+
+      // Owner information
+      ownerHost: {
+        select: {
+          id: true,
+          firstName: true,
+          lastName: true,
+          email: true,
+          phone: true,
+          isVerified: true,
+          isActive: true,
+          updatedAt: true
+        }
+      },
+
+      // Property type
+      propertyType: {
+        select: { id: true, name: true }
+      },
+
+      // Media
+      media: {
+        where: { isDeleted: false },
+        orderBy: { order: 'asc' },
+        select: {
+          id: true,
+          url: true,
+          type: true,
+          isFeatured: true,
+          order: true,
+          width: true,
+          height: true,
+          variants: true,
+          updatedAt: true
+        },
+      },
+
+      // Amenities
+      amenities: {
+        where: { isDeleted: false },
+        select: {
+          updatedAt: true,
+          amenity: {
+            select: {
+              id: true,
+              name: true,
+              icon: true,
+              category: true,
+              isActive: true,
+              updatedAt: true
+            }
+          },
+        },
+      },
+
+      // Facilities
+      facilities: {
+        where: { isDeleted: false },
+        select: {
+          updatedAt: true,
+          facility: {
+            select: {
+              id: true,
+              name: true,
+              icon: true,
+              category: true,
+              isActive: true,
+              updatedAt: true
+            }
+          },
+        },
+      },
+
+      // Safety features
+      safeties: {
+        where: { isDeleted: false },
+        select: {
+          updatedAt: true,
+          safety: {
+            select: {
+              id: true,
+              name: true,
+              icon: true,
+              category: true,
+              isActive: true,
+              updatedAt: true
+            }
+          },
+        },
+      },
+
+      // Reviews
+      reviews: {
+        where: { isDeleted: false },
+        orderBy: { createdAt: 'desc' },
+        take: 10,
+        select: {
+          id: true,
+          rating: true,
+          description: true,
+          createdAt: true,
+          updatedAt: true,
+          user: {
+            select: {
+              id: true,
+              username: true,
+              firstname: true,
+              lastname: true,
+              profileImage: true,
+            },
+          },
+        },
+      },
+
+      // Special rates
+      specialRates: {
+        where: {
+          isDeleted: false,
+          isActive: true
+        },
+        select: {
+          id: true,
+          kind: true,
+          name: true,
+          pricingMode: true,
+          color: true,
+          flatPrice: true,
+          percentAdj: true,
+          createdAt: true,
+          updatedAt: true,
+          roomTypeLinks: {
+            where: { isActive: true },
+            select: {
+              id: true,
+              pricingMode: true,
+              flatPrice: true,
+              percentAdj: true,
+              propertyRoomType: {
+                select: {
+                  id: true,
+                  roomType: { select: { name: true } }
+                }
+              }
+            }
+          },
+          SpecialRateApplication: {
+            where: { isActive: true },
+            select: {
+              id: true,
+              dateFrom: true,
+              dateTo: true,
+              updatedAt: true,
+              propertyRoomType: {
+                select: {
+                  id: true,
+                  roomType: { select: { name: true } }
+                }
+              }
+            },
+            orderBy: { dateFrom: 'asc' }
+          }
+        },
+      },
+
+
+    }
+  });
+
+  if (!property) {
+    return null;
+  }
+
+  // Validator from every loaded row's updatedAt - repeat views get a 304
+  const etag = weakEtag('property-details', id, property);
+
+  // Transform and format the response
+  const formattedProperty = {
+    ...property,
+    // Flatten nested relationships
+    amenities: property.amenities.map(a => a.amenity),
+    facilities: property.facilities.map(f => f.facility),
+    safeties: property.safeties.map(s => s.safety),
+
+    // Add computed fields
+
+    totalAmenities: property.amenities.length,
+    totalFacilities: property.facilities.length,
+    totalSafetyFeatures: property.safeties.length,
+
+
+
+    // Add media summary
+    mediaSummary: {
+      total: property.media.length,
+      featured: property.media.filter(m => m.isFeatured).length,
+      images: property.media.filter(m => m.type === 'image').length,
+      videos: property.media.filter(m => m.type === 'video').length
+    }
+  };
+
+  return {
+    etag,
+    body: JSON.stringify({ success: true, data: formattedProperty }),
+  };
+};
+
+/**
+ * Read the shared document and the property's current generation
+ * @returns {Promise<{document: Object|null|undefined, generation: string|null}>} - document is
+ *   undefined on a miss; generation is null when Redis failed (do not write back then)
+ */
+const readShared = async (id) => {
+  try {
+    const client = await getRedisClient();
+    const [raw, storedGeneration] = await Promise.all([client.get(sharedKey(id)), client.get(generationKey(id))]);
+    const generation = storedGeneration || '0';
+    const entry = raw === null ? null : JSON.parse(raw);
+
+    // Missing, or loaded before the latest invalidation
+    if (!entry || entry.generation !== generation) {
+      sharedStats.misses += 1;
+      return { document: undefined, generation };
+    }
+    sharedStats.hits += 1;
+    return { document: entry.document, generation };
+  } catch (error) {
+    sharedStats.errors += 1;
+    logger.warn('Shared property details read failed', { propertyId: id, err: error });
+    return { document: undefined, generation: null };
+  }
+};
+
+const writeShared = async (id, document, generation) => {
+  try {
+    const client = await getRedisClient();
+    await client.set(sharedKey(id), JSON.stringify({ generation, document }), { PX: SHARED_TTL_MS });
+  } catch (error) {
+    sharedStats.errors += 1;
+    logger.warn('Shared property details write failed', { propertyId: id, err: error });
+  }
+};
+
+const trackView = (id) => {
+  viewCounts.set(id, (viewCounts.get(id) || 0) + 1);
+  if (viewCounts.size > MAX_TRACKED_VIEWS) {
+    // Drop the least viewed half
+    const sorted = [...viewCounts.entries()].sort((a, b) => b[1] - a[1]);
+    viewCounts.clear();
+    sorted.slice(0, MAX_TRACKED_VIEWS / 2).forEach(([key, count]) => viewCounts.set(key, count));
+  }
+};
+
+/**
+ * Get the details document for a property (cached)
+ * @param {string} id - Property ID
+ * @param {Object} [options]
+ * @param {boolean} [options.trackView=true] - Count this as a page view
+ * @returns {Promise<{etag: string, body: string}|null>}
+ */
+const getPropertyDetailsDocument = (id, { trackView: countView = true } = {}) => {
+  if (countView) trackView(id);
+
+  // Shared cache: always filled from the primary, even on replica-routed requests
+  return detailsCache.getOrLoad(id, () => runOnPrimary(async () => {
+    if (!SHARED_ENABLED) return loadPropertyDetailsDocument(id);
+
+    // The generation is read before the query, so an invalidation that
+    // lands while we load makes our (possibly stale) document unusable
+    const shared = await readShared(id);
+    if (shared.document !== undefined) return shared.document;
+
+    const document = await loadPropertyDetailsDocument(id);
+    if (shared.generation !== null) {
+      await writeShared(id, document, shared.generation);
+    }
+    return document;
+  }));
+};
+
+/**
+ * Drop cached details after a property (or anything shown with it) changed
+ * @param {string|string[]} propertyIds
+ * @returns {Promise<void>}
+ */
+const invalidatePropertyDetails = async (propertyIds) => {
+  const ids = (Array.isArray(propertyIds) ? propertyIds : [propertyIds]).filter(Boolean);
+  if (!ids.length) return;
+
+  ids.forEach((id) => detailsCache.delete(id));
+
+  if (SHARED_ENABLED) {
+    try {
+      const client = await getRedisClient();
+      // Bump first: a load already in flight must not be able to publish its document
+      await Promise.all(ids.map((id) => client.incrBy(generationKey(id), 1)));
+      await client.del(ids.map(sharedKey));
+    } catch (error) {
+      sharedStats.errors += 1;
+      logger.warn('Shared property details invalidation failed', { propertyIds: ids, err: error });
+    }
+  }
+};
+
+/**
+ * Load the most viewed properties into the cache
+ * Uses views seen by this process first, topped up with the best-reviewed
+ * active properties (so a fresh process warms something useful).
+ * @param {Object} [options]
+ * @param {number} [options.limit] - Number of properties to warm
+ * @returns {Promise<{warmed: number, failed: number}>}
+ */
+const warmPropertyDetailsCache = async ({ limit = WARM_COUNT } = {}) => {
+  if (limit <= 0) return { warmed: 0, failed: 0 };
+
+  const ids = [...viewCounts.entries()]
+    .sort((a, b) => b[1] - a[1])
+    .slice(0, limit)
+    .map(([id]) => id);
+
+  if (ids.length < limit) {
+    const popular = await prisma.property.findMany({
+      where: { isDeleted: false, status: 'active', id: { notIn: ids } },
+      orderBy: [{ reviewCount: 'desc' }, { avgRating: 'desc' }],
+      take: limit - ids.length,
+      select: { id: true },
+    });
+    ids.push(...popular.map((property) => property.id));
+  }
+
+  const results = await warmPool.mapSettled(ids, (id) => getPropertyDetailsDocument(id, { trackView: false }));
+  const failed = results.filter((result) => result.status === 'rejected').length;
+
+  logger.info('Property details cache warmed', { warmed: ids.length - failed, failed });
+  return { warmed: ids.length - failed, failed };
+};
+
+/**
+ * Cache statistics (in-process LRU plus shared backend counters)
+ */
+const getPropertyDetailsCacheStats = () => ({
+  ...detailsCache.getStats(),
+  shared: SHARED_ENABLED ? { ...sharedStats, ttlMs: SHARED_TTL_MS } : null,
+  trackedProperties: viewCounts.size,
+});
+
+module.exports = {
+  getPropertyDetailsDocument,
+  invalidatePropertyDetails,
+  warmPropertyDetailsCache,
+  getPropertyDetailsCacheStats,
+};
@@ -0,0 +1,120 @@
+/**
+ * Cancellation Refund Utilities
+ * Pure helpers shared by direct booking cancellation and admin approval of
+ * cancellation requests: refund evaluation against policy rules (days of
+ * notice counted in IST calendar days) and the rooms a booking holds.
+ *
+ * Everything here works on rows already in memory - no database access.
+ */
+
+const IST_OFFSET_MINUTES = 330;
+const DAY_IN_MS = 24 * 60 * 60 * 1000;
+
+const toIstMidnight = (date) => {
+  if (!(date instanceof Date) || Number.isNaN(date.getTime())) {
+    return null;
+  }
+  const utcMillis = date.getTime();
+  const istMillis = utcMillis + IST_OFFSET_MINUTES * 60 * 1000;
+  const dayStartMillis = Math.floor(istMillis / DAY_IN_MS) * DAY_IN_MS;
+  return new Date(dayStartMillis - IST_OFFSET_MINUTES * 60 * 1000);
+};
+
+const diffInCalendarDaysIst = (futureDate, baseDate) => {
+  const future = toIstMidnight(futureDate);
+  const base = toIstMidnight(baseDate);
+  if (!future || !base) return null;
+  const diff = future.getTime() - base.getTime();
+  return Math.floor(diff / DAY_IN_MS);
+};
+
+/**
+ * Normalize policy rules (snapshot JSON or CancellationPolicyRule rows)
+ * @param {Array<Object>} rules
+ * @returns {Array<{id: string, daysBefore: number, refundPercentage: number}>}
+ */
+const normalizeRules = (rules) =>
+  (Array.isArray(rules) ? rules : []).map((rule) => ({
+    id: rule.id,
+    daysBefore: Number(rule.daysBefore) || 0,
+    refundPercentage: Number(rule.refundPercentage) || 0,
+  }));
+
+/**
+ * Rules from the policy snapshot taken when the booking was made
+ * @param {Object} booking - Booking with cancellationPolicySnapshot
+ * @returns {Array<Object>} Normalized rules, empty when there is no usable snapshot
+ */
+const getSnapshotRules = (booking) => normalizeRules(booking?.cancellationPolicySnapshot?.rules);
+
+/**
+ * Evaluate the refund a booking is eligible for if cancelled now
+ * @param {Object} options
+ * @param {Object} options.booking - Booking with startDate and totalAmount
+ * @param {Array<Object>} options.rules - Normalized policy rules
+ * @param {Date} [options.now=new Date()]
+ * @returns {{eligibleAmount: number, percentage: number, matchedRule: Object|null, daysNotice?: number}}
+ */
+const buildRefundEvaluation = ({ booking, rules, now = new Date() }) => {
+  if (!booking || !Array.isArray(rules) || rules.length === 0) {
+    return {
+      eligibleAmount: 0,
+      percentage: 0,
+      matchedRule: null,
+    };
+  }
+
+  const daysNotice = diffInCalendarDaysIst(booking.startDate, now);
+  const orderedRules = [...rules]
+    .filter((rule) => Number.isFinite(rule.daysBefore))
+    .sort((a, b) => b.daysBefore - a.daysBefore);
+
+  const matchedRule = orderedRules.find((rule) => daysNotice >= rule.daysBefore) || null;
+  const percentage = matchedRule ? matchedRule.refundPercentage : 0;
+  const totalAmountNumber = Number(booking.totalAmount ?? 0);
+  const eligibleAmount = Number.isFinite(totalAmountNumber)
+    ? (totalAmountNumber * percentage) / 100
+    : 0;
+
+  return {
+    eligibleAmount,
+    percentage,
+    matchedRule,
+    daysNotice,
+  };
+};
+
+/**
+ * Room IDs held by a booking, from its BookingRoomSelection rows
+ * @param {Object} booking - Booking with bookingRoomSelections
+ * @returns {string[]}
+ */
+const extractRoomIdsFromBooking = (booking) => {
+  const ids = new Set();
+
+  // PRODUCTION: Use BookingRoomSelection model (relational approach)
+  // Note: booking.roomId removed - all room details are in BookingRoomSelection
+  if (booking.bookingRoomSelections && Array.isArray(booking.bookingRoomSelections)) {
+    booking.bookingRoomSelections.forEach((selection) => {
+      // Extract room IDs from JSON array
+      const roomIds = Array.isArray(selection.roomIds)
+        ? selection.roomIds
+        : (typeof selection.roomIds === 'string' ? JSON.parse(selection.roomIds || '[]') : []);
+
+      roomIds.forEach((roomId) => {
+        if (roomId) ids.add(roomId);
+      });
+    });
+  }
+
+  return Array.from(ids);
+};
+
+module.exports = {
+  toIstMidnight,
+  diffInCalendarDaysIst,
+  normalizeRules,
+  getSnapshotRules,
+  buildRefundEvaluation,
+  extractRoomIdsFromBooking,
+};
@@ -0,0 +1,136 @@
+/**
+ * Content-Hash Storage
+ * Multer storage engine that names every upload after the SHA-256 of its
+ * bytes (`/uploads/<subdir>/<sha256><ext>`). Identical files uploaded
+ * twice share one blob on disk, and because a name can never point at
+ * different content, uploads are served with immutable cache headers.
+ *
+ * Blobs are never deleted by the request path: they may be shared, so
+ * unreferenced ones are removed by the upload GC (services/media/blobGc).
+ */
+
+const crypto = require('crypto');
+const fs = require('fs');
+const fsp = require('fs/promises');
+const path = require('path');
+const { pipeline, Transform } = require('stream');
+
+// <sha256>.<ext> originals and <sha256>-<variant>.<ext> derived files
+const CONTENT_HASH_FILENAME = /^([0-9a-f]{64})(?:-[a-z0-9]+)?\.[a-z0-9]+$/;
+
+const TEMP_PREFIX = '.tmp-';
+
+const EXTENSION_BY_MIME = {
+  'image/jpeg': '.jpg',
+  'image/jpg': '.jpg',
+  'image/png': '.png',
+  'image/webp': '.webp',
+  'image/gif': '.gif',
+  'image/svg+xml': '.svg',
+  'video/mp4': '.mp4',
+  'video/webm': '.webm',
+  'video/quicktime': '.mov',
+  'video/x-matroska': '.mkv',
+  'application/pdf': '.pdf',
+};
+
+const resolveExtension = (file) => {
+  const fromName = path.extname(file.originalname || '').toLowerCase();
+  if (/^\.[a-z0-9]{1,8}$/.test(fromName)) return fromName === '.jpeg' ? '.jpg' : fromName;
+  return EXTENSION_BY_MIME[file.mimetype] || '';
+};
+
+/**
+ * Whether a stored URL/path points at a content-addressed blob
+ * @param {string} urlOrPath
+ * @returns {boolean}
+ */
+const isContentHashedUpload = (urlOrPath) =>
+  typeof urlOrPath === 'string' && CONTENT_HASH_FILENAME.test(path.basename(urlOrPath.split(/[?#]/)[0]));
+
+/**
+ * Create the multer storage engine
+ * @param {Object} options
+ * @param {string} options.uploadBase - Root upload directory
+ * @param {Function} options.subdirectory - (file) => 'images' | 'videos' | ...
+ */
+const createContentHashStorage = ({ uploadBase, subdirectory }) => ({
+  _handleFile(req, file, cb) {
+    const sub = subdirectory(file);
+    const dir = path.join(uploadBase, sub);
+    const tempPath = path.join(dir, `${TEMP_PREFIX}${crypto.randomUUID()}`);
+    const hash = crypto.createHash('sha256');
+    let size = 0;
+
+    const hashing = new Transform({
+      transform(chunk, encoding, done) {
+        hash.update(chunk);
+        size += chunk.length;
+        done(null, chunk);
+      },
+    });
+
+    const finalize = async () => {
+      const filename = `${hash.digest('hex')}${resolveExtension(file)}`;
+      const finalPath = path.join(dir, filename);
+
+      let deduplicated = false;
+      try {
+        await fsp.access(finalPath);
+        deduplicated = true;
+      } catch (error) {
+        // New content
+      }
+
+      if (deduplicated) {
+        await fsp.unlink(tempPath);
+        // Restart the GC grace period - the blob is about to be referenced again
+        const now = new Date();
+        await fsp.utimes(finalPath, now, now).catch(() => {});
+      } else {
+        await fsp.rename(tempPath, finalPath);
+      }
+
+      return {
+        destination: dir,
+        filename,
+        path: finalPath,
+        size,
+        subdirectory: sub,
+        url: `/uploads/${sub}/${filename}`,
+        contentHash: filename.slice(0, 64),
+        deduplicated,
+      };
+    };
+
+    fsp
+      .mkdir(dir, { recursive: true })
+      .then(
+        () =>
+          new Promise((resolve, reject) => {
+            pipeline(file.stream, hashing, fs.createWriteStream(tempPath), (error) =>
+              error ? reject(error) : resolve()
+            );
+          })
+      )
+      .then(finalize)
+      .then((info) => cb(null, info))
+      .catch((error) => {
+        fsp.unlink(tempPath).catch(() => {});
+        cb(error);
+      });
+  },
+
+  _removeFile(req, file, cb) {
+    // Blobs may already be shared with another upload of the same bytes -
+    // unreferenced ones are left to the GC instead
+    cb(null);
+  },
+});
+
+module.exports = {
+  createContentHashStorage,
+  isContentHashedUpload,
+  CONTENT_HASH_FILENAME,
+  TEMP_PREFIX,
+};
@@ -0,0 +1,103 @@
+/**
+ * ETag Utilities
+ * Weak validators derived from the `id`/`updatedAt` of the rows a response
+ * was built from, so conditional GETs can be answered with 304 without
+ * serializing (or hashing) the full JSON body.
+ *
+ * Usage:
+ * const etag = weakEtag('property-details', req.originalUrl, property);
+ * if (isNotModified(req, res, etag)) return;
+ * return res.json({ success: true, data });
+ */
+
+const crypto = require('crypto');
+
+const isPlainObject = (value) =>
+  value !== null && typeof value === 'object' && Object.getPrototypeOf(value) === Object.prototype;
+
+/**
+ * Fold every row's identity and modification time into the hash.
+ * Walks nested relations of a Prisma result; Decimals, Dates and other
+ * class instances are skipped since they carry no row identity.
+ */
+const foldRows = (hash, value) => {
+  if (Array.isArray(value)) {
+    hash.update(`[${value.length}`);
+    value.forEach((item) => foldRows(hash, item));
+    hash.update(']');
+    return;
+  }
+  if (!isPlainObject(value)) return;
+
+  if (value.id !== undefined || value.updatedAt !== undefined) {
+    const updatedAt = value.updatedAt instanceof Date ? value.updatedAt.getTime() : value.updatedAt;
+    hash.update(`${value.id ?? ''}@${updatedAt ?? ''};`);
+  }
+  Object.keys(value).forEach((key) => {
+    const child = value[key];
+    if (child !== null && typeof child === 'object') foldRows(hash, child);
+  });
+};
+
+/**
+ * Build a weak ETag from request-specific parts and loaded rows
+ * Primitive parts (route name, query, agent id) are hashed verbatim;
+ * objects/arrays contribute the `id@updatedAt` of every row they contain.
+ * @param {...any} parts
+ * @returns {string} - e.g. W/"q8Xh0c1bW2r0Yx3T9iR0Zw"
+ */
+const weakEtag = (...parts) => {
+  const hash = crypto.createHash('sha1');
+  parts.forEach((part) => {
+    if (part instanceof Date) {
+      hash.update(String(part.getTime()));
+    } else if (part !== null && typeof part === 'object') {
+      foldRows(hash, part);
+    } else {
+      hash.update(String(part ?? ''));
+    }
+    hash.update('|');
+  });
+  return `W/"${hash.digest('base64url').slice(0, 22)}"`;
+};
+
+const stripWeak = (tag) => tag.trim().replace(/^W\//, '');
+
+/**
+ * Weak comparison against If-None-Match
+ * @param {string|undefined} header
+ * @param {string} etag
+ * @returns {boolean}
+ */
+const matchesIfNoneMatch = (header, etag) => {
+  if (!header) return false;
+  if (header.trim() === '*') return true;
+  const target = stripWeak(etag);
+  return header.split(',').some((candidate) => stripWeak(candidate) === target);
+};
+
+/**
+ * Set the validator headers and answer 304 when the client copy is current
+ * Responses are marked private/no-cache: they may be agent-specific, and
+ * clients must revalidate (cheaply) on every view.
+ * @param {import('express').Request} req
+ * @param {import('express').Response} res
+ * @param {string} etag
+ * @returns {boolean} - true if a 304 was sent and the handler should return
+ */
+const isNotModified = (req, res, etag) => {
+  res.setHeader('ETag', etag);
+  res.setHeader('Cache-Control', 'private, no-cache');
+
+  if ((req.method === 'GET' || req.method === 'HEAD') && matchesIfNoneMatch(req.headers['if-none-match'], etag)) {
+    res.status(304).end();
+    return true;
+  }
+  return false;
+};
+
+module.exports = {
+  weakEtag,
+  isNotModified,
+  matchesIfNoneMatch,
+};
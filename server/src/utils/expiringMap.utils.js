@@ -0,0 +1,162 @@
+/**
+ * Expiring Map
+ * Key/value map where every entry carries its own TTL.
+ *
+ * Expiry is driven by a binary min-heap ordered on expiresAt plus a single
+ * timer armed for the earliest deadline, so expiring N entries costs
+ * O(log N) each instead of a full scan of the map on every write.
+ * Reads also check the deadline, so an expired value is never returned
+ * even if the timer has not fired yet. Entries set without a TTL never
+ * expire and are kept out of the heap, so they never arm a timer.
+ */
+
+// setTimeout fires immediately for delays above 2^31-1 ms (~24.8 days);
+// longer deadlines are reached by re-arming
+const MAX_TIMER_DELAY_MS = 2 ** 31 - 1;
+
+const createMinHeap = () => {
+  const items = [];
+
+  const swap = (i, j) => {
+    const tmp = items[i];
+    items[i] = items[j];
+    items[j] = tmp;
+  };
+
+  const push = (item) => {
+    items.push(item);
+    let i = items.length - 1;
+    while (i > 0) {
+      const parent = (i - 1) >> 1;
+      if (items[parent].expiresAt <= items[i].expiresAt) break;
+      swap(i, parent);
+      i = parent;
+    }
+  };
+
+  const pop = () => {
+    if (items.length === 0) return undefined;
+    const top = items[0];
+    const last = items.pop();
+    if (items.length > 0) {
+      items[0] = last;
+      let i = 0;
+      for (;;) {
+        const left = 2 * i + 1;
+        const right = left + 1;
+        let smallest = i;
+        if (left < items.length && items[left].expiresAt < items[smallest].expiresAt) smallest = left;
+        if (right < items.length && items[right].expiresAt < items[smallest].expiresAt) smallest = right;
+        if (smallest === i) break;
+        swap(i, smallest);
+        i = smallest;
+      }
+    }
+    return top;
+  };
+
+  return {
+    push,
+    pop,
+    peek: () => items[0],
+    clear: () => {
+      items.length = 0;
+    },
+    get size() {
+      return items.length;
+    },
+  };
+};
+
+const createExpiringMap = () => {
+  const entries = new Map(); // key -> { value, expiresAt }
+  const heap = createMinHeap(); // { key, expiresAt }
+  let timer = null;
+  let timerDeadline = Infinity;
+
+  const sweep = (now = Date.now()) => {
+    while (heap.size > 0 && heap.peek().expiresAt <= now) {
+      const { key, expiresAt } = heap.pop();
+      const entry = entries.get(key);
+      // Skip stale heap nodes left behind by overwrites/deletes
+      if (entry && entry.expiresAt === expiresAt) {
+        entries.delete(key);
+      }
+    }
+  };
+
+  const armTimer = () => {
+    const next = heap.peek();
+    if (!next) {
+      if (timer) clearTimeout(timer);
+      timer = null;
+      timerDeadline = Infinity;
+      return;
+    }
+    if (timer && timerDeadline <= next.expiresAt) return;
+
+    if (timer) clearTimeout(timer);
+    timerDeadline = next.expiresAt;
+    timer = setTimeout(() => {
+      timer = null;
+      timerDeadline = Infinity;
+      sweep();
+      armTimer();
+    }, Math.min(MAX_TIMER_DELAY_MS, Math.max(0, next.expiresAt - Date.now())));
+    // Never keep the process alive just to expire entries
+    if (typeof timer.unref === 'function') timer.unref();
+  };
+
+  /**
+   * @param {string} key
+   * @param {*} value
+   * @param {number} [ttlMs] - Omitted or Infinity: never expires
+   */
+  const set = (key, value, ttlMs = Infinity) => {
+    const expiresAt = ttlMs === Infinity ? Infinity : Date.now() + Math.max(0, ttlMs);
+    entries.set(key, { value, expiresAt });
+    if (expiresAt === Infinity) return;
+    heap.push({ key, expiresAt });
+    armTimer();
+  };
+
+  const get = (key) => {
+    const entry = entries.get(key);
+    if (!entry) return undefined;
+    if (entry.expiresAt <= Date.now()) {
+      entries.delete(key);
+      return undefined;
+    }
+    return entry.value;
+  };
+
+  const ttl = (key) => {
+    const entry = entries.get(key);
+    if (!entry) return -1;
+    return Math.max(0, entry.expiresAt - Date.now());
+  };
+
+  const clear = () => {
+    entries.clear();
+    heap.clear();
+    armTimer();
+  };
+
+  return {
+    set,
+    get,
+    ttl,
+    has: (key) => get(key) !== undefined,
+    delete: (key) => entries.delete(key),
+    clear,
+    sweep,
+    get size() {
+      return entries.size;
+    },
+  };
+};
+
+module.exports = {
+  createExpiringMap,
+  createMinHeap,
+};
@@ -2,10 +2,9 @@
  * Front-desk utility functions for business logic
  */
 
-const { PrismaClient } = require('@prisma/client');
 const { toDateOnly } = require('./date.utils');
 
-const prisma = new PrismaClient();
+const prisma = require('../config/prisma');
 
 /**
  * Normalizes availability status to ensure consistent values
@@ -0,0 +1,212 @@
+/**
+ * Image Probe Utilities
+ * Reads image dimensions from the file header only (PNG, JPEG, GIF, WebP,
+ * SVG) without decoding pixels, so uploads can be validated cheaply on the
+ * request path.
+ */
+
+const fs = require('fs/promises');
+
+const INITIAL_READ_BYTES = 64 * 1024;
+// JPEG SOF markers can sit behind large EXIF/ICC segments
+const MAX_READ_BYTES = 1024 * 1024;
+
+// Start-of-frame markers that carry the frame dimensions
+const JPEG_SOF_MARKERS = new Set([
+  0xc0, 0xc1, 0xc2, 0xc3, 0xc5, 0xc6, 0xc7, 0xc9, 0xca, 0xcb, 0xcd, 0xce, 0xcf,
+]);
+
+const NEED_MORE = Symbol('needMore');
+
+const probePng = (buf) => {
+  if (buf.length < 24) return NEED_MORE;
+  return { format: 'png', width: buf.readUInt32BE(16), height: buf.readUInt32BE(20) };
+};
+
+const probeGif = (buf) => {
+  if (buf.length < 10) return NEED_MORE;
+  return { format: 'gif', width: buf.readUInt16LE(6), height: buf.readUInt16LE(8) };
+};
+
+const probeWebp = (buf) => {
+  if (buf.length < 30) return NEED_MORE;
+  const chunk = buf.toString('ascii', 12, 16);
+
+  if (chunk === 'VP8 ') {
+    return {
+      format: 'webp',
+      width: buf.readUInt16LE(26) & 0x3fff,
+      height: buf.readUInt16LE(28) & 0x3fff,
+    };
+  }
+  if (chunk === 'VP8L') {
+    const b0 = buf[21];
+    const b1 = buf[22];
+    const b2 = buf[23];
+    const b3 = buf[24];
+    return {
+      format: 'webp',
+      width: 1 + (((b1 & 0x3f) << 8) | b0),
+      height: 1 + (((b3 & 0x0f) << 10) | (b2 << 2) | ((b1 & 0xc0) >> 6)),
+    };
+  }
+  if (chunk === 'VP8X') {
+    return {
+      format: 'webp',
+      width: 1 + buf.readUIntLE(24, 3),
+      height: 1 + buf.readUIntLE(27, 3),
+    };
+  }
+  return null;
+};
+
+/**
+ * Read the EXIF orientation tag from an APP1 segment (1 = normal)
+ * Orientations 5-8 are rotated by 90 degrees, so width/height swap.
+ */
+const readExifOrientation = (buf, start, end) => {
+  if (end - start < 14 || buf.toString('ascii', start, start + 4) !== 'Exif') return 1;
+
+  const tiff = start + 6;
+  const littleEndian = buf.toString('ascii', tiff, tiff + 2) === 'II';
+  const u16 = (offset) => (littleEndian ? buf.readUInt16LE(offset) : buf.readUInt16BE(offset));
+  const u32 = (offset) => (littleEndian ? buf.readUInt32LE(offset) : buf.readUInt32BE(offset));
+
+  const ifd = tiff + u32(tiff + 4);
+  if (ifd + 2 > end) return 1;
+
+  const entries = u16(ifd);
+  for (let i = 0; i < entries; i += 1) {
+    const entry = ifd + 2 + i * 12;
+    if (entry + 12 > end) break;
+    if (u16(entry) === 0x0112) return u16(entry + 8);
+  }
+  return 1;
+};
+
+const probeJpeg = (buf) => {
+  let offset = 2;
+  let orientation = 1;
+
+  while (offset + 4 <= buf.length) {
+    if (buf[offset] !== 0xff) return null;
+    const marker = buf[offset + 1];
+
+    // Fill bytes and standalone markers carry no length
+    if (marker === 0xff) {
+      offset += 1;
+      continue;
+    }
+    if (marker === 0x01 || (marker >= 0xd0 && marker <= 0xd9)) {
+      offset += 2;
+      continue;
+    }
+
+    const length = buf.readUInt16BE(offset + 2);
+
+    if (JPEG_SOF_MARKERS.has(marker)) {
+      if (offset + 9 > buf.length) return NEED_MORE;
+      const height = buf.readUInt16BE(offset + 5);
+      const width = buf.readUInt16BE(offset + 7);
+      const rotated = orientation >= 5 && orientation <= 8;
+      return {
+        format: 'jpeg',
+        width: rotated ? height : width,
+        height: rotated ? width : height,
+        orientation,
+      };
+    }
+
+    if (marker === 0xe1 && offset + 2 + length <= buf.length) {
+      orientation = readExifOrientation(buf, offset + 4, offset + 2 + length);
+    }
+
+    offset += 2 + length;
+  }
+  return NEED_MORE;
+};
+
+const parseSvgLength = (value) => {
+  if (!value) return null;
+  const match = /^\s*([\d.]+)\s*(px)?\s*$/.exec(value);
+  return match ? Math.round(parseFloat(match[1])) : null;
+};
+
+const probeSvg = (buf) => {
+  const text = buf.toString('utf8', 0, Math.min(buf.length, INITIAL_READ_BYTES));
+  const tag = /<svg\b[^>]*>/i.exec(text);
+  if (!tag) return null;
+
+  const attr = (name) => {
+    const match = new RegExp(`\\s${name}\\s*=\\s*["']([^"']*)["']`, 'i').exec(tag[0]);
+    return match ? match[1] : null;
+  };
+
+  let width = parseSvgLength(attr('width'));
+  let height = parseSvgLength(attr('height'));
+
+  if (!width || !height) {
+    const viewBox = (attr('viewBox') || '').trim().split(/[\s,]+/).map(Number);
+    if (viewBox.length === 4 && viewBox.every((n) => Number.isFinite(n))) {
+      width = width || Math.round(viewBox[2]);
+      height = height || Math.round(viewBox[3]);
+    }
+  }
+
+  return { format: 'svg', width: width || null, height: height || null };
+};
+
+/**
+ * Detect format and dimensions from the leading bytes of an image
+ * @param {Buffer} buf
+ * @returns {{format: string, width: number|null, height: number|null, orientation?: number}|null|symbol}
+ */
+const probeBuffer = (buf) => {
+  if (buf.length >= 8 && buf.readUInt32BE(0) === 0x89504e47 && buf.readUInt32BE(4) === 0x0d0a1a0a) {
+    return probePng(buf);
+  }
+  if (buf.length >= 3 && buf[0] === 0xff && buf[1] === 0xd8 && buf[2] === 0xff) {
+    return probeJpeg(buf);
+  }
+  if (buf.length >= 6 && buf.toString('ascii', 0, 4) === 'GIF8') {
+    return probeGif(buf);
+  }
+  if (buf.length >= 16 && buf.toString('ascii', 0, 4) === 'RIFF' && buf.toString('ascii', 8, 12) === 'WEBP') {
+    return probeWebp(buf);
+  }
+  if (/<svg\b/i.test(buf.toString('utf8', 0, Math.min(buf.length, 4096)))) {
+    return probeSvg(buf);
+  }
+  return null;
+};
+
+/**
+ * Read just enough of a file to determine its image format and dimensions
+ * @param {string} filePath
+ * @returns {Promise<{format: string, width: number|null, height: number|null}|null>} - null if unrecognised
+ */
+const probeImageFile = async (filePath) => {
+  const handle = await fs.open(filePath, 'r');
+  try {
+    let size = INITIAL_READ_BYTES;
+    for (;;) {
+      const buf = Buffer.alloc(size);
+      const { bytesRead } = await handle.read(buf, 0, size, 0);
+      const result = probeBuffer(buf.subarray(0, bytesRead));
+
+      if (result !== NEED_MORE) return result;
+      if (bytesRead < size || size >= MAX_READ_BYTES) return null;
+      size = Math.min(size * 4, MAX_READ_BYTES);
+    }
+  } finally {
+    await handle.close();
+  }
+};
+
+module.exports = {
+  probeImageFile,
+  probeBuffer: (buf) => {
+    const result = probeBuffer(buf);
+    return result === NEED_MORE ? null : result;
+  },
+};
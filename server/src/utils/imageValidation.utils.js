@@ -1,30 +1,33 @@
 /**
  * Image validation utilities for property creation
- * Validates image size and aspect ratio (16:9)
+ * Validates image size, dimensions and aspect ratio (16:9)
  */
 
-const fs = require('fs');
-const path = require('path');
+const fs = require('fs/promises');
+const { probeImageFile } = require('./imageProbe.utils');
+const { createWorkPool } = require('./workPool.utils');
 
 // Target aspect ratio: 16:9
 const TARGET_RATIO = 16 / 9;
 const TOLERANCE = 0.05; // 5% tolerance for aspect ratio validation
 const MAX_FILE_SIZE = 2 * 1024 * 1024; // 2MB
+// Smallest image that still fills the card variant
+const MIN_WIDTH = 640;
+const MIN_HEIGHT = 360;
 
 /**
- * Validates image aspect ratio using image dimensions
- * Note: This is a simplified validation. For production, use a library like 'sharp' or 'jimp'
+ * Validates image size, dimensions and aspect ratio
+ * Dimensions are read from the image header only (see imageProbe.utils);
+ * SVGs are vector images and skip the ratio check.
  * @param {string} filePath - Path to the image file
- * @returns {Promise<{valid: boolean, ratio?: number, width?: number, height?: number, error?: string}>}
+ * @returns {Promise<{valid: boolean, ratio?: number, width?: number, height?: number, format?: string, error?: string}>}
  */
 const validateImageAspectRatio = async (filePath) => {
   try {
-    // For a more accurate validation, we should use a library like 'sharp' or 'jimp'
-    // For now, we'll validate file size and let the frontend handle aspect ratio validation
-    // The backend will trust that the frontend has validated the aspect ratio
-    
-    // Check if file exists
-    if (!fs.existsSync(filePath)) {
+    let stats;
+    try {
+      stats = await fs.stat(filePath);
+    } catch (error) {
       return {
         valid: false,
         error: 'Image file not found'
@@ -32,7 +35,6 @@ const validateImageAspectRatio = async (filePath) => {
     }
 
     // Check file size
-    const stats = fs.statSync(filePath);
     if (stats.size > MAX_FILE_SIZE) {
       return {
         valid: false,
@@ -40,15 +42,54 @@ const validateImageAspectRatio = async (filePath) => {
       };
     }
 
-    // For production, install 'sharp' library for proper image dimension validation:
-    // npm install sharp
-    // Then use: const metadata = await sharp(filePath).metadata();
-    // const ratio = metadata.width / metadata.height;
-    // const isValid = Math.abs(ratio - TARGET_RATIO) <= TOLERANCE;
+    const probe = await probeImageFile(filePath);
+    if (!probe) {
+      return {
+        valid: false,
+        error: 'Unrecognised or corrupt image file'
+      };
+    }
+
+    if (probe.format === 'svg') {
+      return { valid: true, format: probe.format, width: probe.width, height: probe.height };
+    }
+
+    const { width, height, format } = probe;
+    if (!width || !height) {
+      return {
+        valid: false,
+        error: 'Could not read image dimensions'
+      };
+    }
+
+    if (width < MIN_WIDTH || height < MIN_HEIGHT) {
+      return {
+        valid: false,
+        width,
+        height,
+        format,
+        error: `Image is too small (${width}x${height}). Minimum size is ${MIN_WIDTH}x${MIN_HEIGHT}`
+      };
+    }
+
+    const ratio = width / height;
+    if (Math.abs(ratio - TARGET_RATIO) / TARGET_RATIO > TOLERANCE) {
+      return {
+        valid: false,
+        ratio,
+        width,
+        height,
+        format,
+        error: `Image aspect ratio ${ratio.toFixed(2)} (${width}x${height}) must be 16:9`
+      };
+    }
 
-    // For now, we'll rely on frontend validation and multer file size limits
     return {
-      valid: true
+      valid: true,
+      ratio,
+      width,
+      height,
+      format
     };
   } catch (error) {
     return {
@@ -58,14 +99,54 @@ const validateImageAspectRatio = async (filePath) => {
   }
 };
 
+// Files in one request are validated concurrently, bounded so a 12-image
+// upload does not open 12 descriptors per request at once
+const validationPool = createWorkPool({
+  name: 'image-validation',
+  concurrency: parseInt(process.env.MEDIA_INGEST_CONCURRENCY || '8', 10),
+});
+
+/**
+ * Validate each file (size, type, dimensions, ratio) concurrently
+ * Errors and images keep the order of `files`.
+ * @param {Array<Object>} files - Array of file objects from multer
+ * @returns {Promise<{errors: Array<string>, images: Array<{file: Object, width: number|null, height: number|null}>}>}
+ */
+const validateImageFiles = async (files) => {
+  const results = await validationPool.map(files, async (file) => {
+    // Check file size (multer should already validate this, but double-check)
+    if (file.size > MAX_FILE_SIZE) {
+      return { file, error: `File ${file.originalname} exceeds 2MB limit (${(file.size / 1024 / 1024).toFixed(2)}MB)` };
+    }
+
+    // Check file type
+    if (!file.mimetype.startsWith('image/')) {
+      return { file, error: `File ${file.originalname} is not an image file` };
+    }
+
+    // Validate aspect ratio (if file path is available)
+    if (!file.path) {
+      return { file, width: null, height: null };
+    }
+    const validation = await validateImageAspectRatio(file.path);
+    if (!validation.valid) {
+      return { file, error: `File ${file.originalname}: ${validation.error}` };
+    }
+    return { file, width: validation.width ?? null, height: validation.height ?? null };
+  });
+
+  return {
+    errors: results.filter((result) => result.error).map((result) => result.error),
+    images: results.filter((result) => !result.error),
+  };
+};
+
 /**
  * Validates multiple image files
  * @param {Array<Object>} files - Array of file objects from multer
- * @returns {Promise<{valid: boolean, errors?: Array<string>}>}
+ * @returns {Promise<{valid: boolean, errors?: Array<string>, images?: Array<{file, width, height}>}>}
  */
 const validatePropertyImages = async (files) => {
-  const errors = [];
-  
   if (!files || files.length === 0) {
     return {
       valid: false,
@@ -73,85 +154,50 @@ const validatePropertyImages = async (files) => {
     };
   }
 
+  const errors = [];
+
   // Validate file count
   if (files.length > 12) {
     errors.push(`Maximum 12 images allowed. Received ${files.length} images.`);
   }
 
-  // Validate each file
-  for (const file of files) {
-    // Check file size (multer should already validate this, but double-check)
-    if (file.size > MAX_FILE_SIZE) {
-      errors.push(`File ${file.originalname} exceeds 2MB limit (${(file.size / 1024 / 1024).toFixed(2)}MB)`);
-      continue;
-    }
-
-    // Check file type
-    if (!file.mimetype.startsWith('image/')) {
-      errors.push(`File ${file.originalname} is not an image file`);
-      continue;
-    }
-
-    // Validate aspect ratio (if file path is available)
-    if (file.path) {
-      const validation = await validateImageAspectRatio(file.path);
-      if (!validation.valid) {
-        errors.push(`File ${file.originalname}: ${validation.error}`);
-      }
-    }
-  }
+  const { errors: fileErrors, images } = await validateImageFiles(files);
+  errors.push(...fileErrors);
 
   return {
     valid: errors.length === 0,
-    errors: errors.length > 0 ? errors : undefined
+    errors: errors.length > 0 ? errors : undefined,
+    images
   };
 };
 
 /**
  * Validates room type images
  * @param {Array<Object>} files - Array of file objects from multer
- * @returns {Promise<{valid: boolean, errors?: Array<string>}>}
+ * @returns {Promise<{valid: boolean, errors?: Array<string>, images?: Array<{file, width, height}>}>}
  */
 const validateRoomTypeImages = async (files) => {
-  const errors = [];
-  
   if (!files || files.length === 0) {
     return {
-      valid: true // Room type images are optional
+      valid: true, // Room type images are optional
+      images: []
     };
   }
 
+  const errors = [];
+
   // Validate file count
   if (files.length > 12) {
     errors.push(`Maximum 12 images allowed per room type. Received ${files.length} images.`);
   }
 
-  // Validate each file
-  for (const file of files) {
-    // Check file size
-    if (file.size > MAX_FILE_SIZE) {
-      errors.push(`File ${file.originalname} exceeds 2MB limit (${(file.size / 1024 / 1024).toFixed(2)}MB)`);
-      continue;
-    }
-
-    // Check file type
-    if (!file.mimetype.startsWith('image/')) {
-      errors.push(`File ${file.originalname} is not an image file`);
-      continue;
-    }
-
-    // Validate aspect ratio (if file path is available)
-    if (file.path) {
-      const validation = await validateImageAspectRatio(file.path);
-      if (!validation.valid) {
-        errors.push(`File ${file.originalname}: ${validation.error}`);
-      }
-    }
-  }
+  const { errors: fileErrors, images } = await validateImageFiles(files);
+  errors.push(...fileErrors);
 
   return {
     valid: errors.length === 0,
-    errors: errors.length > 0 ? errors : undefined
+    errors: errors.length > 0 ? errors : undefined,
+    images
   };
 };
 
@@ -160,6 +206,8 @@ module.exports = {
   validatePropertyImages,
   validateRoomTypeImages,
   MAX_FILE_SIZE,
+  MIN_WIDTH,
+  MIN_HEIGHT,
   TARGET_RATIO,
   TOLERANCE
 };
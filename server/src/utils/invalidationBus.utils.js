@@ -0,0 +1,166 @@
+/**
+ * Invalidation Bus
+ * Fans cache invalidations out to every process serving the app, so an
+ * in-process cache stays exact when writes happen on another worker or host.
+ *
+ * A channel is created with the handler that applies an invalidation to
+ * this process. publish() runs it here first, then delivers the payload to
+ * every other process, which runs the same handler:
+ * - Redis pub/sub when REDIS_URL is set (all workers on all hosts)
+ * - otherwise the cluster primary's IPC relay (all workers on this host)
+ * - otherwise nothing: a single process has no one else to tell
+ *
+ * When REDIS_URL is set but the subscription is down (not connected yet,
+ * connection lost, `redis` package missing) invalidations from other hosts
+ * can be missed, so isInvalidationDegraded() reports true and caches keep
+ * entries only for a short fallback TTL. After the subscription comes back
+ * every channel's resync handler runs, dropping whatever may have been missed.
+ *
+ * Payloads must be JSON serialisable.
+ */
+
+const { randomUUID } = require('crypto');
+const { getRedisClient, isSharedRedisConfigured } = require('../config/redis');
+const { isClusterEnabled, broadcastToWorkers, onWorkerBroadcast } = require('../cluster');
+const logger = require('./logger.utils').child('cache');
+
+const CHANNEL_PREFIX = 'invalidate:';
+const IPC_CHANNEL = 'cache-invalidation';
+
+// Identifies this process so it ignores its own Redis messages
+const ORIGIN = randomUUID();
+
+const channels = new Map();
+
+// 'off' (no REDIS_URL), 'connecting', 'ready' or 'down'
+let redisState = isSharedRedisConfigured() ? 'connecting' : 'off';
+let redisPromise = null;
+
+const runHandler = (name, payload) => {
+  const channel = channels.get(name);
+  if (!channel) return;
+  try {
+    channel.handler(payload);
+  } catch (error) {
+    logger.error('Invalidation handler failed', { channel: name, err: error });
+  }
+};
+
+const resyncAll = () => {
+  channels.forEach((channel, name) => {
+    try {
+      channel.resync();
+    } catch (error) {
+      logger.error('Invalidation resync failed', { channel: name, err: error });
+    }
+  });
+};
+
+const onRedisMessage = (raw, redisChannel) => {
+  let message;
+  try {
+    message = JSON.parse(raw);
+  } catch (error) {
+    return;
+  }
+  if (message.origin === ORIGIN) return;
+  runHandler(redisChannel.slice(CHANNEL_PREFIX.length), message.payload);
+};
+
+/**
+ * Connect the Redis publisher/subscriber pair (once)
+ * @returns {Promise<Object|null>} - Publishing client, or null when Redis is unusable
+ */
+const connectRedis = () => {
+  if (!redisPromise) {
+    redisPromise = (async () => {
+      const client = await getRedisClient();
+      if (client.isLocal) {
+        throw new Error('Redis client is the local stand-in');
+      }
+
+      const subscriber = client.duplicate();
+      subscriber.on('error', (error) => {
+        if (redisState === 'ready') {
+          logger.error('Invalidation subscriber lost its connection', { err: error });
+        }
+        redisState = 'down';
+      });
+      subscriber.on('ready', () => {
+        if (redisState === 'down') {
+          // Messages published while we were disconnected are lost
+          redisState = 'ready';
+          resyncAll();
+        }
+      });
+
+      await subscriber.connect();
+      await subscriber.pSubscribe(`${CHANNEL_PREFIX}*`, onRedisMessage);
+      redisState = 'ready';
+      return client;
+    })().catch((error) => {
+      redisState = 'down';
+      logger.error('Cache invalidations cannot reach other hosts: Redis pub/sub unavailable', { err: error });
+      return null;
+    });
+  }
+  return redisPromise;
+};
+
+if (isClusterEnabled()) {
+  onWorkerBroadcast(IPC_CHANNEL, ({ name, payload }) => runHandler(name, payload));
+}
+
+/**
+ * Create an invalidation channel
+ * @param {string} name - Channel name, unique per cache
+ * @param {Object} options
+ * @param {Function} options.handler - (payload) => void, applies an invalidation to this process
+ * @param {Function} [options.resync] - () => void, drops everything (after missed messages)
+ * @returns {{publish: Function}}
+ */
+const createInvalidationChannel = (name, { handler, resync = () => {} }) => {
+  if (channels.has(name)) {
+    throw new Error(`Invalidation channel "${name}" already exists`);
+  }
+  channels.set(name, { handler, resync });
+  if (redisState !== 'off') connectRedis();
+
+  /**
+   * Apply an invalidation here and on every other process
+   * @param {*} payload
+   * @returns {Promise<void>} - Resolves once handed to the transport
+   */
+  const publish = async (payload) => {
+    runHandler(name, payload);
+
+    if (redisState !== 'off') {
+      const client = await connectRedis();
+      if (client && redisState === 'ready') {
+        try {
+          await client.publish(`${CHANNEL_PREFIX}${name}`, JSON.stringify({ origin: ORIGIN, payload }));
+          return;
+        } catch (error) {
+          logger.warn('Invalidation publish failed', { channel: name, err: error });
+        }
+      }
+    }
+
+    // No Redis (or it failed): at least reach the other workers on this host
+    broadcastToWorkers(IPC_CHANNEL, { name, payload });
+  };
+
+  return { publish };
+};
+
+/**
+ * Whether invalidations from other hosts may currently be missed
+ * Caches should then keep entries only briefly.
+ * @returns {boolean}
+ */
+const isInvalidationDegraded = () => redisState === 'connecting' || redisState === 'down';
+
+module.exports = {
+  createInvalidationChannel,
+  isInvalidationDegraded,
+};
@@ -0,0 +1,90 @@
+/**
+ * Keyset Cursor Utilities
+ * Cursor (keyset) pagination over (createdAt, id), newest first.
+ *
+ * Unlike skip/take, the database seeks straight to the cursor position
+ * through the createdAt index, so page 500 costs the same as page 1 and
+ * rows inserted while paging never shift or repeat entries. `id` breaks
+ * ties between rows created in the same millisecond.
+ *
+ * Cursors are opaque base64url strings of "<createdAt ISO>|<id>".
+ *
+ * Usage:
+ * const cursor = decodeCursor(req.query.cursor); // null = first page
+ * const rows = await prisma.x.findMany({
+ *   where: { ...filters, ...keysetWhere(cursor) },
+ *   orderBy: KEYSET_ORDER_BY,
+ *   take: limit + 1,
+ * });
+ * const page = keysetPage(rows, limit); // { items, nextCursor, hasNext }
+ */
+
+const KEYSET_ORDER_BY = [{ createdAt: 'desc' }, { id: 'desc' }];
+
+/**
+ * Encode the position just after a row
+ * @param {{createdAt: Date, id: string}} row
+ * @returns {string}
+ */
+const encodeCursor = (row) =>
+  Buffer.from(`${new Date(row.createdAt).toISOString()}|${row.id}`, 'utf8').toString('base64url');
+
+/**
+ * Decode a cursor from a query string
+ * @param {string} [value]
+ * @returns {{createdAt: Date, id: string}|null} null when absent
+ * @throws {Error} When the cursor is malformed
+ */
+const decodeCursor = (value) => {
+  if (value === undefined || value === null || value === '') return null;
+
+  const decoded = Buffer.from(String(value), 'base64url').toString('utf8');
+  const separator = decoded.indexOf('|');
+  const createdAt = new Date(decoded.slice(0, separator));
+  const id = decoded.slice(separator + 1);
+
+  if (separator < 0 || Number.isNaN(createdAt.getTime()) || !id) {
+    throw new Error('Invalid cursor');
+  }
+
+  return { createdAt, id };
+};
+
+/**
+ * Where clause selecting rows after the cursor in KEYSET_ORDER_BY order
+ * @param {{createdAt: Date, id: string}|null} cursor
+ * @returns {Object} Empty for the first page
+ */
+const keysetWhere = (cursor) => {
+  if (!cursor) return {};
+  return {
+    OR: [
+      { createdAt: { lt: cursor.createdAt } },
+      { createdAt: cursor.createdAt, id: { lt: cursor.id } },
+    ],
+  };
+};
+
+/**
+ * Split a `take: limit + 1` result into a page and the next cursor
+ * @param {Array<Object>} rows
+ * @param {number} limit
+ * @returns {{items: Array<Object>, nextCursor: string|null, hasNext: boolean}}
+ */
+const keysetPage = (rows, limit) => {
+  const hasNext = rows.length > limit;
+  const items = hasNext ? rows.slice(0, limit) : rows;
+  return {
+    items,
+    nextCursor: hasNext ? encodeCursor(items[items.length - 1]) : null,
+    hasNext,
+  };
+};
+
+module.exports = {
+  KEYSET_ORDER_BY,
+  encodeCursor,
+  decodeCursor,
+  keysetWhere,
+  keysetPage,
+};
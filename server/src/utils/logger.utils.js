@@ -0,0 +1,186 @@
+/**
+ * Structured Logger
+ * Leveled, per-module, JSON-lines logger with an asynchronous buffered sink.
+ *
+ * Configuration (environment):
+ * - LOG_LEVEL: error | warn | info | debug | trace (default: info, debug in development)
+ * - LOG_MODULES: per-module overrides, e.g. "search=debug,pricing=warn,*=info"
+ * - LOG_SAMPLE_RATE: fraction (0-1) of debug/trace lines kept (default: 1)
+ * - LOG_FORMAT: json | pretty (default: pretty in development, json otherwise)
+ *
+ * Usage:
+ * const logger = require('../utils/logger.utils').child('search');
+ * logger.info('Search completed', { results: 12 });
+ * // Expensive payloads: pass a function, it only runs if debug is enabled
+ * logger.debug('Where clause', () => ({ where }));
+ */
+
+const LEVELS = { error: 0, warn: 1, info: 2, debug: 3, trace: 4 };
+
+const FLUSH_INTERVAL_MS = 100;
+const MAX_BUFFERED_LINES = 1000;
+
+const isDevelopment = () => process.env.NODE_ENV === 'development';
+
+const parseLevel = (value, fallback) =>
+  Object.prototype.hasOwnProperty.call(LEVELS, value) ? LEVELS[value] : fallback;
+
+const defaultLevel = parseLevel(
+  (process.env.LOG_LEVEL || '').toLowerCase(),
+  isDevelopment() ? LEVELS.debug : LEVELS.info
+);
+
+// "search=debug,pricing=warn" -> { search: 3, pricing: 1 }
+const moduleLevels = (process.env.LOG_MODULES || '')
+  .split(',')
+  .map((pair) => pair.trim())
+  .filter(Boolean)
+  .reduce((acc, pair) => {
+    const [name, level] = pair.split('=').map((part) => part.trim().toLowerCase());
+    if (name && level && Object.prototype.hasOwnProperty.call(LEVELS, level)) {
+      acc[name] = LEVELS[level];
+    }
+    return acc;
+  }, {});
+
+const globalLevel = moduleLevels['*'] !== undefined ? moduleLevels['*'] : defaultLevel;
+
+const sampleRate = Math.min(1, Math.max(0, parseFloat(process.env.LOG_SAMPLE_RATE || '1')));
+
+const format = (process.env.LOG_FORMAT || (isDevelopment() ? 'pretty' : 'json')).toLowerCase();
+
+/* ------------------------------ sink ------------------------------ */
+
+let buffer = [];
+let flushScheduled = false;
+let droppedLines = 0;
+
+const flush = () => {
+  flushScheduled = false;
+  if (buffer.length === 0) return;
+
+  const lines = buffer;
+  buffer = [];
+
+  if (droppedLines > 0) {
+    lines.push(
+      JSON.stringify({ time: new Date().toISOString(), level: 'warn', module: 'logger', msg: `Dropped ${droppedLines} log lines (buffer full)` })
+    );
+    droppedLines = 0;
+  }
+
+  process.stdout.write(lines.join('\n') + '\n');
+};
+
+const scheduleFlush = () => {
+  if (flushScheduled) return;
+  flushScheduled = true;
+  const timer = setTimeout(flush, FLUSH_INTERVAL_MS);
+  if (typeof timer.unref === 'function') timer.unref();
+};
+
+const write = (levelName, line) => {
+  // Errors skip the buffer so they are never lost on a crash
+  if (levelName === 'error') {
+    flush();
+    process.stderr.write(line + '\n');
+    return;
+  }
+
+  if (buffer.length >= MAX_BUFFERED_LINES) {
+    droppedLines += 1;
+    scheduleFlush();
+    return;
+  }
+
+  buffer.push(line);
+  scheduleFlush();
+};
+
+process.on('exit', flush);
+
+/* ----------------------------- records ---------------------------- */
+
+const serializeError = (error) => ({
+  name: error.name,
+  message: error.message,
+  code: error.code,
+  stack: error.stack,
+});
+
+const normalizeFields = (fields) => {
+  if (fields === undefined || fields === null) return {};
+  const resolved = typeof fields === 'function' ? fields() : fields;
+  if (resolved instanceof Error) return { err: serializeError(resolved) };
+  if (typeof resolved !== 'object' || Array.isArray(resolved)) return { data: resolved };
+
+  const out = {};
+  Object.keys(resolved).forEach((key) => {
+    const value = resolved[key];
+    out[key] = value instanceof Error ? serializeError(value) : value;
+  });
+  return out;
+};
+
+const safeStringify = (record) => {
+  try {
+    return JSON.stringify(record, (key, value) => (typeof value === 'bigint' ? value.toString() : value));
+  } catch (error) {
+    return JSON.stringify({ time: record.time, level: record.level, module: record.module, msg: record.msg, serializeError: error.message });
+  }
+};
+
+const render = (record) => {
+  if (format !== 'pretty') return safeStringify(record);
+
+  const { time, level, module: moduleName, msg, ...rest } = record;
+  const extra = Object.keys(rest).length > 0 ? ` ${safeStringify(rest)}` : '';
+  return `${time} ${level.toUpperCase().padEnd(5)} [${moduleName}] ${msg}${extra}`;
+};
+
+/* ----------------------------- logger ----------------------------- */
+
+const createLogger = (moduleName = 'app', bindings = {}) => {
+  const threshold = moduleLevels[moduleName] !== undefined ? moduleLevels[moduleName] : globalLevel;
+
+  const isEnabled = (levelName) => LEVELS[levelName] <= threshold;
+
+  const log = (levelName, msg, fields) => {
+    if (!isEnabled(levelName)) return;
+    if (LEVELS[levelName] >= LEVELS.debug && sampleRate < 1 && Math.random() >= sampleRate) return;
+
+    const record = {
+      time: new Date().toISOString(),
+      level: levelName,
+      module: moduleName,
+      msg,
+      ...bindings,
+      ...normalizeFields(fields),
+    };
+    write(levelName, render(record));
+  };
+
+  return {
+    isEnabled,
+    error: (msg, fields) => log('error', msg, fields),
+    warn: (msg, fields) => log('warn', msg, fields),
+    info: (msg, fields) => log('info', msg, fields),
+    debug: (msg, fields) => log('debug', msg, fields),
+    trace: (msg, fields) => log('trace', msg, fields),
+    /**
+     * Create a logger that adds fixed fields to every line (e.g. requestId)
+     * @param {Object} extraBindings - Fields to attach
+     */
+    with: (extraBindings) => createLogger(moduleName, { ...bindings, ...extraBindings }),
+  };
+};
+
+const rootLogger = createLogger('app');
+
+module.exports = {
+  ...rootLogger,
+  child: (moduleName) => createLogger(moduleName),
+  createLogger,
+  flush,
+  LEVELS,
+};
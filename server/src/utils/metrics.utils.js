@@ -0,0 +1,215 @@
+/**
+ * Metrics Registry
+ * Minimal in-process counters, gauges and histograms rendered in the
+ * Prometheus text exposition format (served on GET /metrics).
+ *
+ * Histograms also expose p50/p95/p99 estimates (interpolated from the
+ * buckets) as a companion `<name>_quantile` gauge so latency can be read
+ * straight from the endpoint without a Prometheus server.
+ */
+
+const { monitorEventLoopDelay } = require('perf_hooks');
+
+// Seconds - covers fast cache hits up to slow report queries
+const DEFAULT_BUCKETS = [0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10];
+const QUANTILES = [0.5, 0.95, 0.99];
+
+const metrics = new Map();
+
+const escapeLabel = (value) =>
+  String(value).replace(/\\/g, '\\\\').replace(/\n/g, '\\n').replace(/"/g, '\\"');
+
+const labelKey = (labelNames, labels = {}) =>
+  labelNames.map((name) => (labels[name] === undefined ? '' : String(labels[name]))).join('\u0000');
+
+const renderLabels = (labelNames, values, extra = {}) => {
+  const parts = labelNames.map((name, i) => `${name}="${escapeLabel(values[i])}"`);
+  Object.keys(extra).forEach((name) => parts.push(`${name}="${escapeLabel(extra[name])}"`));
+  return parts.length > 0 ? `{${parts.join(',')}}` : '';
+};
+
+const register = (metric) => {
+  if (metrics.has(metric.name)) {
+    return metrics.get(metric.name);
+  }
+  metrics.set(metric.name, metric);
+  return metric;
+};
+
+/**
+ * Create (or return the existing) counter
+ * @param {Object} options - { name, help, labelNames }
+ */
+const counter = ({ name, help, labelNames = [] }) => {
+  const values = new Map();
+
+  return register({
+    name,
+    inc: (labels = {}, amount = 1) => {
+      const key = labelKey(labelNames, labels);
+      values.set(key, (values.get(key) || 0) + amount);
+    },
+    render: () => {
+      const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} counter`];
+      values.forEach((value, key) => {
+        lines.push(`${name}${renderLabels(labelNames, key.split('\u0000'))} ${value}`);
+      });
+      return lines.join('\n');
+    },
+  });
+};
+
+/**
+ * Create (or return the existing) gauge
+ * `collect` lets a gauge read its value at scrape time.
+ * @param {Object} options - { name, help, labelNames, collect }
+ */
+const gauge = ({ name, help, labelNames = [], collect = null }) => {
+  const values = new Map();
+
+  const set = (labels = {}, value) => values.set(labelKey(labelNames, labels), value);
+  const inc = (labels = {}, amount = 1) => {
+    const key = labelKey(labelNames, labels);
+    values.set(key, (values.get(key) || 0) + amount);
+  };
+
+  return register({
+    name,
+    set,
+    inc,
+    dec: (labels = {}, amount = 1) => inc(labels, -amount),
+    render: () => {
+      if (collect) collect(set);
+      const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} gauge`];
+      values.forEach((value, key) => {
+        lines.push(`${name}${renderLabels(labelNames, key.split('\u0000'))} ${value}`);
+      });
+      return lines.join('\n');
+    },
+  });
+};
+
+/**
+ * Estimate a quantile from cumulative bucket counts (linear interpolation)
+ */
+const estimateQuantile = (q, buckets, counts, total) => {
+  if (total === 0) return 0;
+  const rank = q * total;
+  let previousBound = 0;
+  let previousCount = 0;
+
+  for (let i = 0; i < buckets.length; i += 1) {
+    if (counts[i] >= rank) {
+      const inBucket = counts[i] - previousCount;
+      const fraction = inBucket > 0 ? (rank - previousCount) / inBucket : 0;
+      return previousBound + (buckets[i] - previousBound) * fraction;
+    }
+    previousBound = buckets[i];
+    previousCount = counts[i];
+  }
+  // Falls in +Inf bucket - best we can say is "above the largest bound"
+  return buckets[buckets.length - 1];
+};
+
+/**
+ * Create (or return the existing) histogram
+ * @param {Object} options - { name, help, labelNames, buckets }
+ */
+const histogram = ({ name, help, labelNames = [], buckets = DEFAULT_BUCKETS }) => {
+  const series = new Map(); // key -> { counts[], sum, count }
+
+  const observe = (labels = {}, value) => {
+    const key = labelKey(labelNames, labels);
+    let entry = series.get(key);
+    if (!entry) {
+      entry = { counts: new Array(buckets.length).fill(0), sum: 0, count: 0 };
+      series.set(key, entry);
+    }
+    for (let i = 0; i < buckets.length; i += 1) {
+      if (value <= buckets[i]) entry.counts[i] += 1;
+    }
+    entry.sum += value;
+    entry.count += 1;
+  };
+
+  return register({
+    name,
+    observe,
+    /**
+     * Start a timer; call the returned function to record elapsed seconds
+     */
+    startTimer: (labels = {}) => {
+      const start = process.hrtime.bigint();
+      return (extraLabels = {}) => {
+        const seconds = Number(process.hrtime.bigint() - start) / 1e9;
+        observe({ ...labels, ...extraLabels }, seconds);
+        return seconds;
+      };
+    },
+    render: () => {
+      const lines = [`# HELP ${name} ${help}`, `# TYPE ${name} histogram`];
+      const quantileLines = [
+        `# HELP ${name}_quantile ${help} (quantile estimate from buckets)`,
+        `# TYPE ${name}_quantile gauge`,
+      ];
+
+      series.forEach((entry, key) => {
+        const values = key.split('\u0000');
+        buckets.forEach((bound, i) => {
+          lines.push(`${name}_bucket${renderLabels(labelNames, values, { le: bound })} ${entry.counts[i]}`);
+        });
+        lines.push(`${name}_bucket${renderLabels(labelNames, values, { le: '+Inf' })} ${entry.count}`);
+        lines.push(`${name}_sum${renderLabels(labelNames, values)} ${entry.sum}`);
+        lines.push(`${name}_count${renderLabels(labelNames, values)} ${entry.count}`);
+
+        QUANTILES.forEach((q) => {
+          const estimate = estimateQuantile(q, buckets, entry.counts, entry.count);
+          quantileLines.push(`${name}_quantile${renderLabels(labelNames, values, { quantile: q })} ${estimate}`);
+        });
+      });
+
+      return `${lines.join('\n')}\n${quantileLines.join('\n')}`;
+    },
+  });
+};
+
+/* ------------------------- built-in metrics ------------------------- */
+
+const eventLoopDelay = monitorEventLoopDelay({ resolution: 20 });
+eventLoopDelay.enable();
+
+gauge({
+  name: 'nodejs_eventloop_lag_seconds',
+  help: 'Event loop delay since last scrape',
+  labelNames: ['stat'],
+  collect: (set) => {
+    set({ stat: 'mean' }, (eventLoopDelay.mean || 0) / 1e9);
+    set({ stat: 'p50' }, eventLoopDelay.percentile(50) / 1e9);
+    set({ stat: 'p99' }, eventLoopDelay.percentile(99) / 1e9);
+    set({ stat: 'max' }, eventLoopDelay.max / 1e9);
+    eventLoopDelay.reset();
+  },
+});
+
+gauge({
+  name: 'process_resident_memory_bytes',
+  help: 'Resident memory size in bytes',
+  collect: (set) => set({}, process.memoryUsage().rss),
+});
+
+/**
+ * Render every registered metric in Prometheus text format
+ * @returns {string}
+ */
+const renderMetrics = () =>
+  `${Array.from(metrics.values())
+    .map((metric) => metric.render())
+    .join('\n')}\n`;
+
+module.exports = {
+  counter,
+  gauge,
+  histogram,
+  renderMetrics,
+  estimateQuantile,
+};
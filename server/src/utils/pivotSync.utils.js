@@ -0,0 +1,112 @@
+/**
+ * Pivot Sync Utilities
+ * Bring a many-to-many pivot table (property amenities, facilities,
+ * safeties, room type amenities) in line with a selected id list.
+ *
+ * The current rows are read once and diffed in memory; changes are applied
+ * with at most three bulk statements per pivot table, however many owners
+ * and ids are involved:
+ * - deleteMany: rows no longer selected (and stale soft-deleted duplicates)
+ * - updateMany: soft-deleted rows that were selected again
+ * - createMany: selected ids with no row yet
+ * Rows that are already correct are not touched, so their ids and
+ * createdAt survive repeated saves.
+ *
+ * Pivot tables are unique on (owner, foreign key, isDeleted), so after a
+ * sync each selected id has exactly one active row and nothing else.
+ *
+ * Usage:
+ * await syncPivot(tx.propertyAmenity, { where: { propertyId }, foreignKey: 'amenityId', selectedIds });
+ */
+
+/**
+ * Sync one pivot table for several owners at once
+ * @param {Object} delegate - Prisma model delegate (e.g. tx.propertyRoomTypeAmenity)
+ * @param {Object} options
+ * @param {string} options.ownerKey - Owner column (e.g. 'propertyRoomTypeId')
+ * @param {string} options.foreignKey - Linked column (e.g. 'amenityId')
+ * @param {Map<string, string[]>|Object<string, string[]>} options.selections - ownerId -> selected ids
+ * @returns {Promise<{created: number, reactivated: number, removed: number}>}
+ */
+const syncPivotGroups = async (delegate, { ownerKey, foreignKey, selections }) => {
+  const entries = selections instanceof Map ? [...selections.entries()] : Object.entries(selections);
+  const result = { created: 0, reactivated: 0, removed: 0 };
+  if (!entries.length) return result;
+
+  const rows = await delegate.findMany({
+    where: { [ownerKey]: { in: entries.map(([ownerId]) => ownerId) } },
+    select: { id: true, [ownerKey]: true, [foreignKey]: true, isDeleted: true },
+  });
+
+  // owner -> foreign id -> { active, deleted }
+  const existing = new Map();
+  rows.forEach((row) => {
+    let byForeignId = existing.get(row[ownerKey]);
+    if (!byForeignId) {
+      byForeignId = new Map();
+      existing.set(row[ownerKey], byForeignId);
+    }
+    const slot = byForeignId.get(row[foreignKey]) || {};
+    slot[row.isDeleted ? 'deleted' : 'active'] = row;
+    byForeignId.set(row[foreignKey], slot);
+  });
+
+  const keepIds = new Set();
+  const reactivateIds = [];
+  const createData = [];
+
+  entries.forEach(([ownerId, selectedIds]) => {
+    const byForeignId = existing.get(ownerId) || new Map();
+    new Set((selectedIds || []).filter(Boolean)).forEach((foreignId) => {
+      const slot = byForeignId.get(foreignId);
+      if (slot?.active) {
+        keepIds.add(slot.active.id);
+      } else if (slot?.deleted) {
+        keepIds.add(slot.deleted.id);
+        reactivateIds.push(slot.deleted.id);
+      } else {
+        createData.push({ [ownerKey]: ownerId, [foreignKey]: foreignId });
+      }
+    });
+  });
+
+  const removeIds = rows.filter((row) => !keepIds.has(row.id)).map((row) => row.id);
+
+  // Remove first so a reactivated row never collides with a stale duplicate
+  if (removeIds.length) {
+    result.removed = (await delegate.deleteMany({ where: { id: { in: removeIds } } })).count;
+  }
+  if (reactivateIds.length) {
+    result.reactivated = (
+      await delegate.updateMany({ where: { id: { in: reactivateIds } }, data: { isDeleted: false } })
+    ).count;
+  }
+  if (createData.length) {
+    result.created = (await delegate.createMany({ data: createData, skipDuplicates: true })).count;
+  }
+
+  return result;
+};
+
+/**
+ * Sync one pivot table for a single owner
+ * @param {Object} delegate - Prisma model delegate (e.g. tx.propertyAmenity)
+ * @param {Object} options
+ * @param {Object} options.where - Owner column and id, e.g. { propertyId }
+ * @param {string} options.foreignKey - Linked column (e.g. 'amenityId')
+ * @param {string[]} options.selectedIds
+ * @returns {Promise<{created: number, reactivated: number, removed: number}>}
+ */
+const syncPivot = (delegate, { where, foreignKey, selectedIds }) => {
+  const [ownerKey, ownerId] = Object.entries(where)[0];
+  return syncPivotGroups(delegate, {
+    ownerKey,
+    foreignKey,
+    selections: new Map([[ownerId, selectedIds]]),
+  });
+};
+
+module.exports = {
+  syncPivot,
+  syncPivotGroups,
+};
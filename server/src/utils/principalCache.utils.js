@@ -0,0 +1,86 @@
+/**
+ * Principal Cache
+ * Short-lived cache of account status for authenticated travel agents,
+ * keyed by the token subject. Host and admin requests do not look their
+ * account up per request, so only agents are cached.
+ *
+ * Every authenticated agent request used to look the agent up again in
+ * the middleware and then once more in the controller. These lookups now
+ * go through here and are served from memory for PRINCIPAL_CACHE_TTL_MS.
+ *
+ * Any code that changes an agent account (approve, suspend, reject,
+ * delete, profile or password update) must call invalidatePrincipal(role, id).
+ * Other processes pick the change up once their entry expires.
+ */
+
+const prisma = require('../config/prisma');
+const { createTtlCache } = require('./ttlCache.utils');
+
+const PRINCIPAL_CACHE_TTL_MS = parseInt(process.env.PRINCIPAL_CACHE_TTL_MS || '30000', 10);
+const PRINCIPAL_CACHE_MAX_ENTRIES = parseInt(
+  process.env.PRINCIPAL_CACHE_MAX_ENTRIES || '5000',
+  10
+);
+
+const principalCache = createTtlCache({
+  name: 'principals',
+  ttlMs: PRINCIPAL_CACHE_TTL_MS,
+  maxEntries: PRINCIPAL_CACHE_MAX_ENTRIES,
+});
+
+// Loaders return the principal when the account is usable, otherwise null.
+// null results are cached as well so rejected tokens don't hammer the DB.
+const loaders = {
+  agent: async (id) => {
+    const agent = await prisma.travelAgent.findFirst({
+      where: { id, isDeleted: false },
+      select: { id: true, email: true, status: true },
+    });
+    return agent || null;
+  },
+};
+
+const cacheKey = (role, id) => `${role}:${id}`;
+
+/**
+ * Get a principal by role and id (cached)
+ * @param {string} role - 'agent'
+ * @param {string} id - Token subject (agentId)
+ * @returns {Promise<Object|null>} - Principal record or null if missing/deleted
+ */
+const getPrincipal = async (role, id) => {
+  const loader = loaders[role];
+  if (!loader || !id) {
+    return null;
+  }
+  return principalCache.getOrLoad(cacheKey(role, id), () => loader(id));
+};
+
+/**
+ * Get a travel agent only if they exist and are approved
+ * @param {string} agentId - Agent ID from token
+ * @returns {Promise<Object|null>} - { id, email, status } or null
+ */
+const getApprovedAgent = async (agentId) => {
+  const agent = await getPrincipal('agent', agentId);
+  return agent && agent.status === 'approved' ? agent : null;
+};
+
+/**
+ * Drop a cached principal after its account has changed
+ * @param {string} role - 'agent'
+ * @param {string} id - Principal ID
+ */
+const invalidatePrincipal = (role, id) => {
+  if (!id) return;
+  principalCache.delete(cacheKey(role, id));
+};
+
+const getPrincipalCacheStats = () => principalCache.getStats();
+
+module.exports = {
+  getPrincipal,
+  getApprovedAgent,
+  invalidatePrincipal,
+  getPrincipalCacheStats,
+};
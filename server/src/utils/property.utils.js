@@ -1,5 +1,5 @@
-const { PrismaClient } = require('@prisma/client');
-const prisma = new PrismaClient();
+const prisma = require('../config/prisma');
+const logger = require('./logger.utils').child('search');
 
 // Date helpers
 const dayUTC = (dateStr) => {
@@ -26,15 +26,17 @@ const eachDateUTC = (start, end) => {
 
 // Fetch available properties with room availability
 async function fetchAvailableProperties(startDate, endDate, guestNeeds, totalBedsNeeded) {
-  console.log('\n=== Fetching Available Properties ===');
-  console.log('Date Range:', { startDate: startDate.toISOString(), endDate: endDate.toISOString() });
-  console.log('Guest Needs:', guestNeeds);
-  console.log('Total Beds Needed:', totalBedsNeeded);
+  logger.debug('Fetching available properties', () => ({
+    startDate: startDate.toISOString(),
+    endDate: endDate.toISOString(),
+    guestNeeds,
+    totalBedsNeeded
+  }));
 
   const availableRoomIds = await fetchAvailableRoomIds(startDate, endDate);
   
   if (availableRoomIds.size === 0) {
-    console.log('No available rooms found for the date range');
+    logger.debug('No available rooms found for the date range');
     return [];
   }
   
@@ -65,6 +67,7 @@ async function fetchAvailableProperties(startDate, endDate, guestNeeds, totalBed
         },
         select: {
           id: true,
+          updatedAt: true,
           Occupancy: true,
           extraBedCapacity: true,
           minOccupancy: true,
@@ -94,6 +97,8 @@ async function fetchAvailableProperties(startDate, endDate, guestNeeds, totalBed
           mealPlanLinks: {
             where: { isDeleted: false, isActive: true },
             select: {
+              id: true,
+              updatedAt: true,
               doubleOccupancyPrice: true,
               singleOccupancyPrice: true,
               groupOccupancyPrice: true
@@ -136,7 +141,8 @@ async function fetchAvailableProperties(startDate, endDate, guestNeeds, totalBed
         where: { isDeleted: false },
         select: {
           id: true,
-          rating: true
+          rating: true,
+          updatedAt: true
         }
       }
     }
@@ -162,13 +168,18 @@ async function fetchAvailableProperties(startDate, endDate, guestNeeds, totalBed
     const hasEnoughRooms = totalAvailableRooms >= 1; // At least 1 room available
 
     if (hasEnoughCapacity && hasEnoughRooms) {
-      console.log(`Property ${property.id} - Capacity: ${totalCapacity}, Needed: ${totalBedsNeeded}, Rooms: ${totalAvailableRooms}`);
+      logger.trace('Property has capacity', () => ({
+        propertyId: property.id,
+        capacity: totalCapacity,
+        needed: totalBedsNeeded,
+        rooms: totalAvailableRooms
+      }));
     }
 
     return hasEnoughCapacity && hasEnoughRooms;
   });
 
-  console.log(`\nValid Properties: ${validProperties.length} of ${properties.length}`);
+  logger.debug('Valid properties', { valid: validProperties.length, candidates: properties.length });
 
   return validProperties;
 }
@@ -204,11 +215,11 @@ async function fetchAvailableRoomIds(startDate, endDate) {
   const validRoomIds = new Set(activeRooms.map(r => r.id));
 
   if (validRoomIds.size === 0) {
-    console.log('No active rooms found');
+    logger.debug('No active rooms found');
     return new Set();
   }
 
-  console.log('\nTotal Active Rooms:', validRoomIds.size);
+  logger.debug('Total active rooms', { count: validRoomIds.size });
 
   // Get all unavailable rooms for the date range
   // Unavailable means: has availability record with status 'booked', 'maintenance', 'blocked', 'out_of_service'
@@ -389,7 +400,7 @@ async function fetchAvailableRoomIds(startDate, endDate) {
     }
   }
 
-  console.log('\nAvailable Rooms for Date Range:', {
+  logger.debug('Available rooms for date range', {
     totalRooms: validRoomIds.size,
     availableRooms: availableRoomIds.size,
     unavailableFromAvailability: unavailableRoomRecords.length,
@@ -411,15 +422,17 @@ function calculateRoomAssignments(properties, guestNeeds, infantsNeedBed, nights
     // Calculate total capacity for each room type
     const totalCapacity = property.roomTypes.reduce((sum, rt) => {
       const roomTypeCapacity = (rt.Occupancy + rt.extraBedCapacity) * rt.rooms.length;
-      console.log('RoomType:', rt.roomType?.name, 
-                  'Base Occupancy:', rt.Occupancy,
-                  'Extra Capacity:', rt.extraBedCapacity,
-                  'Rooms:', rt.rooms.length,
-                  'Total Capacity:', roomTypeCapacity);
+      logger.trace('Room type capacity', () => ({
+        roomType: rt.roomType?.name,
+        baseOccupancy: rt.Occupancy,
+        extraCapacity: rt.extraBedCapacity,
+        rooms: rt.rooms.length,
+        totalCapacity: roomTypeCapacity
+      }));
       return sum + roomTypeCapacity;
     }, 0);
 
-    console.log(`Property ${property.id} total capacity:`, totalCapacity);
+    logger.trace('Property total capacity', () => ({ propertyId: property.id, totalCapacity }));
 
     const totalGuests = guestNeeds.adults + guestNeeds.children + 
       (infantsNeedBed ? guestNeeds.infants : 0);
@@ -0,0 +1,204 @@
+/**
+ * Query plan checks for hot queries
+ *
+ * Runs each critical Prisma query shape, captures the SQL Prisma generates
+ * and EXPLAINs it. A plan is a problem when the query scans a whole table
+ * or index (type ALL / index) or when the composite index meant for it is
+ * not even a candidate - i.e. the index is missing or the query no longer
+ * matches it.
+ *
+ * Writes are checked through a read with the same WHERE clause (the plan
+ * for the predicate is the same), so nothing is modified.
+ *
+ * MySQL only picks an index over a full scan once the table holds enough
+ * rows, so run this against realistic data (scripts/explainHotQueries.js)
+ * or the seeded fixture (tests/queryPlans.test.js).
+ */
+
+const FULL_SCAN_TYPES = new Set(['ALL', 'index']);
+const SAMPLE_ID = '00000000-0000-0000-0000-000000000000';
+
+/**
+ * Query shapes to check
+ * `index` is the composite index (Prisma default name) the query should be able to use.
+ */
+const buildChecks = (prisma, { propertyId, now }) => {
+  const from = new Date(now.getTime() + 7 * 86400000);
+  const to = new Date(now.getTime() + 10 * 86400000);
+
+  return [
+    {
+      name: 'Order holds (releaseOrderHolds / getBlockedAvailability)',
+      table: 'Availability',
+      index: 'Availability_blockedBy_status_idx',
+      run: () =>
+        prisma.availability.findMany({
+          where: { blockedBy: SAMPLE_ID, status: 'blocked', isDeleted: false },
+          select: { id: true },
+        }),
+    },
+    {
+      name: 'Booked nights by booking (cancellation release)',
+      table: 'Availability',
+      index: 'Availability_blockedBy_status_idx',
+      run: () =>
+        prisma.availability.findMany({
+          where: { blockedBy: { in: [SAMPLE_ID] }, status: 'booked', isDeleted: false },
+          select: { id: true },
+        }),
+    },
+    {
+      name: 'Expired holds (front desk hold cleanup)',
+      table: 'Availability',
+      index: 'Availability_status_holdExpiresAt_idx',
+      run: () =>
+        prisma.availability.findMany({
+          where: { status: 'blocked', isDeleted: false, holdExpiresAt: { not: null, lte: now } },
+          select: { id: true, blockedBy: true },
+        }),
+    },
+    {
+      name: 'Overlapping bookings for a property (front desk)',
+      table: 'Booking',
+      index: 'Booking_propertyId_status_startDate_endDate_idx',
+      run: () =>
+        prisma.booking.findMany({
+          where: {
+            propertyId,
+            isDeleted: false,
+            status: { in: ['pending', 'confirmed'] },
+            startDate: { lt: to },
+            endDate: { gt: from },
+          },
+          select: { id: true },
+        }),
+    },
+    {
+      name: 'Overlapping bookings across properties (search)',
+      table: 'Booking',
+      index: 'Booking_status_startDate_endDate_idx',
+      run: () =>
+        prisma.booking.findMany({
+          where: {
+            isDeleted: false,
+            status: { in: ['confirmed', 'pending'] },
+            startDate: { lt: to },
+            endDate: { gt: from },
+          },
+          select: { id: true },
+        }),
+    },
+    {
+      name: 'Active rate plan dates (pricing calendar)',
+      table: 'RatePlanDate',
+      index: 'RatePlanDate_propertyId_isActive_date_idx',
+      run: () =>
+        prisma.ratePlanDate.findMany({
+          where: { propertyId, isDeleted: false, isActive: true, date: { gte: from, lte: to } },
+          select: { id: true, date: true, ratePlanId: true },
+          orderBy: { date: 'asc' },
+        }),
+    },
+    {
+      name: 'Property reviews, newest first',
+      table: 'Review',
+      index: 'Review_propertyId_isDeleted_createdAt_idx',
+      run: () =>
+        prisma.review.findMany({
+          where: { propertyId, isDeleted: false },
+          select: { id: true },
+          orderBy: { createdAt: 'desc' },
+          take: 10,
+        }),
+    },
+    {
+      name: 'Stale PENDING orders (expiry sweep)',
+      table: 'Order',
+      index: 'Order_status_expiresAt_idx',
+      run: () =>
+        prisma.order.findMany({
+          where: { status: 'PENDING', isDeleted: false, expiresAt: { lte: now } },
+          select: { id: true },
+          orderBy: { expiresAt: 'asc' },
+          take: 500,
+        }),
+    },
+  ];
+};
+
+// Prisma logs dates as "2025-01-01 00:00:00 UTC"; MySQL wants them without the zone
+const toSqlParam = (value) =>
+  typeof value === 'string' ? value.replace(/^(\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}(\.\d+)?) UTC$/, '$1') : value;
+
+/**
+ * Create a plan checker bound to a Prisma client
+ * The client must be created with `log: [{ emit: 'event', level: 'query' }]`
+ * so the generated SQL can be captured.
+ * @param {import('@prisma/client').PrismaClient} prisma
+ */
+const createQueryPlanChecker = (prisma) => {
+  let capturedQueries = [];
+  prisma.$on('query', (event) => capturedQueries.push(event));
+
+  /**
+   * Refresh table statistics so the optimizer sees the current row counts
+   * @param {string[]} tables
+   */
+  const analyzeTables = async (tables) => {
+    for (const table of tables) {
+      await prisma.$queryRawUnsafe(`ANALYZE TABLE \`${table}\``);
+    }
+  };
+
+  /**
+   * Run a check and EXPLAIN the SQL it sent for its table
+   * @returns {Promise<{plans: Array<Object>, problems: string[]}>}
+   */
+  const explainCheck = async (check) => {
+    capturedQueries = [];
+    await check.run();
+
+    const tablePattern = new RegExp(`FROM \`[^\`]+\`\\.\`${check.table}\``);
+    const queries = capturedQueries.filter((event) => tablePattern.test(event.query));
+    if (!queries.length) return { plans: [], problems: [`no query against ${check.table} was captured`] };
+
+    const plans = [];
+    const problems = [];
+    for (const event of queries) {
+      const params = JSON.parse(event.params || '[]').map(toSqlParam);
+      const rows = await prisma.$queryRawUnsafe(`EXPLAIN ${event.query}`, ...params);
+
+      rows
+        .filter((row) => row.table === check.table)
+        .forEach((row) => {
+          const possibleKeys = String(row.possible_keys || '').split(',');
+          const plan = {
+            type: row.type,
+            key: row.key,
+            possibleKeys,
+            rows: Number(row.rows),
+            extra: row.Extra,
+            sql: event.query,
+          };
+          plans.push(plan);
+
+          if (FULL_SCAN_TYPES.has(row.type)) problems.push(`full ${row.type === 'ALL' ? 'table' : 'index'} scan`);
+          if (!possibleKeys.includes(check.index)) problems.push(`${check.index} is not a candidate index`);
+        });
+    }
+
+    return { plans, problems: [...new Set(problems)] };
+  };
+
+  return {
+    buildChecks: (options) => buildChecks(prisma, options),
+    analyzeTables,
+    explainCheck,
+  };
+};
+
+module.exports = {
+  SAMPLE_ID,
+  createQueryPlanChecker,
+  toSqlParam,
+};
@@ -0,0 +1,77 @@
+/**
+ * Read Routing
+ * Per-request decision of where Prisma reads go when a read replica is
+ * configured (DATABASE_REPLICA_URL, see config/prisma).
+ *
+ * Everything goes to the primary unless a route opted in with the
+ * replicaSafe middleware. Even then:
+ * - writes always go to the primary, and once a request has written,
+ *   its remaining reads do too (it must see its own write)
+ * - runOnPrimary() pins a block to the primary - for shared caches, whose
+ *   contents outlive the request, and for any transaction
+ *
+ * The state lives on the request context (utils/requestContext), so it
+ * follows the request through services and utils without passing a client
+ * around.
+ */
+
+const { getRequestContext, runWithRequestContext } = require('./requestContext.utils');
+
+const READ_OPERATIONS = new Set([
+  'findUnique',
+  'findUniqueOrThrow',
+  'findFirst',
+  'findFirstOrThrow',
+  'findMany',
+  'count',
+  'aggregate',
+  'groupBy',
+]);
+
+/**
+ * Route the current request's reads to the replica
+ * @param {Object} context - Request context to mark
+ */
+const preferReplica = (context) => {
+  context.readTarget = 'replica';
+};
+
+/**
+ * Whether a query should be sent to the replica
+ * @param {string} operation - Prisma operation (findMany, update, ...)
+ * @returns {boolean}
+ */
+const shouldUseReplica = (operation) => {
+  const context = getRequestContext();
+  return Boolean(context && context.readTarget === 'replica' && READ_OPERATIONS.has(operation));
+};
+
+/**
+ * Record that the current request wrote, so its later reads use the primary
+ * @param {string} operation - Prisma operation
+ */
+const noteOperation = (operation) => {
+  if (READ_OPERATIONS.has(operation)) return;
+  const context = getRequestContext();
+  if (context && context.readTarget === 'replica') context.readTarget = 'primary';
+};
+
+/**
+ * Run `fn` with every query on the primary
+ * The request context (and anything recorded on it) is kept.
+ * @param {Function} fn
+ * @returns {*} Whatever fn returns
+ */
+const runOnPrimary = (fn) => {
+  const context = getRequestContext();
+  if (!context || context.readTarget !== 'replica') return fn();
+  return runWithRequestContext(Object.assign(Object.create(context), { readTarget: 'primary' }), fn);
+};
+
+module.exports = {
+  READ_OPERATIONS,
+  preferReplica,
+  shouldUseReplica,
+  noteOperation,
+  runOnPrimary,
+};
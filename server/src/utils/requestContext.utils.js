@@ -0,0 +1,37 @@
+/**
+ * Request Context
+ * AsyncLocalStorage-backed store that follows a request through every
+ * await, so deep code (e.g. Prisma query hooks) can attribute work to
+ * the request that caused it without threading `req` everywhere.
+ */
+
+const { AsyncLocalStorage } = require('async_hooks');
+
+const storage = new AsyncLocalStorage();
+
+/**
+ * Run `fn` with `context` as the current request context
+ * @param {Object} context - Mutable per-request state
+ * @param {Function} fn - Callback (typically Express `next`)
+ */
+const runWithRequestContext = (context, fn) => storage.run(context, fn);
+
+/**
+ * Current request context, or undefined outside a request
+ * @returns {Object|undefined}
+ */
+const getRequestContext = () => storage.getStore();
+
+/**
+ * Run `fn` detached from the current request context
+ * For background work started by a request (e.g. post-upload processing)
+ * that must not be attributed to it.
+ * @param {Function} fn
+ */
+const runOutsideRequestContext = (fn) => storage.exit(fn);
+
+module.exports = {
+  runWithRequestContext,
+  getRequestContext,
+  runOutsideRequestContext,
+};
@@ -0,0 +1,169 @@
+/**
+ * In-process TTL cache with an LRU size bound
+ *
+ * Entries expire after `ttlMs` and the least recently used entry is evicted
+ * once `maxEntries` is reached. Concurrent loads for the same key share a
+ * single in-flight promise so a cold key only hits the database once.
+ * Every cache reports its size and hit/miss counters on /metrics.
+ */
+
+const { gauge } = require('./metrics.utils');
+
+const caches = new Set();
+
+gauge({
+  name: 'ttl_cache',
+  help: 'In-process cache size and hit/miss/eviction/invalidation counters',
+  labelNames: ['cache', 'stat'],
+  collect: (set) => {
+    caches.forEach((cache) => {
+      const stats = cache.getStats();
+      ['size', 'hits', 'misses', 'evictions', 'invalidations'].forEach((stat) =>
+        set({ cache: stats.name, stat }, stats[stat])
+      );
+    });
+  },
+});
+
+const createTtlCache = ({ name = 'cache', ttlMs = 30000, maxEntries = 1000 } = {}) => {
+  // Map keeps insertion order, so re-inserting on read gives us LRU ordering
+  const entries = new Map();
+  const inflight = new Map();
+  const stats = { hits: 0, misses: 0, evictions: 0, invalidations: 0 };
+
+  const isExpired = (entry, now = Date.now()) => entry.expiresAt <= now;
+
+  const get = (key) => {
+    const entry = entries.get(key);
+    if (!entry) {
+      stats.misses += 1;
+      return undefined;
+    }
+
+    if (isExpired(entry)) {
+      entries.delete(key);
+      stats.misses += 1;
+      return undefined;
+    }
+
+    // Refresh recency
+    entries.delete(key);
+    entries.set(key, entry);
+    stats.hits += 1;
+    return entry.value;
+  };
+
+  const set = (key, value, entryTtlMs = ttlMs) => {
+    if (entries.has(key)) {
+      entries.delete(key);
+    }
+
+    while (entries.size >= maxEntries) {
+      const oldestKey = entries.keys().next().value;
+      entries.delete(oldestKey);
+      stats.evictions += 1;
+    }
+
+    entries.set(key, { value, expiresAt: Date.now() + entryTtlMs });
+    return value;
+  };
+
+  const del = (key) => {
+    inflight.delete(key);
+    if (entries.delete(key)) {
+      stats.invalidations += 1;
+      return true;
+    }
+    return false;
+  };
+
+  /**
+   * Delete every key matching a predicate (e.g. all keys for one property)
+   * @param {Function} predicate - (key) => boolean
+   * @returns {number} - Number of entries removed
+   */
+  const deleteWhere = (predicate) => {
+    let removed = 0;
+    for (const key of Array.from(entries.keys())) {
+      if (predicate(key)) {
+        entries.delete(key);
+        removed += 1;
+      }
+    }
+    for (const key of Array.from(inflight.keys())) {
+      if (predicate(key)) {
+        inflight.delete(key);
+      }
+    }
+    stats.invalidations += removed;
+    return removed;
+  };
+
+  const clear = () => {
+    stats.invalidations += entries.size;
+    entries.clear();
+    inflight.clear();
+  };
+
+  /**
+   * Return the cached value or load it once via `loader`
+   * A loader result of `undefined` is not cached.
+   * @param {string} key - Cache key
+   * @param {Function} loader - async () => value
+   * @param {number} [entryTtlMs] - Override TTL for this entry
+   * @returns {Promise<any>}
+   */
+  const getOrLoad = async (key, loader, entryTtlMs = ttlMs) => {
+    const cached = get(key);
+    if (cached !== undefined) {
+      return cached;
+    }
+
+    if (inflight.has(key)) {
+      return inflight.get(key);
+    }
+
+    const pending = (async () => {
+      try {
+        const value = await loader();
+        // Only store if nobody invalidated the key while we were loading
+        if (value !== undefined && inflight.get(key) === pending) {
+          set(key, value, entryTtlMs);
+        }
+        return value;
+      } finally {
+        if (inflight.get(key) === pending) {
+          inflight.delete(key);
+        }
+      }
+    })();
+
+    inflight.set(key, pending);
+    return pending;
+  };
+
+  const getStats = () => ({
+    name,
+    size: entries.size,
+    maxEntries,
+    ttlMs,
+    ...stats,
+    hitRate: stats.hits + stats.misses > 0 ? stats.hits / (stats.hits + stats.misses) : 0,
+  });
+
+  const cache = {
+    get,
+    set,
+    delete: del,
+    deleteWhere,
+    clear,
+    getOrLoad,
+    getStats,
+  };
+  caches.add(cache);
+  return cache;
+};
+
+module.exports = {
+  createTtlCache,
+};
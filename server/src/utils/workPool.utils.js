@@ -0,0 +1,111 @@
+/**
+ * Work Pool
+ * Bounded-concurrency async task runner. At most `concurrency` tasks run at
+ * once; the rest wait in a FIFO queue (optionally capped by `maxQueue`).
+ *
+ * Usage:
+ * const pool = createWorkPool({ name: 'image-variants', concurrency: 2 });
+ * const result = await pool.run(() => expensiveAsyncWork());
+ * const results = await pool.map(files, (file) => processFile(file));
+ */
+
+const { gauge } = require('./metrics.utils');
+
+const pools = new Set();
+
+gauge({
+  name: 'work_pool_tasks',
+  help: 'Tasks running or queued per work pool',
+  labelNames: ['pool', 'state'],
+  collect: (set) => {
+    pools.forEach((pool) => {
+      const stats = pool.getStats();
+      set({ pool: stats.name, state: 'active' }, stats.active);
+      set({ pool: stats.name, state: 'queued' }, stats.queued);
+    });
+  },
+});
+
+/**
+ * Create a bounded work pool
+ * @param {Object} options
+ * @param {string} options.name - Pool name (metrics/logs)
+ * @param {number} options.concurrency - Maximum tasks running at once
+ * @param {number} [options.maxQueue=Infinity] - Reject new tasks beyond this many waiting
+ */
+const createWorkPool = ({ name, concurrency, maxQueue = Infinity }) => {
+  const limit = Math.max(1, Math.floor(concurrency) || 1);
+  const queue = [];
+  let active = 0;
+  let completed = 0;
+  let failed = 0;
+
+  const pump = () => {
+    while (active < limit && queue.length > 0) {
+      const { task, resolve, reject } = queue.shift();
+      active += 1;
+
+      Promise.resolve()
+        .then(task)
+        .then(
+          (value) => {
+            completed += 1;
+            resolve(value);
+          },
+          (error) => {
+            failed += 1;
+            reject(error);
+          }
+        )
+        .finally(() => {
+          active -= 1;
+          pump();
+        });
+    }
+  };
+
+  /**
+   * Queue a task
+   * @param {Function} task - () => Promise<any>
+   * @returns {Promise<any>} - Settles with the task's result
+   */
+  const run = (task) =>
+    new Promise((resolve, reject) => {
+      if (queue.length >= maxQueue) {
+        const error = new Error(`Work pool "${name}" queue is full`);
+        error.code = 'POOL_QUEUE_FULL';
+        reject(error);
+        return;
+      }
+      queue.push({ task, resolve, reject });
+      pump();
+    });
+
+  /**
+   * Run `fn` over every item through the pool, preserving order
+   * Rejects with the first failure (other tasks still run to completion).
+   * @param {Array} items
+   * @param {Function} fn - (item, index) => Promise<any>
+   */
+  const map = (items, fn) => Promise.all(items.map((item, index) => run(() => fn(item, index))));
+
+  /**
+   * Like map() but never rejects - returns { status, value | reason } per item
+   */
+  const mapSettled = (items, fn) =>
+    Promise.allSettled(items.map((item, index) => run(() => fn(item, index))));
+
+  const pool = {
+    run,
+    map,
+    mapSettled,
+    getStats: () => ({ name, concurrency: limit, active, queued: queue.length, completed, failed }),
+  };
+
+  pools.add(pool);
+  return pool;
+};
+
+module.exports = {
+  createWorkPool,
+};
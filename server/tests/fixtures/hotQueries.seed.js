@@ -0,0 +1,223 @@
+/**
+ * Seed fixture for the query plan suite (tests/queryPlans.test.js)
+ *
+ * Loads enough rows, with a realistic skew, that MySQL prefers the
+ * composite indexes over a full scan: most bookings are in the past and
+ * completed/cancelled, most orders are settled, most availability rows are
+ * booked nights spread over thousands of distinct blockedBy markers, and
+ * every property has a year of rate plan dates.
+ *
+ * Distributions come from a seeded PRNG so plans are reproducible. All
+ * rows hang off freshly created properties, so cleanup only removes what
+ * this fixture created.
+ */
+
+const { randomUUID } = require('crypto');
+
+const DAY_MS = 86400000;
+const CHUNK_SIZE = 1000;
+
+const PROPERTY_COUNT = 20;
+const ROOMS_PER_PROPERTY = 5;
+const AVAILABILITY_DAYS = 200;
+const BOOKING_COUNT = 6000;
+const REVIEW_COUNT = 3000;
+const ORDER_COUNT = 6000;
+const RATE_PLAN_DAYS = 365;
+
+// mulberry32
+const createRandom = (seed) => () => {
+  seed = (seed + 0x6d2b79f5) | 0;
+  let t = Math.imul(seed ^ (seed >>> 15), 1 | seed);
+  t = (t + Math.imul(t ^ (t >>> 7), 61 | t)) ^ t;
+  return ((t ^ (t >>> 14)) >>> 0) / 4294967296;
+};
+
+const startOfUtcDay = (date) => new Date(Date.UTC(date.getUTCFullYear(), date.getUTCMonth(), date.getUTCDate()));
+const addDays = (date, days) => new Date(date.getTime() + days * DAY_MS);
+
+const createManyInChunks = async (delegate, rows) => {
+  for (let i = 0; i < rows.length; i += CHUNK_SIZE) {
+    await delegate.createMany({ data: rows.slice(i, i + CHUNK_SIZE) });
+  }
+};
+
+/**
+ * Seed the hot query tables
+ * @param {import('@prisma/client').PrismaClient} prisma
+ * @param {{now?: Date}} [options]
+ * @returns {Promise<{propertyId: string, now: Date, cleanup: () => Promise<void>}>}
+ */
+const seedHotQueries = async (prisma, { now = new Date() } = {}) => {
+  const random = createRandom(20240601);
+  const pick = (items) => items[Math.floor(random() * items.length)];
+  const between = (min, max) => min + Math.floor(random() * (max - min + 1));
+
+  const tag = `qp${Date.now().toString(36)}`;
+  const today = startOfUtcDay(now);
+
+  const host = await prisma.host.create({
+    data: { email: `${tag}@host.test`, phone: tag, password: 'x' },
+  });
+  const user = await prisma.user.create({ data: { email: `${tag}@user.test`, password: 'x' } });
+  const roomType = await prisma.roomType.create({ data: { name: `${tag} Deluxe` } });
+
+  const propertyIds = Array.from({ length: PROPERTY_COUNT }, () => randomUUID());
+  await prisma.property.createMany({
+    data: propertyIds.map((id, i) => ({ id, title: `${tag} Property ${i}`, ownerHostId: host.id })),
+  });
+
+  const propertyRoomTypes = propertyIds.map((propertyId) => ({
+    id: randomUUID(),
+    propertyId,
+    roomTypeId: roomType.id,
+    maxOccupancy: 3,
+  }));
+  await prisma.propertyRoomType.createMany({ data: propertyRoomTypes });
+
+  const rooms = propertyRoomTypes.flatMap((link) =>
+    Array.from({ length: ROOMS_PER_PROPERTY }, (_, i) => ({
+      id: randomUUID(),
+      propertyRoomTypeId: link.id,
+      name: `Room ${i + 1}`,
+    }))
+  );
+  await prisma.room.createMany({ data: rooms });
+  const roomIds = rooms.map((room) => room.id);
+
+  // Availability: stays of 1-4 nights, each with its own marker; a few holds and maintenance days
+  const availability = [];
+  for (const roomId of roomIds) {
+    let day = -100;
+    while (day < AVAILABILITY_DAYS - 100) {
+      const nights = between(1, 4);
+      const roll = random();
+      const marker = randomUUID();
+      for (let n = 0; n < nights && day < AVAILABILITY_DAYS - 100; n += 1, day += 1) {
+        const date = addDays(today, day);
+        if (roll < 0.94) {
+          availability.push({ id: randomUUID(), roomId, date, status: 'booked', blockedBy: marker });
+        } else if (roll < 0.98) {
+          availability.push({
+            id: randomUUID(),
+            roomId,
+            date,
+            status: 'blocked',
+            blockedBy: marker,
+            holdExpiresAt: new Date(now.getTime() + between(-120, 120) * 60000),
+          });
+        } else {
+          availability.push({ id: randomUUID(), roomId, date, status: 'maintenance', reason: 'Seeded maintenance' });
+        }
+      }
+    }
+  }
+  await createManyInChunks(prisma.availability, availability);
+
+  // Bookings: mostly past (completed/cancelled), the rest spread over the next year
+  const bookings = Array.from({ length: BOOKING_COUNT }, (_, i) => {
+    const past = random() < 0.85;
+    const startDate = addDays(today, past ? between(-700, -10) : between(0, 365));
+    const nights = between(1, 5);
+    const status = past
+      ? pick(['completed', 'completed', 'completed', 'cancelled'])
+      : pick(['confirmed', 'confirmed', 'confirmed', 'pending', 'pending', 'cancelled']);
+
+    return {
+      id: randomUUID(),
+      bookingNumber: `${tag.toUpperCase()}${String(i).padStart(6, '0')}`,
+      userId: user.id,
+      propertyId: pick(propertyIds),
+      guestName: 'Seed Guest',
+      guestEmail: 'guest@seed.test',
+      guestPhone: '9000000000',
+      startDate,
+      endDate: addDays(startDate, nights),
+      nights,
+      adults: 2,
+      totalGuests: 2,
+      rooms: 1,
+      totalAmount: 1000 * nights,
+      status,
+    };
+  });
+  await createManyInChunks(prisma.booking, bookings);
+
+  const reviews = bookings
+    .filter((booking) => booking.status === 'completed')
+    .slice(0, REVIEW_COUNT)
+    .map((booking) => ({
+      id: randomUUID(),
+      bookingId: booking.id,
+      userId: user.id,
+      propertyId: booking.propertyId,
+      rating: between(1, 5),
+      createdAt: addDays(booking.endDate, between(0, 14)),
+      isDeleted: random() < 0.05,
+    }));
+  await createManyInChunks(prisma.review, reviews);
+
+  // Orders: almost all settled; PENDING ones cluster around now
+  const orders = Array.from({ length: ORDER_COUNT }, (_, i) => {
+    const roll = random();
+    const status = roll < 0.9 ? 'SUCCESS' : roll < 0.95 ? 'FAILED' : roll < 0.98 ? 'EXPIRED' : 'PENDING';
+    const createdAt =
+      status === 'PENDING'
+        ? new Date(now.getTime() - between(0, 120) * 60000)
+        : new Date(now.getTime() - between(1, 365) * DAY_MS);
+    const checkIn = addDays(startOfUtcDay(createdAt), between(1, 60));
+
+    return {
+      id: randomUUID(),
+      razorpayOrderId: `order_${tag}_${i}`,
+      amount: 100000,
+      status,
+      propertyId: pick(propertyIds),
+      checkIn,
+      checkOut: addDays(checkIn, between(1, 5)),
+      guests: 2,
+      rooms: 1,
+      createdAt,
+      expiresAt: new Date(createdAt.getTime() + 30 * 60000),
+    };
+  });
+  await createManyInChunks(prisma.order, orders);
+
+  // Rate plans: two per property, a year of dates alternating between them
+  const ratePlans = propertyIds.flatMap((propertyId) => [
+    { id: randomUUID(), propertyId, name: 'Standard', color: '#2563eb' },
+    { id: randomUUID(), propertyId, name: 'Peak', color: '#dc2626' },
+  ]);
+  await prisma.ratePlan.createMany({ data: ratePlans });
+
+  const ratePlanDates = propertyIds.flatMap((propertyId, p) =>
+    Array.from({ length: RATE_PLAN_DAYS }, (_, day) => ({
+      id: randomUUID(),
+      propertyId,
+      ratePlanId: ratePlans[p * 2 + (day % 7 >= 5 ? 1 : 0)].id,
+      date: addDays(today, day - 30),
+      isActive: random() < 0.9,
+    }))
+  );
+  await createManyInChunks(prisma.ratePlanDate, ratePlanDates);
+
+  const cleanup = async () => {
+    const byProperty = { propertyId: { in: propertyIds } };
+    await prisma.review.deleteMany({ where: byProperty });
+    await prisma.booking.deleteMany({ where: byProperty });
+    await prisma.order.deleteMany({ where: byProperty });
+    await prisma.ratePlanDate.deleteMany({ where: byProperty });
+    await prisma.ratePlan.deleteMany({ where: byProperty });
+    await prisma.availability.deleteMany({ where: { roomId: { in: roomIds } } });
+    await prisma.room.deleteMany({ where: { id: { in: roomIds } } });
+    await prisma.propertyRoomType.deleteMany({ where: byProperty });
+    await prisma.property.deleteMany({ where: { id: { in: propertyIds } } });
+    await prisma.roomType.delete({ where: { id: roomType.id } });
+    await prisma.user.delete({ where: { id: user.id } });
+    await prisma.host.delete({ where: { id: host.id } });
+  };
+
+  return { propertyId: propertyIds[0], now, cleanup };
+};
+
+module.exports = { seedHotQueries };
@@ -0,0 +1,41 @@
+/**
+ * Fake Prisma client for middleware tests
+ *
+ * Just enough of a PrismaClient for applyPrismaMiddleware(): $extends()
+ * returns model delegates that run the extension's $allOperations around
+ * a canned result, so query metrics, query hooks and the query tracker
+ * behave as with a real client - without a database.
+ */
+
+const OPERATIONS = ['findUnique', 'findFirst', 'findMany', 'count', 'create', 'update', 'updateMany', 'deleteMany'];
+
+/**
+ * @param {string[]} models - Model names, e.g. ['Property', 'Room']
+ * @param {Object} [results] - Canned results by "Model.operation" (default: null)
+ */
+const createFakePrismaClient = (models, results = {}) => ({
+  $extends(extension) {
+    const { $allOperations } = extension.query.$allModels;
+    const client = {};
+
+    models.forEach((model) => {
+      const delegate = {};
+      OPERATIONS.forEach((operation) => {
+        delegate[operation] = (args = {}) =>
+          $allOperations({
+            model,
+            operation,
+            args,
+            query: async () => results[`${model}.${operation}`] ?? null,
+          });
+      });
+      client[model.charAt(0).toLowerCase() + model.slice(1)] = delegate;
+    });
+
+    return client;
+  },
+});
+
+module.exports = {
+  createFakePrismaClient,
+};
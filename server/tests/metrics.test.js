@@ -0,0 +1,52 @@
+/**
+ * Metrics endpoint (middleware/metrics.middleware)
+ * Scrapes /metrics after some traffic and checks the HTTP and Prisma
+ * histograms are exposed, and that METRICS_TOKEN guards the endpoint.
+ */
+
+const express = require('express');
+const request = require('supertest');
+const { applyPrismaMiddleware } = require('../prisma/middleware/middleware');
+const { metricsMiddleware, metricsHandler } = require('../src/middleware/metrics.middleware');
+const { createFakePrismaClient } = require('./helpers/fakePrismaClient');
+
+const prisma = applyPrismaMiddleware(createFakePrismaClient(['Property'], { 'Property.findMany': [] }));
+
+const app = express();
+app.use(metricsMiddleware);
+app.get('/metrics', metricsHandler);
+app.get('/properties', async (req, res) => {
+  const data = await prisma.property.findMany({ where: { isDeleted: false } });
+  res.json({ success: true, data });
+});
+
+const originalToken = process.env.METRICS_TOKEN;
+
+afterEach(() => {
+  if (originalToken === undefined) delete process.env.METRICS_TOKEN;
+  else process.env.METRICS_TOKEN = originalToken;
+});
+
+describe('GET /metrics', () => {
+  it('exposes HTTP and Prisma histograms', async () => {
+    delete process.env.METRICS_TOKEN;
+    await request(app).get('/properties').expect(200);
+
+    const res = await request(app).get('/metrics');
+
+    expect(res.status).toBe(200);
+    expect(res.headers['content-type']).toMatch(/^text\/plain/);
+    expect(res.text).toContain('# TYPE http_request_duration_seconds histogram');
+    expect(res.text).toMatch(/http_request_duration_seconds_count\{method="GET",route="\/properties",status="2xx"\} 1/);
+    expect(res.text).toContain('# TYPE prisma_query_duration_seconds histogram');
+    expect(res.text).toMatch(/prisma_query_duration_seconds_count\{model="Property",action="findMany"\} 1/);
+  });
+
+  it('rejects a wrong bearer token when METRICS_TOKEN is set', async () => {
+    process.env.METRICS_TOKEN = 'scrape-secret';
+
+    await request(app).get('/metrics').set('Authorization', 'Bearer wrong-token').expect(401);
+    await request(app).get('/metrics').expect(401);
+    await request(app).get('/metrics').set('Authorization', 'Bearer scrape-secret').expect(200);
+  });
+});
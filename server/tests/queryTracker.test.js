@@ -0,0 +1,109 @@
+/**
+ * Query tracker (middleware/queryTracker.middleware)
+ * Runs with NODE_ENV=test, so the tracker is on and strict: a request over
+ * its route budget is answered with 500. Queries go through the real
+ * Prisma query middleware on a fake client (tests/helpers/fakePrismaClient).
+ */
+
+const express = require('express');
+const request = require('supertest');
+const { applyPrismaMiddleware } = require('../prisma/middleware/middleware');
+const { compression } = require('../src/middleware/compression.middleware');
+const {
+  queryTracker,
+  getQueryBudgetViolations,
+  resetQueryBudgetViolations,
+} = require('../src/middleware/queryTracker.middleware');
+const { getQueryBudget } = require('../src/config/queryBudgets');
+const { createFakePrismaClient } = require('./helpers/fakePrismaClient');
+
+const prisma = applyPrismaMiddleware(createFakePrismaClient(['Property', 'Room']));
+const DETAILS_BUDGET = getQueryBudget('GET /propertiesDetials/:id');
+
+let warnings = [];
+
+const buildApp = () => {
+  const app = express();
+
+  // Capture the tracker's warnings (it logs through req.log when present)
+  app.use((req, res, next) => {
+    req.log = {
+      warn: (msg, meta) => warnings.push({ msg, meta }),
+      info: () => {},
+      debug: () => {},
+      error: () => {},
+    };
+    next();
+  });
+
+  // Same order as src/app.js
+  app.use(compression);
+  app.use(queryTracker);
+
+  app.get('/propertiesDetials/:id', async (req, res) => {
+    const queries = Number(req.query.queries);
+    for (let i = 0; i < queries; i += 1) {
+      await prisma.property.findFirst({ where: { id: req.params.id, isDeleted: false } });
+    }
+    // Large enough to be compressed
+    res.json({ success: true, data: 'x'.repeat(4096) });
+  });
+
+  // One room lookup per property: the classic N+1, well within the default budget
+  app.get('/properties-with-rooms', async (req, res) => {
+    const propertyIds = ['p1', 'p2', 'p3', 'p4', 'p5', 'p6'];
+    for (const propertyId of propertyIds) {
+      await prisma.room.findMany({ where: { propertyId } });
+    }
+    res.json({ success: true });
+  });
+
+  return app;
+};
+
+const app = buildApp();
+
+beforeEach(() => {
+  warnings = [];
+  resetQueryBudgetViolations();
+});
+
+describe('query budgets', () => {
+  it('passes a request within its budget', async () => {
+    const res = await request(app).get(`/propertiesDetials/abc?queries=${DETAILS_BUDGET}`);
+
+    expect(res.status).toBe(200);
+    expect(getQueryBudgetViolations()).toHaveLength(0);
+  });
+
+  it('answers 500 when a route goes over its budget', async () => {
+    const res = await request(app)
+      .get(`/propertiesDetials/abc?queries=${DETAILS_BUDGET + 1}`)
+      .set('Accept-Encoding', 'gzip');
+
+    expect(res.status).toBe(500);
+    expect(res.body.queryBudgetViolation).toMatchObject({
+      route: 'GET /propertiesDetials/:id',
+      budget: DETAILS_BUDGET,
+      count: DETAILS_BUDGET + 1,
+    });
+    expect(getQueryBudgetViolations()).toHaveLength(1);
+  });
+});
+
+describe('N+1 detection', () => {
+  it('flags repeated same-shape queries', async () => {
+    const res = await request(app).get('/properties-with-rooms');
+
+    expect(res.status).toBe(200);
+    const warning = warnings.find(({ msg }) => msg === 'Repeated same-shape queries (possible N+1)');
+    expect(warning).toBeDefined();
+    expect(warning.meta.repeated).toEqual([{ shape: 'Room.findMany{where{propertyId}}', count: 6 }]);
+  });
+
+  it('does not flag distinct queries', async () => {
+    await request(app).get('/propertiesDetials/abc?queries=1');
+
+    expect(warnings.find(({ msg }) => msg === 'Repeated same-shape queries (possible N+1)')).toBeUndefined();
+  });
+});
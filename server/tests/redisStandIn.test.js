@@ -0,0 +1,105 @@
+/**
+ * Local Redis stand-in (config/redis) and the redis OTP provider
+ * The stand-in backs tests and single-process development; the OTP
+ * provider must refuse it, since OTPs stored there are not shared.
+ */
+
+const { createLocalRedisClient } = require('../src/config/redis');
+
+describe('local Redis stand-in', () => {
+  let client;
+
+  beforeEach(() => {
+    jest.useFakeTimers();
+    client = createLocalRedisClient();
+  });
+
+  afterEach(async () => {
+    await client.quit();
+    jest.useRealTimers();
+  });
+
+  it('stores, reads and deletes values', async () => {
+    expect(await client.set('a', 1)).toBe('OK');
+    expect(await client.get('a')).toBe('1');
+    expect(await client.del(['a', 'missing'])).toBe(1);
+    expect(await client.get('a')).toBeNull();
+  });
+
+  it('honours NX', async () => {
+    await client.set('a', 'first');
+    expect(await client.set('a', 'second', { NX: true })).toBeNull();
+    expect(await client.get('a')).toBe('first');
+  });
+
+  it('expires keys set with PX or EX', async () => {
+    await client.set('px', 'x', { PX: 1000 });
+    await client.set('ex', 'x', { EX: 2 });
+
+    jest.advanceTimersByTime(1001);
+    expect(await client.get('px')).toBeNull();
+    expect(await client.get('ex')).toBe('x');
+
+    jest.advanceTimersByTime(1000);
+    expect(await client.get('ex')).toBeNull();
+  });
+
+  it('does not arm a timer for keys without an expiry', async () => {
+    await client.set('forever', 'x');
+    await client.incrBy('counter', 2);
+
+    expect(jest.getTimerCount()).toBe(0);
+    expect(await client.get('forever')).toBe('x');
+  });
+
+  it('keeps the expiry of a key across incrBy', async () => {
+    await client.set('counter', '1', { PX: 1000 });
+    expect(await client.incrBy('counter', 4)).toBe(5);
+
+    jest.advanceTimersByTime(1001);
+    expect(await client.get('counter')).toBeNull();
+  });
+
+  it('reads and deletes with getDel', async () => {
+    await client.set('a', 'x');
+    expect(await client.getDel('a')).toBe('x');
+    expect(await client.getDel('a')).toBeNull();
+  });
+});
+
+describe('redis OTP provider', () => {
+  const redisUrl = process.env.REDIS_URL;
+
+  beforeEach(() => {
+    jest.resetModules();
+    delete process.env.REDIS_URL;
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+  });
+
+  afterEach(() => {
+    if (redisUrl !== undefined) process.env.REDIS_URL = redisUrl;
+    jest.restoreAllMocks();
+  });
+
+  it('refuses the in-process stand-in when REDIS_URL is unset', async () => {
+    const redisOtpProvider = require('../src/services/otp/providers/redis.provider');
+
+    await expect(redisOtpProvider.set('otp:user:1', { otp: '1234' }, 60000)).rejects.toMatchObject({
+      code: 'OTP_STORE_UNAVAILABLE',
+    });
+    await expect(redisOtpProvider.get('otp:user:1')).rejects.toMatchObject({ code: 'OTP_STORE_UNAVAILABLE' });
+    expect(console.error).toHaveBeenCalledTimes(1);
+  });
+
+  it('is reported as unshared for cluster mode', () => {
+    const { getUnsharedOtpStoreReason } = require('../src/services/otp');
+
+    process.env.OTP_STORE_PROVIDER = 'redis';
+    expect(getUnsharedOtpStoreReason()).toMatch(/REDIS_URL is not set/);
+
+    process.env.OTP_STORE_PROVIDER = 'memory';
+    expect(getUnsharedOtpStoreReason()).toMatch(/keeps OTPs per process/);
+
+    delete process.env.OTP_STORE_PROVIDER;
+  });
+});
@@ -0,0 +1,532 @@
+"""
+Load test for the booking-critical API endpoints.
+
+Drives the API (not the UI) with an open arrival model: each endpoint gets
+its own Poisson arrival rate, independent of how fast the server answers,
+and --concurrency caps the requests in flight across all endpoints.
+Latency is measured from each request's scheduled arrival, so time spent
+waiting for a free slot counts - a saturated server shows up as latency,
+not as a quietly lower request rate.
+
+Endpoints (--rate name=requests_per_second, 0 disables one):
+    search         GET  /properties/search          (searchProperties)
+    search_cities  GET  /api/search/cities
+    details        GET  /propertiesDetials/:id      (getPropertyDetails)
+    pricing        GET  /propertiesDetials/:id/pricing
+    booking_data   GET  /propertiesDetials/:id/booking-data
+    create_order   POST /api/create-order           (createOrder)
+
+create_order places real orders that hold rooms for 30 minutes (released
+by the order expiry sweeper), so run it against a test database, with the
+server pointed at the mock Razorpay gateway:
+
+    # server/
+    npm run payments:mock-gateway
+    RAZORPAY_API_BASE_URL=http://localhost:4010/v1 npm start
+
+Bookable rooms are collected before the run from booking-data over many
+future one-night stays, and each (room, night) is ordered at most once, so
+orders do not fail on rooms the test itself already holds.
+
+Results (throughput and p50/p95/p99 latency per endpoint) are printed and
+written as JSON, then compared to baseline.json: a latency percentile,
+throughput or error rate worse than the baseline by more than its tolerance
+fails the run (exit code 1). Record the baseline on the reference
+environment with --update-baseline; until one is recorded (recordedAt is
+null) the comparison is skipped with a warning. A run whose profile
+(duration, concurrency, rates) differs from the baseline's is not compared
+either - its numbers would not mean the same thing - and exits with code 2;
+rerun with the baseline's profile or pass --no-compare.
+
+Usage:
+    pip install -r load_tests/requirements.txt
+    python load_tests/load_test.py --base-url http://localhost:5000 \
+        [--duration 60] [--warmup 10] [--concurrency 50] \
+        [--rate search=5 --rate create_order=1 ...] [--property ID ...] \
+        [--token JWT] [--output results.json] [--baseline load_tests/baseline.json] \
+        [--update-baseline] [--no-compare]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import sys
+import time
+from dataclasses import dataclass, field
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+import aiohttp
+
+HERE = Path(__file__).resolve().parent
+
+DEFAULT_RATES = {
+    "search": 5.0,
+    "search_cities": 5.0,
+    "details": 10.0,
+    "pricing": 10.0,
+    "booking_data": 5.0,
+    "create_order": 1.0,
+}
+
+# Statuses that count as a successful answer (304: conditional GET hit)
+OK_STATUSES = {200, 201, 304}
+
+# One-night stays considered when collecting bookable rooms
+FIRST_STAY_OFFSET_DAYS = 14
+LAST_STAY_OFFSET_DAYS = 330
+
+TAX_RATE = 0.12
+FALLBACK_NIGHTLY_PRICE = 1000.0
+
+
+class SetupError(Exception):
+    """The target could not be prepared for a run (no properties, server down, ...)"""
+
+
+@dataclass
+class EndpointStats:
+    """Raw samples of one endpoint inside the measured window"""
+
+    latencies_ms: list = field(default_factory=list)
+    statuses: dict = field(default_factory=dict)
+    errors: int = 0
+    skipped: int = 0
+    # Successful responses that completed inside the window (throughput)
+    completed: int = 0
+
+    def record(self, latency_ms, status):
+        self.latencies_ms.append(latency_ms)
+        key = str(status)
+        self.statuses[key] = self.statuses.get(key, 0) + 1
+        if status not in OK_STATUSES:
+            self.errors += 1
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(stats, measured_seconds):
+    values = sorted(stats.latencies_ms)
+    requests = len(values)
+
+    def rounded(value):
+        return None if value is None else round(value, 2)
+
+    return {
+        "requests": requests,
+        "ok": requests - stats.errors,
+        "errors": stats.errors,
+        "skipped": stats.skipped,
+        "error_rate": round(stats.errors / requests, 4) if requests else 0.0,
+        "throughput_rps": round(stats.completed / measured_seconds, 3) if measured_seconds > 0 else 0.0,
+        "p50_ms": rounded(percentile(values, 50)),
+        "p95_ms": rounded(percentile(values, 95)),
+        "p99_ms": rounded(percentile(values, 99)),
+        "mean_ms": rounded(sum(values) / requests) if requests else None,
+        "max_ms": rounded(values[-1]) if values else None,
+        "statuses": dict(sorted(stats.statuses.items())),
+    }
+
+
+def stay_dates(offset_days, nights=1):
+    check_in = date.today() + timedelta(days=offset_days)
+    check_out = check_in + timedelta(days=nights)
+    nights_list = [(check_in + timedelta(days=n)).isoformat() for n in range(nights)]
+    return check_in.isoformat(), check_out.isoformat(), nights_list
+
+
+class LoadTest:
+    def __init__(self, args):
+        self.args = args
+        self.base_url = args.base_url.rstrip("/")
+        self.rates = args.rates
+        self.property_ids = list(args.property or [])
+        self.order_candidates = []
+        self.stats = {name: EndpointStats() for name, rate in self.rates.items() if rate > 0}
+        self.semaphore = asyncio.Semaphore(args.concurrency)
+        self.session = None
+        self.measure_from = None
+        self.measure_until = None
+
+    # ------------------------------------------------------------------ setup
+
+    async def request(self, method, path, **kwargs):
+        """Plain request (setup only, not measured); returns (status, json_or_none)"""
+        async with self.session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+            try:
+                body = await response.json(content_type=None)
+            except (aiohttp.ContentTypeError, json.JSONDecodeError, UnicodeDecodeError):
+                body = None
+            return response.status, body
+
+    async def discover_properties(self):
+        if self.property_ids:
+            return
+        status, body = await self.request("GET", "/properties", params={"status": "active", "limit": "20"})
+        if status != 200 or not body:
+            raise SetupError(f"GET /properties returned {status}; pass --property explicitly")
+        self.property_ids = [item["id"] for item in body.get("data", []) if item.get("id")]
+        if not self.property_ids:
+            raise SetupError("No active properties found; seed the database or pass --property")
+
+    async def collect_order_candidates(self):
+        """Bookable (property, room, night) combinations, each used by at most one order"""
+        needed = math.ceil(self.rates.get("create_order", 0) * (self.args.duration + self.args.warmup) * 1.2)
+        if needed <= 0:
+            return
+
+        offsets = list(range(FIRST_STAY_OFFSET_DAYS, LAST_STAY_OFFSET_DAYS))
+        random.shuffle(offsets)
+        for offset in offsets:
+            if len(self.order_candidates) >= needed:
+                break
+            property_id = random.choice(self.property_ids)
+            check_in, check_out, nights = stay_dates(offset)
+            status, body = await self.request(
+                "GET",
+                f"/propertiesDetials/{property_id}/booking-data",
+                params={"checkIn": check_in, "checkOut": check_out, "guests": "2", "adults": "2", "rooms": "1", "children": "0"},
+            )
+            if status != 200 or not body:
+                continue
+            for room_type in body.get("data", []):
+                price, meal_plan_id = self.stay_price(room_type, nights)
+                for room in room_type.get("availableRoomsForEntireStay", []):
+                    self.order_candidates.append({
+                        "propertyId": property_id,
+                        "checkIn": check_in,
+                        "checkOut": check_out,
+                        "nights": nights,
+                        "roomTypeId": room_type["roomTypeId"],
+                        "roomTypeName": room_type.get("roomTypeName") or "Room",
+                        "roomId": room["id"],
+                        "mealPlanId": meal_plan_id,
+                        "price": price,
+                    })
+
+        random.shuffle(self.order_candidates)
+        if len(self.order_candidates) < needed:
+            print(f"⚠️  Only {len(self.order_candidates)} bookable room-nights found for ~{needed} orders; "
+                  "create_order arrivals beyond that are skipped")
+
+    @staticmethod
+    def stay_price(room_type, nights):
+        """Price of the stay from the booking-data rate plans (cheapest meal plan per night)"""
+        total = 0.0
+        meal_plan_id = None
+        by_date = {entry.get("date"): entry for entry in room_type.get("ratePlanDates", [])}
+        for night in nights:
+            plans = [plan for key, plan in by_date.get(night, {}).items() if key != "date" and isinstance(plan, dict)]
+            priced = [plan for plan in plans if plan.get("price")]
+            if priced:
+                cheapest = min(priced, key=lambda plan: plan["price"])
+                total += float(cheapest["price"])
+                meal_plan_id = meal_plan_id or cheapest.get("mealPlanId")
+            else:
+                total += FALLBACK_NIGHTLY_PRICE
+        return round(total, 2), meal_plan_id
+
+    # --------------------------------------------------------------- requests
+
+    def random_stay(self):
+        offset = random.randint(FIRST_STAY_OFFSET_DAYS, 120)
+        return stay_dates(offset, nights=random.randint(1, 3))
+
+    def build_request(self, name):
+        """(method, path, kwargs) for one request of an endpoint, or None to skip it"""
+        property_id = random.choice(self.property_ids) if self.property_ids else None
+
+        if name == "search":
+            check_in, check_out, _ = self.random_stay()
+            return "GET", "/properties/search", {"params": {"checkIn": check_in, "checkOut": check_out, "adults": "2", "rooms": "1"}}
+        if name == "search_cities":
+            return "GET", "/api/search/cities", {}
+        if name == "details":
+            return "GET", f"/propertiesDetials/{property_id}", {}
+        if name == "pricing":
+            month = date.today().replace(day=1) + timedelta(days=32 * random.randint(0, 5))
+            return "GET", f"/propertiesDetials/{property_id}/pricing", {"params": {"month": str(month.month), "year": str(month.year)}}
+        if name == "booking_data":
+            check_in, check_out, _ = self.random_stay()
+            params = {"checkIn": check_in, "checkOut": check_out, "guests": "2", "adults": "2", "rooms": "1", "children": "0"}
+            return "GET", f"/propertiesDetials/{property_id}/booking-data", {"params": params}
+        if name == "create_order":
+            if not self.order_candidates:
+                return None
+            return "POST", "/api/create-order", {"json": self.order_payload(self.order_candidates.pop())}
+        raise ValueError(f"Unknown endpoint {name}")
+
+    @staticmethod
+    def order_payload(candidate):
+        price = candidate["price"]
+        tax = round(price * TAX_RATE, 2)
+        total = round(price + tax, 2)
+        selection = {
+            "roomTypeId": candidate["roomTypeId"],
+            "roomTypeName": candidate["roomTypeName"],
+            "roomIds": [candidate["roomId"]],
+            "rooms": 1,
+            "guests": 2,
+            "children": 0,
+            "price": price,
+            "tax": tax,
+            "totalPrice": total,
+            "checkIn": candidate["checkIn"],
+            "checkOut": candidate["checkOut"],
+            "datesToBlock": candidate["nights"],
+        }
+        if candidate["mealPlanId"]:
+            selection["mealPlanId"] = candidate["mealPlanId"]
+        return {
+            "amount": total,
+            "currency": "INR",
+            "bookingDetails": {
+                "propertyId": candidate["propertyId"],
+                "checkIn": candidate["checkIn"],
+                "checkOut": candidate["checkOut"],
+                "guests": 2,
+                "children": 0,
+                "guestName": "Load Test",
+                "guestEmail": "loadtest@example.com",
+                "guestPhone": "9000000000",
+                "role": "user",
+            },
+            "roomSelections": [selection],
+        }
+
+    async def fire(self, name, scheduled_at):
+        built = self.build_request(name)
+        measured = self.measure_from <= scheduled_at < self.measure_until
+        if built is None:
+            if measured:
+                self.stats[name].skipped += 1
+            return
+
+        method, path, kwargs = built
+        async with self.semaphore:
+            try:
+                async with self.session.request(method, f"{self.base_url}{path}", **kwargs) as response:
+                    await response.read()
+                    status = response.status
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                status = type(error).__name__
+        finished_at = time.monotonic()
+        if status in OK_STATUSES and self.measure_from <= finished_at < self.measure_until:
+            self.stats[name].completed += 1
+        if measured:
+            self.stats[name].record((finished_at - scheduled_at) * 1000, status)
+
+    async def arrivals(self, name, rate, until):
+        """Poisson arrivals for one endpoint until `until` (monotonic seconds)
+
+        Each endpoint draws from its own generator seeded by --seed, so the
+        arrival schedule is identical from run to run and against the baseline.
+        """
+        schedule = random.Random(f"{self.args.seed}:{name}")
+        tasks = []
+        next_at = time.monotonic()
+        while True:
+            next_at += schedule.expovariate(rate)
+            if next_at >= until:
+                break
+            await asyncio.sleep(max(0.0, next_at - time.monotonic()))
+            tasks.append(asyncio.create_task(self.fire(name, next_at)))
+        await asyncio.gather(*tasks)
+
+    # -------------------------------------------------------------------- run
+
+    async def run(self):
+        timeout = aiohttp.ClientTimeout(total=self.args.timeout)
+        headers = {"Authorization": f"Bearer {self.args.token}"} if self.args.token else {}
+        connector = aiohttp.TCPConnector(limit=self.args.concurrency)
+        async with aiohttp.ClientSession(timeout=timeout, headers=headers, connector=connector) as session:
+            self.session = session
+            try:
+                await self.discover_properties()
+                await self.collect_order_candidates()
+            except aiohttp.ClientError as error:
+                raise SetupError(f"Cannot reach {self.base_url}: {error}") from error
+
+            started = time.monotonic()
+            self.measure_from = started + self.args.warmup
+            self.measure_until = self.measure_from + self.args.duration
+            print(f"🚀 {self.args.warmup}s warmup + {self.args.duration}s measured against {self.base_url} "
+                  f"({len(self.property_ids)} properties, concurrency {self.args.concurrency})")
+            await asyncio.gather(*(self.arrivals(name, self.rates[name], self.measure_until) for name in self.stats))
+            finished = time.monotonic()
+
+        measured_seconds = min(finished, self.measure_until) - self.measure_from
+        return {
+            "meta": {
+                "baseUrl": self.base_url,
+                "startedAt": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "durationSeconds": self.args.duration,
+                "warmupSeconds": self.args.warmup,
+                "concurrency": self.args.concurrency,
+                "rates": {name: self.rates[name] for name in self.stats},
+                "properties": len(self.property_ids),
+                "drainSeconds": round(max(0.0, finished - self.measure_until), 2),
+            },
+            "endpoints": {name: summarize(stats, measured_seconds) for name, stats in self.stats.items()},
+        }
+
+
+# ------------------------------------------------------------------ baseline
+
+def compare(results, baseline):
+    """Regressions of `results` against `baseline`, as human-readable strings"""
+    tolerance = baseline.get("tolerance", {})
+    latency_tolerance = tolerance.get("latency", 0.25)
+    latency_slack_ms = tolerance.get("latencySlackMs", 10)
+    throughput_tolerance = tolerance.get("throughput", 0.1)
+    error_rate_tolerance = tolerance.get("errorRate", 0.01)
+
+    regressions = []
+    for name, expected in baseline.get("endpoints", {}).items():
+        actual = results["endpoints"].get(name)
+        if actual is None:
+            continue
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            if expected.get(key) is None or actual.get(key) is None:
+                continue
+            limit = max(expected[key] * (1 + latency_tolerance), expected[key] + latency_slack_ms)
+            if actual[key] > limit:
+                regressions.append(f"{name} {key} {actual[key]:.1f} > {limit:.1f} (baseline {expected[key]:.1f})")
+        if expected.get("throughput_rps"):
+            floor = expected["throughput_rps"] * (1 - throughput_tolerance)
+            if actual["throughput_rps"] < floor:
+                regressions.append(f"{name} throughput {actual['throughput_rps']:.2f}/s < {floor:.2f}/s "
+                                   f"(baseline {expected['throughput_rps']:.2f}/s)")
+        ceiling = expected.get("error_rate", 0) + error_rate_tolerance
+        if actual["error_rate"] > ceiling:
+            regressions.append(f"{name} error rate {actual['error_rate']:.2%} > {ceiling:.2%}")
+    return regressions
+
+
+def profile_mismatches(results, baseline):
+    """Differences between the run's profile and the one the baseline was recorded with"""
+    expected = baseline.get("profile", {})
+    mismatches = []
+    for key in ("durationSeconds", "concurrency"):
+        if expected.get(key) != results["meta"][key]:
+            mismatches.append(f"{key} {results['meta'][key]} (baseline {expected.get(key)})")
+    expected_rates = expected.get("rates", {})
+    for name, rate in results["meta"]["rates"].items():
+        if expected_rates.get(name) != rate:
+            mismatches.append(f"rate {name}={rate} (baseline {expected_rates.get(name)})")
+    return mismatches
+
+
+def write_baseline(results, path):
+    previous = json.loads(path.read_text()) if path.exists() else {}
+    keys = ("p50_ms", "p95_ms", "p99_ms", "throughput_rps", "error_rate")
+    baseline = {
+        "recordedAt": results["meta"]["startedAt"],
+        "profile": {key: results["meta"][key] for key in ("durationSeconds", "concurrency", "rates")},
+        "tolerance": previous.get("tolerance", {"latency": 0.25, "latencySlackMs": 10, "throughput": 0.1, "errorRate": 0.01}),
+        "endpoints": {name: {key: stats[key] for key in keys} for name, stats in results["endpoints"].items()},
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n")
+
+
+# ----------------------------------------------------------------------- cli
+
+def print_report(results):
+    print(f"\n{'endpoint':<15}{'reqs':>7}{'err%':>8}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in results["endpoints"].items():
+        def ms(value):
+            return "-" if value is None else f"{value:.1f}"
+        print(f"{name:<15}{stats['requests']:>7}{stats['error_rate'] * 100:>7.1f}%{stats['throughput_rps']:>9.2f}"
+              f"{ms(stats['p50_ms']):>10}{ms(stats['p95_ms']):>10}{ms(stats['p99_ms']):>10}"
+              + (f"  ({stats['skipped']} skipped)" if stats["skipped"] else ""))
+
+
+def parse_rates(values):
+    rates = dict(DEFAULT_RATES)
+    for value in values or []:
+        name, _, rate = value.partition("=")
+        if name not in DEFAULT_RATES:
+            raise argparse.ArgumentTypeError(f"Unknown endpoint '{name}' (one of {', '.join(DEFAULT_RATES)})")
+        rates[name] = float(rate)
+    return rates
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the booking-critical API endpoints")
+    parser.add_argument("--base-url", default="http://localhost:5000")
+    parser.add_argument("--duration", type=float, default=60, help="measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="seconds of load before measuring")
+    parser.add_argument("--concurrency", type=int, default=50, help="max requests in flight")
+    parser.add_argument("--rate", action="append", metavar="NAME=RPS", help="arrival rate of an endpoint (repeatable)")
+    parser.add_argument("--property", action="append", metavar="ID", help="property to target (repeatable; default: discover)")
+    parser.add_argument("--token", help="bearer token, e.g. an agent's to exercise agent pricing")
+    parser.add_argument("--timeout", type=float, default=30, help="per-request timeout in seconds")
+    parser.add_argument("--seed", type=int, default=1, help="seed for the arrival schedule and request mix")
+    parser.add_argument("--output", type=Path, help="results JSON (default: load_tests/results/<timestamp>.json)")
+    parser.add_argument("--baseline", type=Path, default=HERE / "baseline.json")
+    parser.add_argument("--update-baseline", action="store_true", help="write these results as the new baseline")
+    parser.add_argument("--no-compare", action="store_true", help="report only, never fail on the baseline")
+    args = parser.parse_args(argv)
+    try:
+        args.rates = parse_rates(args.rate)
+    except (argparse.ArgumentTypeError, ValueError) as error:
+        parser.error(str(error))
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    random.seed(args.seed)
+
+    try:
+        results = asyncio.run(LoadTest(args).run())
+    except SetupError as error:
+        print(f"❌ {error}")
+        return 2
+
+    print_report(results)
+
+    output = args.output or HERE / "results" / f"load-test-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(f"\n📝 Results written to {output}")
+
+    if args.update_baseline:
+        write_baseline(results, args.baseline)
+        print(f"📌 Baseline updated: {args.baseline}")
+        return 0
+    if args.no_compare or not args.baseline.exists():
+        return 0
+
+    baseline = json.loads(args.baseline.read_text())
+    if not baseline.get("recordedAt"):
+        print(f"⚠️  {args.baseline.name} has not been recorded yet; skipping the comparison. "
+              "Record it on the reference environment with --update-baseline")
+        return 0
+    mismatches = profile_mismatches(results, baseline)
+    if mismatches:
+        print(f"\n❌ Run profile differs from {args.baseline.name}, not comparing:")
+        for mismatch in mismatches:
+            print(f"   - {mismatch}")
+        print("   Rerun with the baseline's profile, pass --no-compare, or record a new baseline")
+        return 2
+    regressions = compare(results, baseline)
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s) against {args.baseline.name}:")
+        for regression in regressions:
+            print(f"   - {regression}")
+        return 1
+    print(f"✅ Within baseline ({args.baseline.name})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -20,9 +20,9 @@ const PendingCancellationPopup = () => {
   const checkPendingRequests = async () => {
     try {
       setLoading(true);
-      const res = await cancellationRequestService.getAll({ status: 'pending', page: 1, limit: 1 });
+      const res = await cancellationRequestService.getCounts();
       if (res.data?.success) {
-        const count = res.data.data.pagination?.total || 0;
+        const count = res.data.data.counts?.pending || 0;
         setPendingCount(count);
         
         // Show popup if there are pending requests
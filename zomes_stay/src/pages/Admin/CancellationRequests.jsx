@@ -7,9 +7,11 @@ const CancellationRequests = () => {
   const [requests, setRequests] = useState([]);
   const [loading, setLoading] = useState(false);
   const [statusFilter, setStatusFilter] = useState(''); // 'pending', 'approved', 'rejected', or '' for all
-  const [page, setPage] = useState(1);
-  const [totalPages, setTotalPages] = useState(1);
-  const [total, setTotal] = useState(0);
+  // Keyset pagination: cursors[i] opens page i (null = first page)
+  const [cursors, setCursors] = useState([null]);
+  const [pageIndex, setPageIndex] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [counts, setCounts] = useState({ pending: 0, approved: 0, rejected: 0, total: 0 });
   const [notification, setNotification] = useState({ isOpen: false, type: 'success', title: '', message: '' });
   
   // Modal states
@@ -19,27 +21,30 @@ const CancellationRequests = () => {
   const [selectedRequest, setSelectedRequest] = useState(null);
   const [adminNotes, setAdminNotes] = useState('');
   const [processingId, setProcessingId] = useState(null);
+  const [detailsLoading, setDetailsLoading] = useState(false);
 
   const openNotify = (type, title, message) => setNotification({ isOpen: true, type, title, message });
   const closeNotify = () => setNotification(prev => ({ ...prev, isOpen: false }));
 
   useEffect(() => {
     fetchRequests();
-  }, [page, statusFilter]);
+  }, [pageIndex, statusFilter]);
 
+  // The list is a slim projection; modals load the full request on demand
   const fetchRequests = async () => {
     try {
       setLoading(true);
+      const cursor = cursors[pageIndex];
       const params = {
-        page,
         limit: 20,
+        ...(cursor && { cursor }),
         ...(statusFilter && { status: statusFilter })
       };
       const res = await cancellationRequestService.getAll(params);
       if (res.data?.success) {
         setRequests(res.data.data.cancellationRequests || []);
-        setTotalPages(res.data.data.pagination?.pages || 1);
-        setTotal(res.data.data.pagination?.total || 0);
+        setNextCursor(res.data.data.pagination?.hasNext ? res.data.data.pagination.nextCursor : null);
+        if (res.data.data.counts) setCounts(res.data.data.counts);
       } else {
         openNotify('error', 'Error', res.data?.message || 'Failed to load cancellation requests');
       }
@@ -86,21 +91,51 @@ const CancellationRequests = () => {
     );
   };
 
-  const openApproveModal = (request) => {
+  const goToNextPage = () => {
+    if (!nextCursor) return;
+    setCursors(prev => [...prev.slice(0, pageIndex + 1), nextCursor]);
+    setPageIndex(i => i + 1);
+  };
+
+  const goToPreviousPage = () => {
+    setPageIndex(i => Math.max(0, i - 1));
+  };
+
+  const filteredTotal = statusFilter ? counts[statusFilter] || 0 : counts.total;
+
+  // Show the list row straight away, then fill in the full request
+  const loadRequestDetails = async (request) => {
     setSelectedRequest(request);
+    try {
+      setDetailsLoading(true);
+      const res = await cancellationRequestService.getById(request.id);
+      if (res.data?.success) {
+        setSelectedRequest(prev => (prev?.id === request.id ? res.data.data.cancellationRequest : prev));
+      } else {
+        openNotify('error', 'Error', res.data?.message || 'Failed to load request details');
+      }
+    } catch (error) {
+      openNotify('error', 'Error', 'Failed to load request details');
+    } finally {
+      setDetailsLoading(false);
+    }
+  };
+
+  const openApproveModal = (request) => {
     setAdminNotes('');
     setShowApproveModal(true);
+    loadRequestDetails(request);
   };
 
   const openRejectModal = (request) => {
-    setSelectedRequest(request);
     setAdminNotes('');
     setShowRejectModal(true);
+    loadRequestDetails(request);
   };
 
   const openViewModal = (request) => {
-    setSelectedRequest(request);
     setShowViewModal(true);
+    loadRequestDetails(request);
   };
 
   const handleApprove = async () => {
@@ -174,7 +209,8 @@ const CancellationRequests = () => {
                 value={statusFilter}
                 onChange={(e) => {
                   setStatusFilter(e.target.value);
-                  setPage(1);
+                  setCursors([null]);
+                  setPageIndex(0);
                 }}
                 className="px-3 py-2 border border-gray-300 rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-blue-500"
               >
@@ -191,18 +227,18 @@ const CancellationRequests = () => {
         <div className="grid grid-cols-1 sm:grid-cols-3 gap-4 mb-4">
           <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-4">
             <div className="text-sm text-gray-600">Total Requests</div>
-            <div className="text-2xl font-bold text-gray-900 mt-1">{total}</div>
+            <div className="text-2xl font-bold text-gray-900 mt-1">{counts.total}</div>
           </div>
           <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-4">
             <div className="text-sm text-gray-600">Pending</div>
             <div className="text-2xl font-bold text-yellow-600 mt-1">
-              {requests.filter(r => r.status === 'pending').length}
+              {counts.pending}
             </div>
           </div>
           <div className="bg-white rounded-lg shadow-sm border border-gray-200 p-4">
             <div className="text-sm text-gray-600">Processed</div>
             <div className="text-2xl font-bold text-green-600 mt-1">
-              {requests.filter(r => r.status !== 'pending').length}
+              {counts.approved + counts.rejected}
             </div>
           </div>
         </div>
@@ -310,22 +346,22 @@ const CancellationRequests = () => {
               </div>
 
               {/* Pagination */}
-              {totalPages > 1 && (
+              {(pageIndex > 0 || nextCursor) && (
                 <div className="px-4 py-3 border-t border-gray-200 flex items-center justify-between">
                   <div className="text-sm text-gray-700">
-                    Showing page {page} of {totalPages}
+                    Page {pageIndex + 1} · {filteredTotal} request{filteredTotal === 1 ? '' : 's'}
                   </div>
                   <div className="flex items-center gap-2">
                     <button
-                      onClick={() => setPage(p => Math.max(1, p - 1))}
-                      disabled={page === 1}
+                      onClick={goToPreviousPage}
+                      disabled={pageIndex === 0}
                       className="px-3 py-1.5 border border-gray-300 rounded-lg text-sm disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                     >
                       Previous
                     </button>
                     <button
-                      onClick={() => setPage(p => Math.min(totalPages, p + 1))}
-                      disabled={page === totalPages}
+                      onClick={goToNextPage}
+                      disabled={!nextCursor}
                       className="px-3 py-1.5 border border-gray-300 rounded-lg text-sm disabled:opacity-50 disabled:cursor-not-allowed hover:bg-gray-50"
                     >
                       Next
@@ -506,6 +542,7 @@ const CancellationRequests = () => {
                 <div className="flex items-center gap-2">
                   <Eye className="h-5 w-5" />
                   <h3 className="text-lg font-semibold">Cancellation Request Details</h3>
+                  {detailsLoading && <Loader2 className="h-4 w-4 animate-spin" />}
                 </div>
                 <button
                   onClick={() => setShowViewModal(false)}
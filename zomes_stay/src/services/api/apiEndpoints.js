@@ -157,6 +157,8 @@ export const CANCELLATION_REQUEST = {
   GET_MY_REQUESTS: '/api/cancellation-requests/my-requests',
   // Get all cancellation requests (admin)
   GET_ALL: '/api/cancellation-requests',
+  // Get request counts per status (admin)
+  GET_COUNTS: '/api/cancellation-requests/counts',
   // Get cancellation request by ID
   GET_BY_ID: '/api/cancellation-requests',
   // Approve cancellation request (admin)
@@ -95,6 +95,7 @@ export const ADMIN = {
   // Cancellation Requests
   CANCELLATION_REQUEST: {
     LIST: '/api/cancellation-requests',
+    COUNTS: '/api/cancellation-requests/counts',
     GET_BY_ID: (id) => `/api/cancellation-requests/${id}`,
     APPROVE: (id) => `/api/cancellation-requests/${id}/approve`,
     REJECT: (id) => `/api/cancellation-requests/${id}/reject`,
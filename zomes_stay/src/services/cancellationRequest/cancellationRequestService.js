@@ -43,7 +43,8 @@ const cancellationRequestService = {
    * Get all cancellation requests (admin)
    * GET /api/cancellation-requests
    * Requires: Admin authentication
-   * Query params: status?, page?, limit?
+   * Query params: status?, limit?, cursor? (or page? for numbered pages)
+   * Returns a slim list with pagination.nextCursor/hasNext; details come from getById
    */
   getAll: (params, config = {}) =>
     apiService.get(CANCELLATION_REQUEST.GET_ALL, {
@@ -54,6 +55,15 @@ const cancellationRequestService = {
       },
     }),
 
+  /**
+   * Get cancellation request counts per status (admin)
+   * GET /api/cancellation-requests/counts
+   * Requires: Admin authentication
+   * Returns: { counts: { pending, approved, rejected, total } }
+   */
+  getCounts: (config = {}) =>
+    apiService.get(CANCELLATION_REQUEST.GET_COUNTS, config),
+
   /**
    * Get cancellation request by ID
    * GET /api/cancellation-requests/:requestId